@@ -40,5 +40,84 @@ def delete_apikey(key: str, db_path: str | None = None) -> None:
         typer.echo(f"API key {key} not found.")
 
 
+@app.command()
+def simulator(
+    host: str = "127.0.0.1",
+    port: int = 8090,
+    latency: float = 0.0,
+    ajax_latency: float = 0.0,
+    slow_rate: float = 0.0,
+    slow_latency: float = 2.0,
+    stale_view_state_rate: float = 0.0,
+    duplicate_patients: bool = False,
+    seed: int | None = None,
+) -> None:
+    """Run the local SIScan simulator (point SISCAN_URL to it)."""
+    import uvicorn
+
+    from src.siscan.simulator import SimulatorConfig, create_app
+
+    config = SimulatorConfig(
+        latency=latency,
+        ajax_latency=ajax_latency,
+        slow_rate=slow_rate,
+        slow_latency=slow_latency,
+        stale_view_state_rate=stale_view_state_rate,
+        duplicate_patients=duplicate_patients,
+        seed=seed,
+    )
+    typer.echo(f"SISCAN_URL=http://{host}:{port}/")
+    uvicorn.run(create_app(config), host=host, port=port)
+
+
+@app.command()
+def benchmark(
+    flow: list[str] = typer.Option(["rastreio", "diagnostica"]),
+    runs: int = 20,
+    warmup: int = 1,
+    output: str = "benchmark.json",
+    baseline: str | None = None,
+    tolerance: float = 0.2,
+    check_budgets: bool = True,
+    url: str | None = None,
+    engine: str = "http",
+    latency: float = 0.0,
+    ajax_latency: float = 0.0,
+    slow_rate: float = 0.0,
+    slow_latency: float = 2.0,
+    seed: int | None = None,
+) -> None:
+    """Benchmark the mamografia flows against a baseline and budgets."""
+    import asyncio
+
+    from src.siscan import benchmark as bench
+    from src.siscan.simulator import SimulatorConfig
+
+    config = SimulatorConfig(
+        latency=latency,
+        ajax_latency=ajax_latency,
+        slow_rate=slow_rate,
+        slow_latency=slow_latency,
+        seed=seed,
+    )
+    result = asyncio.run(bench.run_benchmark(
+        flows=flow, runs=runs, warmup=warmup, config=config, base_url=url,
+        engine=engine,
+    ))
+    bench.save_result(result, output)
+    regressions = []
+    if baseline:
+        regressions = bench.compare(
+            result, bench.load_result(baseline), tolerance=tolerance
+        )
+    exceeded = bench.check_budgets(result) if check_budgets else []
+    typer.echo(bench.format_report(result, regressions))
+    for message in exceeded:
+        typer.echo(f"ORÇAMENTO EXCEDIDO {message}")
+    typer.echo(f"Resultado salvo em {output}")
+    if regressions or exceeded:
+        raise typer.Exit(code=1)
+
+
 if __name__ == "__main__":
     app()
@@ -24,6 +24,103 @@ SISCAN_PASSWORD: str = os.getenv("SISCAN_PASSWORD", "")
 
 DEFAULT_TIMEOUT: int = 10
 
+# Quantidade de navegadores Chromium mantidos aquecidos pelo pool do processo.
+# Com valor 0 o pool é desabilitado e cada job lança seu próprio navegador.
+BROWSER_POOL_SIZE: int = int(os.getenv("BROWSER_POOL_SIZE", "2"))
+
+# Intervalo, em segundos, entre as verificações de saúde do pool.
+BROWSER_POOL_HEALTH_INTERVAL: float = float(
+    os.getenv("BROWSER_POOL_HEALTH_INTERVAL", "30")
+)
+
+# Sessões autenticadas do SIScan: diretório onde o storage_state é salvo,
+# intervalo dos pings de keepalive e tempo (segundos) sem atividade após o
+# qual a sessão JSF é considerada expirada.
+SESSION_STATE_DIR: str = os.getenv("SESSION_STATE_DIR", "static/tmp/sessions")
+SESSION_KEEPALIVE_INTERVAL: float = float(
+    os.getenv("SESSION_KEEPALIVE_INTERVAL", "300")
+)
+SESSION_TTL: float = float(os.getenv("SESSION_TTL", "1500"))
+
+# Estratégia de polling das esperas executadas no navegador
+# (``page.wait_for_function``). "mutation" reavalia a condição a cada
+# alteração do DOM (MutationObserver); um número define o intervalo em ms.
+DOM_WAIT_POLLING: str | int = os.getenv("DOM_WAIT_POLLING", "mutation")
+if str(DOM_WAIT_POLLING).isdigit():
+    DOM_WAIT_POLLING = int(DOM_WAIT_POLLING)
+
+# Cache persistente (no banco) dos seletores resolvidos por label, invalidado
+# quando a estrutura do formulário muda. "false" desabilita o cache.
+SELECTOR_CACHE_ENABLED: bool = (
+    os.getenv("SELECTOR_CACHE_ENABLED", "true").lower() == "true"
+)
+
+# Tempo (segundos) em que as opções dos selects dinâmicos (unidade
+# requisitante, prestador, responsável pela coleta) ficam em cache por conta.
+SELECT_OPTIONS_TTL: float = float(os.getenv("SELECT_OPTIONS_TTL", "86400"))
+
+# Tempo (segundos) em que os dados do paciente resolvidos pelo Cartão SUS
+# ficam em cache e, em PATIENT_NOT_FOUND_TTL, o Cartão SUS sem paciente
+# (os jobs com ele falham sem abrir o navegador).
+PATIENT_CACHE_TTL: float = float(os.getenv("PATIENT_CACHE_TTL", "3600"))
+PATIENT_NOT_FOUND_TTL: float = float(os.getenv("PATIENT_NOT_FOUND_TTL", "600"))
+
+# Motor padrão dos jobs de preenchimento: "browser" (Playwright) ou "http"
+# (requisições JSF/A4J sem navegador, com o navegador como fallback).
+RPA_ENGINE: str = os.getenv("RPA_ENGINE", "browser")
+
+# Grava as requisições JSF/A4J dos jobs executados no navegador como
+# templates de requisição (tabela ``request_templates``).
+REQUEST_RECORDER_ENABLED: bool = (
+    os.getenv("REQUEST_RECORDER_ENABLED", "false").lower() == "true"
+)
+
+# Exportação dos spans do OpenTelemetry: "otlp", "file", "none" ou "auto"
+# (OTLP quando OTEL_EXPORTER_OTLP_ENDPOINT estiver definido; caso
+# contrário, JSON Lines em TRACE_FILE).
+TRACING_EXPORTER: str = os.getenv("TRACING_EXPORTER", "auto")
+OTEL_EXPORTER_OTLP_ENDPOINT: str = os.getenv(
+    "OTEL_EXPORTER_OTLP_ENDPOINT", ""
+)
+TRACE_FILE: str = os.getenv("TRACE_FILE", "static/tmp/traces/spans.jsonl")
+
+# Nível dos logs emitidos no stderr. Com LOG_JOB_BUFFER > 0, as mensagens de
+# DEBUG de cada job ficam em memória (até N por job) e só são emitidas quando
+# o job falha. LOG_DEBUG_RATE limita as mensagens de DEBUG repetidas (mesmo
+# logger e formato) por segundo; 0 desabilita o limite.
+LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_JOB_BUFFER: int = int(os.getenv("LOG_JOB_BUFFER", "500"))
+LOG_DEBUG_RATE: int = int(os.getenv("LOG_DEBUG_RATE", "20"))
+
+# Screenshots dos jobs: "off", "failure" (gravados só quando o job falha),
+# "sampled" (também gravados em uma fração SCREENSHOT_SAMPLE_RATE dos jobs
+# bem-sucedidos) ou "always". Os últimos SCREENSHOT_BUFFER screenshots de cada
+# job ficam em memória, em JPEG ou WebP (requer Pillow), até serem gravados em
+# SCREENSHOT_DIR/<job_id>. O padrão segue TAKE_SCREENSHOT.
+SCREENSHOT_MODE: str = os.getenv(
+    "SCREENSHOT_MODE", "always" if TAKE_SCREENSHOT else "failure"
+).lower()
+SCREENSHOT_SAMPLE_RATE: float = float(
+    os.getenv("SCREENSHOT_SAMPLE_RATE", "0.05")
+)
+SCREENSHOT_BUFFER: int = int(os.getenv("SCREENSHOT_BUFFER", "8"))
+SCREENSHOT_FORMAT: str = os.getenv("SCREENSHOT_FORMAT", "jpeg").lower()
+SCREENSHOT_QUALITY: int = int(os.getenv("SCREENSHOT_QUALITY", "60"))
+SCREENSHOT_FULL_PAGE: bool = (
+    os.getenv("SCREENSHOT_FULL_PAGE", "false").lower() == "true"
+)
+SCREENSHOT_DIR: str = os.getenv("SCREENSHOT_DIR", "static/tmp/screenshots")
+
+# Trace do Playwright dos jobs no navegador: "failure" grava, quando o job
+# lança uma SiscanException, os trechos (um por passo) dos últimos
+# PLAYWRIGHT_TRACE_CHUNKS passos em PLAYWRIGHT_TRACE_DIR/<job_id>; "off"
+# desliga o tracing.
+PLAYWRIGHT_TRACE: str = os.getenv("PLAYWRIGHT_TRACE", "failure").lower()
+PLAYWRIGHT_TRACE_CHUNKS: int = int(os.getenv("PLAYWRIGHT_TRACE_CHUNKS", "3"))
+PLAYWRIGHT_TRACE_DIR: str = os.getenv(
+    "PLAYWRIGHT_TRACE_DIR", "static/tmp/playwright-traces"
+)
+
 # Carrega chaves RSA
 with open("rsa_private_key.pem", "rb") as f:
     private_key = serialization.load_pem_private_key(f.read(), password=None)
@@ -1,29 +1,75 @@
-from fastapi import FastAPI
-import logging
-from .env import Base, engine
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
+from .env import (
+    Base,
+    engine,
+    LOG_DEBUG_RATE,
+    LOG_JOB_BUFFER,
+    LOG_LEVEL,
+    OTEL_EXPORTER_OTLP_ENDPOINT,
+    TRACE_FILE,
+    TRACING_EXPORTER,
+)
+from .siscan.browser_pool import browser_pool
+from .siscan.session_pool import session_manager
 from .routes.user import router as user_router
 from .routes.preencher_formulario_siscan import (
     router as formulario_router,
 )
 from .routes.security import router as security_router
+from .routes.health import router as health_router
+from .routes.metrics import router as metrics_router
+from .routes.notices import router as notices_router
+from .utils import log, tracing
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Logs escritos por uma thread; o DEBUG de cada job só é emitido se ele
+    # falhar
+    log.configure_logging(LOG_LEVEL, LOG_JOB_BUFFER, LOG_DEBUG_RATE)
+    tracing.configure_tracing(
+        TRACING_EXPORTER, OTEL_EXPORTER_OTLP_ENDPOINT, TRACE_FILE
+    )
+    # Aquece o pool de navegadores em segundo plano; o endpoint
+    # /health/ready informa quando ele estiver pronto.
+    await browser_pool.start(wait=False)
+    await session_manager.start()
+    yield
+    await session_manager.stop()
+    await browser_pool.stop()
+    tracing.shutdown_tracing()
+    log.shutdown_logging()
 
-logging.basicConfig(
-    level=logging.DEBUG,  # Troque para logging.INFO caso deseje menos verbosidade
-    format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
-)
 
 app = FastAPI(
     title="API RPA SISCAN",
     description="API para interação com o sistema SISCAN RPA",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 # Cria tabelas a partir dos models
 Base.metadata.create_all(bind=engine)
 
+
+@app.middleware("http")
+async def trace_request(request: Request, call_next):
+    # Um span por requisição da API; os spans do RPA ficam aninhados nele
+    with tracing.span("api.request", method=request.method,
+                      path=request.url.path):
+        response = await call_next(request)
+        tracing.set_attributes(status_code=response.status_code)
+    return response
+
+
 app.include_router(user_router)
 app.include_router(formulario_router)
 app.include_router(security_router)
+app.include_router(health_router)
+app.include_router(metrics_router)
+app.include_router(notices_router)
 
 if __name__ == "__main__":
     import uvicorn
@@ -1,7 +1,7 @@
 from datetime import datetime, timedelta
 from uuid import uuid4
 
-from sqlalchemy import Column, String, LargeBinary, DateTime
+from sqlalchemy import Column, String, LargeBinary, DateTime, Text
 
 from .env import Base
 
@@ -30,3 +30,43 @@ class ApiKey(Base):
     key = Column(String, primary_key=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     expires_at = Column(DateTime, default=one_year_from_now)
+
+
+class SelectorCacheEntry(Base):
+    """Resolved selector of a form field, keyed by the form structure."""
+
+    __tablename__ = "selector_cache"
+
+    url = Column(String, primary_key=True)
+    fingerprint = Column(String, primary_key=True)
+    label = Column(String, primary_key=True)
+    input_type = Column(String, primary_key=True)
+    selector = Column(String, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    last_used_at = Column(DateTime, default=datetime.utcnow)
+
+
+class RequestTemplateEntry(Base):
+    """Replayable request template of a form flow, keyed by page structure."""
+
+    __tablename__ = "request_templates"
+
+    flow = Column(String, primary_key=True)
+    version = Column(String, primary_key=True)
+    # Fingerprint of the page where the recorded flow starts
+    fingerprint = Column(String, nullable=False, index=True)
+    steps = Column(Text, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class InformationNotice(Base):
+    """Notice shown by SIScan in the information popup after login."""
+
+    __tablename__ = "information_notices"
+
+    date = Column(String, primary_key=True)
+    subject = Column(String, primary_key=True)
+    # JSON list with the text lines of the notice
+    lines = Column(Text, nullable=False)
+    first_seen_at = Column(DateTime, default=datetime.utcnow)
+    last_seen_at = Column(DateTime, default=datetime.utcnow)
@@ -0,0 +1,38 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from src.siscan.browser_pool import browser_pool
+from src.siscan.menu_targets import menu_targets
+from src.siscan.options_cache import options_cache
+from src.siscan.patient_cache import patient_cache
+from src.utils.selector_cache import selector_cache
+
+router = APIRouter(prefix="/health", tags=["health"])
+
+
+@router.get(
+    "/ready",
+    summary="Prontidão do Serviço",
+    description="Informa se o pool de navegadores está aquecido e pronto "
+                "para atender requisições do RPA",
+)
+async def readiness():
+    status = browser_pool.status()
+    return JSONResponse(status_code=200 if status["ready"] else 503,
+                        content=status)
+
+
+@router.get(
+    "/cache",
+    summary="Caches do RPA",
+    description="Informa os acertos e falhas do cache persistente de "
+                "seletores de formulário, do cache de opções de selects, "
+                "dos atalhos de menu e do cache de pacientes por Cartão SUS",
+)
+async def cache_stats():
+    return {
+        "selectors": selector_cache.stats(),
+        "select_options": options_cache.stats(),
+        "menu_targets": menu_targets.stats(),
+        "patients": patient_cache.stats(),
+    }
@@ -0,0 +1,17 @@
+from fastapi import APIRouter, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get(
+    "/metrics",
+    summary="Métricas Prometheus",
+    description="Jobs, latência por tipo de formulário, fila, pool de "
+                "navegadores, sessões, novas tentativas e memória do "
+                "Chromium no formato do Prometheus",
+)
+def metrics():
+    # Rota síncrona: a coleta percorre o /proc (RSS do Chromium) no
+    # threadpool do FastAPI, fora do event loop
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
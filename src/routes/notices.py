@@ -0,0 +1,19 @@
+from fastapi import APIRouter, Depends, Query
+
+from src.siscan.notices import notice_store
+from src.utils.dependencies import _get_user_uuid
+
+router = APIRouter(prefix="/informes", tags=["siscan"])
+
+
+@router.get(
+    "",
+    summary="Informes do SIScan",
+    description="Lista os informes exibidos pelo SIScan na popup de "
+                "mensagens informativas, coletados durante os logins do RPA",
+)
+def listar_informes(
+    limit: int = Query(50, ge=1, le=500),
+    uuid: str = Depends(_get_user_uuid),
+):
+    return {"informes": notice_store.list(limit)}
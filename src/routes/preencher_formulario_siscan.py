@@ -17,7 +17,9 @@ async def preencher_requisicao_mamografia_rastreamento(
     data: PreencherSolicitacaoInput,
     uuid: str = Depends(_get_user_uuid),
 ):
-    result = await run_rpa("requisicao-rastreamento", data.__dict__)
+    result = await run_rpa(
+        "requisicao-rastreamento", data.__dict__, user_uuid=uuid
+    )
     result.update({"user_uuid": uuid})
     return result
 
@@ -31,7 +33,9 @@ async def preencher_requisicao_mamografia_diagnostica(
     data: PreencherSolicitacaoInput,
     uuid: str = Depends(_get_user_uuid),
 ):
-    result = await run_rpa("requisicao-diagnostica", data.__dict__)
+    result = await run_rpa(
+        "requisicao-diagnostica", data.__dict__, user_uuid=uuid
+    )
     result.update({"user_uuid": uuid})
     return result
 
@@ -44,6 +48,6 @@ async def preencher_laudo(
     data: dict,
     uuid: str = Depends(_get_user_uuid),
 ):
-    result = await run_rpa("laudo", data)
+    result = await run_rpa("laudo", data, user_uuid=uuid)
     result.update({"user_uuid": uuid})
     return result
@@ -0,0 +1,377 @@
+import copy
+import json
+import logging
+import math
+import tempfile
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+import httpx
+
+from src.siscan.classes import webpage as siscan_webpage
+from src.siscan.classes.requisicao_exame_mamografia_diagnostica import (
+    RequisicaoExameMamografiaDiagnostica,
+)
+from src.siscan.classes.requisicao_exame_mamografia_rastreio import (
+    RequisicaoExameMamografiaRastreio,
+)
+from src.siscan.http_engine import JsfHttpEngine
+from src.siscan.session_pool import SiscanSessionManager
+from src.siscan.simulator import SimulatorConfig, create_app
+from src.utils import round_trips
+
+logger = logging.getLogger(__name__)
+
+FLOWS = {
+    "rastreio": RequisicaoExameMamografiaRastreio,
+    "diagnostica": RequisicaoExameMamografiaDiagnostica,
+}
+
+# Passos medidos, na ordem do fluxo (ver ``WebPage.step``)
+STEPS = (
+    "login",
+    "menu",
+    "cartao_sus",
+    "tipo_exame",
+    "unidade",
+    "prestador",
+    "campos_exame",
+    "avancar",
+    "campos_clinicos",
+    "responsavel_coleta",
+)
+
+PERCENTILES = (50, 95, 99)
+
+# Máximo de idas e voltas por preenchimento contra o simulador, com login
+# novo, por fluxo e motor ("http": requisições JSF/A4J; "browser": chamadas
+# ao Playwright). Passos com orçamento próprio usam a chave "steps".
+ROUND_TRIP_BUDGETS: dict[str, dict[str, int]] = {
+    "rastreio": {"http": 12},
+    "diagnostica": {"http": 13},
+}
+
+_CIRURGIAS = (
+    "biopsia_cirurgica_incisional",
+    "biopsia_cirurgica_excisional",
+    "segmentectomia",
+    "centralectomia",
+    "dutectomia",
+    "mastectomia",
+    "mastectomia_poupadora_pele",
+    "mastectomia_poupadora_pele_complexo_papilar",
+    "linfadenectomia_axilar",
+    "biopsia_linfonodo_sentinela",
+    "reconstrucao_mamaria",
+    "mastoplastia_redutora",
+    "inclusao_implantes",
+)
+
+
+@dataclass(frozen=True)
+class Regression:
+    """Passo cujo tempo piorou em relação ao baseline."""
+
+    flow: str
+    step: str
+    metric: str
+    baseline: float
+    current: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current / self.baseline if self.baseline else math.inf
+
+
+def dados_exemplo(flow: str, config: SimulatorConfig, run: int = 0) -> dict:
+    """
+    Dados válidos de uma requisição do fluxo, com a unidade, o prestador e
+    o responsável pela coleta conhecidos pelo simulador. Cada execução usa
+    um Cartão SUS diferente.
+    """
+    cnes = next(iter(config.unidades))
+    dados = {
+        "cartao_sus": f"7{run:014d}",
+        "nome": "MARIA DA SILVA",
+        "apelido": "MARIA",
+        "data_de_nascimento": "01/01/1970",
+        "nacionalidade": "BRASILEIRO",
+        "sexo": "F",
+        "nome_da_mae": "JOANA DA SILVA",
+        "raca_cor": "BRANCA",
+        "escolaridade": "4",
+        "uf": "SP",
+        "municipio": "SAO PAULO",
+        "tipo_logradouro": "RUA",
+        "nome_logradouro": "DAS FLORES",
+        "numero": "100",
+        "bairro": "CENTRO",
+        "cep": "01001000",
+        "ponto_de_referencia": "PRACA",
+        "cnes_unidade_requisitante": cnes,
+        "prestador": config.prestadores[0],
+        "num_prontuario": f"{run:09d}",
+        "tem_nodulo_ou_caroco_na_mama": ["01", "02"],
+        "apresenta_risco_elevado_para_cancer_mama": "01",
+        "fez_mamografia_alguma_vez": "01",
+        "ano_que_fez_a_ultima_mamografia": "2020",
+        "antes_desta_consulta_teve_as_mamas_examinadas_por_um_profissional":
+            "03",
+        "fez_radioterapia_na_mama_ou_no_plastrao": "01",
+        "radioterapia_localizacao": "03",
+        "ano_da_radioterapia_direita": "2019",
+        "ano_da_radioterapia_esquerda": "2019",
+        "fez_cirurgia_de_mama": "01",
+        **{f"ano_{c}_direita": str(2000 + i)
+           for i, c in enumerate(_CIRURGIAS)},
+        **{f"ano_{c}_esquerda": str(2001 + i)
+           for i, c in enumerate(_CIRURGIAS)},
+        "data_da_solicitacao": datetime.now().strftime("%d/%m/%Y"),
+        "cns_responsavel_coleta": next(iter(config.responsaveis)),
+    }
+    if flow == "rastreio":
+        dados["tipo_mamografia_de_rastreamento"] = "01"
+    else:
+        dados.update({
+            "achados_exame_clinico": True,
+            "exame_clinico_mama_direita_lesao_papilar": "S",
+            "exame_clinico_mama_direita_descarga_papilar_espontanea": "01",
+            "exame_clinico_mama_direita_nodulo_localizacao": ["01"],
+            "exame_clinico_mama_direita_espessamento_localizacao": ["02"],
+            "exame_clinico_mama_direita_linfonodo_palpavel": ["01"],
+            "exame_clinico_mama_esquerda_lesao_papilar": "S",
+            "exame_clinico_mama_esquerda_descarga_papilar_espontanea": "02",
+            "exame_clinico_mama_esquerda_nodulo_localizacao": ["03", "04"],
+            "exame_clinico_mama_esquerda_espessamento_localizacao": ["05"],
+            "exame_clinico_mama_esquerda_linfonodo_palpavel": ["02"],
+        })
+    return dados
+
+
+def percentile(values: list[float], p: float) -> float:
+    """Percentil com interpolação linear entre os pontos ordenados."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * p / 100
+    lower, upper = math.floor(k), math.ceil(k)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (k - lower)
+
+
+def summarize(values: list[float]) -> dict[str, float]:
+    """p50/p95/p99, média e máximo, em segundos."""
+    stats = {f"p{p}": round(percentile(values, p), 6) for p in PERCENTILES}
+    stats["mean"] = round(sum(values) / len(values), 6) if values else 0.0
+    stats["max"] = round(max(values, default=0.0), 6)
+    stats["n"] = len(values)
+    return stats
+
+
+async def run_benchmark(
+    flows=tuple(FLOWS),
+    runs: int = 20,
+    warmup: int = 1,
+    config: Optional[SimulatorConfig] = None,
+    base_url: Optional[str] = None,
+    engine: str = "http",
+    user: Optional[str] = None,
+    password: str = "benchmark",
+) -> dict:
+    """
+    Executa ``runs`` preenchimentos de cada fluxo e retorna o tempo de
+    parede por passo (p50/p95/p99), o tempo total e as idas e voltas ao
+    navegador/servidor por execução (``round_trips``), no total e por passo.
+
+    Sem ``base_url``, os fluxos rodam no motor HTTP contra o simulador em
+    processo (``create_app(config)``). Com ``base_url`` (ex.: o simulador
+    iniciado por ``python cli.py simulator``), cada execução usa
+    ``executar(engine=engine)``. As execuções de aquecimento não entram nas
+    estatísticas; sessão e cache de opções são aquecidos nelas, como em
+    produção.
+    """
+    config = config or SimulatorConfig()
+    app = None if base_url else create_app(config)
+    url = base_url or "http://siscan-benchmark.local/"
+    user = user or f"benchmark-{uuid.uuid4().hex[:8]}@simulador"
+
+    previous = siscan_webpage.session_manager
+    result = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "runs": runs,
+        "warmup": warmup,
+        "engine": "http" if app else engine,
+        "target": "simulator" if app else url,
+        "simulator": {
+            name: getattr(config, name)
+            for name in ("latency", "ajax_latency", "slow_rate",
+                         "slow_latency", "stale_view_state_rate")
+        },
+        "flows": {},
+    }
+    with tempfile.TemporaryDirectory() as state_dir:
+        siscan_webpage.session_manager = SiscanSessionManager(
+            state_dir=state_dir, keepalive_interval=0
+        )
+        client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url=url,
+            follow_redirects=True,
+        ) if app else None
+        try:
+            for flow in flows:
+                result["flows"][flow] = await _run_flow(
+                    flow, runs, warmup, config, url, engine, user, password,
+                    client,
+                )
+        finally:
+            if client is not None:
+                await client.aclose()
+            siscan_webpage.session_manager = previous
+    return result
+
+
+async def _run_flow(
+    flow, runs, warmup, config, url, engine, user, password, client
+) -> dict:
+    steps: dict[str, list[float]] = {}
+    trips: dict[str, list[float]] = {}
+    totals, trip_totals = [], []
+    for run in range(warmup + runs):
+        page = FLOWS[flow](url, user, password)
+        dados = dados_exemplo(flow, config, run)
+        start = time.perf_counter()
+        with round_trips.count() as counter:
+            if client is not None:
+                async with JsfHttpEngine(url, client=client) as http:
+                    page._http = http
+                    await page.preencher(copy.deepcopy(dados))
+            else:
+                await page.executar(dados, engine=engine)
+        elapsed = time.perf_counter() - start
+        if run < warmup:
+            continue
+        totals.append(elapsed)
+        trip_totals.append(float(counter.total))
+        for step, value in page.steps.summary().items():
+            steps.setdefault(step, []).append(value)
+            trips.setdefault(step, []).append(float(counter.by_step[step]))
+        logger.debug("Benchmark %s #%s: %.3fs, %s idas e voltas",
+                     flow, run, elapsed, counter.total)
+
+    ordered = [s for s in STEPS if s in steps] + [
+        s for s in steps if s not in STEPS
+    ]
+    return {
+        "steps": {s: summarize(steps[s]) for s in ordered},
+        "total": summarize(totals),
+        "round_trips": {
+            "steps": {s: summarize(trips[s]) for s in ordered},
+            "total": summarize(trip_totals),
+        },
+    }
+
+
+def save_result(result: dict, path: str | Path) -> Path:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(result, indent=2, ensure_ascii=False),
+                    encoding="utf-8")
+    return path
+
+
+def load_result(path: str | Path) -> dict:
+    return json.loads(Path(path).read_text(encoding="utf-8"))
+
+
+def compare(
+    current: dict,
+    baseline: dict,
+    tolerance: float = 0.2,
+    min_delta: float = 0.005,
+    metrics=("p50", "p95"),
+) -> list[Regression]:
+    """
+    Passos (e o total) de ``current`` mais lentos que no ``baseline``: o
+    tempo precisa superar o baseline em mais de ``tolerance`` (fração) e em
+    mais de ``min_delta`` segundos, para que ruído em passos de poucos
+    milissegundos não seja apontado como regressão.
+    """
+    regressions = []
+    for flow, atual in current.get("flows", {}).items():
+        anterior = baseline.get("flows", {}).get(flow)
+        if anterior is None:
+            continue
+        pares = [(s, atual["steps"][s], anterior["steps"].get(s))
+                 for s in atual["steps"]]
+        pares.append(("total", atual["total"], anterior.get("total")))
+        for step, stats, base in pares:
+            if not base:
+                continue
+            for metric in metrics:
+                value, ref = stats.get(metric, 0.0), base.get(metric, 0.0)
+                if value > ref * (1 + tolerance) and value - ref > min_delta:
+                    regressions.append(
+                        Regression(flow, step, metric, ref, value)
+                    )
+    return regressions
+
+
+def check_budgets(
+    result: dict, budgets: dict[str, dict] = ROUND_TRIP_BUDGETS
+) -> list[str]:
+    """
+    Fluxos (ou passos) de ``result`` cuja execução mais custosa fez mais
+    idas e voltas que o orçamento do motor usado no benchmark.
+    """
+    exceeded = []
+    for flow, data in result["flows"].items():
+        budget = budgets.get(flow, {})
+        limit = budget.get(result["engine"])
+        used = data["round_trips"]["total"]["max"]
+        if limit is not None and used > limit:
+            exceeded.append(f"{flow}: {used:.0f} idas e voltas "
+                            f"(orçamento: {limit})")
+        for step, limit in budget.get("steps", {}).items():
+            stats = data["round_trips"]["steps"].get(step)
+            if stats and stats["max"] > limit:
+                exceeded.append(f"{flow}/{step}: {stats['max']:.0f} idas e "
+                                f"voltas (orçamento: {limit})")
+    return exceeded
+
+
+def format_report(
+    result: dict, regressions: list[Regression] = ()
+) -> str:
+    """
+    Tabela em texto com os percentis de cada passo, em milissegundos, e a
+    mediana de idas e voltas ao navegador/servidor.
+    """
+    lines = []
+    marked = {(r.flow, r.step) for r in regressions}
+    for flow, data in result["flows"].items():
+        lines.append(f"{flow} ({data['total']['n']} execuções)")
+        lines.append(f"  {'passo':<20}{'p50':>10}{'p95':>10}{'p99':>10}"
+                     f"{'idas':>8}")
+        trips = data["round_trips"]
+        rows = [(s, stats, trips["steps"][s])
+                for s, stats in data["steps"].items()]
+        rows.append(("total", data["total"], trips["total"]))
+        for step, stats, step_trips in rows:
+            flag = "  <- regressão" if (flow, step) in marked else ""
+            lines.append(
+                f"  {step:<20}"
+                + "".join(f"{stats[f'p{p}'] * 1000:>10.1f}"
+                          for p in PERCENTILES)
+                + f"{step_trips['p50']:>8.0f}"
+                + flag
+            )
+    for r in regressions:
+        lines.append(
+            f"REGRESSÃO {r.flow}/{r.step} {r.metric}: "
+            f"{r.baseline * 1000:.1f} ms -> {r.current * 1000:.1f} ms "
+            f"({r.ratio:.2f}x)"
+        )
+    return "\n".join(lines)
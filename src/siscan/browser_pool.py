@@ -0,0 +1,244 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+from playwright.async_api import (
+    async_playwright,
+    Browser,
+    BrowserContext,
+    Playwright,
+)
+
+from src.env import (
+    BROWSER_POOL_HEALTH_INTERVAL,
+    BROWSER_POOL_SIZE,
+    HEADLESS,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class BrowserPool:
+    """
+    Mantém um conjunto de navegadores Chromium aquecidos sob um único driver
+    Playwright e entrega a cada job um ``BrowserContext`` isolado.
+
+    Iniciar o driver e abrir o Chromium custa mais de um segundo e centenas
+    de MB por processo; criar um ``BrowserContext`` em um navegador já aberto
+    custa poucos milissegundos e mantém cookies, storage e cache isolados
+    entre os jobs.
+
+    Exemplo
+    -------
+    ```python
+    await browser_pool.start()
+    async with browser_pool.context() as context:
+        page = await context.new_page()
+    ```
+    """
+
+    def __init__(
+        self,
+        size: int = BROWSER_POOL_SIZE,
+        headless: bool = HEADLESS,
+        health_interval: float = BROWSER_POOL_HEALTH_INTERVAL,
+    ):
+        self._size = size
+        self._headless = headless
+        self._health_interval = health_interval
+
+        self._playwright: Optional[Playwright] = None
+        self._browsers: list[Browser] = []
+        # Quantidade de contextos abertos por navegador
+        self._leases: dict[Browser, int] = {}
+
+        self._lock = asyncio.Lock()
+        self._warmup_task: Optional[asyncio.Task] = None
+        self._health_task: Optional[asyncio.Task] = None
+        self._launches = 0
+
+    @property
+    def size(self) -> int:
+        """Quantidade desejada de navegadores aquecidos."""
+        return self._size
+
+    @property
+    def warm(self) -> int:
+        """Quantidade de navegadores conectados e prontos para uso."""
+        return sum(1 for b in self._browsers if b.is_connected())
+
+    @property
+    def in_use(self) -> int:
+        """Quantidade de contextos atualmente emprestados aos jobs."""
+        return sum(self._leases.values())
+
+    @property
+    def launches(self) -> int:
+        """Quantidade de navegadores lançados desde a criação do pool."""
+        return self._launches
+
+    @property
+    def ready(self) -> bool:
+        """Indica se há ao menos um navegador aquecido para emprestar."""
+        return self._playwright is not None and self.warm > 0
+
+    def status(self) -> dict:
+        """
+        Retorna o estado atual do pool para o endpoint de prontidão. Com o
+        pool desabilitado (tamanho 0) cada job lança seu próprio navegador,
+        então o serviço é informado como pronto.
+        """
+        return {
+            "ready": self.ready or self._size <= 0,
+            "size": self._size,
+            "warm": self.warm,
+            "in_use": self.in_use,
+            "launches": self._launches,
+        }
+
+    async def start(self, wait: bool = True) -> None:
+        """
+        Inicializa o driver Playwright e aquece os navegadores do pool.
+
+        Parâmetros
+        ----------
+        wait : bool, opcional
+            Se False, o aquecimento ocorre em segundo plano e o método
+            retorna imediatamente. Útil no ``lifespan`` do FastAPI para não
+            atrasar a subida da API.
+        """
+        if self._size <= 0:
+            logger.info("Pool de navegadores desabilitado (tamanho 0).")
+            return
+        if self._warmup_task is None or (
+            self._warmup_task.done() and not self.ready
+        ):
+            self._warmup_task = asyncio.create_task(self._warmup())
+        if wait:
+            await asyncio.shield(self._warmup_task)
+
+    async def _warmup(self) -> None:
+        try:
+            async with self._lock:
+                if self._playwright is None:
+                    logger.debug("Inicializando driver Playwright do pool")
+                    self._playwright = await async_playwright().start()
+                await self._fill()
+            logger.info(
+                "Pool de navegadores aquecido: %s/%s", self.warm, self._size
+            )
+        except Exception:
+            logger.exception(
+                "Falha ao aquecer o pool de navegadores. Certifique-se de que "
+                "os browsers estao instalados com 'playwright install'."
+            )
+            return
+        if self._health_interval > 0 and self._health_task is None:
+            self._health_task = asyncio.create_task(self._health_loop())
+
+    async def stop(self) -> None:
+        """Fecha todos os navegadores e encerra o driver Playwright."""
+        for task in (self._health_task, self._warmup_task):
+            if task is not None and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except (asyncio.CancelledError, Exception):
+                    pass
+        self._health_task = None
+        self._warmup_task = None
+
+        async with self._lock:
+            for browser in self._browsers:
+                try:
+                    await browser.close()
+                except Exception:
+                    logger.debug("Navegador do pool já estava fechado")
+            self._browsers.clear()
+            self._leases.clear()
+            if self._playwright is not None:
+                await self._playwright.stop()
+                self._playwright = None
+        # O lock fica associado ao event loop em que foi usado; um novo
+        # ``start`` pode ocorrer em outro loop (ex.: TestClient).
+        self._lock = asyncio.Lock()
+
+    async def _launch(self) -> Browser:
+        browser = await self._playwright.chromium.launch(headless=self._headless)
+        self._launches += 1
+        self._leases[browser] = 0
+        logger.debug("Navegador do pool lançado (total de lançamentos: %s)",
+                     self._launches)
+        return browser
+
+    async def _fill(self) -> None:
+        """Descarta navegadores desconectados e completa o tamanho do pool."""
+        for browser in [b for b in self._browsers if not b.is_connected()]:
+            logger.warning("Navegador do pool desconectado. Substituindo.")
+            self._browsers.remove(browser)
+            self._leases.pop(browser, None)
+        while len(self._browsers) < self._size:
+            self._browsers.append(await self._launch())
+
+    async def health_check(self) -> dict:
+        """
+        Verifica a saúde dos navegadores, substituindo os que caíram.
+
+        Retorno
+        -------
+        dict
+            Estado do pool após a verificação.
+        """
+        if self._playwright is not None:
+            async with self._lock:
+                await self._fill()
+        return self.status()
+
+    async def _health_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self._health_interval)
+            try:
+                await self.health_check()
+            except Exception:
+                logger.exception("Falha na verificação de saúde do pool")
+
+    def _pick_browser(self) -> Browser:
+        healthy = [b for b in self._browsers if b.is_connected()]
+        if not healthy:
+            raise RuntimeError("Pool de navegadores sem navegadores disponíveis.")
+        # Distribui a carga pelo navegador com menos contextos abertos
+        return min(healthy, key=lambda b: self._leases.get(b, 0))
+
+    async def new_context(self, **kwargs) -> BrowserContext:
+        """
+        Cria um ``BrowserContext`` isolado no navegador menos ocupado.
+
+        O contexto é devolvido ao pool automaticamente quando fechado.
+        Os argumentos nomeados são repassados para ``Browser.new_context``.
+        """
+        if not self.ready:
+            await self.health_check()
+        browser = self._pick_browser()
+        context = await browser.new_context(**kwargs)
+        self._leases[browser] = self._leases.get(browser, 0) + 1
+
+        def _release(_):
+            if browser in self._leases and self._leases[browser] > 0:
+                self._leases[browser] -= 1
+
+        context.on("close", _release)
+        return context
+
+    @asynccontextmanager
+    async def context(self, **kwargs) -> AsyncIterator[BrowserContext]:
+        """Empresta um ``BrowserContext`` e o fecha ao final do bloco."""
+        context = await self.new_context(**kwargs)
+        try:
+            yield context
+        finally:
+            await context.close()
+
+
+# Pool compartilhado pelo processo, iniciado no lifespan da aplicação
+browser_pool = BrowserPool()
@@ -1,12 +1,7 @@
-from typing import Type, Any
-
-from pydantic import BaseModel
-
 from abc import abstractmethod
 
 import logging
 
-from src.siscan.exception import SiscanInvalidFieldValueError
 from src.siscan.classes.webpage import SiscanWebPage
 from src.utils.SchemaMapExtractor import SchemaMapExtractor
 from src.utils.xpath_constructor import XPathConstructor as XPE, InputType
@@ -15,6 +10,13 @@ logger = logging.getLogger(__name__)
 
 
 class RequisicaoExame(SiscanWebPage):
+    # Selects dinâmicos cujas opções dependem apenas da conta do SIScan e
+    # são lidas antecipadamente quando a sessão é aquecida
+    PREFETCH_SELECT_FIELDS = {
+        "cnes_unidade_requisitante": lambda text: text.split("-")[0].strip(),
+        "prestador": None,
+    }
+
     # Campos específicos deste formulário
     MAP_SCHEMA_FIELDS = [
         "apelido",
@@ -25,15 +27,10 @@ class RequisicaoExame(SiscanWebPage):
         "prestador",
     ]
 
-    def __init__(
-        self, base_url: str, user: str, password: str, schema_model: Type[BaseModel]
-    ):
-        super().__init__(base_url, user, password, schema_model)
-        map_data_label, fields_map = SchemaMapExtractor.schema_to_maps(
-            self.schema_model, fields=RequisicaoExame.MAP_SCHEMA_FIELDS
-        )
-        RequisicaoExame.MAP_DATA_LABEL = map_data_label
-        self.FIELDS_MAP.update(fields_map)
+    FIELD_OVERRIDES = {
+        "cartao_sus": SchemaMapExtractor.make_field_spec(
+            "cartao_sus", "Cartão SUS", InputType.TEXT, True),
+    }
 
     def validation(self, data: dict):
         super().validation(data)
@@ -48,28 +45,21 @@ class RequisicaoExame(SiscanWebPage):
             "O método select_type_exam deve ser implementado na subclasse."
         )
 
-    def get_map_label(self) -> dict[str, dict[str, Any]]:
-        """
-        Retorna o mapeamento de campos do formulário com seus respectivos labels e tipos.
-        """
-        map_label = {
-            **SiscanWebPage.MAP_DATA_LABEL,
-            **RequisicaoExame.MAP_DATA_LABEL,
-        }
-        map_label["cartao_sus"] = SchemaMapExtractor.make_field_dict(
-            "Cartão SUS", InputType.TEXT, True)
-        return map_label
-
     async def buscar_cartao_sus(self, data: dict):
         await self._buscar_cartao_sus(data, menu_action=self._novo_exame)
 
     async def _acessar_menu_gerenciar_exame(self):
         await self.acessar_menu("EXAME", "GERENCIAR EXAME")
 
-    async def _novo_exame(self, event_button: bool = False) -> XPE:
+    async def _novo_exame(self, event_button: bool = False) -> XPE | None:
         # TOFIX Não deveria ter um comando genérico para botões em vez de algo específico?
         await self._acessar_menu_gerenciar_exame()
 
+        if self.http is not None:
+            if event_button:
+                await self.http.click("Novo Exame")
+            return None
+
         xpath = await XPE.create(self.context)
         if event_button:
             # ``find_form_anchor_button`` é síncrono e apenas configura o XPath
@@ -77,84 +67,70 @@ class RequisicaoExame(SiscanWebPage):
             # chamamos ``handle_click`` e aguardamos sua conclusão.
             await xpath.find_form_anchor_button("Novo Exame").handle_click()
 
-        await self.wait_page_ready()
+        await self.wait_page_ready(step="novo_exame")
         return xpath
 
     async def _seleciona_unidade_requisitante(self, data: dict | None = None):
         """
         Seleciona e valida a unidade requisitante a partir dos dados fornecidos.
         """
+        # As opções são mapeadas apenas pelo código CNES antes do hífen.
         nome_campo = "cnes_unidade_requisitante"
-        await self.load_select_options(nome_campo)
-
-        # Atualiza o mapeamento de campos usando apenas o código CNES antes do hífen.
-        for k, v in list(self.FIELDS_MAP[nome_campo].items()):
-            key = f"{k.split('-')[0].strip()}"
-            self.FIELDS_MAP[nome_campo][key] = v
-
-            # Remove o item original que contém o hífen
-            if v != "0":
-                del self.FIELDS_MAP[nome_campo][k]
-
-        text, value = await self.select_value(nome_campo, data)
-        if value == "0":
-            raise SiscanInvalidFieldValueError(
-                self.context,
-                field_name=nome_campo,
-                data=data,
-                options_values=self.FIELDS_MAP[nome_campo].keys(),
-            )
-        data.pop(nome_campo, None)
+        await self.select_cached_option(
+            nome_campo, data, key=self.PREFETCH_SELECT_FIELDS[nome_campo]
+        )
 
     async def _selecionar_prestador(self, data: dict | None = None):
         """
         Seleciona e valida o campo 'prestador' a partir dos dados fornecidos.
         """
-        nome_campo = "prestador"
-        await self.load_select_options(nome_campo)
-        text, value = await self.select_value(nome_campo, data)
-        if value == "0":
-            raise SiscanInvalidFieldValueError(
-                self.context,
-                field_name=nome_campo,
-                data=data,
-                options_values=self.FIELDS_MAP[nome_campo].keys(),
-            )
-        data.pop(nome_campo, None)
+        await self.select_cached_option("prestador", data)
+
+    async def _abrir_formulario_selects(self):
+        await self._novo_exame(event_button=True)
 
     async def preencher(self, data: dict):
         """
         Preenche o formulário de novo exame de acordo com os campos informados.
         """
 
-        await self._authenticate()
+        with self.step("login"):
+            await self._authenticate()
 
         self.validation(data)
 
-        xpath = await self._novo_exame(event_button=True)
+        with self.step("menu"):
+            xpath = await self._novo_exame(event_button=True)
 
-        # 1o passo: Preenche o campo Cartão SUS e chama o evento onblur do campo
-        await self.preencher_cartao_sus(
-            numero=self.get_field_value("cartao_sus", data),
-            timeout=20)
+        # 1o passo: Preenche o campo Cartão SUS e chama o evento onblur do campo.
+        # Os dados do paciente retornados não são usados aqui: com o paciente
+        # em cache, o campo é apenas preenchido, sem aguardar o SIScan
+        with self.step("cartao_sus"):
+            await self.preencher_cartao_sus(
+                numero=self.get_field_value("cartao_sus", data),
+                timeout=20)
 
         # 2o passo: Define o tipo de exame para então poder habilitar os
         # campos de Prestador e Unidade Requisitante
-        await self.selecionar_tipo_exame(data)
+        with self.step("tipo_exame"):
+            await self.selecionar_tipo_exame(data)
 
         # 3o passo: Obtem os valores do campo select Unidade Requisitante,
         # atualiza o mapeamento de campos e preenche o campo
-        await self._seleciona_unidade_requisitante(data)
+        with self.step("unidade"):
+            await self._seleciona_unidade_requisitante(data)
 
         # 4o passo: Obtem os valores do campo select Prestador, atualiza o
         # mapeamento de campos e preenche o campo
-        await self._selecionar_prestador(data)
+        with self.step("prestador"):
+            await self._selecionar_prestador(data)
 
         # 5o passo: Preenche os campos adicionais do formulário
         # apelido, escolaridade, ponto_de_referenciea
-        await self.fill_form_fields(
-            data,
-            RequisicaoExame.MAP_DATA_LABEL,
-            suffix=""
-        )
-        await self.take_screenshot("screenshot_03_requisicao_exame.png")
+        with self.step("campos_exame"):
+            await self.fill_form_fields(
+                data,
+                self.field_layer(RequisicaoExame),
+                suffix=""
+            )
+        await self.take_screenshot("03_requisicao_exame")
@@ -5,8 +5,7 @@ import logging
 from typing import Type
 from pydantic import BaseModel
 
-from src.siscan.exception import CartaoSusNotFoundError, \
-    SiscanInvalidFieldValueError
+from src.siscan.exception import CartaoSusNotFoundError
 from src.siscan.classes.requisicao_exame import RequisicaoExame
 
 from src.siscan.schema.requisicao_mamografia_schema import (
@@ -15,7 +14,7 @@ from src.siscan.schema.requisicao_mamografia_schema import (
 from src.siscan.schema.requisicao_novo_exame_schema import (
     RequisicaoNovoExameSchema, TipoExameMama,
 )
-from src.utils.SchemaMapExtractor import SchemaMapExtractor
+from src.utils.bulk_writer import FieldWrite
 from src.utils.xpath_constructor import XPathConstructor as XPE  # XPathElement
 from src.utils import messages as msg
 
@@ -49,28 +48,11 @@ class RequisicaoExameMamografia(RequisicaoExame):
             schema_model,
         )
 
-        map_data_label, fields_map = SchemaMapExtractor.schema_to_maps(
-            self.schema_model, fields=RequisicaoExameMamografia.MAP_SCHEMA_FIELDS
-        )
-        RequisicaoExameMamografia.MAP_DATA_LABEL = map_data_label
-        fields_map.update(self.FIELDS_MAP)
-        self.FIELDS_MAP = fields_map
-
     def validation(self, data: dict):
         # Define o tipo de exame como Mamografia
         data["tipo_exame_mama"] = TipoExameMama.MAMOGRAFIA.value
         super().validation(data)
 
-    def get_map_label(self) -> dict[str, dict[str, str]]:
-        """
-        Retorna o mapeamento de campos do formulário com seus respectivos labels e tipos, específico para o exame de Mamografia.
-        """
-        map_label = {
-            **RequisicaoExameMamografia.MAP_DATA_LABEL,
-        }
-        map_label.update(super().get_map_label())
-        return map_label
-
     async def selecionar_tipo_exame(self, data: dict):
         """
         Seleciona o tipo de exame como Mamografia.
@@ -146,6 +128,8 @@ class RequisicaoExameMamografia(RequisicaoExame):
             "ano_inclusao_implantes_esquerda",
         ]
 
+        # Os 26 campos de ano são aplicados em lote, em uma única chamada
+        fields: list[FieldWrite] = []
         for campo_nome in anos_procedimentos:
             lado = "direita" if "direita" in campo_nome else "esquerda"
 
@@ -168,13 +152,16 @@ class RequisicaoExameMamografia(RequisicaoExame):
             else:
                 raise ValueError("O parâmetro 'lado' deve ser 'direita' ou 'esquerda'.")
 
-            xpath = await XPE.create(self.context, xpath=base_xpath)
-            await xpath.handle_fill(
-                self.get_field_value(campo_nome, data),
+            fields.append(FieldWrite(
+                campo_nome,
+                base_xpath,
                 self.get_field_type(campo_nome),
-            )
+                self.get_field_value(campo_nome, data),
+            ))
             data.pop(campo_nome)
 
+        await self.write_fields(fields)
+
     async def _preencher_fez_cirurgia_cirurgica(self, data: dict):
         # Para "FEZ CIRURGIA DE MAMA?"
         _, value = await self.select_value("fez_cirurgia_de_mama",
@@ -185,29 +172,14 @@ class RequisicaoExameMamografia(RequisicaoExame):
 
     async def _seleciona_responsavel_coleta(self, data: dict | None = None):
         """
-        Seleciona e valida a unidade requisitante a partir dos dados fornecidos.
+        Seleciona e valida o responsável pela coleta a partir dos dados fornecidos.
         """
-        nome_campo = "cns_responsavel_coleta"
-        await self.load_select_options(nome_campo)
-
-        # Atualiza o mapeamento de campos usando apenas o código CNES após do hífen.
-        for k, v in list(self.FIELDS_MAP[nome_campo].items()):
-            key = f"{k.split('-')[-1].strip()}"
-            self.FIELDS_MAP[nome_campo][key] = v
-
-            # Remove o item original que contém o hífen
-            if v != "0":
-                del self.FIELDS_MAP[nome_campo][k]
-
-        text, value = await self.select_value(nome_campo, data)
-        if value == "0":
-            raise SiscanInvalidFieldValueError(
-                self.context,
-                field_name=nome_campo,
-                data=data,
-                options_values=self.FIELDS_MAP[nome_campo].keys(),
-            )
-        data.pop(nome_campo, None)
+        # As opções são mapeadas apenas pelo CNS após o hífen.
+        await self.select_cached_option(
+            "cns_responsavel_coleta",
+            data,
+            key=lambda text: text.split("-")[-1].strip(),
+        )
 
     async def preencher(self, data: dict):
         """
@@ -229,31 +201,35 @@ class RequisicaoExameMamografia(RequisicaoExame):
 
         await super().preencher(data)
 
-        xpath_ctx = await XPE.create(
-            self.context
-        )  # TOFIX Não faz setido criar um xpath apenas com o contexto
-
         # 1o passo: após preenchido os dados básicos do formulário de
         # "Novo Exame", clica no botão "Avançar" para ir para o
         # formulário de requisição de mamografia
-        await (await xpath_ctx.find_form_button("Avançar")).handle_click()
-        await self.wait_page_ready()
+        with self.step("avancar"):
+            if self.http is not None:
+                await self.http.click("Avançar")
+            else:
+                xpath_ctx = await XPE.create(
+                    self.context
+                )  # TOFIX Não faz setido criar um xpath apenas com o contexto
+                await (await xpath_ctx.find_form_button("Avançar")).handle_click()
+            await self.wait_page_ready(step="avancar")
 
         # 2o passo: Preenche os campos específicos do formulário
-        await self.fill_form_field("num_prontuario", data, suffix="")
-        await self.select_value(
-            "tem_nodulo_ou_caroco_na_mama", data)
-        await self.select_value(
-            "apresenta_risco_elevado_para_cancer_mama", data)
-        await self.select_value(
-            "antes_desta_consulta_teve_as_mamas_examinadas_por_um_profissional", data)
-        await self._preencher_fez_mamografia_alguma_vez(data)
-        await self._preencher_fez_radioterapia_na_mama_ou_no_plastao(data)
-        await self._preencher_fez_cirurgia_cirurgica(data)
-
-        await self.fill_form_field("data_da_solicitacao", data)
-
-        await self.take_screenshot("screenshot_04_requisicao_exame_mamografia.png")
+        with self.step("campos_clinicos"):
+            await self.fill_form_field("num_prontuario", data, suffix="")
+            await self.select_value(
+                "tem_nodulo_ou_caroco_na_mama", data)
+            await self.select_value(
+                "apresenta_risco_elevado_para_cancer_mama", data)
+            await self.select_value(
+                "antes_desta_consulta_teve_as_mamas_examinadas_por_um_profissional", data)
+            await self._preencher_fez_mamografia_alguma_vez(data)
+            await self._preencher_fez_radioterapia_na_mama_ou_no_plastao(data)
+            await self._preencher_fez_cirurgia_cirurgica(data)
+
+            await self.fill_form_field("data_da_solicitacao", data)
+
+        await self.take_screenshot("04_requisicao_exame_mamografia")
 
 base_fields = set(RequisicaoNovoExameSchema.model_fields.keys())
 diag_fields = set(RequisicaoMamografiaSchema.model_fields.keys())
@@ -1,6 +1,6 @@
 import logging
 
-from typing import Type, Any
+from typing import Type
 from pydantic import BaseModel
 
 from src.siscan.classes.requisicao_exame import RequisicaoExame
@@ -9,8 +9,8 @@ from src.siscan.classes.requisicao_exame_mamografia import (
 )
 from src.siscan.schema import TipoDeMamografia
 from src.siscan.schema.requisicao_novo_exame_schema import TipoExameMama
-from src.utils.SchemaMapExtractor import SchemaMapExtractor
-from src.utils.xpath_constructor import XPathConstructor as XPE  # XPathElement
+from src.utils.bulk_writer import FieldWrite
+from src.utils.schema import InputType
 
 
 from src.siscan.schema.requisicao_mamografia_diagnostica_schema import (
@@ -33,28 +33,6 @@ class RequisicaoExameMamografiaDiagnostica(RequisicaoExameMamografia):
             schema_model,
         )
 
-        base_fields = set(RequisicaoMamografiaSchema.model_fields.keys())
-        diag_fields = set(RequisicaoMamografiaDiagnosticaSchema.model_fields.keys())
-        RequisicaoExameMamografiaDiagnostica.MAP_SCHEMA_FIELDS = sorted(
-            diag_fields - base_fields
-        )
-
-        map_data_label, fields_map = SchemaMapExtractor.schema_to_maps(
-            self.schema_model, fields=self.MAP_SCHEMA_FIELDS
-        )
-
-        RequisicaoExameMamografiaDiagnostica.MAP_DATA_LABEL = map_data_label
-        fields_map.update(self.FIELDS_MAP)
-        self.FIELDS_MAP = fields_map
-
-    def get_map_label(self) -> dict[str, dict[str, Any]]:
-        """Retorna o mapeamento de campos específico deste exame."""
-        map_label = {
-            **RequisicaoExameMamografiaDiagnostica.MAP_DATA_LABEL,
-        }
-        map_label.update(super().get_map_label())
-        return map_label
-
     def validation(self, data: dict):
         # Define o tipo de exame como Mamografia Diagnóstica
         data["tipo_de_mamografia"] = TipoDeMamografia.DIAGNOSTICA.value
@@ -76,34 +54,28 @@ class RequisicaoExameMamografiaDiagnostica(RequisicaoExameMamografia):
         await super().preencher(data)
 
         # 3o passo: preencher os campos específicos de diagnóstico
-        await self.fill_form_field("tipo_de_mamografia",
-                                   data, suffix="")
-
-
-        print("Preenchendo achados de exame clínico")
-        await self.preencher_achados_exame_clinico(data)
-        logger.debug("Preenchendo controle radiológico de lesão categoria 3")
-        await self.preencher_controle_radiologico_lesao_categoria_3(data)
-        logger.debug("Preenchendo lesão de diagnóstico de câncer")
-        await self.preencher_lesao_diagnostico_cancer(data)
-        logger.debug("Preenchendo avaliação de resposta à quimioterapia")
-        await self.preencher_avaliacao_resposta_quimioterapia(data)
-        logger.debug("Preenchendo revisão de mamografia de outra instituição")
-        await self.preencher_revisao_mamografia_outra_instituicao(data)
-        logger.debug("Preenchendo controle de lesão pós-biópsia PAAF benigna")
-        await self.preencher_controle_lesao_pos_biopsia_paaf_benigna(data)
-
-        await self._seleciona_responsavel_coleta(data)
-
-        await self.take_screenshot("screenshot_05_mamografia_diagnostica.png")
-
-    async def _check_checkbox_by_XP(self, x_xpath: str):
-        """Marca um checkbox identificando pelo xpath."""
-        xpath = await XPE.create(self.context, xpath=x_xpath)
-        locator = await xpath.wait_and_get()
-        if not await locator.is_checked():
-            await locator.check(force=True)
-        xpath.reset()
+        with self.step("campos_clinicos"):
+            await self.fill_form_field("tipo_de_mamografia",
+                                       data, suffix="")
+
+
+            logger.debug("Preenchendo achados de exame clínico")
+            await self.preencher_achados_exame_clinico(data)
+            logger.debug("Preenchendo controle radiológico de lesão categoria 3")
+            await self.preencher_controle_radiologico_lesao_categoria_3(data)
+            logger.debug("Preenchendo lesão de diagnóstico de câncer")
+            await self.preencher_lesao_diagnostico_cancer(data)
+            logger.debug("Preenchendo avaliação de resposta à quimioterapia")
+            await self.preencher_avaliacao_resposta_quimioterapia(data)
+            logger.debug("Preenchendo revisão de mamografia de outra instituição")
+            await self.preencher_revisao_mamografia_outra_instituicao(data)
+            logger.debug("Preenchendo controle de lesão pós-biópsia PAAF benigna")
+            await self.preencher_controle_lesao_pos_biopsia_paaf_benigna(data)
+
+        with self.step("responsavel_coleta"):
+            await self._seleciona_responsavel_coleta(data)
+
+        await self.take_screenshot("05_mamografia_diagnostica")
 
     async def _preencher_grupo(
         self,
@@ -111,25 +83,38 @@ class RequisicaoExameMamografiaDiagnostica(RequisicaoExameMamografia):
         campo_grupo: str,
         prefixo: str,
     ):
-        """Preenche um grupo de campos ativado por checkbox."""
+        """
+        Preenche um grupo de campos ativado por checkbox.
+
+        O checkbox do grupo e os subcampos são enviados juntos ao
+        ``BulkFormWriter``: se o checkbox disparar AJAX (habilitando os
+        subcampos), ele é aplicado em uma fase própria e os subcampos seguem
+        em lote após a resposta.
+        """
         sub_campos = [k for k in list(data.keys()) if k.startswith(prefixo)]
         if not data.get(campo_grupo) and not sub_campos:
             return
 
-        await self._check_checkbox_by_XP(
-            self.get_field_metadata(campo_grupo).get('xpath'))
+        fields = [FieldWrite(
+            campo_grupo,
+            self.get_field_xpath(campo_grupo),
+            InputType.CHECKBOX,
+            True,
+        )]
         data.pop(campo_grupo, None)
 
         if sub_campos:
             sub_data = {k: data[k] for k in sub_campos}
-            await self.fill_form_fields(
+            fields += await self.build_field_writes(
                 sub_data,
-                RequisicaoExameMamografiaDiagnostica.MAP_DATA_LABEL,
+                self.field_layer(RequisicaoExameMamografiaDiagnostica),
                 suffix=""
             )
             for k in sub_campos:
                 data.pop(k, None)
 
+        await self.write_fields(fields)
+
     async def preencher_achados_exame_clinico(self, data: dict):
         """
         Preenche os achados do exame clínico de mama com base nos dados fornecidos.
@@ -189,3 +174,10 @@ class RequisicaoExameMamografiaDiagnostica(RequisicaoExameMamografia):
             campo_grupo="controle_lesao_pos_biopsia_paaf_benigna",
             prefixo="controle_lesao_pos_biopsia_paaf_benigna",
         )
+
+
+base_fields = set(RequisicaoMamografiaSchema.model_fields.keys())
+diag_fields = set(RequisicaoMamografiaDiagnosticaSchema.model_fields.keys())
+RequisicaoExameMamografiaDiagnostica.MAP_SCHEMA_FIELDS = sorted(
+    diag_fields - base_fields
+)
@@ -1,6 +1,6 @@
 import logging
 
-from typing import Type, Any
+from typing import Type
 from pydantic import BaseModel
 
 from src.siscan.schema import TipoDeMamografia
@@ -12,7 +12,6 @@ from src.siscan.classes.requisicao_exame_mamografia import (
     RequisicaoExameMamografia,
 )
 from src.siscan.schema.requisicao_novo_exame_schema import TipoExameMama
-from src.utils.SchemaMapExtractor import SchemaMapExtractor
 
 logger = logging.getLogger(__name__)
 
@@ -27,25 +26,6 @@ class RequisicaoExameMamografiaRastreio(RequisicaoExameMamografia):
             schema_model,
         )
 
-        # Extrai o mapeamento dos labels e campos do schema informado
-        map_data_label, fields_map = SchemaMapExtractor.schema_to_maps(
-            self.schema_model, fields=self.MAP_SCHEMA_FIELDS
-        )
-
-        # Atualiza o mapeamento de labels da classe
-        RequisicaoExameMamografiaRastreio.MAP_DATA_LABEL = map_data_label
-        # Atualiza o dicionário de campos, mesclando com os campos já existentes
-        fields_map.update(self.FIELDS_MAP)
-        self.FIELDS_MAP = fields_map
-
-    def get_map_label(self) -> dict[str, dict[str, Any]]:
-        """Retorna o mapeamento de campos específico deste exame."""
-        map_label = {
-            **RequisicaoExameMamografiaRastreio.MAP_DATA_LABEL,
-        }
-        map_label.update(super().get_map_label())
-        return map_label
-
     def validation(self, data: dict):
         # Define o tipo de exame como Mamografia de Rastreio
         data["tipo_de_mamografia"] = TipoDeMamografia.RASTREAMENTO.value
@@ -57,14 +37,16 @@ class RequisicaoExameMamografiaRastreio(RequisicaoExameMamografia):
         await super().preencher(data)
 
         # 3o passo: preencher os campos específicos de rastreio
-        await self.fill_form_field("tipo_de_mamografia",
-                                   data, suffix="")
-        await self.fill_form_field(
-            "tipo_mamografia_de_rastreamento", data, suffix="")
+        with self.step("campos_clinicos"):
+            await self.fill_form_field("tipo_de_mamografia",
+                                       data, suffix="")
+            await self.fill_form_field(
+                "tipo_mamografia_de_rastreamento", data, suffix="")
 
-        await self._seleciona_responsavel_coleta(data)
+        with self.step("responsavel_coleta"):
+            await self._seleciona_responsavel_coleta(data)
 
-        await self.take_screenshot("screenshot_05_mamografia_rastreamento.png")
+        await self.take_screenshot("05_mamografia_rastreamento")
 
 
 base_fields = set(RequisicaoMamografiaSchema.model_fields.keys())
@@ -1,22 +1,43 @@
-import logging
-from typing import Callable, Any, Type
 import asyncio
+import copy
+import logging
+from dataclasses import replace
+from typing import Callable, Any, Optional, Type
 from pydantic import BaseModel
 
 from src.siscan.exception import (
     SiscanLoginError,
-    SiscanMenuNotFoundError,
     PacienteDuplicadoException,
     SiscanException,
     CartaoSusNotFoundError,
     SiscanInvalidFieldValueError, SiscanTimeoutError,
+    SiscanMenuNotFoundError,
+    SiscanHttpEngineError,
+)
+from src.env import RPA_ENGINE, REQUEST_RECORDER_ENABLED
+from src.siscan.http_engine import JsfHttpEngine
+from src.siscan.menu_targets import (
+    CLICK_MENU_ITEM,
+    MENU_ITEM_ID,
+    MenuTarget,
+    menu_targets,
+)
+from src.siscan.recorder import (
+    RequestTemplate,
+    build_template,
+    request_templates,
 )
-from src.utils.SchemaMapExtractor import SchemaMapExtractor
+from src.siscan.options_cache import options_cache
+from src.siscan.patient_cache import patient_cache
+from src.siscan.session_pool import session_manager
+from src.utils.bulk_writer import FieldWrite
 from src.utils.validator import Validator, SchemaValidationError
 from src.utils.webpage import WebPage
 from src.utils.xpath_constructor import XPathConstructor as XPE, \
-    XPathConstructor
-from src.utils import messages as msg
+    XPathConstructor, InputType
+from src.utils import bulk_reader, dom_wait
+from src.utils.selector_cache import page_key
+from src.utils.wait import wait_until, retry
 
 logger = logging.getLogger(__name__)
 
@@ -42,16 +63,22 @@ class SiscanWebPage(WebPage):
         "cep",
     ]
     MAP_SCHEMA_FIELDS = MAP_DATA_FIND_CARTAO_SUS + MAP_DATA_CARTAO_SUS
+    # Dados do paciente carregados pelo Cartão SUS e mantidos em cache
+    MAP_DATA_PACIENTE = [
+        "nome",
+        "nome_da_mae",
+        "data_de_nascimento",
+        *MAP_DATA_CARTAO_SUS,
+    ]
+
+    # Selects dinâmicos, por nome do campo, pré-carregados quando a sessão
+    # é aquecida, com a função que converte o texto da opção na chave
+    PREFETCH_SELECT_FIELDS: dict[str, Optional[Callable[[str], str]]] = {}
 
     def __init__(
         self, base_url: str, user: str, password: str, schema_model: Type[BaseModel]
     ):
         super().__init__(base_url, user, password, schema_model)
-        map_data_label, fields_map = SchemaMapExtractor.schema_to_maps(
-            self.schema_model, fields=SiscanWebPage.MAP_SCHEMA_FIELDS
-        )
-        SiscanWebPage.MAP_DATA_LABEL = map_data_label
-        self.FIELDS_MAP.update(fields_map)
         self._is_authenticated = False
 
     def validation(self, data: dict):
@@ -64,6 +91,103 @@ class SiscanWebPage(WebPage):
             raise SiscanInvalidFieldValueError(context=None, data=data,
                                                message=str(ve))
 
+    async def executar(self, data: dict, engine: Optional[str] = None) -> str:
+        """
+        Executa o preenchimento (``preencher``) com o motor escolhido para o
+        job.
+
+        Com ``engine="http"``, o fluxo é reproduzido por requisições HTTP do
+        JSF/A4J (``JsfHttpEngine``), sem navegador. Se algum passo não puder
+        ser reproduzido (``SiscanHttpEngineError``), o job é repetido desde o
+        início no navegador; erros de dados (ex.: Cartão SUS não
+        encontrado) são propagados normalmente. Um Cartão SUS já registrado
+        sem paciente no ``patient_cache`` falha antes do login.
+
+        Parâmetros
+        ----------
+        data : dict
+            Dados do formulário.
+        engine : str, opcional
+            "browser" ou "http". O padrão é ``RPA_ENGINE``.
+
+        Retorno
+        -------
+        str
+            Motor que concluiu o preenchimento.
+        """
+        engine = (engine or RPA_ENGINE).lower()
+        # Cartão SUS sabidamente sem paciente: falha sem abrir o SIScan
+        patient_cache.check(data.get("cartao_sus"))
+        # Screenshots do job gravados conforme SCREENSHOT_MODE (na falha,
+        # inclui a página no estado do erro) e trace do Playwright gravado
+        # apenas se o job lançar uma SiscanException
+        async with self.screenshots.job(self._failure_page), \
+                self.context.traces.job():
+            if engine == "http":
+                try:
+                    async with JsfHttpEngine(self._base_url) as http:
+                        self._http = http
+                        await self.preencher(copy.deepcopy(data))
+                        logger.info(
+                            "Preenchimento concluído pelo motor HTTP em %s "
+                            "requisições.",
+                            http.requests,
+                        )
+                        return "http"
+                except SiscanHttpEngineError as e:
+                    logger.warning(
+                        "Motor HTTP não concluiu o job: %s. Repetindo no "
+                        "navegador.",
+                        e,
+                    )
+                finally:
+                    self._http = None
+                    # A autenticação do motor HTTP não vale para o navegador
+                    self._is_authenticated = False
+            if REQUEST_RECORDER_ENABLED:
+                await self.gravar_template(data)
+            else:
+                await self.preencher(data)
+            return "browser"
+
+    async def gravar_template(self, data: dict) -> Optional[RequestTemplate]:
+        """
+        Executa o preenchimento no navegador gravando as requisições JSF/A4J
+        e salva o ``RequestTemplate`` do fluxo, versionado pelo fingerprint
+        das páginas.
+
+        A gravação começa após a autenticação, de modo que as credenciais
+        não fazem parte do template. Falhas ao montar ou gravar o template
+        não interrompem o job.
+
+        Retorno
+        -------
+        RequestTemplate | None
+            Template gravado, ou None se não pôde ser montado.
+        """
+        fields = self.get_map_label()
+        # Valores convertidos antes do preenchimento, que consome ``data``
+        values = {
+            name: self.get_field_value(name, data)
+            for name in data if name in fields
+        }
+        await self._authenticate()
+        await self.context.start_recording()
+        try:
+            await self.preencher(data)
+        finally:
+            records = await self.context.stop_recording()
+        try:
+            template = build_template(type(self).__name__, records, fields,
+                                      values)
+        except Exception:
+            logger.warning("Falha ao montar o template de requisições.",
+                           exc_info=True)
+            return None
+        # Gravação no banco em uma thread, fora do event loop
+        await asyncio.to_thread(request_templates.save, template)
+        return template
+
     def is_authenticated(self) -> bool:
         """
         Verifica se o usuário está autenticado no SIScan.
@@ -77,64 +201,201 @@ class SiscanWebPage(WebPage):
 
     async def _authenticate(self):
         """
-        Realiza login no SIScan utilizando um contexto.
+        Garante que o contexto esteja autenticado no SIScan.
+
+        A sessão é obtida do gerenciador de sessões por credencial: quando
+        já existe um login válido da mesma conta, o ``storage_state`` salvo
+        é aplicado ao contexto e o login completo é evitado. Jobs
+        concorrentes da mesma conta compartilham um único login. Com a
+        sessão pronta, as opções dos selects dinâmicos da conta são
+        pré-carregadas (``prefetch_select_options``).
 
         Exceções
         --------
-        Exception se autenticação falhar.
+        SiscanLoginError se autenticação falhar.
         """
+        if self._is_authenticated:
+            return
 
-        if not self._is_authenticated:
-            logger.debug("Autenticando usuario %s", self._user)
-            await self.context.handle_goto("/login.jsf")
-            logger.debug("Pagina de login carregada")
+        login = self._login if self._http is None else self._login_http
+        for _ in range(2):
+            state = await session_manager.acquire(
+                self._base_url, self._user, login=login
+            )
+            # Login completo feito por este job ou sessão salva restaurada
+            if self._is_authenticated or await self._restore_session(state):
+                # Fora do lock de login da conta: os demais jobs não
+                # aguardam o pré-carregamento
+                await self.prefetch_select_options()
+                return
+            # A sessão salva expirou no servidor: descarta e autentica de novo
+            session_manager.invalidate(self._base_url, self._user)
+        raise SiscanLoginError(self.context)
+
+    async def prefetch_select_options(self, refresh: bool = False):
+        """
+        Lê e guarda no ``options_cache`` as opções dos selects dinâmicos da
+        conta (``PREFETCH_SELECT_FIELDS``), abrindo o formulário que os
+        contém (``_abrir_formulario_selects``). Executado por
+        ``_authenticate`` fora do lock de login, uma vez por conta enquanto
+        o cache for válido. As opções são lidas dos selects ainda
+        desabilitados, sem Cartão SUS nem tipo de exame. Falhas são apenas
+        registradas: as opções serão lidas no próprio job.
+
+        No motor HTTP as opções vêm do HTML já recebido pelo job, sem
+        navegador: o pré-carregamento só acrescentaria requisições.
+        """
+        if self._http is not None:
+            return
+        pendentes = [
+            campo for campo in self.PREFETCH_SELECT_FIELDS
+            if refresh or not options_cache.is_cached(
+                self._base_url, self._user, campo)
+        ]
+        if not pendentes:
+            return
+
+        async def _carregar():
+            await self._abrir_formulario_selects()
+            for campo in pendentes:
+                await self.load_cached_select_options(
+                    campo, self.PREFETCH_SELECT_FIELDS[campo], refresh=True
+                )
 
-            # Aguarda possível popup abrir e fecha se necessário
-            await self.context.collect_information_popup()
-            logger.debug("Popup de informacao tratada")
+        try:
+            await options_cache.prefetch(self._base_url, self._user, _carregar)
+        except Exception as e:
+            logger.warning(
+                "Não foi possível pré-carregar as opções dos selects: %s", e
+            )
 
-            xpath = await XPE.create(self.context)
+    async def _abrir_formulario_selects(self):
+        """Abre o formulário com os selects de ``PREFETCH_SELECT_FIELDS``."""
+        raise NotImplementedError(
+            "Subclasses com PREFETCH_SELECT_FIELDS devem abrir o formulário."
+        )
 
-            logger.debug("Preenchendo formulario de login")
-            user_input = await xpath.find_form_input("E-mail:")
-            await user_input.handle_fill(self._user)
+    async def _restore_session(self, storage_state: dict) -> bool:
+        """
+        Aplica uma sessão existente ao contexto e verifica se ela continua
+        autenticada no SIScan.
+        """
+        logger.debug("Reutilizando sessão autenticada do usuario %s", self._user)
+        if self._http is not None:
+            self._http.use_storage_state(storage_state)
+            await self._http.goto("/")
+            if not self._http.document.has_heading("SEJA BEM VINDO AO SISCAN"):
+                logger.info("Sessão salva do usuario %s não é mais válida",
+                            self._user)
+                return False
+            self._is_authenticated = True
+            return True
+        if await self.context.apply_storage_state(storage_state):
+            await self.context.handle_goto("/")
+        try:
+            await (await self.context.page).wait_for_selector(
+                'h1:text("SEJA BEM VINDO AO SISCAN")', timeout=5000
+            )
+        except Exception:
+            logger.info("Sessão salva do usuario %s não é mais válida",
+                        self._user)
+            return False
+        self._is_authenticated = True
+        logger.debug("Sessão restaurada sem novo login")
+        return True
+
+    async def _login(self) -> dict:
+        """
+        Realiza o login completo no SIScan utilizando o contexto atual.
+
+        Retorno
+        -------
+        dict
+            ``storage_state`` do contexto autenticado, para reutilização por
+            outros jobs da mesma credencial.
 
-            pass_input = await xpath.find_form_input("Senha:")
-            await pass_input.handle_fill(self._password)
+        Exceções
+        --------
+        SiscanLoginError se autenticação falhar.
+        """
+        logger.debug("Autenticando usuario %s", self._user)
+        await self.context.handle_goto("/login.jsf")
+        logger.debug("Pagina de login carregada")
 
-            await self.take_screenshot("screenshot_01_autenticar.png")
+        # Popup de informes já aberta: aguarda a leitura (sem popup, segue
+        # direto; o handler do contexto trata as que abrirem depois)
+        await self.context.collect_information_popup()
+        logger.debug("Popup de informacao tratada")
 
-            acessar_btn = await xpath.find_form_button("Acessar")
-            await acessar_btn.handle_click()
-            logger.debug("Botao acessar clicado")
+        xpath = await XPE.create(self.context)
 
-            # Aguarda confirmação de login bem-sucedido
-            try:
-                await (await self.context.page).wait_for_selector(
-                    'h1:text("SEJA BEM VINDO AO SISCAN")', timeout=10000
-                )
-            except Exception:
-                raise SiscanLoginError(self.context)
+        logger.debug("Preenchendo formulario de login")
+        user_input = await xpath.find_form_input("E-mail:")
+        await user_input.handle_fill(self._user)
 
-            self._is_authenticated = True
-            logger.debug("Login realizado com sucesso")
-            await self.take_screenshot("screenshot_02_tela_principal.png")
+        pass_input = await xpath.find_form_input("Senha:")
+        await pass_input.handle_fill(self._password)
+
+        await self.take_screenshot("01_autenticar")
+
+        acessar_btn = await xpath.find_form_button("Acessar")
+        await acessar_btn.handle_click()
+        logger.debug("Botao acessar clicado")
+
+        # Aguarda confirmação de login bem-sucedido
+        try:
+            await (await self.context.page).wait_for_selector(
+                'h1:text("SEJA BEM VINDO AO SISCAN")', timeout=10000
+            )
+        except Exception:
+            raise SiscanLoginError(self.context)
+
+        self._is_authenticated = True
+        logger.debug("Login realizado com sucesso")
+        await self.take_screenshot("02_tela_principal")
+        return await self.context.storage_state()
+
+    async def _login_http(self) -> dict:
+        """
+        Realiza o login completo pelo motor HTTP, com os mesmos passos de
+        ``_login``, e retorna os cookies no formato ``storage_state``.
+        """
+        logger.debug("Autenticando usuario %s pelo motor HTTP", self._user)
+        await self._http.goto("/login.jsf")
+        await self._http.write([
+            FieldWrite("usuario", "", InputType.TEXT, self._user,
+                       label="E-mail:"),
+            FieldWrite("senha", "", InputType.TEXT, self._password,
+                       label="Senha:"),
+        ])
+        await self._http.click("Acessar")
+        if not self._http.document.has_heading("SEJA BEM VINDO AO SISCAN"):
+            raise SiscanLoginError(None)
+
+        self._is_authenticated = True
+        logger.debug("Login realizado com sucesso")
+        return self._http.storage_state()
 
     async def wait_page_ready(
-        self, timeout: float = XPE.DEFAULT_TIMEOUT
+        self, timeout: float = XPE.DEFAULT_TIMEOUT, step: str = "page"
     ) -> "XPathConstructor":
         """
-        Aguarda até que a página esteja completamente carregada e o jQuery
-        (se usado) esteja disponível.
+        Aguarda até que a página esteja pronta após a última ação.
 
-        Este método espera pelo estado 'networkidle', indicando que não
-        há mais requisições de rede em andamento, e garante que o jQuery
-        já foi carregado e está acessível na página.
+        A prontidão é detectada pelas requisições AJAX do RichFaces/A4J
+        (ver ``AjaxReadinessTracker``): o passo termina assim que o documento
+        está carregado, não há requisições XHR pendentes e o status
+        ``_viewRoot:status`` não exibe "Carregando...". Se nenhuma requisição
+        foi enviada desde o último ponto ocioso confirmado, a verificação é
+        ignorada.
 
         Parâmetros
         ----------
         timeout : int, opcional
             Tempo máximo de espera, em segundos. O padrão é 10 segundos.
+        step : str, opcional
+            Nome do passo do fluxo, usado nos tempos de prontidão expostos em
+            ``self.context.readiness``.
 
         Retorno
         -------
@@ -143,57 +404,41 @@ class SiscanWebPage(WebPage):
 
         Exceções
         --------
+        SiscanTimeoutError
+            Se a página não ficar pronta dentro do tempo limite.
         SiscanException
-            Se a página não carregar completamente ou o jQuery não estiver
-            disponível dentro do tempo limite.
+            Em caso de erro inesperado durante a espera.
         """
-        try:
-            logger.debug(
-                f"Aguardando o estado 'networkidle' da página. "
-                f"Timeout: {timeout * XPE.TIMEOUT_MS_FACTOR} "
-                f"milessegundos."
-            )
-            await (await self.context.page).wait_for_load_state(
-                "networkidle", timeout=timeout * XPE.TIMEOUT_MS_FACTOR
-            )
-            logger.debug("Estado 'networkidle' alcançado.")
-
-            # Espera pelo jQuery, caso a aplicação o utilize.
-            # Esta verificação é opcional; remova-a se sua aplicação não usa
-            # jQuery.
-            logger.debug(
-                f"Verificando a disponibilidade do jQuery na página. "
-                f"Timeout: {timeout * XPE.TIMEOUT_MS_FACTOR} "
-                f"milessegundos."
-            )
-            await (await self.context.page).wait_for_function(
-                "window.jQuery !== undefined && typeof jQuery === 'function'",
-                timeout=timeout * XPE.TIMEOUT_MS_FACTOR,
-            )
-            logger.info("Página pronta e jQuery disponível.")
-
+        if self._http is not None:
+            # As respostas do motor HTTP já foram aplicadas ao documento
             return self
-
-        except TimeoutError as e:
-            # Captura timeouts do wait_for_load_state ou wait_for_function
-            logger.error(
-                f"Timeout: A página não ficou pronta ou o jQuery não "
-                f"carregou dentro de . Erro: {e}"
-            )
-            raise SiscanTimeoutError(
-                self._context,
-                m=f"Página não carregada ou jQuery indisponível dentro do "
-                f"tempo limite: {e}",
-            )
+        readiness = self.context.readiness
+        try:
+            await self.context.page
+            if await readiness.wait_ready(timeout, step=step):
+                return self
         except Exception as e:
             # Captura quaisquer outras exceções inesperadas
-            logger.error(f"Erro inesperado ao aguardar a prontidão da "
-                         f"página: {e}")
+            logger.error(
+                "Erro inesperado ao aguardar a prontidão da página: %s",
+                e,
+            )
             raise SiscanException(
                 self._context,
                 m=f"Erro inesperado ao aguardar a prontidão da página: {e}",
             )
 
+        logger.error(
+            "Timeout: A página não ficou pronta no passo '%s' dentro de %s "
+            "milessegundos.",
+            step, timeout * XPE.TIMEOUT_MS_FACTOR,
+        )
+        raise SiscanTimeoutError(
+            self._context,
+            m=f"Página não ficou pronta no passo '{step}' dentro do tempo "
+              f"limite.",
+        )
+
     async def pagina_status_pronto(self, timeout: float = 10.0) -> bool:
         """
         Verifica se a página foi carregada, ou seja, se não existe a palavra
@@ -201,18 +446,9 @@ class SiscanWebPage(WebPage):
 
         Retorna True se a página foi carregada, False caso contrário.
         """
-        await self.wait_page_ready()
-        elapsed = 0
-        interval = 0.2
-        while elapsed < timeout:
-            status = await (await self.context.page).locator(
-                "span#_viewRoot\\:status"
-            ).first.inner_text()
-            if "Carregando" not in status:
-                return True
-            await asyncio.sleep(interval)
-            elapsed += interval
-        return False
+        await self.wait_page_ready(step="status")
+        page = await self.context.page
+        return await dom_wait.ajax_idle(page, timeout)
 
     async def acessar_menu(
         self,
@@ -236,45 +472,227 @@ class SiscanWebPage(WebPage):
         interval : float, opcional (default=)
             Intervalo (em segundos) entre tentativas.
         """
+        if self._http is not None:
+            await self._http.menu(menu_name, menu_action_text)
+            return
+
+        target = menu_targets.get(self._base_url, menu_name, menu_action_text)
+        if target is not None:
+            try:
+                await self._acessar_menu_direto(
+                    menu_name, menu_action_text, target, timeout
+                )
+                logger.info("Acesso direto ao menu '%s > %s'.",
+                            menu_name, menu_action_text)
+                return
+            except Exception as e:
+                logger.info(
+                    "Atalho do menu '%s > %s' falhou (%s). Acessando pelo "
+                    "menu suspenso.",
+                    menu_name, menu_action_text, e,
+                )
+                menu_targets.invalidate(
+                    self._base_url, menu_name, menu_action_text
+                )
+
+        page = await self.context.page
+        origem = page.url
+        try:
+            item_id = await page.evaluate(
+                MENU_ITEM_ID, {"menu": menu_name, "action": menu_action_text}
+            )
+        except Exception:
+            item_id = None
+
         interval = interval if interval is not None else XPE.ELAPSED_INTERVAL
 
-        elapsed = 0
-        last_exception = None
-        while elapsed < timeout:
+        async def _acessar():
             try:
                 xpath = await XPE.create(self.context)
                 await xpath.click_menu_action(menu_name, menu_action_text)
                 logger.info(
-                    f"Acesso ao menu '{menu_name} > {menu_action_text}' "
-                    "realizado com sucesso."
+                    "Acesso ao menu '%s > %s' realizado com sucesso.",
+                    menu_name, menu_action_text,
                 )
-                await self.wait_page_ready()
-                return  # Sucesso
-            except Exception as e:
-                last_exception = e
+                await self.wait_page_ready(step="menu")
+            except Exception:
                 logger.warning(
-                    f"Tentativa de acesso ao menu '{menu_name} > "
-                    f"{menu_action_text}' falhou ({elapsed:.1f}s). "
-                    f"Retentando..."
+                    "Tentativa de acesso ao menu '%s > %s' falhou. "
+                    "Retentando...",
+                    menu_name, menu_action_text,
                 )
-                asyncio.sleep(interval)
-                elapsed += interval
+                raise
 
-        # Todas as tentativas falharam
-        logger.error(
-            f"Falha definitiva ao acessar menu '{menu_name} > "
-            f"{menu_action_text}' após {timeout} segundos."
+        try:
+            await retry(_acessar, timeout, interval)
+        except Exception:
+            # Todas as tentativas falharam: relança a última exceção
+            logger.error(
+                "Falha definitiva ao acessar menu '%s > %s' após %s "
+                "segundos.",
+                menu_name, menu_action_text, timeout,
+            )
+            raise
+
+        menu_targets.store(
+            self._base_url, menu_name, menu_action_text,
+            await self._menu_target(origem, item_id),
         )
-        raise (
-            last_exception
-            if last_exception
-            else SiscanMenuNotFoundError(
+
+    async def _menu_target(
+        self, origem: str, item_id: Optional[str]
+    ) -> MenuTarget:
+        """
+        Destino da navegação pelo menu que acabou de concluir: a URL da
+        página, se ela mudou e pertence ao SIScan, ou o id do item de menu.
+        """
+        _, fingerprint = await self.context.form_key()
+        base = self._base_url.rstrip("/")
+        destino = page_key((await self.context.page).url)
+        path = None
+        if destino != page_key(origem) and destino.startswith(base):
+            path = destino[len(base):]
+        return MenuTarget(path=path, item_id=item_id, fingerprint=fingerprint)
+
+    async def _acessar_menu_direto(
+        self,
+        menu_name: str,
+        menu_action_text: str,
+        target: MenuTarget,
+        timeout: float,
+    ) -> None:
+        """
+        Vai direto ao destino aprendido do menu: abre a URL com
+        ``handle_goto`` ou dispara a ação JSF do item, e confere se a página
+        aberta tem o formulário esperado.
+
+        Exceções
+        --------
+        SiscanMenuNotFoundError
+            Se o item de menu não existir mais ou a página aberta não for a
+            esperada.
+        """
+        if target.path is not None:
+            await self.context.handle_goto(target.path)
+            if await self._pagina_do_menu(target, timeout):
+                return
+            if target.item_id is None:
+                raise SiscanMenuNotFoundError(
+                    self.context,
+                    m="A página aberta pelo atalho não é a do menu.",
+                )
+            # A URL não identifica a página (postback do JSF): passa a usar
+            # a ação do item de menu
+            target = replace(target, path=None)
+            menu_targets.store(self._base_url, menu_name, menu_action_text,
+                               target)
+
+        page = await self.context.page
+        if not await page.evaluate(CLICK_MENU_ITEM, target.item_id):
+            raise SiscanMenuNotFoundError(
+                self.context, menu_name=menu_name, action=menu_action_text
+            )
+        if not await self._pagina_do_menu(target, timeout):
+            raise SiscanMenuNotFoundError(
+                self.context, m="A página aberta pelo atalho não é a do menu."
+            )
+
+    async def _pagina_do_menu(self, target: MenuTarget, timeout: float) -> bool:
+        await self.wait_page_ready(timeout, step="menu")
+        if target.fingerprint is None:
+            return True
+        _, fingerprint = await self.context.form_key()
+        return fingerprint == target.fingerprint
+
+    async def load_cached_select_options(
+        self,
+        field_name: str,
+        key: Optional[Callable[[str], str]] = None,
+        refresh: bool = False,
+    ) -> tuple[dict[str, str], bool]:
+        """
+        Atualiza ``FIELDS_MAP[field_name]`` com as opções do select, usando o
+        cache por credencial (``options_cache``) quando possível.
+
+        Parâmetros
+        ----------
+        field_name : str
+            Nome do campo <select>.
+        key : Callable[[str], str], opcional
+            Converte o texto de cada opção na chave do mapeamento (ex.: o
+            código CNES antes do hífen). A opção "0" (Selecione...) mantém o
+            texto original.
+        refresh : bool, opcional
+            Se True, ignora o cache e relê as opções da página.
+
+        Retorno
+        -------
+        tuple[dict[str, str], bool]
+            Mapeamento {chave: value} e se ele veio do cache.
+        """
+        options = None
+        if not refresh:
+            options = options_cache.get(self._base_url, self._user, field_name)
+        if options is not None:
+            self.FIELDS_MAP[field_name] = options
+            return options, True
+
+        await self.load_select_options(field_name)
+        options = {}
+        for text, value in self.FIELDS_MAP[field_name].items():
+            options[key(text) if key and value != "0" else text] = value
+        options_cache.store(self._base_url, self._user, field_name, options)
+        self.FIELDS_MAP[field_name] = dict(options)
+        return options, False
+
+    async def select_cached_option(
+        self,
+        field_name: str,
+        data: dict,
+        key: Optional[Callable[[str], str]] = None,
+    ) -> str:
+        """
+        Seleciona a opção de um select dinâmico validando o valor informado
+        contra as opções em cache. Apenas o ``select_option`` final acessa o
+        navegador; se o valor não constar do cache, as opções são relidas
+        uma vez antes de recusar o valor.
+
+        Exceções
+        --------
+        SiscanInvalidFieldValueError
+            Se o valor não corresponder a nenhuma opção do select.
+        """
+        options, cached = await self.load_cached_select_options(field_name, key)
+        value = self.get_field_value(field_name, data)
+        if value in (None, "0") and cached:
+            logger.debug(
+                "Valor de '%s' fora do cache. Relendo as opções da página.",
+                field_name,
+            )
+            options, _ = await self.load_cached_select_options(
+                field_name, key, refresh=True
+            )
+            value = self.get_field_value(field_name, data)
+        if value in (None, "0"):
+            raise SiscanInvalidFieldValueError(
                 self.context,
-                menu_name=menu_name,
-                action=menu_action_text,
-                m=msg.MENU_ACCESS_TIMEOUT,
+                field_name=field_name,
+                data=data,
+                options_values=options.keys(),
             )
-        )
+
+        field = self.get_field_metadata(field_name)
+        if self._http is not None:
+            await self._http.write([FieldWrite(
+                field_name, field.xpath, InputType.SELECT, value,
+                label=field.label,
+            )])
+        else:
+            xpath = await XPE.create(self.context, xpath=field.xpath)
+            await xpath.find_form_input(field.label, InputType.SELECT)
+            await xpath.handle_fill(value, InputType.SELECT)
+        data.pop(field_name, None)
+        return value
 
     async def seleciona_um_paciente(self, timeout=10):
         """
@@ -287,19 +705,21 @@ class SiscanWebPage(WebPage):
             "table#frm\\:listaPaciente", state="visible", timeout=timeout * 1000
         )
 
-        # Localiza o corpo da tabela
-        rows = (await self.context.page).locator(
-            "table#frm\\:listaPaciente > tbody > tr"
-        )
-        row_count = await rows.count()
+        page = await self.context.page
+        # Lê as linhas da tabela em uma única chamada ao navegador
+        linhas = await bulk_reader.table_rows(page, "table#frm\\:listaPaciente")
+        row_count = len(linhas or [])
         if row_count > 1:
             raise PacienteDuplicadoException(self.context)
         elif row_count == 0:
             raise Exception("Nenhum paciente encontrado na tabela de resultados.")
+        logger.debug("Paciente encontrado: %s", linhas[0])
 
         # Se chegou aqui, só há um resultado: clicar no botão
         # 'Selecionar Paciente' (última coluna)
-        botao_selecionar = rows.nth(0).locator("a[title='Selecionar Paciente']")
+        botao_selecionar = page.locator(
+            "table#frm\\:listaPaciente > tbody > tr"
+        ).nth(0).locator("a[title='Selecionar Paciente']")
         await botao_selecionar.click()
 
     async def _buscar_cartao_sus(self, data: dict, menu_action: Callable[[], Any]):
@@ -321,7 +741,7 @@ class SiscanWebPage(WebPage):
                 self.get_field_label("cartao_sus"))
         ).handle_click()
 
-        await self.wait_page_ready()
+        await self.wait_page_ready(step="cartao_sus_busca")
 
         # Preenche os campos de busca do Cartão SUS
         await self.fill_form_fields(
@@ -340,13 +760,19 @@ class SiscanWebPage(WebPage):
         numero: str,
         timeout: int = XPE.DEFAULT_TIMEOUT,
         interval: float | None = None,
-    ):
+    ) -> dict[str, str]:
         """
         Preenche o campo Cartão SUS no formulário e trata possíveis erros.
         Repete as tentativas de preenchimento e validação até sucesso ou até
         atingir o tempo limite. Se ocorrer erro (mensagem exibida na tela) ou
         o campo 'Nome' for preenchido, interrompe o loop.
 
+        A resolução do cartão passa pelo ``patient_cache``: um cartão
+        sabidamente sem paciente falha antes de tocar o formulário. Se o
+        paciente já está em cache, ou se outro job está resolvendo o mesmo
+        cartão, o campo é preenchido uma única vez, sem aguardar o SIScan
+        carregar o paciente, e os dados resolvidos são reutilizados.
+
         Parâmetros
         ----------
         numero : str
@@ -355,13 +781,69 @@ class SiscanWebPage(WebPage):
             Tempo máximo, em segundos, para tentar a validação.
         interval : float, opcional (default=0.2)
             Intervalo, em segundos, entre tentativas.
+
+        Retorno
+        -------
+        dict[str, str]
+            Dados do paciente (``MAP_DATA_PACIENTE``) exibidos pelo SIScan.
+        """
+        resolvido = False
+
+        async def _resolver() -> dict[str, str]:
+            nonlocal resolvido
+            resolvido = True
+            await self._preencher_cartao_sus(numero, timeout, interval)
+            paciente = await self.ler_paciente()
+            if not paciente.get("nome"):
+                # Sem o nome o paciente não foi carregado: nada vai para o
+                # cache e os jobs na espera fazem a própria resolução
+                raise SiscanTimeoutError(
+                    self.context,
+                    m="Dados do paciente não carregados após o Cartão SUS.",
+                )
+            return paciente
+
+        paciente = await patient_cache.resolve(numero, _resolver)
+        if not resolvido:
+            # Paciente em cache ou resolvido por outro job: apenas informa o
+            # cartão no formulário
+            await self._informar_cartao_sus(numero)
+        return paciente
+
+    async def _informar_cartao_sus(self, numero: str):
+        """
+        Preenche o Cartão SUS de um paciente já resolvido, sem o blur e sem
+        aguardar o SIScan exibir os dados do paciente.
         """
+        if self._http is not None:
+            field = self.get_field_metadata("cartao_sus")
+            await self._http.write([FieldWrite(
+                "cartao_sus", field.xpath, field.input_type, numero,
+                label=field.label,
+            )])
+            return
+
+        xpath = await XPE.create(self.context)
+        cartao_sus_ele = await (
+            await xpath.find_form_input(self.get_field_label("cartao_sus"))
+        ).wait_until_enabled()
+        await cartao_sus_ele.handle_fill(numero, reset=False)
+
+    async def _preencher_cartao_sus(
+        self,
+        numero: str,
+        timeout: int,
+        interval: float | None,
+    ):
+        if self._http is not None:
+            await self._preencher_cartao_sus_http(numero)
+            return
+
         xpath = await XPE.create(self.context)
-        elapsed = 0
 
         interval = interval or (XPE.ELAPSED_INTERVAL)
 
-        while elapsed < timeout:
+        async def _tentativa() -> bool:
             xpath.reset()
             cartao_sus_ele = await (
                 await xpath.find_form_input(self.get_field_label("cartao_sus"))
@@ -370,13 +852,17 @@ class SiscanWebPage(WebPage):
             await cartao_sus_ele.on_blur()
             cartao_sus_ele.reset()
 
-            await self.wait_page_ready()
+            await self.wait_page_ready(step="cartao_sus_blur")
 
-            # 1. Verifica se há mensagem de erro na página
+            # 1. Verifica se há mensagem de erro na página. Apenas a de
+            # cartão sem paciente é registrada no cache; as demais (ex.:
+            # falha transitória do SIScan) são propagadas sem cache.
             message_erros = await SiscanException.get_error_messages(
                 self.context)
-            if message_erros:
+            if CartaoSusNotFoundError.matches(message_erros):
                 raise CartaoSusNotFoundError(self.context, cartao_sus=numero)
+            if message_erros:
+                raise SiscanException(self.context, m=message_erros)
 
             # 2. Verifica se o campo "Nome" foi preenchido
             try:
@@ -386,34 +872,98 @@ class SiscanWebPage(WebPage):
                 await nome_ele.wait_until_filled(timeout=timeout * 5) # 0.5 segundos
                 nome, _ = await nome_ele.get_value()
                 if nome:
-                    return  # Sucesso!
+                    return True  # Sucesso!
             except Exception as err:
                 try:
                     current_value = await (
                         await cartao_sus_ele.get_locator()
                     ).input_value()
                     if current_value:
-                        break
+                        return True
                 except Exception:
                     logger.warning(
-                        f"Erro ao obter valor do campo "
-                        f"Cartão SUS: {numero}. Error: {err}. "
-                        f"Tentando novamente..."
+                        "Erro ao obter valor do campo Cartão SUS: %s. "
+                        "Error: %s. Tentando novamente...",
+                        numero, err,
                     )
 
             # 3. Aguarda o intervalo antes da próxima tentativa
-            asyncio.sleep(interval)
-            elapsed += interval
+            return False
+
+        if not await wait_until(_tentativa, timeout, interval):
+            raise SiscanTimeoutError(
+                self.context,
+                m=f"Cartão SUS {numero} não validado em {timeout} segundos.",
+            )
+
+    async def ler_paciente(self) -> dict[str, str]:
+        """
+        Lê, em uma única chamada, os dados do paciente (``MAP_DATA_PACIENTE``)
+        exibidos após o Cartão SUS.
+
+        Retorno
+        -------
+        dict[str, str]
+            ``{campo: valor}`` dos campos mapeados no formulário.
+        """
+        fields = self.get_map_label()
+        names = [n for n in self.MAP_DATA_PACIENTE if n in fields]
+        if self._http is not None:
+            paciente = {}
+            for name in names:
+                field = fields[name]
+                try:
+                    text, _ = self._http.read(field.xpath, field.label,
+                                              field.input_type)
+                except Exception:
+                    continue
+                paciente[name] = text or ""
+            return paciente
+
+        labels = {fields[n].label: n for n in names}
+        values = await bulk_reader.labeled_values(
+            await self.context.page, list(labels)
+        )
+        return {labels[label]: value for label, value in values.items()}
+
+    async def _preencher_cartao_sus_http(self, numero: str):
+        """
+        Preenche o Cartão SUS pelo motor HTTP: o handler AJAX do campo é
+        enviado e a resposta já traz os dados do paciente ou a mensagem de
+        erro, sem novas tentativas.
+        """
+        field = self.get_field_metadata("cartao_sus")
+        await self._http.write([FieldWrite(
+            "cartao_sus", field.xpath, field.input_type, numero,
+            label=field.label,
+        )])
+        erros = " | ".join(self._http.document.errors)
+        if CartaoSusNotFoundError.matches(erros):
+            raise CartaoSusNotFoundError(None, cartao_sus=numero)
+        if erros:
+            raise SiscanHttpEngineError(None, m=f"Form Errors: {erros}")
+        nome, _ = self._http.read("", "Nome", InputType.TEXT)
+        if not nome:
+            raise SiscanHttpEngineError(
+                None, m="Dados do paciente não carregados após o Cartão SUS."
+            )
 
     async def fill_field_in_card(self, card_name: str, field_name: str, value: str):
         logger.debug(
-            f"Preenchendo campo '{field_name}' de '{card_name}' com o valor '{value}'"
+            "Preenchendo campo '%s' de '%s' com o valor '%s'",
+            field_name, card_name, value,
         )
-        xpath_obj = await XPE.create(
-            self.context,
-            xpath=f"//fieldset[legend[normalize-space(text())='{card_name}']]"
-            f"//input[@type='text']",
+        xpath = (
+            f"//fieldset[legend[normalize-space(text())='{card_name}']]"
+            f"//input[@type='text']"
         )
+        if self._http is not None:
+            await self._http.write([FieldWrite(
+                field_name or card_name, xpath, InputType.TEXT, value
+            )])
+            return
+
+        xpath_obj = await XPE.create(self.context, xpath=xpath)
 
         await xpath_obj.handle_fill(value)
 
@@ -425,7 +975,7 @@ class SiscanWebPage(WebPage):
         label_dependentes: dict | None = None,
         erro_dependente_msg: str | None = None,
     ):
-        logger.debug(f"Selecionar campo {campo_chave}")
+        logger.debug("Selecionar campo %s", campo_chave)
         text, value = await self.select_value(campo_chave, data)
 
         dependentes = condicoes_dependentes.get(value, [])
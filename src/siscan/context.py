@@ -1,12 +1,34 @@
 import logging
 import asyncio
-from typing import Optional
-from src.utils import messages as msg
-from playwright.async_api import async_playwright, Browser, Page
+from typing import Optional, TYPE_CHECKING
+from src.utils import bulk_reader, messages as msg
+from src.siscan.notices import NoticeStore, notice_store
+from src.siscan.readiness import AjaxReadinessTracker
+from src.siscan.recorder import NetworkRecorder, RecordedRequest
+from src.siscan.trace_buffer import TraceBuffer
+from src.utils.label_index import LabelIndex
+from src.utils.selector_cache import (
+    SelectorCache,
+    form_fingerprint,
+    page_key,
+    selector_cache,
+)
+from playwright.async_api import (
+    async_playwright,
+    Browser,
+    BrowserContext,
+    Page,
+)
+
+if TYPE_CHECKING:
+    from src.siscan.browser_pool import BrowserPool
 
 
 logger = logging.getLogger(__name__)
 
+# Popup aberta pelo SIScan após o login com os informes do sistema
+INFORMATION_POPUP = "popupMensagensInformativas.jsf"
+
 
 class SiscanBrowserContext:
     """
@@ -18,15 +40,43 @@ class SiscanBrowserContext:
         base_url: str = "https://siscan.saude.gov.br/",
         headless: bool = True,
         timeout: int = 10000,
+        pool: Optional["BrowserPool"] = None,
+        cache: Optional[SelectorCache] = selector_cache,
+        notices: Optional[NoticeStore] = notice_store,
     ):
         self._base_url = base_url
         self._timeout = timeout
         self.headless = headless
 
+        # Quando informado e aquecido, o pool fornece um BrowserContext
+        # isolado em um Chromium já aberto, evitando lançar um navegador novo.
+        self._pool = pool
+        self._browser_context: Optional[BrowserContext] = None
+        # storage_state (cookies/storage) aplicado ao criar o contexto, para
+        # iniciar já autenticado a partir de uma sessão existente
+        self._storage_state: Optional[dict] = None
+
         self._browser: Optional[Browser] = None
         self._page: Optional[Page] = None
 
-        self._information_messages: dict[str, list[str]] = {}
+        # Informes da popup, por (data, assunto), lidos pelo handler do
+        # evento "page" do contexto (``_on_page``) e gravados em ``notices``
+        self._information_messages: dict[tuple[str, str], list[str]] = {}
+        self._notices = notices
+        self._popup_tasks: set[asyncio.Task] = set()
+
+        # Prontidão da página baseada nas requisições AJAX do RichFaces
+        self._readiness = AjaxReadinessTracker()
+        # Índice de labels da página, descartado a cada requisição observada
+        self._label_index = LabelIndex(self._readiness)
+        # Cache persistente de seletores e a chave (URL, fingerprint) do
+        # formulário atual, recalculada a cada requisição observada
+        self._selector_cache = cache
+        self._form_key: Optional[tuple[int, tuple[str, str]]] = None
+        # Gravação das requisições JSF/A4J (modo recorder)
+        self._recorder: Optional[NetworkRecorder] = None
+        # Trace do Playwright por passo, gravado só se o job falhar
+        self._traces = TraceBuffer()
 
     @property
     def base_url(self) -> str:
@@ -43,7 +93,7 @@ class SiscanBrowserContext:
         return self._timeout
 
     @property
-    def information_messages(self) -> dict[str, list[str]]:
+    def information_messages(self) -> dict[tuple[str, str], list[str]]:
         """
         Retorna os informes coletados da popup de mensagens informativas.
         """
@@ -67,7 +117,126 @@ class SiscanBrowserContext:
             self._browser, self._page = await self.startup()
         return self._page
 
+    @property
+    def readiness(self) -> AjaxReadinessTracker:
+        """
+        Retorna o detector de prontidão AJAX da página e seus tempos por
+        passo.
+        """
+        return self._readiness
+
+    @property
+    def label_index(self) -> LabelIndex:
+        """
+        Retorna o índice de labels usado por ``find_form_input``.
+        """
+        return self._label_index
+
+    @property
+    def selector_cache(self) -> Optional[SelectorCache]:
+        """
+        Retorna o cache persistente de seletores, ou None se desabilitado.
+        """
+        cache = self._selector_cache
+        return cache if cache is not None and cache.enabled else None
+
+    async def form_key(self) -> tuple[str, str]:
+        """
+        Retorna a chave (URL, fingerprint da estrutura do formulário) da
+        página atual. O fingerprint é lido uma vez a cada requisição
+        observada pelo ``AjaxReadinessTracker``.
+        """
+        generation = self._readiness.generation
+        if self._form_key is None or self._form_key[0] != generation:
+            page = await self.page
+            key = (page_key(page.url), await form_fingerprint(page))
+            self._form_key = (generation, key)
+        return self._form_key[1]
+
+    @property
+    def traces(self) -> TraceBuffer:
+        """Trace do Playwright do job (ver ``TraceBuffer``)."""
+        return self._traces
+
+    @property
+    def recording(self) -> bool:
+        """Indica se as requisições da página estão sendo gravadas."""
+        return self._recorder is not None
+
+    async def start_recording(self) -> NetworkRecorder:
+        """
+        Ativa o modo recorder: as requisições JSF/A4J da página passam a
+        ser gravadas até ``stop_recording``.
+        """
+        if self._recorder is None:
+            self._recorder = NetworkRecorder()
+            await self._recorder.attach(await self.page)
+        return self._recorder
+
+    async def stop_recording(self) -> list[RecordedRequest]:
+        """Encerra o modo recorder e retorna as requisições gravadas."""
+        recorder, self._recorder = self._recorder, None
+        if recorder is None:
+            return []
+        records = await recorder.stop()
+        logger.debug("%s requisições gravadas.", len(records))
+        return records
+
+    @property
+    def is_started(self) -> bool:
+        """
+        Indica se o navegador e a página já foram inicializados.
+        """
+        return self._page is not None
+
+    async def apply_storage_state(self, storage_state: dict) -> bool:
+        """
+        Aplica o ``storage_state`` de uma sessão autenticada.
+
+        Se o navegador ainda não foi iniciado, o estado é usado na criação
+        do contexto. Caso contrário, os cookies são adicionados ao contexto
+        atual e a página precisa ser recarregada.
+
+        Retorno
+        -------
+        bool
+            True se a página atual precisa ser recarregada.
+        """
+        if not self.is_started:
+            self._storage_state = storage_state
+            return False
+        await self._page.context.add_cookies(storage_state.get("cookies", []))
+        return True
+
+    async def storage_state(self) -> dict:
+        """
+        Retorna o ``storage_state`` atual do contexto do navegador.
+        """
+        return await (await self.page).context.storage_state()
+
+    @property
+    def is_pooled(self) -> bool:
+        """
+        Indica se o navegador atual foi emprestado do pool do processo.
+        """
+        return self._browser_context is not None
+
     async def close(self):
+        if self._recorder is not None:
+            await self.stop_recording()
+        for task in list(self._popup_tasks):
+            task.cancel()
+        await self._traces.discard()
+        if self._readiness.timings:
+            logger.debug("Tempos de prontidão por passo: %s",
+                         self._readiness.summary())
+        if self._browser_context is not None:
+            # O navegador pertence ao pool: fecha apenas o contexto do job.
+            await self._browser_context.close()
+            self._browser_context = None
+            self._browser = None
+            self._page = None
+            return
         if self._browser:
             await self._browser.close()
             self._browser = None
@@ -80,7 +249,7 @@ class SiscanBrowserContext:
         if not self._page:
             await self.startup()
         url = self._base_url.rstrip("/") + "/" + path.lstrip("/")
-        logger.debug(f"Navegando para: {url}")
+        logger.debug("Navegando para: %s", url)
         if self._page:
             await self._page.goto(url, **kwargs)
         else:
@@ -92,6 +261,20 @@ class SiscanBrowserContext:
         if self._browser and self._page:
             return self._browser, self._page
 
+        if self._pool is not None and self._pool.ready:
+            logger.debug("Obtendo contexto isolado do pool de navegadores")
+            self._browser_context = await self._pool.new_context(
+                storage_state=self._storage_state
+            )
+            self._browser = self._browser_context.browser
+            self._page = await self._browser_context.new_page()
+            await self._readiness.attach(self._page)
+            await self._traces.attach(self._browser_context)
+            self._browser_context.on("page", self._on_page)
+            logger.debug("Navegando para %s", self._base_url)
+            await self._page.goto(self._base_url, wait_until="load")
+            return self._browser, self._page
+
         async def _launch():
             logger.debug("Inicializando Playwright")
             try:
@@ -100,7 +283,10 @@ class SiscanBrowserContext:
                 browser = await playwright.chromium.launch(headless=self.headless, slow_mo=100)
                 logger.debug("Modo headless: %s", self.headless)
 
-                page = await browser.new_page()
+                page = await browser.new_page(storage_state=self._storage_state)
+                await self._readiness.attach(page)
+                await self._traces.attach(page.context)
+                page.context.on("page", self._on_page)
 
                 logger.debug("Navegando para %s", self._base_url)
                 await page.goto(self._base_url, wait_until="load")
@@ -117,64 +303,56 @@ class SiscanBrowserContext:
         self._page = page
         return self._browser, self._page
 
+    def _on_page(self, page: Page) -> None:
+        """
+        Handler do evento "page" do contexto: trata cada janela aberta pelo
+        SIScan em qualquer ponto do fluxo, sem polling de ``context.pages``.
+        """
+        if page == self._page:
+            return
+        task = asyncio.get_running_loop().create_task(
+            self._read_information_popup(page)
+        )
+        self._popup_tasks.add(task)
+        task.add_done_callback(self._popup_tasks.discard)
+
+    async def _read_information_popup(self, popup: Page) -> None:
+        try:
+            await popup.wait_for_load_state("domcontentloaded")
+            if INFORMATION_POPUP not in popup.url:
+                return
+            # Lê todos os informes da tabela em uma única chamada ao
+            # navegador
+            notices = await bulk_reader.information_notices(popup)
+            for notice in notices:
+                self._information_messages[
+                    (notice["date"], notice["subject"])
+                ] = notice["lines"]
+            logger.debug("%s informes lidos da popup", len(notices))
+            if self._notices is not None:
+                # Gravação no banco em uma thread, fora do event loop
+                await asyncio.to_thread(self._notices.store, notices)
+            await popup.close()
+        except Exception as e:
+            # A popup pode ser fechada pelo SIScan ou pelo fim do job
+            logger.debug("Falha ao ler a popup de informes: %s", e)
+
     async def collect_information_popup(
-        self, timeout: int = 3000
-    ) -> dict[str, list[str]]:
+        self,
+    ) -> dict[tuple[str, str], list[str]]:
         """
-        Coleta todos os informes da popup, estruturando como {data: [linhas de texto, ...]}, e fecha a popup.
+        Aguarda o tratamento das popups de informes já abertas e retorna os
+        informes coletados. Sem popup, retorna imediatamente; uma popup
+        aberta depois é tratada em segundo plano pelo handler do evento
+        "page".
 
         Retorno
         -------
         dict
-            Dicionário {data: [lista de linhas de conteúdo]}
+            Dicionário {(data, assunto): [lista de linhas de conteúdo]}
         """
         if not self._page:
             await self.startup()
-
-        context = self._page.context
-        popup = None
-        start = asyncio.get_event_loop().time()
-        while (asyncio.get_event_loop().time() - start) * 1000 < timeout:
-            for current_page in context.pages:
-                if (
-                    current_page != self._page
-                    and "popupMensagensInformativas.jsf" in current_page.url
-                ):
-                    popup = current_page
-                    break
-            if popup:
-                break
-            await asyncio.sleep(0.1)
-        if not popup:
-            logger.debug("Nenhuma popup de informacoes encontrada")
-            return {}
-
-        logger.debug("Coletando mensagens da popup de informacoes")
-
-        await popup.wait_for_load_state("domcontentloaded")
-
-        trs = popup.locator("table#listaMensagens tr.rich-table-row")
-        count = await trs.count()
-
-        for i in range(count):
-            tr = trs.nth(i)
-            date_elem = tr.locator('p[align="center"] > b > span')
-            if await date_elem.count() == 0:
-                continue
-            notice_date = (await date_elem.first.inner_text()).strip()
-
-            subject_elem = tr.locator("p").nth(1)
-            notice_subject = (await subject_elem.inner_text()).strip()
-
-            lines = []
-            ps = tr.locator("div#divDesc p")
-            ps_count = await ps.count()
-            for j in range(ps_count):
-                texto = (await ps.nth(j).inner_text()).strip()
-                if texto:
-                    lines.append(texto)
-            self._information_messages[(notice_date, notice_subject)] = lines
-
-        await popup.close()
-
+        if self._popup_tasks:
+            await asyncio.gather(*self._popup_tasks, return_exceptions=True)
         return self._information_messages
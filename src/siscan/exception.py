@@ -1,5 +1,7 @@
+import re
 from typing import Iterable
 from src.utils import messages as msg
+from src.utils import bulk_reader, metrics
 from playwright.async_api import TimeoutError as PlaywrightTimeoutError
 
 
@@ -12,6 +14,7 @@ class SiscanException(Exception):
     def __init__(self, ctx, m: str | None = None):
         self.ctx = ctx
         self.msg = m or ""
+        metrics.EXCEPTIONS.labels(type(self).__name__).inc()
 
         # A coleta de mensagens de erro pode exigir chamadas assíncronas ao
         # Playwright. Para evitar chamadas bloqueantes em contextos assíncronos
@@ -38,13 +41,8 @@ class SiscanException(Exception):
             ".mensagem",
             "tr.errorMessage > td",
         ]
-        mensagens = []
-        for seletor in seletores:
-            elementos = await (await ctx.page).query_selector_all(seletor)
-            for el in elementos:
-                texto = el.inner_text().strip()
-                if texto:
-                    mensagens.append(texto)
+        # Todos os seletores são lidos em uma única chamada ao navegador
+        mensagens = await bulk_reader.texts(await ctx.page, seletores)
         if mensagens:
             return f"Form Errors: {' | '.join(mensagens)}"
         return ""
@@ -87,6 +85,20 @@ class CartaoSusNotFoundError(SiscanException):
     Exceção disparada quando o Cartão SUS informado não é localizado no SIScan.
     """
 
+    # Mensagens do SIScan para Cartão SUS sem paciente (ex.: "Cartão SUS não
+    # encontrado na base do CADSUS."). Outras mensagens de erro não indicam
+    # que o cartão é inválido.
+    NOT_FOUND_MESSAGE = re.compile(
+        r"cart[aã]o\s+sus.*n[aã]o\s+(foi\s+)?(encontrad|localizad)"
+        r"|n[aã]o\s+existe\s+paciente",
+        re.IGNORECASE,
+    )
+
+    @classmethod
+    def matches(cls, message: str | None) -> bool:
+        """Indica se a mensagem de erro da página é de cartão sem paciente."""
+        return bool(message) and cls.NOT_FOUND_MESSAGE.search(message) is not None
+
     def __init__(self, ctx, cartao_sus: str | None = None, m: str | None = None):
         if m is not None:
             mensagem = m
@@ -224,6 +236,18 @@ class SiscanInvalidFieldValueError(SiscanException):
         self.field_name = field_name
 
 
+class SiscanHttpEngineError(SiscanException):
+    """
+    Exceção lançada quando o motor HTTP (``JsfHttpEngine``) não consegue
+    reproduzir um passo do fluxo: campo ou ação não localizados no HTML,
+    script de evento não suportado, ViewState expirado ou resposta
+    inesperada do servidor. O job é então repetido no navegador.
+    """
+
+    def __init__(self, ctx, m: str | None = None):
+        super().__init__(ctx, m or "Passo não suportado pelo motor HTTP.")
+
+
 class SiscanTimeoutError(SiscanException, PlaywrightTimeoutError):
     """
     Exceção lançada quando ocorre um timeout em operações assíncronas do Playwright no SIScan.
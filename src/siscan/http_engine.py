@@ -0,0 +1,1098 @@
+import hashlib
+import logging
+import re
+from dataclasses import dataclass, field
+from html.parser import HTMLParser
+from typing import Optional
+from urllib.parse import urlencode, urljoin, urlsplit
+
+import httpx
+
+from src.siscan.exception import FieldValueNotFoundError, SiscanHttpEngineError
+from src.siscan.session_pool import cookies_from_storage_state
+from src.utils.bulk_writer import FieldWrite, FieldWriteResult
+from src.utils import round_trips
+from src.utils.label_index import normalize_label
+from src.utils.schema import InputType
+
+logger = logging.getLogger(__name__)
+
+VIEW_STATE = "javax.faces.ViewState"
+
+# Elementos HTML sem tag de fechamento
+_VOID_TAGS = frozenset({
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link",
+    "meta", "param", "source", "track", "wbr",
+})
+# Tipos de <input> tratados como campo de texto
+_TEXT_TYPES = frozenset({
+    "", "text", "password", "email", "tel", "number", "date", "search",
+    "hidden",
+})
+_BUTTON_TYPES = frozenset({"submit", "button", "image", "reset"})
+# Classes dos elementos com mensagens de erro (ver
+# ``SiscanException.get_error_messages``)
+_ERROR_CLASSES = frozenset({"mensagem-erro", "alert-danger", "mensagem"})
+
+# Handlers inline que disparam requisições AJAX do A4J/RichFaces
+_AJAX = re.compile(r"A4J\.AJAX\.Submit|RichFaces\.ajax|jsf\.ajax")
+_AJAX_HANDLERS = ("onchange", "onclick", "onblur", "onkeyup")
+
+# Scripts de evento gerados pelo JSF/RichFaces
+_A4J_SUBMIT = re.compile(
+    r"A4J\.AJAX\.Submit\(\s*((?:'[^']*'\s*,\s*)*)event\s*,\s*\{(.*)\}\s*\)",
+    re.S,
+)
+_JSFCLJS = re.compile(
+    r"jsfcljs\(\s*document\.(?:getElementById\('([^']+)'\)"
+    r"|forms\['([^']+)'\])\s*,\s*(\{[^}]*\}|'[^']*')",
+)
+_LOCATION = re.compile(
+    r"(?:document\.|window\.)?location(?:\.href)?\s*=\s*'([^']+)'"
+)
+_JS_PAIR = re.compile(r"'([^']*)'\s*:\s*'([^']*)'")
+_JS_PARAMETERS = re.compile(r"'parameters'\s*:\s*\{([^}]*)\}")
+
+# XPaths fixos (``x-xpath``) e montados pelas páginas que o motor HTTP
+# sabe reproduzir sobre o HTML
+_XPATH_BY_ATTR = re.compile(r"^//(?:\w+|\*)\[@(name|id)='([^']+)'\]$")
+_XPATH_FIELDSET = re.compile(
+    r"^(?://div\[@id='(?P<div>[^']+)'\])?"
+    r"//fieldset\[legend\[(?:normalize-space\()?text\(\)\)?="
+    r"'(?P<legend>[^']+)'\]\]"
+    r"(?P<text>//input\[@type='text'\])?$"
+)
+_XPATH_AFTER_LABEL = re.compile(
+    r"^//label\[contains\(normalize-space\(\.\), '(?P<label>[^']+)'\)\]"
+    r"/following::input\[@type='text'\]\[1\]$"
+)
+_XPATH_BESIDE_LABEL = re.compile(
+    r"^//fieldset\[legend\[normalize-space\(text\(\)\)='(?P<legend>[^']+)'\]\]"
+    r"//label\[normalize-space\(text\(\)\)='(?P<label>[^']+)'\]"
+    r"/parent::div/(?P<axis>preceding|following)-sibling::div\[1\]"
+    r"//input\[@type='text'\]$"
+)
+
+
+def _text(parts: list[str]) -> str:
+    return re.sub(r"\s+", " ", "".join(parts)).strip()
+
+
+@dataclass(eq=False)
+class JsfControl:
+    """Controle de formulário (input, select ou textarea) do documento."""
+
+    tag: str
+    type: str
+    name: str
+    id: str
+    form: Optional[str]
+    value: str = ""
+    checked: bool = False
+    disabled: bool = False
+    readonly: bool = False
+    # (value, texto) de cada <option>
+    options: list[tuple[str, str]] = field(default_factory=list)
+    handlers: dict[str, str] = field(default_factory=dict)
+    # ids dos elementos ancestrais e legends dos fieldsets que o contêm
+    ancestors: tuple[str, ...] = ()
+    legends: tuple[str, ...] = ()
+    # Texto do label[for] do controle e do label irmão que o precede
+    label: str = ""
+    caption: str = ""
+    # Posição no documento, usada nas buscas por ordem (following/preceding)
+    order: tuple = ()
+
+    @property
+    def is_text(self) -> bool:
+        return self.tag == "textarea" or (
+            self.tag == "input" and self.type in _TEXT_TYPES
+        )
+
+    def within(self, element_id: str) -> bool:
+        return element_id == self.id or element_id in self.ancestors
+
+    def ajax_handler(self) -> Optional[str]:
+        """Retorna o script do handler que dispara AJAX, se houver."""
+        for name in _AJAX_HANDLERS:
+            script = self.handlers.get(name, "")
+            if _AJAX.search(script):
+                return script
+        return None
+
+
+@dataclass(eq=False)
+class JsfAction:
+    """Elemento clicável: link, botão ou item de menu."""
+
+    tag: str
+    id: str
+    form: Optional[str]
+    classes: str = ""
+    text: str = ""
+    onclick: str = ""
+    href: str = ""
+    name: str = ""
+    value: str = ""
+    ancestors: tuple[str, ...] = ()
+    order: tuple = ()
+
+    def within(self, element_id: str) -> bool:
+        return element_id == self.id or element_id in self.ancestors
+
+
+@dataclass(eq=False)
+class _Label:
+    text: str
+    for_id: str
+    legends: tuple[str, ...]
+    ancestors: tuple[str, ...]
+    order: tuple
+
+    def within(self, element_id: str) -> bool:
+        return element_id in self.ancestors
+
+
+@dataclass(eq=False)
+class _Mark:
+    """Item da assinatura estrutural: controle, label ou legend."""
+
+    text: str
+    id: str
+    in_form: bool
+    ancestors: tuple[str, ...]
+    order: tuple
+
+    def within(self, element_id: str) -> bool:
+        return element_id == self.id or element_id in self.ancestors
+
+
+class _Frame:
+    __slots__ = (
+        "tag", "id", "classes", "text", "collect", "legend", "pending_label",
+        "label_ctx", "action", "control", "error", "for_id", "mark",
+    )
+
+    def __init__(self, tag: str, attrs: dict):
+        self.tag = tag
+        self.id = attrs.get("id", "")
+        self.classes = attrs.get("class", "")
+        self.text: list[str] = []
+        self.collect = False
+        self.legend: Optional[str] = None
+        # Label fechado que precede o próximo elemento irmão
+        self.pending_label: Optional[str] = None
+        # Label do elemento irmão anterior (label/following-sibling::*[1])
+        self.label_ctx: Optional[str] = None
+        self.action: Optional[JsfAction] = None
+        self.control: Optional[JsfControl] = None
+        self.error = False
+        self.for_id = attrs.get("for", "")
+        self.mark: Optional[_Mark] = None
+
+
+class _JsfParser(HTMLParser):
+    def __init__(self, prefix: tuple = ()):
+        super().__init__(convert_charrefs=True)
+        self._prefix = prefix
+        self._count = 0
+        self._stack: list[_Frame] = []
+        self._select: Optional[JsfControl] = None
+        self._selected = False
+        self._option: Optional[tuple[Optional[str], list[str], bool]] = None
+
+        self.controls: list[JsfControl] = []
+        self.actions: list[JsfAction] = []
+        self.labels: list[_Label] = []
+        # Assinatura estrutural, na ordem do documento (ver ``fingerprint``)
+        self.marks: list[_Mark] = []
+        self.forms: dict[str, str] = {}
+        # id -> (ancestors, legends, form, order) de cada elemento com id
+        self.elements: dict[str, tuple] = {}
+        self.meta: dict[str, str] = {}
+        self.headings: list[str] = []
+        self.errors: list[str] = []
+        self.menus: list[str] = []
+        self.view_state: Optional[str] = None
+
+    def _order(self) -> tuple:
+        self._count += 1
+        return self._prefix + (self._count,)
+
+    def _ancestors(self) -> tuple[str, ...]:
+        return tuple(f.id for f in self._stack if f.id)
+
+    def _legends(self) -> tuple[str, ...]:
+        return tuple(f.legend for f in self._stack if f.legend)
+
+    def _in_form(self) -> bool:
+        return any(f.tag == "form" for f in self._stack)
+
+    def _form(self) -> Optional[str]:
+        for frame in reversed(self._stack):
+            if frame.tag == "form":
+                return frame.id or None
+        return None
+
+    def _caption(self) -> Optional[str]:
+        for frame in reversed(self._stack):
+            if frame.label_ctx:
+                return frame.label_ctx
+        return None
+
+    def handle_starttag(self, tag, attrs):
+        a = {k: (v if v is not None else "") for k, v in attrs}
+        if tag == "option":
+            self._end_option()
+            self._option = (a.get("value"), [], "selected" in a)
+            return
+        if tag == "meta":
+            if a.get("name"):
+                self.meta[a["name"]] = a.get("content", "")
+            return
+
+        parent = self._stack[-1] if self._stack else None
+        is_control = tag in ("input", "select", "textarea")
+        pending = None
+        if parent is not None and (is_control or tag not in _VOID_TAGS):
+            pending, parent.pending_label = parent.pending_label, None
+
+        order = self._order()
+        element_id = a.get("id", "")
+        if element_id:
+            self.elements[element_id] = (
+                self._ancestors(), self._legends(), self._form(), order
+            )
+
+        mark = None
+        if is_control:
+            self.marks.append(_Mark(
+                "|".join((tag, element_id, a.get("type", ""), a.get("name", ""))),
+                element_id, self._in_form(), self._ancestors(), order,
+            ))
+        elif tag in ("label", "legend"):
+            # O texto é preenchido quando o elemento é fechado
+            mark = _Mark("", element_id, self._in_form(), self._ancestors(),
+                         order)
+            self.marks.append(mark)
+
+        control = action = None
+        if is_control:
+            control = self._control(tag, a, order)
+            control.caption = pending or self._caption() or ""
+        elif tag in ("a", "button") or a.get("onclick"):
+            action = JsfAction(
+                tag=tag,
+                id=element_id,
+                form=self._form(),
+                classes=a.get("class", ""),
+                onclick=a.get("onclick", ""),
+                href=a.get("href", ""),
+                name=a.get("name", ""),
+                value=a.get("value", ""),
+                ancestors=self._ancestors(),
+                order=order,
+            )
+
+        if tag in _VOID_TAGS:
+            return
+
+        frame = _Frame(tag, a)
+        frame.mark = mark
+        frame.label_ctx = pending
+        frame.action = action
+        frame.control = control if tag == "textarea" else None
+        frame.error = bool(_ERROR_CLASSES & set(frame.classes.split())) or (
+            tag == "td" and parent is not None and parent.tag == "tr"
+            and "errorMessage" in parent.classes.split()
+        )
+        frame.collect = (
+            tag in ("label", "legend", "h1", "h2", "h3", "textarea")
+            or action is not None or frame.error
+            or "rich-label-text-decor" in frame.classes
+        )
+        if tag == "form" and element_id:
+            self.forms[element_id] = a.get("action", "")
+        if tag == "select":
+            self._select, self._selected = control, False
+        self._stack.append(frame)
+
+    def _control(self, tag: str, a: dict, order: tuple) -> JsfControl:
+        input_type = (a.get("type") or "text").lower() if tag == "input" else tag
+        control = JsfControl(
+            tag=tag,
+            type=input_type,
+            name=a.get("name", ""),
+            id=a.get("id", ""),
+            form=self._form(),
+            value=a.get("value", ""),
+            checked="checked" in a,
+            disabled="disabled" in a,
+            readonly="readonly" in a,
+            handlers={k: v for k, v in a.items() if k.startswith("on")},
+            ancestors=self._ancestors(),
+            legends=self._legends(),
+            order=order,
+        )
+        if control.name == VIEW_STATE:
+            self.view_state = control.value
+        if tag == "input" and input_type in _BUTTON_TYPES:
+            # Botões só são enviados quando acionados: ficam entre as ações
+            self.actions.append(JsfAction(
+                tag=tag, id=control.id, form=control.form,
+                classes=a.get("class", ""), text=control.value,
+                onclick=a.get("onclick", ""), name=control.name,
+                value=control.value, ancestors=control.ancestors,
+                order=order,
+            ))
+        elif input_type != "file":
+            self.controls.append(control)
+        return control
+
+    def _end_option(self):
+        if self._option is None:
+            return
+        value, parts, selected = self._option
+        self._option = None
+        if self._select is None:
+            return
+        text = _text(parts)
+        value = text if value is None else value
+        self._select.options.append((value, text))
+        if selected and not self._selected:
+            self._select.value, self._selected = value, True
+
+    def handle_data(self, data):
+        if self._option is not None:
+            self._option[1].append(data)
+            return
+        if self._stack and self._stack[-1].tag in ("script", "style"):
+            return
+        for frame in self._stack:
+            if frame.collect:
+                frame.text.append(data)
+
+    def handle_endtag(self, tag):
+        if tag == "option":
+            self._end_option()
+            return
+        if not any(f.tag == tag for f in self._stack):
+            return
+        while self._stack:
+            frame = self._stack.pop()
+            self._close(frame)
+            if frame.tag == tag:
+                break
+
+    def _close(self, frame: _Frame):
+        text = _text(frame.text)
+        parent = self._stack[-1] if self._stack else None
+        if frame.mark is not None:
+            frame.mark.text = f"{frame.tag}:{text}"
+        if frame.tag == "select":
+            self._end_option()
+            select, self._select = self._select, None
+            if select is not None and not self._selected and select.options:
+                select.value = select.options[0][0]
+        elif frame.tag == "textarea" and frame.control is not None:
+            frame.control.value = "".join(frame.text).strip()
+        elif frame.tag == "label":
+            self.labels.append(_Label(
+                text, frame.for_id, self._legends(), self._ancestors(),
+                self._order(),
+            ))
+            if not frame.for_id and parent is not None:
+                parent.pending_label = text
+        elif frame.tag == "legend":
+            for outer in reversed(self._stack):
+                if outer.tag == "fieldset":
+                    outer.legend = text
+                    break
+        elif frame.tag in ("h1", "h2", "h3"):
+            self.headings.append(text)
+        if frame.error and text:
+            self.errors.append(text)
+        if "rich-label-text-decor" in frame.classes and text:
+            self.menus.append(text)
+        if frame.action is not None:
+            frame.action.text = text
+            self.actions.append(frame.action)
+
+    def close(self):
+        super().close()
+        while self._stack:
+            self._close(self._stack.pop())
+        labels = {lb.for_id: lb.text for lb in self.labels if lb.for_id}
+        for control in self.controls:
+            control.label = labels.get(control.id, "")
+
+
+class JsfDocument:
+    """
+    Estado de uma página JSF lido do HTML, sem navegador: controles de cada
+    formulário com seus valores atuais, ações clicáveis, labels, legends,
+    mensagens de erro e o ``javax.faces.ViewState``.
+
+    Os campos são localizados pelos mesmos metadados usados no navegador:
+    o ``x-xpath`` do schema (``//input[@name='frm:...']``, fieldsets por
+    legend) ou, sem XPath fixo, o label do campo. Respostas AJAX do A4J
+    substituem apenas as regiões re-renderizadas (``merge``).
+
+    Exemplo
+    -------
+    ```python
+    doc = JsfDocument(html, url)
+    doc.resolve("//input[@name='frm:lesaoPapilarDireita']", "",
+                InputType.CHECKBOX)
+    ```
+    """
+
+    def __init__(self, html: str, url: str = "", prefix: tuple = ()):
+        parser = _JsfParser(prefix)
+        parser.feed(html)
+        parser.close()
+        self.url = url
+        self.controls = parser.controls
+        self.actions = parser.actions
+        self.labels = parser.labels
+        self.marks = parser.marks
+        self.forms = parser.forms
+        self.elements = parser.elements
+        self.meta = parser.meta
+        self.headings = parser.headings
+        self.errors = parser.errors
+        self.menus = parser.menus
+        self.view_state = parser.view_state
+
+    @property
+    def fingerprint(self) -> str:
+        """
+        Hash da estrutura dos formulários do documento, igual ao calculado
+        no navegador por ``form_fingerprint``: tag, id, tipo e nome de cada
+        controle e o texto de cada label/legend dentro de um <form>.
+        """
+        signature = "\n".join(
+            m.text for m in sorted(self.marks, key=lambda m: m.order)
+            if m.in_form
+        )
+        return hashlib.sha1(signature.encode("utf-8")).hexdigest()
+
+    def has_heading(self, text: str) -> bool:
+        target = normalize_label(text)
+        return any(normalize_label(h) == target for h in self.headings)
+
+    # Localização de campos -------------------------------------------------
+
+    def resolve(
+        self,
+        xpath: str,
+        label: str,
+        input_type: str | InputType,
+    ) -> list[JsfControl]:
+        """
+        Retorna os controles do campo: um único controle para texto e
+        select, todos os radios/checkboxes do grupo.
+
+        Exceções
+        --------
+        SiscanHttpEngineError
+            Se o XPath não for suportado ou nenhum controle corresponder.
+        """
+        if not isinstance(input_type, InputType):
+            input_type = InputType(str(input_type).lower())
+        candidates = (
+            self._by_xpath(xpath) if xpath else self._by_label(label, input_type)
+        )
+        controls = [c for c in candidates if self._matches(c, input_type)]
+        if not controls:
+            raise SiscanHttpEngineError(
+                None, m=f"Campo não localizado no HTML (xpath='{xpath}', "
+                        f"label='{label}')."
+            )
+        if input_type in (InputType.CHECKBOX, InputType.RADIO):
+            return controls
+        return controls[:1]
+
+    @staticmethod
+    def _matches(control: JsfControl, input_type: InputType) -> bool:
+        if input_type in (InputType.CHECKBOX, InputType.RADIO):
+            return control.type == input_type.value
+        if input_type in (InputType.SELECT, InputType.LIST):
+            return control.tag == "select"
+        return control.is_text and control.type != "hidden"
+
+    def _by_xpath(self, xpath: str) -> list[JsfControl]:
+        m = _XPATH_BY_ATTR.match(xpath)
+        if m:
+            attr, value = m.groups()
+            if attr == "name":
+                return [c for c in self.controls if c.name == value]
+            return [c for c in self.controls if c.within(value)]
+
+        m = _XPATH_FIELDSET.match(xpath)
+        if m:
+            legend = normalize_label(m["legend"])
+            controls = [
+                c for c in self.controls
+                if (not m["div"] or m["div"] in c.ancestors)
+                and legend in map(normalize_label, c.legends)
+            ]
+            if m["text"]:
+                controls = [c for c in controls if c.is_text][:1]
+            return controls
+
+        m = _XPATH_AFTER_LABEL.match(xpath)
+        if m:
+            text = normalize_label(m["label"])
+            label = next(
+                (lb for lb in self.labels if text in normalize_label(lb.text)),
+                None,
+            )
+            if label is None:
+                return []
+            return [
+                c for c in self.controls
+                if c.order > label.order and c.type == "text"
+            ][:1]
+
+        m = _XPATH_BESIDE_LABEL.match(xpath)
+        if m:
+            legend = normalize_label(m["legend"])
+            text = normalize_label(m["label"])
+            label = next((
+                lb for lb in self.labels
+                if normalize_label(lb.text) == text
+                and legend in map(normalize_label, lb.legends)
+            ), None)
+            if label is None:
+                return []
+            inputs = [
+                c for c in self.controls
+                if c.type == "text"
+                and legend in map(normalize_label, c.legends)
+            ]
+            if m["axis"] == "preceding":
+                inputs = [c for c in inputs if c.order < label.order][-1:]
+            else:
+                inputs = [c for c in inputs if c.order > label.order][:1]
+            return inputs
+
+        raise SiscanHttpEngineError(
+            None, m=f"XPath não suportado pelo motor HTTP: {xpath}"
+        )
+
+    def _by_label(self, label: str, input_type: InputType) -> list[JsfControl]:
+        target = normalize_label(label)
+        if input_type in (InputType.CHECKBOX, InputType.RADIO):
+            # Grupo em um fieldset cuja legend é o label do campo
+            group = [
+                c for c in self.controls
+                if c.legends and normalize_label(c.legends[-1]) == target
+            ]
+            if not group:
+                group = [
+                    c for c in self.controls
+                    if normalize_label(c.caption) == target
+                ]
+            if not group:
+                group = [
+                    c for c in self.controls
+                    if any(target in normalize_label(lg) for lg in c.legends)
+                ]
+            return group
+        by_for = [c for c in self.controls if normalize_label(c.label) == target]
+        return by_for or [
+            c for c in self.controls if normalize_label(c.caption) == target
+        ]
+
+    # Leitura ------------------------------------------------------------
+
+    def read(
+        self,
+        xpath: str,
+        label: str,
+        input_type: str | InputType,
+    ) -> tuple[str, str] | list[tuple[str, str]]:
+        """
+        Lê o valor atual do campo no mesmo formato de
+        ``XPathConstructor.get_value``.
+        """
+        if not isinstance(input_type, InputType):
+            input_type = InputType(str(input_type).lower())
+        controls = self.resolve(xpath, label, input_type)
+        if input_type == InputType.CHECKBOX:
+            checked = [(c.label, c.value) for c in controls if c.checked]
+            return checked or (None, None)
+        if input_type == InputType.RADIO:
+            checked = [(c.label, c.value) for c in controls if c.checked]
+            return checked[0] if checked else ("", "")
+        control = controls[0]
+        if control.tag == "select":
+            text = dict(control.options).get(control.value, "")
+            return (text, control.value)
+        return (control.value, control.value)
+
+    def select_options(self, xpath: str, label: str) -> dict[str, str]:
+        """Opções do select no formato {value: texto}."""
+        control = self.resolve(xpath, label, InputType.SELECT)[0]
+        return dict(control.options)
+
+    # Ações ----------------------------------------------------------------
+
+    def find_action(self, text: str) -> Optional[JsfAction]:
+        """Primeiro botão ou link cujo texto é ``text``."""
+        target = normalize_label(text)
+        for action in self.actions:
+            if normalize_label(action.text) == target:
+                return action
+        return None
+
+    def find_menu_action(self, menu: str, item: str) -> Optional[JsfAction]:
+        """Item ``item`` de um menu suspenso do RichFaces."""
+        if normalize_label(menu) not in map(normalize_label, self.menus):
+            return None
+        target = normalize_label(item)
+        for action in self.actions:
+            if ("rich-menu-item" in action.classes
+                    and normalize_label(action.text) == target):
+                return action
+        return None
+
+    def form_data(
+        self, form_id: Optional[str]
+    ) -> list[tuple[str, str]]:
+        """Parâmetros enviados pelo navegador ao submeter o formulário."""
+        data = []
+        for c in self.controls:
+            if c.form != form_id or not c.name or c.disabled:
+                continue
+            if c.type in ("checkbox", "radio"):
+                if c.checked:
+                    data.append((c.name, c.value or "on"))
+            elif c.tag == "select":
+                if c.options:
+                    data.append((c.name, c.value))
+            else:
+                data.append((c.name, c.value))
+        return data
+
+    # Respostas AJAX --------------------------------------------------------
+
+    def merge(self, fragment_html: str, form_id: Optional[str]) -> None:
+        """
+        Aplica uma resposta AJAX do A4J: as regiões listadas em
+        ``Ajax-Update-Ids`` (ou, sem a meta, as regiões conhecidas mais
+        externas da resposta) substituem as atuais, e o ViewState é
+        atualizado.
+        """
+        fragment = JsfDocument(fragment_html, self.url)
+        update_ids = [
+            i.strip() for i in fragment.meta.get("Ajax-Update-Ids", "").split(",")
+            if i.strip()
+        ]
+        if not update_ids:
+            known = {i for i in fragment.elements if i in self.elements}
+            update_ids = [
+                i for i in known
+                if not any(a in known for a in fragment.elements[i][0])
+            ]
+
+        for uid in update_ids:
+            if uid not in fragment.elements or uid not in self.elements:
+                continue
+            self._replace(uid, fragment_html, form_id)
+
+        if fragment.view_state:
+            self.view_state = fragment.view_state
+            for c in self.controls:
+                if c.name == VIEW_STATE:
+                    c.value = fragment.view_state
+        self.errors = fragment.errors
+
+    def _replace(self, uid: str, fragment_html: str, form_id: Optional[str]):
+        ancestors, legends, form, order = self.elements[uid]
+        # A região nova ocupa a posição da antiga na ordem do documento
+        region = JsfDocument(fragment_html, self.url, prefix=order)
+
+        def rebase(item):
+            own = item.ancestors
+            inner = own[own.index(uid):] if uid in own else ()
+            item.ancestors = ancestors + inner
+            if hasattr(item, "form"):
+                item.form = form or form_id
+            if hasattr(item, "legends"):
+                item.legends = legends + item.legends
+            if hasattr(item, "in_form"):
+                item.in_form = item.in_form or bool(form or form_id)
+            return item
+
+        def inside(item) -> bool:
+            return item.within(uid)
+
+        self.controls = [c for c in self.controls if not inside(c)]
+        self.actions = [a for a in self.actions if not inside(a)]
+        self.labels = [lb for lb in self.labels if not inside(lb)]
+        self.marks = [m for m in self.marks if not inside(m)]
+        self.controls += [rebase(c) for c in region.controls if inside(c)]
+        self.actions += [rebase(a) for a in region.actions if inside(a)]
+        self.labels += [rebase(lb) for lb in region.labels if inside(lb)]
+        self.marks += [rebase(m) for m in region.marks if inside(m)]
+        self.controls.sort(key=lambda c: c.order)
+        self.actions.sort(key=lambda a: a.order)
+        self.labels.sort(key=lambda lb: lb.order)
+
+        for eid, (anc, leg, _, pos) in region.elements.items():
+            if eid != uid and uid not in anc:
+                continue
+            inner = anc[anc.index(uid):] if uid in anc else ()
+            self.elements[eid] = (ancestors + inner, legends + leg,
+                                  form or form_id, pos)
+
+
+@dataclass(frozen=True)
+class _A4JCall:
+    form: str
+    container: str
+    parameters: tuple[tuple[str, str], ...]
+    action_url: str = ""
+
+
+def _parse_a4j(script: str) -> Optional[_A4JCall]:
+    m = _A4J_SUBMIT.search(script)
+    if not m:
+        return None
+    args = re.findall(r"'([^']*)'", m.group(1))
+    options = m.group(2)
+    params = _JS_PARAMETERS.search(options)
+    parameters = _JS_PAIR.findall(params.group(1)) if params else []
+    top = dict(_JS_PAIR.findall(_JS_PARAMETERS.sub("", options)))
+    if top.get("ajaxSingle"):
+        parameters.append(("ajaxSingle", top["ajaxSingle"]))
+    if len(args) >= 2:
+        container, form = args[-2], args[-1]
+    elif args:
+        container, form = top.get("containerId", "_viewRoot"), args[0]
+    else:
+        return None
+    return _A4JCall(form, container, tuple(parameters),
+                    top.get("actionUrl", ""))
+
+
+def _parse_jsfcljs(script: str) -> Optional[tuple[str, list[tuple[str, str]]]]:
+    m = _JSFCLJS.search(script)
+    if not m:
+        return None
+    form = m.group(1) or m.group(2)
+    raw = m.group(3)
+    if raw.startswith("{"):
+        return form, _JS_PAIR.findall(raw)
+    items = raw.strip("'").split(",")
+    return form, list(zip(items[::2], items[1::2]))
+
+
+class JsfHttpEngine:
+    """
+    Motor de execução sem navegador: reproduz os passos dos fluxos do
+    SIScan como requisições HTTP do JSF/A4J, com ``httpx``.
+
+    A página atual é mantida como ``JsfDocument``; preencher um campo altera
+    apenas o estado local, exceto quando o controle tem um handler AJAX do
+    A4J (ex.: Cartão SUS, tipo de exame), caso em que o formulário é
+    enviado com ``AJAXREQUEST`` e a resposta parcial é aplicada ao
+    documento. Cliques reproduzem o script do elemento (``A4J.AJAX.Submit``,
+    ``jsfcljs`` ou navegação). Cookies de sessão e o
+    ``javax.faces.ViewState`` acompanham cada requisição.
+
+    Passos que o motor não sabe reproduzir lançam
+    ``SiscanHttpEngineError``, e o job é repetido no navegador
+    (ver ``SiscanWebPage.executar``).
+
+    Exemplo
+    -------
+    ```python
+    async with JsfHttpEngine(SISCAN_URL) as http:
+        http.use_storage_state(state)
+        await http.goto("/")
+        await http.menu("EXAME", "GERENCIAR EXAME")
+        await http.click("Novo Exame")
+    ```
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        client: Optional[httpx.AsyncClient] = None,
+        timeout: float = 30,
+    ):
+        self._base_url = base_url if base_url.endswith("/") else f"{base_url}/"
+        self._own_client = client is None
+        self._client = client or httpx.AsyncClient(
+            follow_redirects=True, timeout=timeout
+        )
+        self._document: Optional[JsfDocument] = None
+        # Quantidade de requisições HTTP enviadas
+        self.requests = 0
+
+    async def __aenter__(self) -> "JsfHttpEngine":
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+    async def aclose(self):
+        if self._own_client:
+            await self._client.aclose()
+
+    @property
+    def document(self) -> JsfDocument:
+        if self._document is None:
+            raise SiscanHttpEngineError(None, m="Nenhuma página carregada.")
+        return self._document
+
+    # Sessão -------------------------------------------------------------
+
+    def use_storage_state(self, storage_state: dict) -> None:
+        """Aplica os cookies de um ``storage_state`` do Playwright."""
+        self._client.cookies = cookies_from_storage_state(storage_state)
+
+    def storage_state(self) -> dict:
+        """Cookies atuais no formato ``storage_state`` do Playwright."""
+        host = urlsplit(self._base_url).hostname or ""
+        cookies = []
+        for c in self._client.cookies.jar:
+            cookies.append({
+                "name": c.name,
+                "value": c.value,
+                "domain": c.domain if c.domain_specified else host,
+                "path": c.path or "/",
+                "expires": c.expires if c.expires is not None else -1,
+                "httpOnly": bool(c.has_nonstandard_attr("HttpOnly")),
+                "secure": bool(c.secure),
+                "sameSite": "Lax",
+            })
+        return {"cookies": cookies, "origins": []}
+
+    # Requisições ----------------------------------------------------------
+
+
+    async def _send(self, method: str, url: str, **kwargs) -> httpx.Response:
+        self.requests += 1
+        round_trips.record(f"http.{method.lower()}")
+        try:
+            response = await self._client.request(method, url, **kwargs)
+        except httpx.HTTPError as e:
+            raise SiscanHttpEngineError(
+                None, m=f"Falha na requisição {method} {url}: {e}"
+            )
+        if response.status_code >= 400:
+            raise SiscanHttpEngineError(
+                None, m=f"Resposta {response.status_code} para "
+                        f"{method} {url}."
+            )
+        if ("ViewExpiredException" in response.text
+                or response.headers.get("Ajax-Expired")):
+            raise SiscanHttpEngineError(
+                None, m="ViewState expirado no servidor."
+            )
+        return response
+
+    async def _post(
+        self, url: str, data: list[tuple[str, str]]
+    ) -> httpx.Response:
+        # Lista de pares: checkboxes do mesmo grupo repetem o nome
+        return await self._send(
+            "POST", url, content=urlencode(data),
+            headers={"Content-Type": "application/x-www-form-urlencoded"},
+        )
+
+    def _load(self, response: httpx.Response, expect_login: bool = False):
+        url = str(response.url)
+        if "login.jsf" in url and not expect_login:
+            raise SiscanHttpEngineError(
+                None, m="Sessão do SIScan expirada (redirecionado ao login)."
+            )
+        self._document = JsfDocument(response.text, url)
+        return self._document
+
+    async def goto(self, path: str) -> JsfDocument:
+        """
+        Carrega uma página (GET), relativa à URL base do SIScan, e a torna
+        o documento atual.
+        """
+        return await self._navigate(urljoin(self._base_url, path.lstrip("/")))
+
+    async def _navigate(self, url: str) -> JsfDocument:
+        response = await self._send("GET", url)
+        return self._load(response, expect_login=True)
+
+    async def _submit(
+        self, form_id: Optional[str], params: list[tuple[str, str]]
+    ) -> JsfDocument:
+        document = self.document
+        action = document.forms.get(form_id or "", "") or document.url
+        data = document.form_data(form_id) + list(params)
+        response = await self._post(urljoin(document.url, action), data)
+        return self._load(response, expect_login="login.jsf" in document.url)
+
+    async def _ajax(self, call: _A4JCall) -> JsfDocument:
+        document = self.document
+        action = call.action_url or document.forms.get(call.form, "")
+        data = document.form_data(call.form) + [("AJAXREQUEST", call.container)]
+        data += list(call.parameters)
+        response = await self._post(
+            urljoin(document.url, action or document.url), data
+        )
+
+        # Navegação iniciada por uma ação AJAX
+        redirect = (
+            response.headers.get("Ajax-Response") == "redirect"
+            or _meta(response.text, "Ajax-Response") == "redirect"
+        )
+        if redirect:
+            location = (response.headers.get("Location")
+                        or _meta(response.text, "Location"))
+            if location:
+                return await self._navigate(urljoin(document.url, location))
+        document.merge(response.text, call.form)
+        return document
+
+    async def trigger(
+        self, script: str, action: Optional[JsfAction] = None
+    ) -> JsfDocument:
+        """Reproduz o script de evento de um controle ou ação."""
+        call = _parse_a4j(script)
+        if call is not None:
+            return await self._ajax(call)
+        submit = _parse_jsfcljs(script)
+        if submit is not None:
+            return await self._submit(*submit)
+        url = self.document.url
+        location = _LOCATION.search(script)
+        if location:
+            return await self._navigate(urljoin(url, location.group(1)))
+        if action is not None:
+            if action.tag in ("input", "button") and action.name:
+                return await self._submit(
+                    action.form, [(action.name, action.value)]
+                )
+            href = action.href
+            if href and href != "#" and not href.startswith("javascript"):
+                return await self._navigate(urljoin(url, href))
+        raise SiscanHttpEngineError(
+            None, m=f"Evento não suportado pelo motor HTTP: {script!r}"
+        )
+
+    async def click(self, text: str) -> JsfDocument:
+        """Aciona o botão ou link com o texto informado."""
+        action = self.document.find_action(text)
+        if action is None:
+            raise SiscanHttpEngineError(
+                None, m=f"Botão '{text}' não localizado no HTML."
+            )
+        logger.debug("Motor HTTP: acionando '%s'", text)
+        return await self.trigger(action.onclick, action)
+
+    async def menu(self, menu_name: str, menu_action_text: str) -> JsfDocument:
+        """Aciona um item de menu suspenso do RichFaces."""
+        action = self.document.find_menu_action(menu_name, menu_action_text)
+        if action is None:
+            raise SiscanHttpEngineError(
+                None, m=f"Menu '{menu_name} > {menu_action_text}' não "
+                        f"localizado no HTML."
+            )
+        logger.debug("Motor HTTP: menu '%s > %s'", menu_name,
+                     menu_action_text)
+        return await self.trigger(action.onclick, action)
+
+    # Campos ------------------------------------------------------------------
+
+    def read(self, xpath: str, label: str, input_type: str | InputType):
+        """Valor atual do campo (ver ``JsfDocument.read``)."""
+        return self.document.read(xpath, label, input_type)
+
+    def select_options(self, xpath: str, label: str) -> dict[str, str]:
+        """Opções do select no formato {value: texto}."""
+        return self.document.select_options(xpath, label)
+
+    async def write(self, fields: list[FieldWrite]) -> list[FieldWriteResult]:
+        """
+        Preenche os campos na ordem informada, com a mesma semântica do
+        ``BulkFormWriter``: o valor é aplicado ao estado local e, se o
+        controle tiver um handler AJAX, o formulário é enviado antes do
+        campo seguinte.
+
+        Exceções
+        --------
+        FieldValueNotFoundError
+            Se a opção de um select ou radio não existir.
+        SiscanHttpEngineError
+            Se o campo não for localizado ou estiver desabilitado.
+        """
+        results: list[FieldWriteResult] = []
+        for f in fields:
+            if f.value is None:
+                logger.warning(
+                    "Valor vazio para o campo '%s'. Nenhum valor será "
+                    "preenchido.", f.name,
+                )
+                results.append(FieldWriteResult(f.name, False, error="empty"))
+                continue
+            controls = self.document.resolve(f.xpath, f.label, f.input_type)
+            changed = self._apply(f, controls)
+            script = next(
+                (s for s in (c.ajax_handler() for c in changed) if s), None
+            )
+            if script:
+                await self.trigger(script)
+            results.append(FieldWriteResult(f.name, True, ajax=bool(script)))
+        return results
+
+    @staticmethod
+    def _apply(f: FieldWrite, controls: list[JsfControl]) -> list[JsfControl]:
+        def enabled(control: JsfControl) -> JsfControl:
+            if control.disabled or control.readonly:
+                raise SiscanHttpEngineError(
+                    None, m=f"Campo '{f.name}' desabilitado no HTML."
+                )
+            return control
+
+        if f.input_type == InputType.CHECKBOX:
+            if isinstance(f.value, bool):
+                wanted = {c: f.value for c in controls}
+            else:
+                values = f.value if isinstance(f.value, list) else [f.value]
+                values = [str(v) for v in values]
+                wanted = {c: c.value in values for c in controls}
+            changed = [enabled(c) for c in controls if c.checked != wanted[c]]
+            for c in changed:
+                c.checked = wanted[c]
+            return changed
+
+        if f.input_type == InputType.RADIO:
+            radio = next((c for c in controls if c.value == str(f.value)), None)
+            if radio is None:
+                raise FieldValueNotFoundError(None, f.name, f.value)
+            if radio.checked:
+                return []
+            enabled(radio)
+            for c in controls:
+                if c.name == radio.name:
+                    c.checked = c is radio
+            return [radio]
+
+        control = enabled(controls[0])
+        value = str(f.value)
+        if control.tag == "select" and value not in dict(control.options):
+            raise FieldValueNotFoundError(None, f.name, f.value)
+        control.value = value
+        # Como no navegador, change/blur são disparados mesmo sem alteração
+        return [control]
+
+
+def _meta(html: str, name: str) -> str:
+    """Conteúdo de uma ``<meta name=...>`` de uma resposta."""
+    m = re.search(
+        rf"<meta\s+name=[\"']{re.escape(name)}[\"']\s+content=[\"']([^\"']*)",
+        html, re.I,
+    )
+    return m.group(1) if m else ""
@@ -0,0 +1,112 @@
+import logging
+from dataclasses import dataclass
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Id do item de um menu suspenso do RichFaces, pelo texto do menu e da ação
+MENU_ITEM_ID = """(a) => {
+    const norm = (s) => (s || '').replace(/\\s+/g, ' ').trim().toUpperCase();
+    const menus = Array.from(document.querySelectorAll('.rich-ddmenu-label'))
+        .filter((m) => norm(m.textContent).includes(norm(a.menu)));
+    for (const menu of menus) {
+        const root = menu.closest('.rich-ddmenu') || menu.parentElement
+            || document;
+        for (const label of root.querySelectorAll('.rich-menu-item-label')) {
+            if (norm(label.textContent).includes(norm(a.action))) {
+                const item = label.closest('.rich-menu-item');
+                return item && item.id ? item.id : null;
+            }
+        }
+    }
+    return null;
+}"""
+
+# Dispara a ação JSF do item de menu sem abrir o menu (hover)
+CLICK_MENU_ITEM = """(id) => {
+    const item = document.getElementById(id);
+    if (!item) return false;
+    item.click();
+    return true;
+}"""
+
+
+@dataclass(frozen=True)
+class MenuTarget:
+    """
+    Destino aprendido de um item de menu: a página aberta pela ação, quando
+    ela tem URL própria, ou o id do item cuja ação JSF é disparada direto.
+    ``fingerprint`` é a estrutura do formulário de destino, conferida após
+    o atalho (no JSF a URL da barra pode ser a da página anterior).
+    """
+
+    path: Optional[str] = None
+    item_id: Optional[str] = None
+    fingerprint: Optional[str] = None
+
+
+class MenuTargets:
+    """
+    Destinos dos itens de menu do SIScan aprendidos na primeira navegação
+    pelo menu suspenso (hover), por (URL base, menu, ação).
+
+    Nas navegações seguintes, ``SiscanWebPage.acessar_menu`` vai direto ao
+    destino (``handle_goto`` ou a ação JSF do item); se o atalho falhar, o
+    destino é descartado e o menu é acessado pelo hover.
+
+    Exemplo
+    -------
+    ```python
+    target = menu_targets.get(base_url, "EXAME", "GERENCIAR EXAME")
+    if target is None:
+        menu_targets.store(base_url, "EXAME", "GERENCIAR EXAME",
+                           MenuTarget(path="/exame/gerenciarExame.jsf"))
+    ```
+    """
+
+    def __init__(self):
+        self._targets: dict[tuple[str, str, str], MenuTarget] = {}
+        self.hits = 0
+        self.misses = 0
+        self.fallbacks = 0
+
+    @staticmethod
+    def _key(base_url: str, menu: str, action: str) -> tuple[str, str, str]:
+        return base_url.rstrip("/"), menu.upper(), action.upper()
+
+    def get(self, base_url: str, menu: str, action: str) -> Optional[MenuTarget]:
+        target = self._targets.get(self._key(base_url, menu, action))
+        if target is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return target
+
+    def store(
+        self, base_url: str, menu: str, action: str, target: MenuTarget
+    ) -> None:
+        if target.path is None and target.item_id is None:
+            return
+        self._targets[self._key(base_url, menu, action)] = target
+        logger.debug("Destino do menu '%s > %s' aprendido: %s",
+                     menu, action, target)
+
+    def invalidate(self, base_url: str, menu: str, action: str) -> None:
+        """Descarta o destino após uma falha do atalho."""
+        if self._targets.pop(self._key(base_url, menu, action), None):
+            self.fallbacks += 1
+
+    def clear(self) -> None:
+        self._targets.clear()
+
+    def stats(self) -> dict:
+        """Retorna os contadores dos atalhos de menu."""
+        return {
+            "targets": len(self._targets),
+            "hits": self.hits,
+            "misses": self.misses,
+            "fallbacks": self.fallbacks,
+        }
+
+
+menu_targets = MenuTargets()
@@ -0,0 +1,118 @@
+import json
+import logging
+from datetime import datetime
+from typing import Iterable
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from src import env
+from src.models import InformationNotice
+
+logger = logging.getLogger(__name__)
+
+
+class NoticeStore:
+    """
+    Informes da popup de mensagens informativas do SIScan, gravados no banco
+    sem repetição por (data, assunto).
+
+    A popup aparece a cada login com os mesmos informes; os já gravados
+    pelo processo são reconhecidos em memória e não geram escrita no banco.
+
+    Exemplo
+    -------
+    ```python
+    notice_store.store([{"date": "01/07/2025", "subject": "Manutenção",
+                         "lines": ["O sistema ficará indisponível..."]}])
+    notice_store.list()
+    ```
+    """
+
+    def __init__(self):
+        self._seen: set[tuple[str, str]] = set()
+        self._table_ready = False
+
+    def _ensure_table(self) -> None:
+        if not self._table_ready:
+            InformationNotice.__table__.create(bind=env.engine,
+                                               checkfirst=True)
+            self._table_ready = True
+
+    def store(self, notices: Iterable[dict]) -> int:
+        """
+        Grava os informes ainda não conhecidos.
+
+        Retorno
+        -------
+        int
+            Quantidade de informes novos.
+        """
+        novos = [n for n in notices
+                 if (n["date"], n["subject"]) not in self._seen]
+        if not novos:
+            return 0
+        db = None
+        created = 0
+        try:
+            self._ensure_table()
+            db = env.get_db()
+            now = datetime.utcnow()
+            for notice in novos:
+                row = db.get(InformationNotice,
+                             (notice["date"], notice["subject"]))
+                if row is None:
+                    db.add(InformationNotice(
+                        date=notice["date"],
+                        subject=notice["subject"],
+                        lines=json.dumps(notice["lines"], ensure_ascii=False),
+                        first_seen_at=now,
+                        last_seen_at=now,
+                    ))
+                    created += 1
+                else:
+                    row.last_seen_at = now
+            db.commit()
+        except SQLAlchemyError:
+            logger.warning("Falha ao gravar os informes do SIScan.",
+                           exc_info=True)
+            return 0
+        finally:
+            if db is not None:
+                db.close()
+        self._seen.update((n["date"], n["subject"]) for n in novos)
+        if created:
+            logger.info("%s novos informes do SIScan gravados.", created)
+        return created
+
+    def list(self, limit: int = 50) -> list[dict]:
+        """Retorna os informes gravados, do mais novo ao mais antigo."""
+        db = None
+        try:
+            self._ensure_table()
+            db = env.get_db()
+            rows = (
+                db.query(InformationNotice)
+                .order_by(InformationNotice.first_seen_at.desc())
+                .limit(limit)
+                .all()
+            )
+            return [
+                {
+                    "date": row.date,
+                    "subject": row.subject,
+                    "lines": json.loads(row.lines),
+                    "first_seen_at": row.first_seen_at.isoformat(),
+                    "last_seen_at": row.last_seen_at.isoformat(),
+                }
+                for row in rows
+            ]
+        finally:
+            if db is not None:
+                db.close()
+
+    def clear(self) -> None:
+        """Esquece os informes conhecidos em memória."""
+        self._seen.clear()
+
+
+notice_store = NoticeStore()
@@ -0,0 +1,135 @@
+import logging
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Optional
+
+from src.env import SELECT_OPTIONS_TTL
+from src.siscan.session_pool import SiscanSessionManager
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CachedOptions:
+    """Opções de um select já mapeadas para ``FIELDS_MAP``."""
+
+    options: dict[str, str]
+    loaded_at: float
+
+    def is_valid(self, ttl: float) -> bool:
+        return time.time() - self.loaded_at < ttl
+
+
+class SelectOptionsCache:
+    """
+    Cache, por credencial do SIScan, das opções de selects dinâmicos
+    (unidade requisitante, prestador, responsável pela coleta).
+
+    Essas listas dependem apenas da conta e quase nunca mudam; mantê-las
+    em memória por ``ttl`` segundos evita ler todas as opções do navegador
+    a cada job. ``invalidate`` força uma nova leitura (refresh explícito).
+
+    Exemplo
+    -------
+    ```python
+    options = options_cache.get(base_url, user, "prestador")
+    if options is None:
+        options_cache.store(base_url, user, "prestador", {...})
+    ```
+    """
+
+    def __init__(self, ttl: float = SELECT_OPTIONS_TTL):
+        self._ttl = ttl
+        # (chave da credencial, campo) -> opções
+        self._entries: dict[tuple[str, str], CachedOptions] = {}
+        # Credenciais com pré-carregamento em andamento
+        self._prefetching: set[str] = set()
+
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+        self.prefetches = 0
+
+    @staticmethod
+    def _key(base_url: str, user: str, field_name: str) -> tuple[str, str]:
+        return SiscanSessionManager.key(base_url, user), field_name
+
+    def is_cached(self, base_url: str, user: str, field_name: str) -> bool:
+        """Indica se há opções válidas do campo, sem contar acerto/falha."""
+        entry = self._entries.get(self._key(base_url, user, field_name))
+        return entry is not None and entry.is_valid(self._ttl)
+
+    def get(
+        self, base_url: str, user: str, field_name: str
+    ) -> Optional[dict[str, str]]:
+        """Retorna uma cópia das opções válidas do campo, ou None."""
+        entry = self._entries.get(self._key(base_url, user, field_name))
+        if entry is None or not entry.is_valid(self._ttl):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return dict(entry.options)
+
+    def store(
+        self,
+        base_url: str,
+        user: str,
+        field_name: str,
+        options: dict[str, str],
+    ) -> None:
+        """Registra as opções lidas da página."""
+        self._entries[self._key(base_url, user, field_name)] = CachedOptions(
+            options=dict(options), loaded_at=time.time()
+        )
+        self.loads += 1
+        logger.debug("Opções de '%s' em cache: %s.", field_name, len(options))
+
+    async def prefetch(
+        self,
+        base_url: str,
+        user: str,
+        load: Callable[[], Awaitable[None]],
+    ) -> bool:
+        """
+        Executa ``load`` para pré-carregar as opções da credencial, uma
+        única vez mesmo com vários jobs da conta autenticados ao mesmo
+        tempo: se já houver um pré-carregamento em andamento, retorna False
+        sem aguardá-lo (o job lê as opções que faltarem ao usá-las).
+        """
+        account = SiscanSessionManager.key(base_url, user)
+        if account in self._prefetching:
+            return False
+        self._prefetching.add(account)
+        self.prefetches += 1
+        try:
+            await load()
+        finally:
+            self._prefetching.discard(account)
+        return True
+
+    def invalidate(
+        self, base_url: str, user: str, field_name: Optional[str] = None
+    ) -> None:
+        """
+        Descarta as opções de um campo da credencial ou, sem ``field_name``,
+        de todos os campos.
+        """
+        if field_name is not None:
+            self._entries.pop(self._key(base_url, user, field_name), None)
+            return
+        account = SiscanSessionManager.key(base_url, user)
+        for key in [k for k in self._entries if k[0] == account]:
+            del self._entries[key]
+
+    def stats(self) -> dict:
+        """Retorna os contadores do cache."""
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "loads": self.loads,
+            "prefetches": self.prefetches,
+        }
+
+
+options_cache = SelectOptionsCache()
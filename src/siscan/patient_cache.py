@@ -0,0 +1,221 @@
+import asyncio
+import logging
+import re
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Optional
+
+from src.env import PATIENT_CACHE_TTL, PATIENT_NOT_FOUND_TTL
+from src.siscan.exception import CartaoSusNotFoundError
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CachedPatient:
+    """Resultado da resolução de um Cartão SUS (``None``: sem paciente)."""
+
+    patient: Optional[dict[str, str]]
+    loaded_at: float
+
+    def is_valid(self, ttl: float, not_found_ttl: float) -> bool:
+        limit = ttl if self.patient is not None else not_found_ttl
+        return time.time() - self.loaded_at < limit
+
+
+class PatientCache:
+    """
+    Cache, por Cartão SUS, dos dados do paciente exibidos pelo SIScan após
+    o preenchimento do cartão (nome, nascimento, mãe e endereço).
+
+    Os mesmos pacientes aparecem em requisições de rastreio e diagnóstica.
+    Um Cartão SUS sem paciente fica registrado por ``not_found_ttl``
+    segundos: ``check`` faz os jobs seguintes com ele falharem antes de
+    abrir o navegador. Jobs concorrentes com o mesmo cartão compartilham uma
+    única resolução (single-flight): os demais aguardam o resultado do
+    primeiro em vez de esperar, cada um, o SIScan carregar o paciente.
+
+    Exemplo
+    -------
+    ```python
+    patient_cache.check(data.get("cartao_sus"))  # falha rápido
+    paciente = await patient_cache.resolve(numero, lookup=ler_paciente)
+    ```
+    """
+
+    def __init__(
+        self,
+        ttl: float = PATIENT_CACHE_TTL,
+        not_found_ttl: float = PATIENT_NOT_FOUND_TTL,
+    ):
+        self._ttl = ttl
+        self._not_found_ttl = not_found_ttl
+        self._entries: dict[str, CachedPatient] = {}
+        # Resoluções em andamento, por Cartão SUS
+        self._pending: dict[str, asyncio.Future] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.lookups = 0
+        self.coalesced = 0
+        self.rejected = 0
+
+    @staticmethod
+    def _key(cartao_sus: str) -> str:
+        return re.sub(r"\D", "", str(cartao_sus))
+
+    def _entry(self, key: str) -> Optional[CachedPatient]:
+        entry = self._entries.get(key)
+        if entry is not None and not entry.is_valid(
+            self._ttl, self._not_found_ttl
+        ):
+            del self._entries[key]
+            return None
+        return entry
+
+    def get(self, cartao_sus: str) -> Optional[CachedPatient]:
+        """Retorna a resolução válida do Cartão SUS, ou None."""
+        entry = self._entry(self._key(cartao_sus))
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return entry
+
+    def check(self, cartao_sus: Optional[str]) -> Optional[dict[str, str]]:
+        """
+        Verificação antecipada do Cartão SUS, sem acessar o SIScan.
+
+        Retorno
+        -------
+        dict | None
+            Cópia dos dados do paciente, se o cartão já foi resolvido, ou
+            None se ainda não se sabe se ele resolve.
+
+        Exceções
+        --------
+        CartaoSusNotFoundError se o cartão sabidamente não tem paciente.
+        """
+        if not cartao_sus:
+            return None
+        entry = self._entry(self._key(cartao_sus))
+        if entry is None:
+            return None
+        if entry.patient is None:
+            self.rejected += 1
+            raise CartaoSusNotFoundError(None, cartao_sus=cartao_sus)
+        return dict(entry.patient)
+
+    def store(self, cartao_sus: str, patient: dict[str, str]) -> None:
+        """Registra os dados do paciente lidos da página."""
+        self._entries[self._key(cartao_sus)] = CachedPatient(
+            patient=dict(patient), loaded_at=time.time()
+        )
+
+    def store_not_found(self, cartao_sus: str) -> None:
+        """Registra que o SIScan não encontrou paciente com o cartão."""
+        self._entries[self._key(cartao_sus)] = CachedPatient(
+            patient=None, loaded_at=time.time()
+        )
+        logger.debug("Cartão SUS %s sem paciente registrado em cache.",
+                     cartao_sus)
+
+    def invalidate(self, cartao_sus: str) -> None:
+        self._entries.pop(self._key(cartao_sus), None)
+
+    async def resolve(
+        self,
+        cartao_sus: str,
+        lookup: Callable[[], Awaitable[dict[str, str]]],
+    ) -> dict[str, str]:
+        """
+        Retorna os dados do paciente do Cartão SUS.
+
+        Sem resolução válida em cache, executa ``lookup`` uma única vez,
+        mesmo que vários jobs peçam o mesmo cartão ao mesmo tempo: os
+        demais aguardam e reutilizam o resultado. Se ``lookup`` falhar por
+        outro motivo que não ``CartaoSusNotFoundError`` (ex.: timeout),
+        nada é registrado e o próximo job na espera faz a sua resolução.
+
+        Parâmetros
+        ----------
+        cartao_sus : str
+            Número do Cartão SUS.
+        lookup : Callable[[], Awaitable[dict]]
+            Corrotina que resolve o cartão no SIScan e retorna os dados do
+            paciente, ou lança ``CartaoSusNotFoundError``.
+
+        Retorno
+        -------
+        dict
+            Cópia dos dados do paciente.
+
+        Exceções
+        --------
+        CartaoSusNotFoundError se o cartão não tem paciente.
+        """
+        key = self._key(cartao_sus)
+        while True:
+            cached = self.check(cartao_sus)
+            if cached is not None:
+                self.hits += 1
+                return cached
+            pending = self._pending.get(key)
+            if pending is None:
+                break
+            self.coalesced += 1
+            try:
+                return dict(await asyncio.shield(pending))
+            except CartaoSusNotFoundError:
+                raise CartaoSusNotFoundError(None, cartao_sus=cartao_sus)
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise  # este job foi cancelado
+                continue
+            except Exception:
+                # A resolução do outro job falhou sem resposta: tenta a sua
+                continue
+
+        self.misses += 1
+        self.lookups += 1
+        future = asyncio.get_running_loop().create_future()
+        # Sem jobs aguardando, a exceção do future não é consumida
+        future.add_done_callback(
+            lambda f: f.cancelled() or f.exception()
+        )
+        self._pending[key] = future
+        try:
+            patient = await lookup()
+        except CartaoSusNotFoundError as e:
+            self.store_not_found(cartao_sus)
+            future.set_exception(e)
+            raise
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        else:
+            self.store(cartao_sus, patient)
+            future.set_result(dict(patient))
+            return dict(patient)
+        finally:
+            self._pending.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        """Retorna os contadores do cache."""
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "lookups": self.lookups,
+            "coalesced": self.coalesced,
+            "rejected": self.rejected,
+        }
+
+
+patient_cache = PatientCache()
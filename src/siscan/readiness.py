@@ -0,0 +1,254 @@
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Optional
+
+from playwright.async_api import Error, Page, Request
+
+from src.utils import dom_wait
+
+logger = logging.getLogger(__name__)
+
+# Script injetado em todo documento da página: contabiliza as requisições
+# XHR em andamento. O RichFaces (A4J) envia suas requisições parciais via
+# XMLHttpRequest e aplica a resposta no DOM durante o ``readystatechange``,
+# portanto no ``loadend`` a atualização parcial já foi concluída. A cada
+# mudança o contador é refletido em um atributo do <html>, o que dispara a
+# reavaliação das esperas com ``polling="mutation"`` mesmo quando a resposta
+# não altera o DOM. O mesmo é feito a cada ``readystatechange``, que também
+# não é uma mutação. ``sent`` conta as requisições enviadas pelo documento e
+# é comparado com o valor do último ponto ocioso para decidir se a espera
+# pode ser ignorada: ele é incrementado no próprio ``send``, antes de o
+# clique ou blur retornar, ao contrário do evento ``request`` do
+# Playwright, que chega depois ao Python.
+_INIT_SCRIPT = """
+(() => {
+    if (window.__siscanAjax) return;
+    const state = window.__siscanAjax = {pending: 0, sent: 0};
+    const publish = () => {
+        if (document.documentElement) {
+            document.documentElement.setAttribute(
+                'data-siscan-ajax', String(state.pending));
+        }
+    };
+    const send = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function (...args) {
+        state.pending += 1;
+        state.sent += 1;
+        publish();
+        this.addEventListener('loadend', () => {
+            state.pending = Math.max(0, state.pending - 1);
+            publish();
+        }, {once: true});
+        return send.apply(this, args);
+    };
+    document.addEventListener('readystatechange', publish);
+})();
+"""
+
+# Estado da página: pronta (documento carregado, nenhuma requisição AJAX
+# pendente e o status do RichFaces sem "Carregando...") e o total de
+# requisições enviadas pelo documento.
+_STATE = """() => {
+    const state = window.__siscanAjax;
+    const status = document.getElementById('_viewRoot:status');
+    const idle = document.readyState === 'complete'
+        && !(state && state.pending > 0)
+        && (!status || !status.innerText.includes('Carregando'));
+    return {idle, sent: state ? state.sent : null};
+}"""
+
+# Condição de espera: o estado da página, quando pronta
+_IDLE = f"""() => {{
+    const state = ({_STATE})();
+    return state.idle ? state : false;
+}}"""
+
+# Reavaliação periódica da espera, além das mutações do DOM (segundos)
+IDLE_RECHECK = 0.25
+
+# Tipos de recurso que podem alterar o estado da página
+_TRACKED_RESOURCES = ("document", "xhr", "fetch")
+
+
+@dataclass(frozen=True)
+class ReadinessTiming:
+    """Tempo gasto aguardando a prontidão da página em um passo do fluxo."""
+
+    step: str
+    elapsed: float
+    skipped: bool
+    # Requisições observadas desde o último ponto ocioso confirmado
+    requests: int
+    # Das quais, requisições parciais do A4J (``AJAXREQUEST``)
+    partial: int
+
+
+class AjaxReadinessTracker:
+    """
+    Detecta quando a página do SIScan está pronta após uma ação, a partir
+    das requisições AJAX do RichFaces/A4J, em vez de ``networkidle``.
+
+    ``networkidle`` sempre acrescenta ao menos 500 ms de ociosidade e nunca
+    é atingido quando há polling em segundo plano. Aqui cada passo termina
+    assim que o round trip AJAX que ele disparou é concluído e aplicado ao
+    DOM. Quando o contador de requisições do próprio navegador não mudou
+    desde o último ponto ocioso confirmado e a página está pronta, a espera
+    é ignorada após uma única leitura.
+
+    Exemplo
+    -------
+    ```python
+    tracker = AjaxReadinessTracker()
+    await tracker.attach(page)
+    await page.click("#frm\\:avancar")
+    await tracker.wait_ready(timeout=10, step="avancar")
+    print(tracker.summary())
+    ```
+    """
+
+    def __init__(self):
+        self._page: Optional[Page] = None
+        # Requisições observadas e quantidade no último ponto ocioso
+        self._seq = 0
+        self._idle_seq = 0
+        # Requisições enviadas pelo documento no último ponto ocioso
+        self._idle_sent: Optional[int] = None
+        self._partial = 0
+        self._idle_partial = 0
+        self._timings: list[ReadinessTiming] = []
+
+    @property
+    def attached(self) -> bool:
+        return self._page is not None
+
+    @property
+    def dirty(self) -> bool:
+        """Indica se houve requisições desde o último ponto ocioso."""
+        return self._seq != self._idle_seq
+
+    @property
+    def generation(self) -> int:
+        """
+        Contador de requisições observadas. Muda a cada navegação ou
+        requisição AJAX, indicando que o DOM pode ter sido re-renderizado.
+        """
+        return self._seq
+
+    @property
+    def timings(self) -> list[ReadinessTiming]:
+        return list(self._timings)
+
+    async def attach(self, page: Page) -> None:
+        """
+        Instala o monitoramento na página. Deve ser chamado antes da
+        primeira navegação para que o script seja injetado no documento.
+        """
+        self._page = page
+        page.on("request", self._on_request)
+        await page.add_init_script(_INIT_SCRIPT)
+
+    def _on_request(self, request: Request) -> None:
+        if request.resource_type not in _TRACKED_RESOURCES:
+            return
+        self._seq += 1
+        post_data = request.post_data or ""
+        if "AJAXREQUEST" in post_data:
+            self._partial += 1
+
+    def mark_idle(self, sent: Optional[int] = None) -> None:
+        """
+        Registra o estado atual como ponto ocioso confirmado, com o total de
+        requisições enviadas pelo documento (``__siscanAjax.sent``).
+        """
+        self._idle_seq = self._seq
+        self._idle_partial = self._partial
+        self._idle_sent = sent
+
+    async def wait_ready(
+        self, timeout: float, step: str = "page", force: bool = False
+    ) -> bool:
+        """
+        Aguarda até a página estar pronta após o passo ``step``.
+
+        Parâmetros
+        ----------
+        timeout : float
+            Tempo máximo de espera, em segundos.
+        step : str
+            Nome do passo do fluxo, usado nas métricas de tempo.
+        force : bool
+            Aguarda a prontidão mesmo sem requisições enviadas. Útil logo
+            após uma ação que sabidamente dispara AJAX, cuja requisição o
+            A4J pode ainda manter na fila.
+
+        Retorno
+        -------
+        bool
+            True se a página ficou pronta, False se o tempo limite expirou.
+        """
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        requests = self._seq - self._idle_seq
+        partial = self._partial - self._idle_partial
+
+        skipped = False
+        if not force:
+            # Uma única leitura do contador do navegador: o evento
+            # ``request`` de uma ação recém-concluída pode ainda não ter
+            # chegado ao Python
+            try:
+                state = await self._page.evaluate(_STATE)
+            except Error:
+                # Navegação em andamento: aguarda o novo documento
+                state = {"idle": False, "sent": None}
+            skipped = (
+                not self.dirty
+                and state["idle"]
+                and state["sent"] is not None
+                and state["sent"] == self._idle_sent
+            )
+        if skipped:
+            ready = True
+        else:
+            state = await dom_wait.wait_for_value(
+                self._page, _IDLE, None, timeout, recheck=IDLE_RECHECK
+            )
+            ready = state is not None
+            if ready:
+                self.mark_idle(state["sent"])
+
+        timing = ReadinessTiming(
+            step=step,
+            elapsed=loop.time() - start,
+            skipped=skipped,
+            requests=requests,
+            partial=partial,
+        )
+        self._timings.append(timing)
+        logger.debug(
+            "Prontidão '%s': %.3fs (ignorada=%s, requisições=%s, A4J=%s)",
+            step, timing.elapsed, skipped, requests, partial,
+        )
+        return ready
+
+    def summary(self) -> dict[str, dict]:
+        """
+        Agrega os tempos de prontidão por passo.
+
+        Retorno
+        -------
+        dict[str, dict]
+            ``{passo: {"count", "skipped", "total", "max"}}``, com tempos em
+            segundos.
+        """
+        result: dict[str, dict] = {}
+        for t in self._timings:
+            item = result.setdefault(
+                t.step, {"count": 0, "skipped": 0, "total": 0.0, "max": 0.0}
+            )
+            item["count"] += 1
+            item["skipped"] += int(t.skipped)
+            item["total"] += t.elapsed
+            item["max"] = max(item["max"], t.elapsed)
+        return result
@@ -0,0 +1,496 @@
+import asyncio
+import copy
+import hashlib
+import json
+import logging
+from dataclasses import asdict, dataclass, field
+from typing import Any, Mapping, Optional
+from urllib.parse import parse_qsl, urlsplit
+
+from playwright.async_api import Page, Request, Response
+from sqlalchemy.exc import SQLAlchemyError
+
+from src import env
+from src.models import RequestTemplateEntry
+from src.siscan.exception import SiscanHttpEngineError
+from src.siscan.http_engine import VIEW_STATE, JsfDocument
+from src.utils.schema import FieldSpec
+
+logger = logging.getLogger(__name__)
+
+# Tipos de recurso que compõem o fluxo JSF: navegações e requisições A4J
+_TRACKED_RESOURCES = ("document", "xhr", "fetch")
+
+# Tamanho mínimo de um valor para associá-lo a um campo apenas pelo valor
+_MIN_VALUE_MATCH = 3
+
+# Origem do valor de cada parâmetro do template
+SOURCE_FIELD = "field"
+SOURCE_VIEW_STATE = "view_state"
+SOURCE_CONSTANT = "constant"
+# Senhas nunca são gravadas: o valor é informado na reprodução
+SOURCE_SECRET = "secret"
+
+
+@dataclass
+class RecordedRequest:
+    """Requisição do fluxo JSF/A4J capturada pelo ``NetworkRecorder``."""
+
+    method: str
+    url: str
+    resource_type: str
+    params: list[tuple[str, str]]
+    # Estado da página de onde a requisição partiu, reconstruído a partir
+    # das respostas anteriores (mesmo parser do motor HTTP)
+    document: Optional[JsfDocument] = None
+    status: Optional[int] = None
+
+    @property
+    def ajax(self) -> bool:
+        return any(name == "AJAXREQUEST" for name, _ in self.params)
+
+    @property
+    def fingerprint(self) -> str:
+        return self.document.fingerprint if self.document is not None else ""
+
+
+@dataclass
+class TemplateParam:
+    """Parâmetro de uma requisição do template."""
+
+    name: str
+    value: str
+    source: str = SOURCE_CONSTANT
+    # Campo do schema cujo valor é enviado no parâmetro
+    field: Optional[str] = None
+
+
+@dataclass
+class TemplateStep:
+    """Requisição parametrizada, válida para a estrutura ``fingerprint``."""
+
+    method: str
+    path: str
+    ajax: bool
+    fingerprint: str
+    params: list[TemplateParam] = field(default_factory=list)
+
+    def render(
+        self,
+        values: Mapping[str, Any],
+        view_state: Optional[str] = None,
+        secrets: Optional[Mapping[str, str]] = None,
+    ) -> list[tuple[str, str]]:
+        """
+        Monta os parâmetros da requisição para os valores de um job.
+
+        Parâmetros
+        ----------
+        values : Mapping[str, Any]
+            Valores dos campos, já convertidos (``get_field_value``).
+        view_state : str, opcional
+            ``javax.faces.ViewState`` atual da página.
+        secrets : Mapping[str, str], opcional
+            Valores dos parâmetros de senha, por nome do parâmetro.
+
+        Retorno
+        -------
+        list[tuple[str, str]]
+            Parâmetros na ordem gravada. Campos com lista de valores
+            (checkboxes) geram um parâmetro por valor; campos ausentes ou
+            booleanos falsos não são enviados.
+        """
+        secrets = secrets or {}
+        rendered: list[tuple[str, str]] = []
+        expanded: set[tuple[str, str]] = set()
+        for param in self.params:
+            if param.source == SOURCE_VIEW_STATE:
+                rendered.append((param.name, view_state or param.value))
+            elif param.source == SOURCE_SECRET:
+                rendered.append((param.name, secrets.get(param.name, "")))
+            elif param.source == SOURCE_FIELD:
+                value = values.get(param.field)
+                if isinstance(value, bool):
+                    if value:
+                        rendered.append((param.name, param.value))
+                elif isinstance(value, list):
+                    key = (param.name, param.field)
+                    if key not in expanded:
+                        expanded.add(key)
+                        rendered += [(param.name, str(v)) for v in value]
+                elif value is not None:
+                    rendered.append((param.name, str(value)))
+            else:
+                rendered.append((param.name, param.value))
+        return rendered
+
+
+@dataclass
+class RequestTemplate:
+    """
+    Sequência de requisições de um fluxo de preenchimento, com os
+    parâmetros mapeados de volta aos campos do schema.
+
+    A versão é o hash dos fingerprints de cada passo: um deploy do SIScan
+    que altere qualquer formulário do fluxo gera uma versão nova.
+    """
+
+    flow: str
+    steps: list[TemplateStep]
+
+    @property
+    def version(self) -> str:
+        signature = "\n".join(s.fingerprint for s in self.steps)
+        return hashlib.sha1(signature.encode("utf-8")).hexdigest()
+
+    @property
+    def fingerprint(self) -> str:
+        """Fingerprint da página em que o fluxo começa."""
+        return self.steps[0].fingerprint if self.steps else ""
+
+    @property
+    def fields(self) -> set[str]:
+        """Campos do schema cobertos pelo template."""
+        return {
+            p.field for s in self.steps for p in s.params
+            if p.source == SOURCE_FIELD
+        }
+
+    def to_json(self) -> str:
+        return json.dumps([asdict(s) for s in self.steps], ensure_ascii=False)
+
+    @classmethod
+    def from_json(cls, flow: str, steps: str) -> "RequestTemplate":
+        return cls(flow, [
+            TemplateStep(**{
+                **s, "params": [TemplateParam(**p) for p in s["params"]],
+            })
+            for s in json.loads(steps)
+        ])
+
+
+def _matches(value: Any, sent: str) -> bool:
+    """Indica se ``sent`` é o valor (ou um dos valores) do campo."""
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, list):
+        return sent in map(str, value)
+    return str(value) == sent
+
+
+def _field_controls(
+    document: Optional[JsfDocument],
+    fields: Mapping[str, FieldSpec],
+    values: Mapping[str, Any],
+) -> dict[str, str]:
+    """Nome do parâmetro -> campo, localizando cada campo no documento."""
+    controls: dict[str, str] = {}
+    if document is None:
+        return controls
+    for name, value in values.items():
+        spec = fields.get(name)
+        if spec is None or value is None:
+            continue
+        try:
+            found = document.resolve(spec.xpath, spec.label, spec.input_type)
+        except SiscanHttpEngineError:
+            continue
+        for control in found:
+            if control.name:
+                controls.setdefault(control.name, name)
+    return controls
+
+
+def build_template(
+    flow: str,
+    records: list[RecordedRequest],
+    fields: Mapping[str, FieldSpec],
+    values: Mapping[str, Any],
+) -> RequestTemplate:
+    """
+    Converte as requisições gravadas em um ``RequestTemplate``.
+
+    Cada parâmetro é associado a um campo do schema quando o controle que
+    o envia é o do campo (localizado pelo ``x-xpath`` ou label, como no
+    motor HTTP) e o valor enviado é o valor do campo no job. Parâmetros de
+    controles não localizados são associados por valor, desde que o valor
+    identifique um único campo (códigos curtos, como "01", nunca são
+    associados por valor). O ``ViewState`` é substituído pelo valor
+    atual na reprodução, senhas não são gravadas e os demais parâmetros
+    são mantidos como constantes.
+
+    Parâmetros
+    ----------
+    flow : str
+        Nome do fluxo (ex.: classe da página).
+    records : list[RecordedRequest]
+        Requisições capturadas pelo ``NetworkRecorder``.
+    fields : Mapping[str, FieldSpec]
+        Metadados dos campos (``get_map_label()``).
+    values : Mapping[str, Any]
+        Valores enviados no job, já convertidos (``get_field_value``).
+    """
+    by_value: dict[str, list[str]] = {}
+    for name, value in values.items():
+        if value is None or isinstance(value, bool):
+            continue
+        for item in value if isinstance(value, list) else [value]:
+            by_value.setdefault(str(item), []).append(name)
+
+    steps = []
+    for record in records:
+        controls = _field_controls(record.document, fields, values)
+        secrets = {
+            c.name for c in (record.document.controls if record.document else [])
+            if c.type == "password"
+        }
+        params = []
+        for name, value in record.params:
+            if name == VIEW_STATE:
+                params.append(TemplateParam(name, "", SOURCE_VIEW_STATE))
+            elif name in secrets:
+                params.append(TemplateParam(name, "", SOURCE_SECRET))
+            elif name in controls:
+                field_name = controls[name]
+                if _matches(values[field_name], value):
+                    params.append(TemplateParam(name, value, SOURCE_FIELD,
+                                                field_name))
+                else:
+                    params.append(TemplateParam(name, value))
+            elif (len(value) >= _MIN_VALUE_MATCH
+                  and len(by_value.get(value, [])) == 1
+                  and by_value[value][0] not in controls.values()):
+                params.append(TemplateParam(name, value, SOURCE_FIELD,
+                                            by_value[value][0]))
+            else:
+                params.append(TemplateParam(name, value))
+        steps.append(TemplateStep(
+            method=record.method,
+            path=urlsplit(record.url).path.split(";", 1)[0],
+            ajax=record.ajax,
+            fingerprint=record.fingerprint,
+            params=params,
+        ))
+    return RequestTemplate(flow, steps)
+
+
+class NetworkRecorder:
+    """
+    Grava as requisições JSF/A4J de uma execução no navegador.
+
+    As requisições e respostas da página são processadas em ordem: o HTML
+    de cada navegação e cada resposta parcial do A4J são aplicados a um
+    ``JsfDocument``, de modo que cada requisição gravada carrega o estado
+    (estrutura e fingerprint) da página de onde partiu, exatamente como o
+    motor HTTP o veria ao reproduzi-la.
+
+    Exemplo
+    -------
+    ```python
+    recorder = await context.start_recording()
+    await page.preencher(data)
+    records = await context.stop_recording()
+    template = build_template("rastreio", records, fields, values)
+    ```
+    """
+
+    def __init__(self):
+        self._page: Optional[Page] = None
+        self._document: Optional[JsfDocument] = None
+        self._events: asyncio.Queue = asyncio.Queue()
+        self._worker: Optional[asyncio.Task] = None
+        self._records: dict[Request, RecordedRequest] = {}
+
+    @property
+    def recording(self) -> bool:
+        return self._page is not None
+
+    @property
+    def records(self) -> list[RecordedRequest]:
+        return list(self._records.values())
+
+    async def attach(self, page: Page) -> None:
+        """Passa a gravar as requisições de ``page``."""
+        self._page = page
+        self._document = JsfDocument(await page.content(), page.url)
+        page.on("request", self._on_request)
+        page.on("response", self._on_response)
+        self._worker = asyncio.ensure_future(self._consume())
+
+    async def stop(self) -> list[RecordedRequest]:
+        """Encerra a gravação e retorna as requisições na ordem de envio."""
+        if self._page is not None:
+            self._page.remove_listener("request", self._on_request)
+            self._page.remove_listener("response", self._on_response)
+            self._page = None
+        if self._worker is not None:
+            await self._events.put(None)
+            await self._worker
+            self._worker = None
+        return self.records
+
+    def _tracked(self, request: Request) -> bool:
+        if request.resource_type not in _TRACKED_RESOURCES:
+            return False
+        try:
+            return request.frame == self._page.main_frame
+        except Exception:
+            # Requisições de service workers não pertencem a um frame
+            return False
+
+    def _on_request(self, request: Request) -> None:
+        if self._page is not None and self._tracked(request):
+            self._events.put_nowait(("request", request))
+
+    def _on_response(self, response: Response) -> None:
+        if self._page is not None and self._tracked(response.request):
+            self._events.put_nowait(("response", response))
+
+    async def _consume(self) -> None:
+        while (event := await self._events.get()) is not None:
+            kind, item = event
+            try:
+                if kind == "request":
+                    self._record(item)
+                else:
+                    await self._apply(item)
+            except Exception:
+                logger.warning("Falha ao gravar requisição do fluxo.",
+                               exc_info=True)
+
+    def _record(self, request: Request) -> None:
+        params: list[tuple[str, str]] = []
+        content_type = request.headers.get("content-type", "")
+        if request.post_data and "urlencoded" in content_type:
+            params = parse_qsl(request.post_data, keep_blank_values=True)
+        self._records[request] = RecordedRequest(
+            method=request.method,
+            url=request.url,
+            resource_type=request.resource_type,
+            params=params,
+            document=copy.deepcopy(self._document),
+        )
+
+    async def _apply(self, response: Response) -> None:
+        record = self._records.get(response.request)
+        if record is None:
+            return
+        record.status = response.status
+        if not 200 <= response.status < 300:
+            return
+        body = await response.text()
+        if record.resource_type == "document":
+            self._document = JsfDocument(body, response.url)
+        elif record.ajax and self._document is not None:
+            form = next((n for n, v in record.params
+                         if n == v and n in self._document.forms), None)
+            self._document.merge(body, form)
+
+
+class RequestTemplateStore:
+    """
+    Templates de requisição gravados no banco (tabela
+    ``request_templates``), versionados pelos fingerprints das páginas do
+    fluxo. Os métodos acessam o banco de forma síncrona: em código
+    assíncrono, chame-os via ``asyncio.to_thread``.
+
+    Exemplo
+    -------
+    ```python
+    await asyncio.to_thread(request_templates.save, template)
+    template = await asyncio.to_thread(
+        request_templates.find, "RequisicaoExameMamografiaRastreio",
+        document.fingerprint,
+    )
+    ```
+    """
+
+    def __init__(self):
+        self._table_ready = False
+
+    def _ensure_table(self) -> None:
+        if not self._table_ready:
+            RequestTemplateEntry.__table__.create(bind=env.engine,
+                                                  checkfirst=True)
+            self._table_ready = True
+
+    def save(self, template: RequestTemplate) -> None:
+        """Grava (ou substitui) o template na sua versão."""
+        db = None
+        try:
+            self._ensure_table()
+            db = env.get_db()
+            db.merge(RequestTemplateEntry(
+                flow=template.flow,
+                version=template.version,
+                fingerprint=template.fingerprint,
+                steps=template.to_json(),
+            ))
+            db.commit()
+            logger.info(
+                "Template do fluxo %s gravado (%s, %s passos, %s campos).",
+                template.flow, template.version[:8], len(template.steps),
+                len(template.fields),
+            )
+        except SQLAlchemyError:
+            logger.warning("Falha ao gravar o template de requisições.",
+                           exc_info=True)
+        finally:
+            if db is not None:
+                db.close()
+
+    def _query(self, flow: str, **filters) -> Optional[RequestTemplate]:
+        db = None
+        try:
+            self._ensure_table()
+            db = env.get_db()
+            row = (
+                db.query(RequestTemplateEntry)
+                .filter_by(flow=flow, **filters)
+                .order_by(RequestTemplateEntry.created_at.desc())
+                .first()
+            )
+            return None if row is None else RequestTemplate.from_json(
+                row.flow, row.steps
+            )
+        except SQLAlchemyError:
+            logger.warning("Falha ao ler o template de requisições.",
+                           exc_info=True)
+            return None
+        finally:
+            if db is not None:
+                db.close()
+
+    def get(self, flow: str, version: str) -> Optional[RequestTemplate]:
+        """Retorna o template do fluxo na versão informada."""
+        return self._query(flow, version=version)
+
+    def find(self, flow: str, fingerprint: str) -> Optional[RequestTemplate]:
+        """
+        Retorna o template mais recente do fluxo que começa na página com
+        o fingerprint informado.
+        """
+        return self._query(flow, fingerprint=fingerprint)
+
+    def versions(self, flow: str) -> list[str]:
+        """Versões gravadas do fluxo, da mais recente para a mais antiga."""
+        db = None
+        try:
+            self._ensure_table()
+            db = env.get_db()
+            rows = (
+                db.query(RequestTemplateEntry.version)
+                .filter_by(flow=flow)
+                .order_by(RequestTemplateEntry.created_at.desc())
+            )
+            return [row.version for row in rows]
+        except SQLAlchemyError:
+            logger.warning("Falha ao ler os templates de requisições.",
+                           exc_info=True)
+            return []
+        finally:
+            if db is not None:
+                db.close()
+
+
+request_templates = RequestTemplateStore()
@@ -937,7 +937,8 @@ class RequisicaoMamografiaDiagnosticaSchema(RequisicaoMamografiaSchema):
                 field_info = cls.model_fields[field_name]
 
                 # Log para depuração
-                logger.debug(f"Campo {field_name}: value={value}, type={type(value)}")
+                logger.debug("Campo %s: value=%s, type=%s",
+                             field_name, value, type(value))
 
                 if value is None:
                     valores_possiveis = cls._extrai_valores_possiveis(field_info.annotation)
@@ -43,7 +43,7 @@ class RequisicaoMamografiaRastreamentoSchema(RequisicaoMamografiaSchema):
     @model_validator(mode="after")
     def valida_tipo_de_mamografia(cls, values):
         logger.debug(
-            f"Executando valida_tipo_de_mamografia, valores: {values}")
+            "Executando valida_tipo_de_mamografia, valores: %s", values)
 
         # 5) Se tipo_de_mamografia == 'Rastreamento', tipo_mamografia_de_rastreamento é obrigatório
         tipo = values.tipo_de_mamografia
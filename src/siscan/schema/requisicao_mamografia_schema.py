@@ -453,9 +453,8 @@ class RequisicaoMamografiaSchema(RequisicaoNovoExameSchema):
         args = get_args(annotation)
 
         logger.debug(
-            f"Extrai valores possíveis de {annotation}, "
-            f"origin: {origin}, "
-            f"args: {args}"
+            "Extrai valores possíveis de %s, origin: %s, args: %s",
+            annotation, origin, args,
         )
 
         # Trata Annotated[T, ...]
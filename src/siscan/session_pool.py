@@ -0,0 +1,284 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Awaitable, Callable, Optional
+
+import httpx
+
+from src.env import (
+    SESSION_KEEPALIVE_INTERVAL,
+    SESSION_STATE_DIR,
+    SESSION_TTL,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def cookies_from_storage_state(storage_state: dict) -> httpx.Cookies:
+    """Converte os cookies de um ``storage_state`` do Playwright para httpx."""
+    cookies = httpx.Cookies()
+    for c in storage_state.get("cookies", []):
+        cookies.set(c["name"], c["value"], domain=c.get("domain", ""),
+                    path=c.get("path", "/"))
+    return cookies
+
+
+@dataclass
+class SiscanSession:
+    """Sessão autenticada de uma credencial do SIScan."""
+
+    base_url: str
+    user: str
+    storage_state: Optional[dict] = None
+    # Momento (time.time) da última atividade conhecida no servidor
+    last_seen: float = 0.0
+    # Se o estado salvo em disco já foi lido
+    loaded: bool = False
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock, repr=False)
+
+    def is_valid(self, ttl: float) -> bool:
+        return (
+            self.storage_state is not None
+            and time.time() - self.last_seen < ttl
+        )
+
+
+class SiscanSessionManager:
+    """
+    Gerencia sessões autenticadas do SIScan por credencial.
+
+    O ``storage_state`` do Playwright (cookies e storage) de cada login é
+    mantido em memória e salvo em disco, permitindo que novos jobs iniciem
+    já autenticados. A leitura e a gravação do arquivo rodam em uma thread
+    (``asyncio.to_thread``), fora do event loop. Jobs concorrentes da mesma conta compartilham um único
+    login (single-flight) e pings periódicos mantêm a sessão JSF viva antes
+    que ela expire no servidor.
+
+    Exemplo
+    -------
+    ```python
+    state = await session_manager.acquire(base_url, user, login=page._login)
+    ```
+    """
+
+    def __init__(
+        self,
+        state_dir: str | Path = SESSION_STATE_DIR,
+        keepalive_interval: float = SESSION_KEEPALIVE_INTERVAL,
+        ttl: float = SESSION_TTL,
+    ):
+        self._state_dir = Path(state_dir)
+        self._keepalive_interval = keepalive_interval
+        self._ttl = ttl
+        self._sessions: dict[str, SiscanSession] = {}
+        self._keepalive_task: Optional[asyncio.Task] = None
+
+        self.logins = 0
+        self.reuses = 0
+
+    @staticmethod
+    def key(base_url: str, user: str) -> str:
+        """Chave estável (e sem expor o usuário em disco) da credencial."""
+        raw = f"{base_url.rstrip('/')}|{user}".encode()
+        return hashlib.sha256(raw).hexdigest()
+
+    def _session(self, base_url: str, user: str) -> SiscanSession:
+        key = self.key(base_url, user)
+        session = self._sessions.get(key)
+        if session is None:
+            session = SiscanSession(base_url=base_url, user=user)
+            self._sessions[key] = session
+        return session
+
+    async def _loaded_session(self, base_url: str, user: str) -> SiscanSession:
+        """Retorna a sessão da credencial, lendo o estado salvo em disco."""
+        session = self._session(base_url, user)
+        if not session.loaded:
+            async with session.lock:
+                if not session.loaded:
+                    await asyncio.to_thread(self._load, session)
+                    session.loaded = True
+        return session
+
+    def _state_path(self, session: SiscanSession) -> Path:
+        return self._state_dir / f"{self.key(session.base_url, session.user)}.json"
+
+    def _load(self, session: SiscanSession) -> None:
+        path = self._state_path(session)
+        if not path.exists():
+            return
+        try:
+            session.storage_state = json.loads(path.read_text(encoding="utf-8"))
+            session.last_seen = path.stat().st_mtime
+        except (OSError, ValueError):
+            logger.warning("Estado de sessão inválido em %s. Ignorando.", path)
+
+    async def _persist(self, session: SiscanSession) -> None:
+        # Serializa no event loop: o keepalive pode alterar os cookies
+        # enquanto o arquivo é gravado
+        text = json.dumps(session.storage_state)
+        await asyncio.to_thread(self._save, self._state_path(session), text)
+
+    @staticmethod
+    def _save(path: Path, text: str) -> None:
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(text, encoding="utf-8")
+            # O arquivo contém cookies de sessão: restringe a leitura ao dono
+            os.chmod(path, 0o600)
+        except OSError:
+            logger.warning("Não foi possível salvar o estado da sessão em %s",
+                           path)
+
+    async def get_storage_state(
+        self, base_url: str, user: str
+    ) -> Optional[dict]:
+        """Retorna o ``storage_state`` válido da credencial, se houver."""
+        session = await self._loaded_session(base_url, user)
+        if session.is_valid(self._ttl):
+            return session.storage_state
+        return None
+
+    async def acquire(
+        self,
+        base_url: str,
+        user: str,
+        login: Callable[[], Awaitable[dict]],
+    ) -> dict:
+        """
+        Retorna o ``storage_state`` autenticado da credencial.
+
+        Se não houver sessão válida, executa ``login`` uma única vez, mesmo
+        que vários jobs da mesma conta peçam a sessão ao mesmo tempo: os
+        demais aguardam e reutilizam o resultado.
+
+        Parâmetros
+        ----------
+        base_url : str
+            URL base do SIScan.
+        user : str
+            Usuário (e-mail) da credencial.
+        login : Callable[[], Awaitable[dict]]
+            Corrotina que realiza o login completo e retorna o
+            ``storage_state`` resultante.
+
+        Retorno
+        -------
+        dict
+            ``storage_state`` no formato do Playwright.
+        """
+        session = await self._loaded_session(base_url, user)
+        if session.is_valid(self._ttl):
+            self.reuses += 1
+            return session.storage_state
+
+        async with session.lock:
+            if session.is_valid(self._ttl):
+                # Outro job concluiu o login enquanto aguardávamos
+                self.reuses += 1
+                return session.storage_state
+
+            logger.debug("Nenhuma sessão válida para a credencial. Autenticando.")
+            state = await login()
+            self.logins += 1
+            await self._store(session, state)
+            return state
+
+    async def store(self, base_url: str, user: str, storage_state: dict) -> None:
+        """Registra o ``storage_state`` de uma sessão recém-autenticada."""
+        await self._store(self._session(base_url, user), storage_state)
+
+    async def _store(self, session: SiscanSession, storage_state: dict) -> None:
+        session.storage_state = storage_state
+        session.last_seen = time.time()
+        session.loaded = True
+        await self._persist(session)
+
+    def touch(self, base_url: str, user: str) -> None:
+        """Marca atividade recente da sessão (ex.: job concluído)."""
+        session = self._session(base_url, user)
+        if session.storage_state is not None:
+            session.last_seen = time.time()
+
+    def invalidate(self, base_url: str, user: str) -> None:
+        """Descarta a sessão da credencial, forçando um novo login."""
+        session = self._session(base_url, user)
+        session.storage_state = None
+        session.last_seen = 0.0
+        try:
+            self._state_path(session).unlink(missing_ok=True)
+        except OSError:
+            pass
+
+    async def ping(
+        self, session: SiscanSession, client: Optional[httpx.AsyncClient] = None
+    ) -> bool:
+        """
+        Envia um ping HTTP com os cookies da sessão para mantê-la viva.
+
+        Retorna False (e invalida a sessão) quando o SIScan redireciona para
+        a página de login, indicando que a sessão expirou.
+        """
+        cookies = cookies_from_storage_state(session.storage_state)
+
+        own_client = client is None
+        client = client or httpx.AsyncClient(follow_redirects=True, timeout=15)
+        try:
+            client.cookies = cookies
+            response = await client.get(session.base_url)
+        finally:
+            if own_client:
+                await client.aclose()
+
+        if "login.jsf" in str(response.url):
+            logger.info("Sessão do SIScan expirada durante keepalive.")
+            self.invalidate(session.base_url, session.user)
+            return False
+
+        # Atualiza cookies renovados pelo servidor
+        renewed = {c.name: c.value for c in client.cookies.jar}
+        for c in session.storage_state.get("cookies", []):
+            if c["name"] in renewed:
+                c["value"] = renewed[c["name"]]
+        session.last_seen = time.time()
+        await self._persist(session)
+        return True
+
+    async def _keepalive_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self._keepalive_interval)
+            for session in list(self._sessions.values()):
+                if not session.is_valid(self._ttl) or session.lock.locked():
+                    continue
+                try:
+                    await self.ping(session)
+                except Exception:
+                    logger.warning("Falha no keepalive da sessão do SIScan",
+                                   exc_info=True)
+
+    async def start(self) -> None:
+        """Inicia os pings de keepalive em segundo plano."""
+        if self._keepalive_interval > 0 and self._keepalive_task is None:
+            self._keepalive_task = asyncio.create_task(self._keepalive_loop())
+
+    async def stop(self) -> None:
+        """Interrompe os pings de keepalive."""
+        if self._keepalive_task is not None:
+            self._keepalive_task.cancel()
+            try:
+                await self._keepalive_task
+            except asyncio.CancelledError:
+                pass
+            self._keepalive_task = None
+        # Os locks ficam associados ao event loop em que foram usados
+        for session in self._sessions.values():
+            session.lock = asyncio.Lock()
+
+
+# Gerenciador compartilhado pelo processo
+session_manager = SiscanSessionManager()
@@ -0,0 +1,3 @@
+from src.siscan.simulator.app import SimulatorConfig, SiscanSimulator, create_app
+
+__all__ = ["SimulatorConfig", "SiscanSimulator", "create_app"]
@@ -0,0 +1,451 @@
+import asyncio
+import logging
+import random
+import re
+import secrets
+import zlib
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, field
+from typing import Optional
+from urllib.parse import parse_qs
+
+from fastapi import FastAPI, Request
+from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse
+from starlette.responses import Response
+
+from src.siscan.http_engine import VIEW_STATE
+from src.siscan.simulator.pages import (
+    A4J_PREFIX,
+    CAMPOS_PACIENTE,
+    GERENCIAR,
+    HOME,
+    LOGIN,
+    POPUP,
+    State,
+    Telas,
+    ajax_response,
+    mensagens,
+    painel_id,
+    view_expired,
+)
+
+logger = logging.getLogger(__name__)
+
+SESSION_COOKIE = "JSESSIONID"
+
+# Campos de configuração que podem ser alterados com o simulador em execução
+# (``POST /_simulator/config``)
+FAULT_FIELDS = (
+    "latency",
+    "ajax_latency",
+    "slow_rate",
+    "slow_latency",
+    "stale_view_state_rate",
+    "duplicate_patients",
+)
+
+
+@dataclass
+class SimulatorConfig:
+    """
+    Configuração do simulador do SIScan.
+
+    Atributos
+    ---------
+    latency, ajax_latency : float
+        Atraso, em segundos, de cada requisição de página e de cada
+        requisição AJAX do A4J.
+    slow_rate, slow_latency : float
+        Fração das requisições que recebe um atraso extra de
+        ``slow_latency`` segundos.
+    stale_view_state_rate : float
+        Fração dos postbacks respondidos com ``ViewExpiredException``, como
+        se o ViewState tivesse sido descartado pelo servidor.
+    duplicate_patients : bool
+        A pesquisa de paciente devolve dois registros (homônimos) para cada
+        paciente encontrado.
+    max_views : int
+        Views guardadas por sessão (``numberOfViewsInSession`` do JSF);
+        ViewStates mais antigos expiram.
+    users : dict
+        E-mail -> senha aceitos no login. Vazio aceita qualquer credencial
+        preenchida.
+    patients : dict, opcional
+        Cartão SUS -> dados do paciente. Sem valor, qualquer Cartão SUS com
+        15 dígitos retorna um paciente gerado.
+    """
+
+    latency: float = 0.0
+    ajax_latency: float = 0.0
+    slow_rate: float = 0.0
+    slow_latency: float = 2.0
+    stale_view_state_rate: float = 0.0
+    duplicate_patients: bool = False
+    max_views: int = 20
+    seed: Optional[int] = None
+    users: dict[str, str] = field(default_factory=dict)
+    patients: Optional[dict[str, dict]] = None
+    unidades: dict[str, str] = field(default_factory=lambda: {
+        "0015466": "HOSPITAL MUNICIPAL DE SAO PAULO",
+        "2337545": "UNIDADE BASICA DE SAUDE CENTRO",
+        "6738451": "POLICLINICA REGIONAL NORTE",
+    })
+    prestadores: list[str] = field(default_factory=lambda: [
+        "CLINICA DE IMAGEM SAO LUCAS",
+        "CENTRO DE DIAGNOSTICO POR IMAGEM",
+    ])
+    responsaveis: dict[str, str] = field(default_factory=lambda: {
+        "898001160660761": "MARIA APARECIDA SOUZA",
+        "700000000000005": "JOAO PEREIRA LIMA",
+    })
+    notices: list[tuple[str, str, list[str]]] = field(default_factory=lambda: [(
+        "01/01/2025",
+        "Manutenção programada",
+        ["O SISCAN ficará indisponível no domingo, das 8h às 12h."],
+    )])
+    # Pacientes gerados pela pesquisa: o cartão selecionado traz os mesmos
+    # dados
+    _gerados: dict[str, dict] = field(default_factory=dict, init=False,
+                                      repr=False)
+
+    def paciente(self, cartao: str) -> Optional[dict]:
+        """Dados do paciente do Cartão SUS ou ``None``."""
+        if self.patients is not None:
+            return self.patients.get(cartao)
+        if not re.fullmatch(r"\d{15}", cartao):
+            return None
+        return self._gerados.get(cartao) or self._paciente_gerado(
+            cartao, f"PACIENTE {cartao[-6:]}"
+        )
+
+    def pesquisar(self, nome: str, cpf: str) -> list[tuple[str, dict]]:
+        """Resultado da pesquisa de paciente: (cartão, dados)."""
+        nome, cpf = nome.strip().upper(), re.sub(r"\D", "", cpf)
+        if self.patients is not None:
+            found = [
+                (cartao, dados) for cartao, dados in self.patients.items()
+                if (not nome or nome in dados.get("nome", "").upper())
+                and (not cpf or cpf == re.sub(r"\D", "", dados.get("cpf", "")))
+            ]
+        elif nome or cpf:
+            cartao = f"70{zlib.crc32((nome + cpf).encode()):013d}"
+            found = [(cartao, self._paciente_gerado(
+                cartao, nome or f"PACIENTE {cartao[-6:]}", cpf
+            ))]
+        else:
+            found = []
+        if self.duplicate_patients:
+            found = [
+                row for cartao, dados in found
+                for row in ((cartao, dados),
+                            (cartao[:-1] + str((int(cartao[-1]) + 1) % 10),
+                             dados))
+            ]
+        if self.patients is None:
+            self._gerados.update(found)
+        return found
+
+    @staticmethod
+    def _paciente_gerado(cartao: str, nome: str, cpf: str = "") -> dict:
+        dados = dict.fromkeys(CAMPOS_PACIENTE, "")
+        dados.update(
+            cpf=cpf or f"{int(cartao[-11:]):011d}",
+            nome=nome,
+            nome_da_mae=f"MAE DE {nome}",
+            data_de_nascimento="01/01/1970",
+            nacionalidade="BRASILEIRO",
+            sexo="F",
+            raca_cor="PARDA",
+            uf="SP",
+            municipio="SAO PAULO",
+            tipo_logradouro="RUA",
+            nome_logradouro="DAS FLORES",
+            numero="100",
+            bairro="CENTRO",
+            cep="01001-000",
+        )
+        return dados
+
+
+@dataclass
+class _View:
+    """Tela renderizada para um ViewState: nome e estado do formulário."""
+
+    screen: str
+    state: State
+
+
+@dataclass
+class _Sessao:
+    id: str
+    autenticado: bool = False
+    user: str = ""
+    views: OrderedDict = field(default_factory=OrderedDict)
+
+
+class SiscanSimulator:
+    """
+    Servidor local que reproduz as telas do SIScan usadas pelas páginas
+    (login, popup de informes, menu do RichFaces, novo exame com Cartão SUS
+    e pesquisa de paciente, requisição de mamografia) e o protocolo do
+    JSF/A4J: sessão por cookie ``JSESSIONID``, ``javax.faces.ViewState``
+    por tela e respostas AJAX parciais com ``Ajax-Update-Ids``.
+
+    Serve tanto ao navegador quanto ao ``JsfHttpEngine``; ``SISCAN_URL``
+    pode apontar para ele (ver ``python cli.py simulator``). Latência e
+    falhas (respostas lentas, ViewState expirado, pacientes duplicados)
+    são definidas em ``SimulatorConfig`` e podem ser alteradas em execução
+    por ``POST /_simulator/config``.
+
+    Exemplo
+    -------
+    ```python
+    app = create_app(SimulatorConfig(ajax_latency=0.2))
+    transport = httpx.ASGITransport(app=app)
+    ```
+    """
+
+    def __init__(self, config: Optional[SimulatorConfig] = None):
+        self.config = config or SimulatorConfig()
+        self.telas = Telas(self.config)
+        self.sessions: dict[str, _Sessao] = {}
+        self.stats: Counter = Counter()
+        self._random = random.Random(self.config.seed)
+        self._tokens = 0
+
+    # Sessão e ViewState -----------------------------------------------------
+
+    def _sessao(self, request: Request) -> Optional[_Sessao]:
+        return self.sessions.get(request.cookies.get(SESSION_COOKIE, ""))
+
+    def _nova_sessao(self) -> _Sessao:
+        sessao = _Sessao(secrets.token_hex(16))
+        self.sessions[sessao.id] = sessao
+        return sessao
+
+    def _token(self, sessao: _Sessao, view: _View) -> str:
+        self._tokens += 1
+        token = f"j_id{self._tokens}"
+        sessao.views[token] = view
+        while len(sessao.views) > self.config.max_views:
+            sessao.views.popitem(last=False)
+        return token
+
+    def _restore(self, sessao: _Sessao, token: str) -> Optional[_View]:
+        view = sessao.views.get(token)
+        if view is None or self._chance(self.config.stale_view_state_rate):
+            self.stats["expired"] += 1
+            return None
+        sessao.views.move_to_end(token)
+        return view
+
+    def _chance(self, rate: float) -> bool:
+        return rate > 0 and self._random.random() < rate
+
+    async def _delay(self, ajax: bool) -> None:
+        delay = self.config.ajax_latency if ajax else self.config.latency
+        if self._chance(self.config.slow_rate):
+            self.stats["slow"] += 1
+            delay += self.config.slow_latency
+        if delay:
+            await asyncio.sleep(delay)
+
+    # Telas ------------------------------------------------------------------
+
+    def render(self, sessao: _Sessao, view: _View, erros=()) -> str:
+        token = self._token(sessao, view)
+        screen = view.screen
+        if screen == "login":
+            return self.telas.login(token, erros[0] if erros else "")
+        if screen == "home":
+            return self.telas.home(token)
+        if screen == "gerenciar":
+            return self.telas.gerenciar(token)
+        if screen == "novo_exame":
+            return self.telas.novo_exame(token, view.state, erros)
+        return self.telas.mamografia(token, view.state)
+
+    def _html(self, sessao: _Sessao, view: _View, erros=()) -> HTMLResponse:
+        response = HTMLResponse(self.render(sessao, view, erros))
+        response.set_cookie(SESSION_COOKIE, sessao.id, path="/",
+                            httponly=True)
+        return response
+
+    def login_page(self, request: Request) -> HTMLResponse:
+        sessao = self._sessao(request) or self._nova_sessao()
+        return self._html(sessao, _View("login", {}))
+
+    def home_page(self, request: Request) -> Response:
+        sessao = self._sessao(request)
+        if sessao is None or not sessao.autenticado:
+            return RedirectResponse(LOGIN, status_code=302)
+        return self._html(sessao, _View("home", {}))
+
+    def gerenciar_page(self, request: Request) -> Response:
+        sessao = self._sessao(request)
+        if sessao is None or not sessao.autenticado:
+            return RedirectResponse(LOGIN, status_code=302)
+        return self._html(sessao, _View("gerenciar", {}))
+
+    # Postbacks --------------------------------------------------------------
+
+    async def postback(self, request: Request) -> Response:
+        state = parse_qs((await request.body()).decode(),
+                         keep_blank_values=True)
+        ajax = "AJAXREQUEST" in state
+        self.stats["requests"] += 1
+        self.stats["ajax" if ajax else "postbacks"] += 1
+        await self._delay(ajax)
+
+        sessao = self._sessao(request)
+        login = request.url.path == LOGIN
+        if sessao is None or not (sessao.autenticado or login):
+            if ajax:
+                return Response(headers={"Ajax-Response": "redirect",
+                                         "Location": LOGIN})
+            return RedirectResponse(LOGIN, status_code=302)
+
+        token = (state.get(VIEW_STATE) or [""])[0]
+        view = self._restore(sessao, token)
+        if view is None:
+            if ajax:
+                return Response(view_expired(request.url.path),
+                                media_type="text/html",
+                                headers={"Ajax-Expired": "true"})
+            return HTMLResponse(view_expired(request.url.path))
+
+        if login:
+            return self._login(sessao, state)
+        if ajax:
+            return self._ajax(sessao, view, state)
+        return self._submit(sessao, view, state)
+
+    def _login(self, sessao: _Sessao, state: State) -> Response:
+        email = (state.get("frm:email") or [""])[0].strip()
+        senha = (state.get("frm:senha") or [""])[0]
+        users = self.config.users
+        if not email or not senha or (users and users.get(email) != senha):
+            return self._html(sessao, _View("login", {}),
+                              ["Usuário ou senha inválidos."])
+        sessao.autenticado, sessao.user = True, email
+        self.stats["logins"] += 1
+        return RedirectResponse(HOME, status_code=302)
+
+    def _ajax(self, sessao: _Sessao, view: _View, state: State) -> Response:
+        support = next(
+            (k[len(A4J_PREFIX):] for k in state if k.startswith(A4J_PREFIX)),
+            "",
+        )
+        telas = self.telas
+        if support == "cartao_sus":
+            paciente, erros = telas.paciente(state)
+            regioes = [("frm:paciente", paciente),
+                       ("frm:mensagens", mensagens(erros))]
+        elif support in ("pesquisa_abrir", "pesquisar"):
+            modo = "resultado" if support == "pesquisar" else "aberta"
+            regioes = [("frm:pesquisa", telas.pesquisa(state, modo))]
+        elif support == "selecionar":
+            state["frm:cartaoSus"] = state.get("cartao", [""])
+            paciente, erros = telas.paciente(state)
+            regioes = [("frm:cartao", telas.cartao(state)),
+                       ("frm:paciente", paciente),
+                       ("frm:mensagens", mensagens(erros)),
+                       ("frm:pesquisa", telas.pesquisa(state))]
+        elif support in telas.dependentes:
+            regioes = [(painel_id(support), telas.painel(support, state))]
+        else:
+            regioes = []
+        token = self._token(sessao, _View(view.screen, state))
+        return Response(ajax_response(regioes, token), media_type="text/xml")
+
+    def _submit(self, sessao: _Sessao, view: _View, state: State) -> Response:
+        if "menu:gerenciarExame" in state:
+            return self._html(sessao, _View("gerenciar", {}))
+        if "frm:novoExame" in state:
+            return self._html(sessao, _View("novo_exame", {}))
+        if "frm:avancar" in state:
+            erros, paciente = self._validar_novo_exame(state)
+            if erros:
+                return self._html(sessao, _View("novo_exame", state), erros)
+            return self._html(sessao, _View(
+                "mamografia", {"frm:nome": [paciente["nome"]]}
+            ))
+        return self._html(sessao, _View(view.screen, state))
+
+    def _validar_novo_exame(self, state: State) -> tuple[list[str], dict]:
+        def valor(name: str) -> str:
+            return (state.get(name) or [""])[0]
+
+        paciente = self.config.paciente(valor("frm:cartaoSus").strip())
+        erros = []
+        if not paciente:
+            erros.append("Informe o Cartão SUS do paciente.")
+        tipo = self.telas.control_name("tipo_exame_mama")
+        if not valor(tipo):
+            erros.append("Selecione o tipo de exame.")
+        for name in ("cnes_unidade_requisitante", "prestador"):
+            if valor(self.telas.control_name(name)) in ("", "0"):
+                label = self.telas.fields[name].label.rstrip(":")
+                erros.append(f"O campo {label} é obrigatório.")
+        return erros, paciente or {}
+
+    # Controle do simulador --------------------------------------------------
+
+    def config_dict(self) -> dict:
+        return {name: getattr(self.config, name) for name in FAULT_FIELDS}
+
+    def update_config(self, values: dict) -> dict:
+        for name, value in values.items():
+            if name not in FAULT_FIELDS:
+                raise ValueError(f"Campo de configuração inválido: {name}")
+            setattr(self.config, name, type(getattr(self.config, name))(value))
+        logger.info("Configuração do simulador alterada: %s", values)
+        return self.config_dict()
+
+
+def create_app(config: Optional[SimulatorConfig] = None) -> FastAPI:
+    """Aplicação ASGI do simulador do SIScan."""
+    simulator = SiscanSimulator(config)
+    app = FastAPI(title="Simulador SIScan", docs_url=None, redoc_url=None)
+    app.state.simulator = simulator
+
+    @app.get("/", response_class=HTMLResponse)
+    @app.get(HOME, response_class=HTMLResponse)
+    async def home(request: Request):
+        await simulator._delay(ajax=False)
+        return simulator.home_page(request)
+
+    @app.get(LOGIN, response_class=HTMLResponse)
+    async def login(request: Request):
+        await simulator._delay(ajax=False)
+        return simulator.login_page(request)
+
+    @app.get(POPUP, response_class=HTMLResponse)
+    async def popup():
+        return simulator.telas.popup()
+
+    @app.get(GERENCIAR, response_class=HTMLResponse)
+    async def gerenciar(request: Request):
+        await simulator._delay(ajax=False)
+        return simulator.gerenciar_page(request)
+
+    @app.get("/_simulator/config")
+    async def get_config():
+        return simulator.config_dict()
+
+    @app.post("/_simulator/config")
+    async def set_config(values: dict):
+        try:
+            return simulator.update_config(values)
+        except ValueError as e:
+            return JSONResponse({"detail": str(e)}, status_code=422)
+
+    @app.get("/_simulator/stats")
+    async def stats():
+        return dict(simulator.stats)
+
+    @app.post("/{path:path}")
+    async def postback(request: Request):
+        return await simulator.postback(request)
+
+    return app
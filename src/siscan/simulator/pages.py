@@ -0,0 +1,667 @@
+import re
+from enum import Enum
+from html import escape
+from itertools import groupby
+from typing import Optional, get_args, get_origin
+
+from src.siscan.classes.requisicao_exame import RequisicaoExame
+from src.siscan.classes.requisicao_exame_mamografia_diagnostica import (
+    RequisicaoExameMamografiaDiagnostica,
+)
+from src.siscan.classes.requisicao_exame_mamografia_rastreio import (
+    RequisicaoExameMamografiaRastreio,
+)
+from src.siscan.classes.webpage import SiscanWebPage
+from src.siscan.http_engine import (
+    VIEW_STATE,
+    _XPATH_AFTER_LABEL,
+    _XPATH_BY_ATTR,
+    _XPATH_FIELDSET,
+)
+from src.siscan.schema.requisicao_mamografia_diagnostica_schema import (
+    RequisicaoMamografiaDiagnosticaSchema,
+)
+from src.siscan.schema.requisicao_mamografia_rastreamento_schema import (
+    RequisicaoMamografiaRastreamentoSchema,
+)
+from src.utils.field_registry import FieldRegistry
+from src.utils.schema import InputType
+
+# Parâmetro enviado pelos handlers A4J do simulador: identifica o controle
+# que disparou a requisição (``frm:a4j_<campo>``)
+A4J_PREFIX = "frm:a4j_"
+
+# Grupos da mamografia diagnóstica: checkbox do grupo -> prefixo dos
+# subcampos (ver ``RequisicaoExameMamografiaDiagnostica``)
+GRUPOS = {
+    "achados_exame_clinico": "exame_clinico_mama",
+    "controle_radiologico_lesao_categoria_3":
+        "controle_radiologico_lesao_categoria_3",
+    "lesao_diagnostico_cancer": "lesao_diagnostico_cancer",
+    "avaliacao_resposta_quimioterapia_neoadjuvante":
+        "avaliacao_resposta_quimioterapia",
+    "revisao_mamografia_outra_instituicao":
+        "revisao_mamografia_outra_instituicao",
+    "controle_lesao_pos_biopsia_paaf_benigna":
+        "controle_lesao_pos_biopsia_paaf_benigna",
+}
+
+# Endereços das telas
+LOGIN = "/login.jsf"
+HOME = "/home.jsf"
+POPUP = "/popupMensagensInformativas.jsf"
+GERENCIAR = "/exame/gerenciarExame.jsf"
+NOVO_EXAME = "/exame/novoExame.jsf"
+REQUISICAO = "/exame/requisicao.jsf"
+
+# Pseudo-campo com a tabela de anos da fieldset "OPÇÕES DE CIRURGIA"
+CIRURGIAS = "opcoes_de_cirurgia"
+
+# Dados do paciente exibidos (somente leitura) após o Cartão SUS
+CAMPOS_PACIENTE = (
+    SiscanWebPage.MAP_DATA_FIND_CARTAO_SUS[1:]
+    + SiscanWebPage.MAP_DATA_CARTAO_SUS
+)
+
+# Campos da tela de mamografia, na ordem do formulário
+CAMPOS_MAMOGRAFIA = (
+    "num_prontuario",
+    "tem_nodulo_ou_caroco_na_mama",
+    "apresenta_risco_elevado_para_cancer_mama",
+    "antes_desta_consulta_teve_as_mamas_examinadas_por_um_profissional",
+    "fez_mamografia_alguma_vez",
+    "fez_radioterapia_na_mama_ou_no_plastrao",
+    "fez_cirurgia_de_mama",
+    "tipo_de_mamografia",
+    "data_da_solicitacao",
+    "cns_responsavel_coleta",
+)
+
+# Mesmo script usado pelo RichFaces para o status das requisições AJAX
+_STATUS = (
+    '<span id="_viewRoot:status"><span id="_viewRoot:status.start" '
+    'style="display:none">Carregando...</span></span>'
+)
+
+_STYLE = """
+.rich-ddmenu-label { display: inline-block; position: relative; }
+.rich-menu-list-border { display: none; position: absolute; }
+.rich-ddmenu-label:hover .rich-menu-list-border { display: block; }
+.mensagem-erro { color: #c00; }
+"""
+
+# Implementação mínima das funções JavaScript do JSF/RichFaces usadas nos
+# handlers das telas: ``jsfcljs`` (submit com parâmetros) e
+# ``A4J.AJAX.Submit`` (envio do formulário com AJAXREQUEST e substituição
+# das regiões listadas em Ajax-Update-Ids)
+_SCRIPT = """
+function jsfcljs(f, p, t) {
+  for (var k in p) {
+    var i = document.createElement('input');
+    i.type = 'hidden'; i.name = k; i.value = p[k];
+    f.appendChild(i);
+  }
+  f.submit();
+}
+var A4J = {AJAX: {Submit: function(container, formId, event, opts) {
+  var form = document.getElementById(formId);
+  var data = new URLSearchParams(new FormData(form));
+  data.append('AJAXREQUEST', container);
+  var params = opts.parameters || {};
+  for (var k in params) data.append(k, params[k]);
+  var status = document.getElementById('_viewRoot:status.start');
+  status.style.display = '';
+  var xhr = new XMLHttpRequest();
+  xhr.open('POST', opts.actionUrl || form.action);
+  xhr.setRequestHeader('Content-Type', 'application/x-www-form-urlencoded');
+  xhr.onload = function() {
+    status.style.display = 'none';
+    if (xhr.getResponseHeader('Ajax-Expired')) {
+      document.open(); document.write(xhr.responseText); document.close();
+      return;
+    }
+    var doc = new DOMParser().parseFromString(xhr.responseText, 'text/html');
+    var meta = doc.querySelector("meta[name='Ajax-Update-Ids']");
+    var ids = meta ? meta.content.split(',') : [];
+    ids.forEach(function(id) {
+      var n = doc.getElementById(id.trim());
+      var o = document.getElementById(id.trim());
+      if (n && o) o.outerHTML = n.outerHTML;
+    });
+    var vs = doc.querySelector("input[name='javax.faces.ViewState']");
+    if (vs) {
+      document.querySelectorAll("input[name='javax.faces.ViewState']")
+        .forEach(function(i) { i.value = vs.value; });
+    }
+  };
+  xhr.send(data.toString());
+  return false;
+}}};
+"""
+
+State = dict[str, list[str]]
+
+
+def _enum(annotation) -> Optional[type]:
+    """Enum de uma anotação (Optional, Annotated e list incluídos)."""
+    if isinstance(annotation, type) and issubclass(annotation, Enum):
+        return annotation
+    if get_origin(annotation) is not None:
+        for arg in get_args(annotation):
+            found = _enum(arg)
+            if found is not None:
+                return found
+    return None
+
+
+def _texto_opcao(member: Enum) -> str:
+    if member.value == "0":
+        return "Selecione..."
+    return member.name.replace("_", " ").capitalize()
+
+
+def _flag(name: str, on: bool) -> str:
+    return f' {name}="{name}"' if on else ""
+
+
+def _first(state: State, name: str) -> str:
+    values = state.get(name) or [""]
+    return values[0]
+
+
+class Telas:
+    """
+    HTML das telas do SIScan servidas pelo simulador.
+
+    Os campos dos formulários são montados a partir do mesmo
+    ``FieldRegistry`` usado pelas páginas (labels, legends, ``x-xpath`` e
+    opções dos enums dos schemas), de modo que as telas acompanham as
+    mudanças nos schemas. Cada tela é renderizada a partir do estado do
+    formulário enviado (``State``), como em um postback do JSF; as regiões
+    re-renderizadas por AJAX são obtidas pelos mesmos métodos.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        rastreio = FieldRegistry.for_page(
+            RequisicaoExameMamografiaRastreio,
+            RequisicaoMamografiaRastreamentoSchema,
+        )
+        diagnostica = FieldRegistry.for_page(
+            RequisicaoExameMamografiaDiagnostica,
+            RequisicaoMamografiaDiagnosticaSchema,
+        )
+        self.fields = {**rastreio.fields, **diagnostica.fields}
+        self._mapped = {**rastreio.options, **diagnostica.options}
+        self._annotations = {
+            **{k: f.annotation for k, f in
+               RequisicaoMamografiaRastreamentoSchema.model_fields.items()},
+            **{k: f.annotation for k, f in
+               RequisicaoMamografiaDiagnosticaSchema.model_fields.items()},
+        }
+        self.dependentes = self._dependentes(diagnostica)
+        dependentes = {
+            name for valores in self.dependentes.values()
+            for names in valores.values() for name in names
+        }
+        # Campos da tela de novo exame; os dependentes ficam nos painéis
+        self._novo_exame = [
+            name for name in diagnostica.layer(RequisicaoExame)
+            if name not in dependentes
+        ]
+        # Anos preenchidos em cards (``preencher_campo_dependente_multiplo``)
+        self._cards = {
+            name
+            for controle in ("fez_mamografia_alguma_vez",
+                             "radioterapia_localizacao")
+            for names in self.dependentes[controle].values()
+            for name in names
+        }
+
+    @staticmethod
+    def _dependentes(diagnostica) -> dict[str, dict[str, tuple[str, ...]]]:
+        """Controle -> {valor: campos habilitados pelo valor}."""
+        layer = diagnostica.layer(RequisicaoExameMamografiaDiagnostica)
+        grupos = {
+            grupo: {"S": tuple(
+                name for name in layer
+                if name.startswith(prefixo) and name != grupo
+                and name not in GRUPOS
+            )}
+            for grupo, prefixo in GRUPOS.items()
+        }
+        return {
+            "tipo_exame_mama": {
+                v: ("cnes_unidade_requisitante", "prestador")
+                for v in ("01", "03", "05")
+            },
+            "fez_mamografia_alguma_vez": {
+                "01": ("ano_que_fez_a_ultima_mamografia",),
+            },
+            "fez_radioterapia_na_mama_ou_no_plastrao": {
+                "01": ("radioterapia_localizacao",),
+            },
+            "radioterapia_localizacao": {
+                "01": ("ano_da_radioterapia_esquerda",),
+                "02": ("ano_da_radioterapia_direita",),
+                "03": ("ano_da_radioterapia_direita",
+                       "ano_da_radioterapia_esquerda"),
+            },
+            "fez_cirurgia_de_mama": {"S": (CIRURGIAS,)},
+            "tipo_de_mamografia": {
+                "01": tuple(GRUPOS),
+                "02": ("tipo_mamografia_de_rastreamento",),
+            },
+            **grupos,
+        }
+
+    # Opções ---------------------------------------------------------------
+
+    def options(self, name: str) -> list[tuple[str, str]]:
+        """(value, texto) das opções de um campo."""
+        if name == "cnes_unidade_requisitante":
+            return [("0", "Selecione...")] + [
+                (str(i), f"{cnes} - {nome}")
+                for i, (cnes, nome) in enumerate(
+                    self.config.unidades.items(), start=1)
+            ]
+        if name == "prestador":
+            return [("0", "Selecione...")] + [
+                (str(i), nome)
+                for i, nome in enumerate(self.config.prestadores, start=1)
+            ]
+        if name == "cns_responsavel_coleta":
+            return [("0", "Selecione...")] + [
+                (cns, f"{nome} - {cns}")
+                for cns, nome in self.config.responsaveis.items()
+            ]
+        enum = _enum(self._annotations.get(name))
+        members = [m for m in enum if m.value != "null"] if enum else []
+        mapped = self._mapped.get(name)
+        if mapped:
+            # Valores convertidos pelo FIELDS_MAP da página (ex.: S/N)
+            texts = {m.value: _texto_opcao(m) for m in members}
+            return [(value, texts.get(key, key))
+                    for key, value in mapped.items()]
+        if members:
+            return [(m.value, _texto_opcao(m)) for m in members]
+        # Checkbox isolado (booleano)
+        return [("S", "Sim")]
+
+    # Campos ----------------------------------------------------------------
+
+    def control_name(self, name: str) -> str:
+        """``name`` do controle HTML de um campo."""
+        m = _XPATH_BY_ATTR.match(self.fields[name].xpath or "")
+        if m and m.group(1) == "name":
+            return m.group(2)
+        return f"frm:{name}"
+
+    def _div(self, name: str) -> str:
+        if name not in self.fields:
+            return ""
+        m = _XPATH_FIELDSET.match(self.fields[name].xpath or "")
+        return (m and m["div"]) or ""
+
+    def _handler(self, name: str) -> str:
+        if name not in self.dependentes:
+            return ""
+        action = NOVO_EXAME if name in self._novo_exame else REQUISICAO
+        return f' onclick="{a4j(A4J_PREFIX + name, action)}"'
+
+    def campo(self, name: str, state: State, enabled: bool = True) -> str:
+        """HTML de um campo do formulário ``frm``."""
+        if name == CIRURGIAS:
+            return self._cirurgias(state, enabled)
+        spec = self.fields[name]
+        kind = InputType(str(spec.input_type).lower())
+        control = self.control_name(name)
+        disabled = _flag("disabled", not enabled)
+        label = escape(spec.label)
+
+        if kind in (InputType.RADIO, InputType.CHECKBOX):
+            checked = state.get(control, [])
+            handler = self._handler(name)
+            by_attr = _XPATH_BY_ATTR.match(spec.xpath or "")
+            if by_attr and by_attr.group(1) == "name":
+                # Checkbox isolado, localizado pelo name
+                value = self.options(name)[0][0]
+                return (
+                    f'<input type="checkbox" id="{control}" name="{control}" '
+                    f'value="{value}"{_flag("checked", value in checked)}'
+                    f'{disabled}{handler}/>'
+                    f'<label for="{control}">{label}</label>'
+                )
+            fieldset = _XPATH_FIELDSET.match(spec.xpath or "")
+            legend = escape(fieldset["legend"]) if fieldset else label
+            table = (by_attr.group(2) if by_attr and by_attr.group(1) == "id"
+                     else f"{control}:opcoes")
+            cells = "".join(
+                f'<td><input type="{kind.value}" id="{control}:{i}" '
+                f'name="{control}" value="{escape(value)}"'
+                f'{_flag("checked", value in checked)}{disabled}{handler}/>'
+                f'<label for="{control}:{i}">{escape(text)}</label></td>'
+                for i, (value, text) in enumerate(self.options(name))
+            )
+            return (f'<fieldset><legend>{legend}</legend>'
+                    f'<table id="{table}"><tr>{cells}</tr></table></fieldset>')
+
+        if kind in (InputType.SELECT, InputType.LIST):
+            selected = _first(state, control)
+            # As opções só são carregadas com o select habilitado
+            options = self.options(name) if enabled else self.options(name)[:1]
+            opts = "".join(
+                f'<option value="{escape(value)}"'
+                f'{_flag("selected", value == selected)}>{escape(text)}'
+                f'</option>'
+                for value, text in options
+            )
+            return (f'<label for="{control}">{label}</label>'
+                    f'<select id="{control}" name="{control}"{disabled}>'
+                    f'{opts}</select>')
+
+        text_input = (
+            f'<input type="text" id="{control}" name="{control}" '
+            f'value="{escape(_first(state, control))}"{disabled}'
+        )
+        after_label = _XPATH_AFTER_LABEL.match(spec.xpath or "")
+        if after_label or kind == InputType.DATE:
+            text = escape(after_label["label"]) if after_label else label
+            return (f'<label for="{control}">{text}</label>'
+                    f'<span class="rich-calendar">{text_input} '
+                    f'class="rich-calendar-input date"/></span>')
+        if name in self._cards:
+            # Campo dependente exibido em um card (``fill_field_in_card``)
+            return (f'<fieldset><legend>{label}</legend>'
+                    f'<label for="{control}">Ano:</label>{text_input}/>'
+                    f'</fieldset>')
+        return f'<label for="{control}">{label}</label>{text_input}/>'
+
+    def _cirurgias(self, state: State, enabled: bool) -> str:
+        disabled = _flag("disabled", not enabled)
+        rows = []
+        for name in self.fields:
+            if not (name.startswith("ano_") and name.endswith("_direita")
+                    and "radioterapia" not in name):
+                continue
+            esquerda = name[:-len("direita")] + "esquerda"
+            # Mesmo label usado por ``_preencher_ano_cirurgia``
+            label = re.sub(r"\s*\(.*?\)\s*", "", self.fields[name].label)
+            inputs = [
+                f'<div><input type="text" name="frm:{n}" '
+                f'value="{escape(_first(state, f"frm:{n}"))}"{disabled}/>'
+                f'</div>'
+                for n in (name, esquerda)
+            ]
+            rows.append(f'<div class="linha">{inputs[0]}'
+                        f'<div><label>{escape(label)}</label></div>'
+                        f'{inputs[1]}</div>')
+        return (f'<fieldset><legend>OPÇÕES DE CIRURGIA</legend>'
+                f'{"".join(rows)}</fieldset>')
+
+    def campos(
+        self, names, state: State, enabled: bool | set[str] = True
+    ) -> str:
+        """
+        Campos em sequência, cada controle seguido da região dos seus
+        dependentes; fieldsets da mesma mama ficam no mesmo div.
+        """
+        parts = []
+        for div, group in groupby(names, key=self._div):
+            html = "".join(
+                self.campo(n, state, on) + self.painel(n, state, on)
+                for n in group
+                for on in [enabled if isinstance(enabled, bool)
+                           else n in enabled]
+            )
+            parts.append(f'<div id="{div}">{html}</div>' if div else html)
+        return "".join(parts)
+
+    def painel(self, controle: str, state: State, enabled: bool = True) -> str:
+        """
+        Região re-renderizada pelo handler AJAX de um controle, com os
+        campos dependentes habilitados conforme o valor marcado.
+        """
+        if controle not in self.dependentes:
+            return ""
+        values = state.get(self.control_name(controle), []) if enabled else []
+        todos = list(dict.fromkeys(
+            name for names in self.dependentes[controle].values()
+            for name in names
+        ))
+        ativos = {
+            name for value in values
+            for name in self.dependentes[controle].get(value, ())
+        }
+        return (f'<div id="{painel_id(controle)}">'
+                f'{self.campos(todos, state, ativos)}</div>')
+
+    # Telas -------------------------------------------------------------------
+
+    def _page(self, title: str, body: str, menu: str = "") -> str:
+        return (
+            f'<!DOCTYPE html><html><head><meta charset="utf-8"/>'
+            f'<title>SISCAN - {escape(title)}</title>'
+            f'<style>{_STYLE}</style><script>{_SCRIPT}</script></head>'
+            f'<body>{_STATUS}{menu}{body}</body></html>'
+        )
+
+    @staticmethod
+    def _view_state(token: str) -> str:
+        return f'<input type="hidden" name="{VIEW_STATE}" value="{token}"/>'
+
+    def _menu(self, token: str, action: str) -> str:
+        item = "menu:gerenciarExame"
+        return (
+            f'<form id="menu" name="menu" method="post" action="{action}">'
+            f'<input type="hidden" name="menu" value="menu"/>'
+            f'<div class="rich-ddmenu-label" id="menu:exame">'
+            f'<div class="rich-label-text-decor">EXAME</div>'
+            f'<div class="rich-menu-list-border"><div class="rich-menu-list-bg">'
+            f'<div class="rich-menu-item rich-menu-item-enabled" id="{item}" '
+            f'onclick="{jsfcljs("menu", item)}">'
+            f'<span class="rich-menu-item-label">GERENCIAR EXAME</span>'
+            f'</div></div></div></div>{self._view_state(token)}</form>'
+        )
+
+    def login(self, token: str, erro: str = "") -> str:
+        popup = (
+            f"<script>window.open('{POPUP}', 'informes', "
+            f"'width=600,height=400');</script>"
+            if self.config.notices else ""
+        )
+        body = (
+            f'<h1>SISCAN - Sistema de Informação do Câncer</h1>'
+            f'<form id="frm" name="frm" method="post" action="{LOGIN}">'
+            f'<input type="hidden" name="frm" value="frm"/>'
+            f'{mensagens([erro] if erro else [])}'
+            f'<label for="frm:email">E-mail:</label>'
+            f'<input type="text" id="frm:email" name="frm:email"/>'
+            f'<label for="frm:senha">Senha:</label>'
+            f'<input type="password" id="frm:senha" name="frm:senha"/>'
+            f'<input type="submit" id="frm:acessar" name="frm:acessar" '
+            f'value="Acessar"/>{self._view_state(token)}</form>{popup}'
+        )
+        return self._page("Login", body)
+
+    def popup(self) -> str:
+        rows = "".join(
+            f'<tr class="rich-table-row"><td>'
+            f'<p align="center"><b><span>{escape(data)}</span></b></p>'
+            f'<p>{escape(assunto)}</p><div id="divDesc">'
+            f'{"".join(f"<p>{escape(linha)}</p>" for linha in linhas)}'
+            f'</div></td></tr>'
+            for data, assunto, linhas in self.config.notices
+        )
+        return self._page(
+            "Mensagens Informativas",
+            f'<table id="listaMensagens"><tbody>{rows}</tbody></table>',
+        )
+
+    def home(self, token: str) -> str:
+        return self._page("Início", "<h1>SEJA BEM VINDO AO SISCAN</h1>",
+                          self._menu(token, HOME))
+
+    def gerenciar(self, token: str) -> str:
+        body = (
+            f'<h1>Gerenciar Exame</h1>'
+            f'<form id="frm" name="frm" method="post" action="{GERENCIAR}">'
+            f'<input type="hidden" name="frm" value="frm"/>'
+            f'<a href="#" id="frm:novoExame" class="form-button" '
+            f'onclick="{jsfcljs("frm", "frm:novoExame")}">Novo Exame</a>'
+            f'{self._view_state(token)}</form>'
+        )
+        return self._page("Gerenciar Exame", body,
+                          self._menu(token, GERENCIAR))
+
+    def novo_exame(self, token: str, state: State, erros=()) -> str:
+        paciente, erros_paciente = self.paciente(state)
+        body = (
+            f'<h1>Requisição de Exame</h1>'
+            f'<form id="frm" name="frm" method="post" action="{NOVO_EXAME}">'
+            f'<input type="hidden" name="frm" value="frm"/>'
+            f'{mensagens(list(erros) or erros_paciente)}'
+            f'{self.cartao(state)}{paciente}{self.pesquisa(state)}'
+            f'{self.campos(self._novo_exame, state)}'
+            f'<input type="submit" id="frm:avancar" name="frm:avancar" '
+            f'value="Avançar"/>{self._view_state(token)}</form>'
+        )
+        return self._page("Requisição de Exame", body,
+                          self._menu(token, NOVO_EXAME))
+
+    def mamografia(self, token: str, state: State) -> str:
+        nome = escape(_first(state, "frm:nome"))
+        body = (
+            f'<h1>Requisição de Mamografia</h1>'
+            f'<form id="frm" name="frm" method="post" action="{REQUISICAO}">'
+            f'<input type="hidden" name="frm" value="frm"/>'
+            f'{mensagens([])}<h2>Paciente: {nome}</h2>'
+            f'{self.campos(CAMPOS_MAMOGRAFIA, {})}'
+            f'<input type="submit" id="frm:salvar" name="frm:salvar" '
+            f'value="Salvar"/>{self._view_state(token)}</form>'
+        )
+        return self._page("Requisição de Mamografia", body,
+                          self._menu(token, REQUISICAO))
+
+    # Regiões do formulário de novo exame ------------------------------------
+
+    def cartao(self, state: State) -> str:
+        spec = self.fields["cartao_sus"]
+        blur = a4j(f"{A4J_PREFIX}cartao_sus", NOVO_EXAME)
+        abrir = a4j(f"{A4J_PREFIX}pesquisa_abrir", NOVO_EXAME)
+        return (
+            f'<div id="frm:cartao">'
+            f'<label for="frm:cartaoSus">{escape(spec.label)}</label>'
+            f'<input type="text" id="frm:cartaoSus" name="frm:cartaoSus" '
+            f'maxlength="15" value="{escape(_first(state, "frm:cartaoSus"))}" '
+            f'onblur="{blur}"/><a href="#" title="Pesquisar Paciente" '
+            f'onclick="{abrir}return false;"><img alt="Pesquisar"/></a></div>'
+        )
+
+    def paciente(self, state: State) -> tuple[str, list[str]]:
+        """
+        Região com os dados (somente leitura) do paciente do Cartão SUS
+        informado e as mensagens de erro da busca.
+        """
+        cartao = _first(state, "frm:cartaoSus").strip()
+        dados, erros = {}, []
+        if cartao:
+            dados = self.config.paciente(cartao) or {}
+            if not dados:
+                erros.append("Cartão SUS não encontrado na base do CADSUS.")
+        html = "".join(
+            f'<label for="frm:{name}">{escape(self.fields[name].label)}'
+            f'</label><input type="text" id="frm:{name}" name="frm:{name}" '
+            f'value="{escape(dados.get(name, ""))}" readonly="readonly"/>'
+            for name in CAMPOS_PACIENTE
+        )
+        return f'<div id="frm:paciente">{html}</div>', erros
+
+    def pesquisa(self, state: State, modo: str = "") -> str:
+        """
+        Painel de pesquisa de paciente: fechado, aberto ou com a tabela de
+        resultados ``frm:listaPaciente``.
+        """
+        if not modo:
+            return '<div id="frm:pesquisa"></div>'
+        campos = "".join(
+            f'<label for="frm:pesquisa_{n}">{escape(self.fields[n].label)}'
+            f'</label><input type="text" id="frm:pesquisa_{n}" '
+            f'name="frm:pesquisa_{n}" '
+            f'value="{escape(_first(state, f"frm:pesquisa_{n}"))}"/>'
+            for n in ("cpf", "nome", "nome_da_mae", "data_de_nascimento")
+        )
+        tabela = ""
+        if modo == "resultado":
+            linhas = "".join(
+                f'<tr class="rich-table-row"><td>{cartao}</td>'
+                f'<td>{escape(dados["nome"])}</td>'
+                f'<td>{escape(dados["data_de_nascimento"])}</td>'
+                f'<td><a href="#" title="Selecionar Paciente" onclick="'
+                f'{a4j(f"{A4J_PREFIX}selecionar", NOVO_EXAME, cartao=cartao)}'
+                f'return false;">Selecionar</a></td></tr>'
+                for cartao, dados in self.config.pesquisar(
+                    _first(state, "frm:pesquisa_nome"),
+                    _first(state, "frm:pesquisa_cpf"),
+                )
+            )
+            tabela = (f'<table id="frm:listaPaciente"><tbody>{linhas}'
+                      f'</tbody></table>')
+        pesquisar = a4j(f"{A4J_PREFIX}pesquisar", NOVO_EXAME)
+        return (
+            f'<div id="frm:pesquisa"><fieldset><legend>Pesquisar Paciente'
+            f'</legend>{campos}<input type="submit" id="frm:pesquisar" '
+            f'name="frm:pesquisar" value="Pesquisar" '
+            f'onclick="{pesquisar}return false;"/>{tabela}</fieldset></div>'
+        )
+
+
+def painel_id(controle: str) -> str:
+    return f"frm:{controle}Painel"
+
+
+def a4j(support: str, action: str, **parameters: str) -> str:
+    """Handler ``A4J.AJAX.Submit`` do formulário ``frm``."""
+    params = ",".join(
+        f"'{k}':'{v}'" for k, v in {support: support, **parameters}.items()
+    )
+    return (
+        f"A4J.AJAX.Submit('_viewRoot','frm',event,{{'similarityGroupingId':"
+        f"'{support}','parameters':{{{params}}},'actionUrl':'{action}'}});"
+    )
+
+
+def jsfcljs(form: str, parameter: str) -> str:
+    """Handler de submit com parâmetro (``commandLink`` do JSF)."""
+    return (
+        f"jsfcljs(document.getElementById('{form}'),"
+        f"{{'{parameter}':'{parameter}'}},'');return false;"
+    )
+
+
+def mensagens(erros: list[str]) -> str:
+    itens = "".join(
+        f'<span class="mensagem-erro">{escape(e)}</span>' for e in erros
+    )
+    return f'<div id="frm:mensagens">{itens}</div>'
+
+
+def ajax_response(regioes: list[tuple[str, str]], token: str) -> str:
+    """Resposta parcial do A4J: regiões re-renderizadas e o ViewState."""
+    ids = ",".join(uid for uid, _ in regioes)
+    body = "".join(html for _, html in regioes)
+    return (
+        f'<?xml version="1.0" encoding="UTF-8"?>'
+        f'<html xmlns="http://www.w3.org/1999/xhtml"><head>'
+        f'<meta name="Ajax-Update-Ids" content="{ids}"/></head><body>{body}'
+        f'<span id="ajax-view-state"><input type="hidden" '
+        f'name="{VIEW_STATE}" value="{token}"/></span></body></html>'
+    )
+
+
+def view_expired(view: str) -> str:
+    return (
+        f"<html><body><h1>Erro</h1><pre>"
+        f"javax.faces.application.ViewExpiredException: viewId:{view} - "
+        f"View {view} could not be restored.</pre></body></html>"
+    )
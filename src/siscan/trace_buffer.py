@@ -0,0 +1,201 @@
+import asyncio
+import logging
+import re
+import shutil
+import tempfile
+import uuid
+from collections import deque
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, AsyncIterator, Optional
+
+from playwright.async_api import BrowserContext
+
+from src.env import (
+    PLAYWRIGHT_TRACE,
+    PLAYWRIGHT_TRACE_CHUNKS,
+    PLAYWRIGHT_TRACE_DIR,
+)
+from src.siscan.exception import SiscanException
+from src.utils import log
+
+logger = logging.getLogger(__name__)
+
+
+def _slug(name: str) -> str:
+    return re.sub(r"[^\w.-]+", "_", name).strip("_") or "passo"
+
+
+class TraceBuffer:
+    """
+    Trace do Playwright de um job, gravado apenas quando ele falha.
+
+    O tracing (snapshots do DOM, sem screencast) fica ligado durante o job
+    e é dividido em um trecho (chunk) por passo (``WebPage.step``). Ao fim
+    de cada passo o trecho é fechado em um zip temporário e apenas os
+    últimos ``chunks`` trechos são mantidos. Se o job lançar uma
+    ``SiscanException``, os trechos mantidos vão para
+    ``<directory>/<job_id>`` (``playwright show-trace <zip>``); nos demais
+    casos são descartados.
+
+    A troca de trecho roda em segundo plano: o passo seguinte não espera o
+    zip ser escrito.
+
+    Exemplo:
+        traces = TraceBuffer()
+        await traces.attach(page.context)
+        async with traces.job():
+            traces.step("cartao_sus")
+            ...
+    """
+
+    def __init__(
+        self,
+        enabled: bool = PLAYWRIGHT_TRACE == "failure",
+        chunks: int = PLAYWRIGHT_TRACE_CHUNKS,
+        directory: str | Path = PLAYWRIGHT_TRACE_DIR,
+        job_id: Optional[str] = None,
+    ):
+        self.enabled = enabled and chunks > 0
+        self._directory = Path(directory)
+        self._job_id = job_id
+        # Trechos concluídos mantidos (o trecho atual também é gravado)
+        self._chunks: deque[Path] = deque(maxlen=max(chunks - 1, 0))
+        # ``BrowserContext.tracing`` enquanto o trace estiver ligado
+        self._tracing: Optional[Any] = None
+        self._tmp: Optional[Path] = None
+        self._current = "inicio"
+        self._index = 1
+        self._lock = asyncio.Lock()
+        self._pending: set[asyncio.Task] = set()
+        self.saved: list[Path] = []
+
+    @property
+    def active(self) -> bool:
+        return self._tracing is not None
+
+    @property
+    def job_id(self) -> str:
+        if self._job_id is None:
+            job = log.current_job()
+            self._job_id = job.job_id if job else uuid.uuid4().hex[:12]
+        return self._job_id
+
+    async def attach(self, context: BrowserContext) -> None:
+        """Liga o tracing no contexto do job e abre o primeiro trecho."""
+        if not self.enabled or self._tracing is not None:
+            return
+        try:
+            await context.tracing.start(snapshots=True, screenshots=False)
+            await context.tracing.start_chunk(title=self._current)
+        except Exception as e:
+            logger.warning("Não foi possível iniciar o trace do job: %s", e)
+            return
+        self._tracing = context.tracing
+        self._tmp = Path(tempfile.mkdtemp(prefix="siscan-trace-"))
+
+    def step(self, name: str) -> None:
+        """Inicia o trecho do passo ``name`` (em segundo plano)."""
+        if self._tracing is None:
+            # Antes do navegador abrir: nomeia o primeiro trecho
+            self._current = name
+            return
+        task = asyncio.get_running_loop().create_task(self._rotate(name))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    def _chunk_path(self) -> Path:
+        return self._tmp / f"{self._index:02d}_{_slug(self._current)}.zip"
+
+    async def _rotate(self, name: str) -> None:
+        async with self._lock:
+            if self._tracing is None:
+                return
+            try:
+                if self._chunks.maxlen:
+                    path = self._chunk_path()
+                    await self._tracing.stop_chunk(path=str(path))
+                    if len(self._chunks) == self._chunks.maxlen:
+                        self._chunks[0].unlink(missing_ok=True)
+                    self._chunks.append(path)
+                else:
+                    await self._tracing.stop_chunk()
+                self._index += 1
+                self._current = name
+                await self._tracing.start_chunk(title=name)
+            except Exception as e:
+                # Contexto fechado ou tracing interrompido: segue sem trace
+                logger.debug("Trace do job interrompido: %s", e)
+                self._tracing = None
+
+    async def _settle(self) -> None:
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+
+    async def save(self) -> list[Path]:
+        """
+        Fecha o trecho atual e move os trechos mantidos para
+        ``<directory>/<job_id>``.
+
+        Retorno:
+            list[Path]: Arquivos zip do trace, do mais antigo ao atual.
+        """
+        await self._settle()
+        async with self._lock:
+            if self._tracing is None:
+                return []
+            current = self._chunk_path()
+            await self._tracing.stop_chunk(path=str(current))
+            await self._stop()
+            chunks = [*self._chunks, current]
+            target = self._directory / self.job_id
+            self.saved = await asyncio.to_thread(self._move, chunks, target)
+            self._cleanup()
+        logger.info("Trace do Playwright salvo em: %s", target)
+        return list(self.saved)
+
+    @staticmethod
+    def _move(chunks: list[Path], target: Path) -> list[Path]:
+        target.mkdir(parents=True, exist_ok=True)
+        return [Path(shutil.move(str(c), target / c.name))
+                for c in chunks if c.exists()]
+
+    async def discard(self) -> None:
+        """Desliga o tracing sem gravar nada."""
+        await self._settle()
+        async with self._lock:
+            if self._tracing is not None:
+                await self._stop()
+            self._cleanup()
+
+    async def _stop(self) -> None:
+        tracing, self._tracing = self._tracing, None
+        try:
+            await tracing.stop()
+        except Exception as e:
+            logger.debug("Falha ao encerrar o trace do job: %s", e)
+
+    def _cleanup(self) -> None:
+        self._chunks.clear()
+        if self._tmp is not None:
+            shutil.rmtree(self._tmp, ignore_errors=True)
+            self._tmp = None
+
+    @asynccontextmanager
+    async def job(self) -> AsyncIterator["TraceBuffer"]:
+        """
+        Delimita o job: grava o trace se o bloco lançar uma
+        ``SiscanException`` e o descarta em qualquer outro desfecho.
+        """
+        try:
+            yield self
+        except SiscanException:
+            try:
+                await self.save()
+            except Exception as e:
+                # Não esconde a exceção original do job
+                logger.warning("Trace do job não gravado: %s", e)
+            raise
+        finally:
+            if self.active or self._tmp is not None:
+                await self.discard()
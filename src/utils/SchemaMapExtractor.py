@@ -1,25 +1,34 @@
+from functools import lru_cache
 from pathlib import Path
 
 from typing import Tuple, Dict, List, Optional, Union, Type
 
 from pydantic import BaseModel
+from src.utils.schema import FieldSpec, InputType
 from src.utils.validator import Validator
 
 
+@lru_cache(maxsize=None)
+def _model_schema(schema: Type[BaseModel]) -> dict:
+    # ``model_json_schema`` é caro nos schemas grandes (diagnóstica):
+    # calculado uma única vez por classe
+    return getattr(schema, "__schema__", None) or schema.model_json_schema()
+
+
 class SchemaMapExtractor:
     @classmethod
     def schema_to_maps(
         cls,
         schema: Union[str, Path, Type[BaseModel]],
         fields: Optional[List[str]] = None,
-    ) -> Tuple[Dict[str, dict], Dict[str, dict]]:
+    ) -> Tuple[Dict[str, FieldSpec], Dict[str, dict]]:
         map_data_label = {}
         fields_map = {}
 
         if isinstance(schema, (str, Path)):
             schema_dict = Validator.load_json(schema)
         elif isinstance(schema, type) and issubclass(schema, BaseModel):
-            schema_dict = getattr(schema, "__schema__", schema.model_json_schema())
+            schema_dict = _model_schema(schema)
         else:
             raise TypeError("schema must be a path or BaseModel class")
 
@@ -37,8 +46,8 @@ class SchemaMapExtractor:
                 field, required_fields
             )
             x_xpath = SchemaMapExtractor._infer_input_xpath(field_schema)
-            map_data_label[field] = SchemaMapExtractor.make_field_dict(
-                label, input_type, requirement, x_xpath
+            map_data_label[field] = SchemaMapExtractor.make_field_spec(
+                field, label, input_type, requirement, x_xpath
             )
             fm = SchemaMapExtractor._extract_fields_map(field_schema)
             if fm:
@@ -85,15 +94,11 @@ class SchemaMapExtractor:
         return None
 
     @classmethod
-    def make_field_dict(
+    def make_field_spec(
             cls,
+            name: str,
             label: str,
-            input_type: str,
+            input_type: str | InputType,
             requirement: bool,
-            xpath: str | None = "") -> dict:
-        return {
-            "label": label,
-            "input_type": input_type,
-            "required": requirement,
-            "xpath": xpath
-        }
\ No newline at end of file
+            xpath: str | None = "") -> FieldSpec:
+        return FieldSpec(name, label, input_type, requirement, xpath or "")
\ No newline at end of file
@@ -0,0 +1,197 @@
+import logging
+from typing import Optional
+
+from playwright.async_api import Page
+
+logger = logging.getLogger(__name__)
+
+# Cada leitura abaixo percorre a estrutura inteira dentro do navegador e
+# devolve o resultado como JSON em um único ``page.evaluate``, em vez de um
+# round trip por elemento (count/nth/get_attribute/inner_text). Um select
+# com centenas de unidades CNES é lido em uma chamada.
+
+# Funções auxiliares injetadas em todas as leituras
+_PRELUDE = """
+const byXPath = (xpath) => document.evaluate(
+    xpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null
+).singleNodeValue;
+const text = (el) => (el ? (el.innerText || el.textContent || '') : '').trim();
+const labelOf = (input) => {
+    let label = null;
+    if (input.id) {
+        label = document.querySelector(`label[for="${CSS.escape(input.id)}"]`);
+    }
+    label = label || input.closest('label');
+    return text(label) || input.getAttribute('value');
+};
+"""
+
+_SELECT_OPTIONS = """(a) => {
+    const el = byXPath(a.xpath);
+    if (!el) return null;
+    return Array.from(el.querySelectorAll('option'))
+        .map((o) => [o.getAttribute('value'), text(o)]);
+}"""
+
+_SELECTED_OPTION = """(a) => {
+    const el = byXPath(a.xpath);
+    const option = el && el.querySelector('option:checked');
+    return option ? [text(option), option.getAttribute('value')] : null;
+}"""
+
+_CHECKED_INPUTS = """(a) => {
+    const el = byXPath(a.xpath);
+    if (!el) return null;
+    const selector = `input[type='${a.type}']`;
+    const inputs = el.matches(selector)
+        ? [el] : Array.from(el.querySelectorAll(selector));
+    if (!inputs.length) return null;
+    return inputs.filter((i) => i.checked)
+        .map((i) => [labelOf(i), i.getAttribute('value')]);
+}"""
+
+_TABLE_ROWS = """(a) => {
+    const table = document.querySelector(a.selector);
+    if (!table) return null;
+    const rows = table.tBodies.length
+        ? Array.from(table.tBodies).flatMap((b) => Array.from(b.rows))
+        : Array.from(table.rows);
+    return rows.map((r) => Array.from(r.cells).map(text));
+}"""
+
+_TEXTS = """(a) => a.selectors.flatMap(
+    (s) => Array.from(document.querySelectorAll(s)).map(text)
+).filter((t) => t)"""
+
+_LABELED_VALUES = """(a) => {
+    const norm = (s) => (s || '').replace(/[\\s:*]+/g, ' ').trim()
+        .toUpperCase();
+    const labels = Array.from(document.querySelectorAll('label[for]'));
+    const values = {};
+    for (const wanted of a.labels) {
+        const label = labels.find((l) => norm(text(l)) === norm(wanted));
+        const el = label && document.getElementById(label.htmlFor);
+        if (!el) continue;
+        if (el.tagName === 'SELECT') {
+            values[wanted] = text(el.querySelector('option:checked'));
+        } else {
+            values[wanted] = (el.value || '').trim();
+        }
+    }
+    return values;
+}"""
+
+_INFORMATION_NOTICES = """() => {
+    const rows = document.querySelectorAll(
+        'table#listaMensagens tr.rich-table-row');
+    const notices = [];
+    for (const tr of rows) {
+        const date = tr.querySelector('p[align="center"] > b > span');
+        if (!date) continue;
+        const ps = tr.querySelectorAll('p');
+        notices.push({
+            date: text(date),
+            subject: text(ps[1]),
+            lines: Array.from(tr.querySelectorAll('div#divDesc p'))
+                .map(text).filter((t) => t),
+        });
+    }
+    return notices;
+}"""
+
+
+async def _evaluate(page: Page, script: str, arg: Optional[dict] = None):
+    return await page.evaluate(
+        f"(a) => {{ {_PRELUDE} return ({script})(a); }}", arg
+    )
+
+
+async def select_options(page: Page, xpath: str) -> dict[str, str]:
+    """
+    Lê todas as opções de um <select>.
+
+    Retorno
+    -------
+    dict[str, str]
+        ``{value: texto_opcao}`` na ordem do documento. Vazio se o
+        elemento não existir.
+    """
+    options = await _evaluate(page, _SELECT_OPTIONS, {"xpath": xpath})
+    return {value: label for value, label in (options or [])}
+
+
+async def selected_option(
+    page: Page, xpath: str
+) -> tuple[Optional[str], Optional[str]]:
+    """Retorna ``(texto, value)`` da opção selecionada de um <select>."""
+    selected = await _evaluate(page, _SELECTED_OPTION, {"xpath": xpath})
+    return tuple(selected) if selected else (None, None)
+
+
+async def checked_inputs(
+    page: Page, xpath: str, input_type: str = "checkbox"
+) -> Optional[list[tuple[str, str]]]:
+    """
+    Lê os checkboxes ou radios marcados de um elemento (o próprio input ou
+    um contêiner).
+
+    O texto de cada item é o do ``label[for=id]``, do ``label`` ancestral
+    ou, na falta de ambos, o próprio value.
+
+    Retorno
+    -------
+    list[tuple[str, str]] ou None
+        ``[(texto, value), ...]`` dos itens marcados, ou None se não houver
+        inputs do tipo informado.
+    """
+    checked = await _evaluate(
+        page, _CHECKED_INPUTS, {"xpath": xpath, "type": input_type}
+    )
+    if checked is None:
+        return None
+    return [tuple(item) for item in checked]
+
+
+async def table_rows(page: Page, selector: str) -> Optional[list[list[str]]]:
+    """
+    Lê o texto de todas as células das linhas do corpo de uma tabela.
+
+    Retorno
+    -------
+    list[list[str]] ou None
+        Uma lista de células por linha, ou None se a tabela não existir.
+    """
+    return await _evaluate(page, _TABLE_ROWS, {"selector": selector})
+
+
+async def texts(page: Page, selectors: list[str]) -> list[str]:
+    """
+    Retorna os textos não vazios de todos os elementos que correspondem aos
+    seletores CSS, na ordem dos seletores.
+    """
+    return await _evaluate(page, _TEXTS, {"selectors": selectors})
+
+
+async def labeled_values(page: Page, labels: list[str]) -> dict[str, str]:
+    """
+    Lê o valor dos campos (inputs ou texto da opção selecionada) associados
+    aos labels informados.
+
+    Retorno
+    -------
+    dict[str, str]
+        ``{label: valor}`` dos labels encontrados na página.
+    """
+    return await _evaluate(page, _LABELED_VALUES, {"labels": labels}) or {}
+
+
+async def information_notices(page: Page) -> list[dict]:
+    """
+    Lê os informes da popup de mensagens informativas do SIScan.
+
+    Retorno
+    -------
+    list[dict]
+        ``[{"date": str, "subject": str, "lines": [str, ...]}, ...]``
+    """
+    return await _evaluate(page, _INFORMATION_NOTICES)
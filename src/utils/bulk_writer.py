@@ -0,0 +1,275 @@
+import logging
+from dataclasses import dataclass
+from typing import Any, Optional, TYPE_CHECKING
+
+from playwright.async_api import Page
+
+from src.env import DEFAULT_TIMEOUT
+from src.siscan.exception import SiscanTimeoutError
+from src.utils.schema import InputType
+from src.utils.xpath_constructor import XPathConstructor
+
+if TYPE_CHECKING:
+    from src.siscan.readiness import AjaxReadinessTracker
+
+logger = logging.getLogger(__name__)
+
+# Aplica, em uma única chamada ao navegador, os campos informados na ordem
+# recebida, disparando os eventos que um usuário dispararia (input, change,
+# blur/click). A aplicação para no primeiro campo cujo elemento dispara uma
+# requisição AJAX do JSF (handler inline do A4J/RichFaces): esse campo forma
+# uma fase própria, e os campos seguintes só são aplicados depois que a
+# página reflete a resposta, pois podem depender dela (ex.: um checkbox que
+# habilita os subcampos de um grupo).
+_APPLY = """(a) => {
+    const byXPath = (xpath) => document.evaluate(
+        xpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null
+    ).singleNodeValue;
+    const AJAX = /A4J\\.AJAX|RichFaces\\.ajax|jsf\\.ajax/;
+    const HANDLERS = ['onchange', 'onclick', 'onblur', 'onkeyup', 'oninput'];
+    const isAjax = (els) => els.some((e) => HANDLERS.some(
+        (h) => AJAX.test(e.getAttribute(h) || '')));
+    const fire = (el, type) => el.dispatchEvent(
+        new Event(type, {bubbles: type !== 'blur'}));
+    const inputsOf = (el, type) => el.matches(`input[type='${type}']`)
+        ? [el] : Array.from(el.querySelectorAll(`input[type='${type}']`));
+
+    const apply = (f, el, targets) => {
+        if (f.type === 'checkbox') {
+            if (!targets.length) return 'not_found';
+            const values = Array.isArray(f.value) ? f.value.map(String) : [];
+            for (const input of targets) {
+                const wanted = typeof f.value === 'boolean'
+                    ? f.value : values.includes(input.value);
+                if (input.checked !== wanted) input.click();
+            }
+        } else if (f.type === 'radio') {
+            const radio = targets.find((r) => r.value === String(f.value));
+            if (!radio) return 'option_not_found';
+            if (radio.disabled) return 'disabled';
+            if (!radio.checked) radio.click();
+        } else if (el.tagName === 'SELECT') {
+            const value = String(f.value);
+            if (!Array.from(el.options).some((o) => o.value === value)) {
+                return 'option_not_found';
+            }
+            if (el.disabled) return 'disabled';
+            el.value = value;
+            fire(el, 'change');
+        } else {
+            if (el.disabled || el.readOnly) return 'disabled';
+            el.focus();
+            el.value = String(f.value);
+            fire(el, 'input');
+            fire(el, 'change');
+            fire(el, 'blur');
+        }
+        return null;
+    };
+
+    const results = [];
+    for (const [index, f] of a.fields.entries()) {
+        const el = byXPath(f.xpath);
+        const targets = !el ? [] : (f.type === 'checkbox' || f.type === 'radio')
+            ? inputsOf(el, f.type) : [el];
+        const ajax = isAjax(targets);
+        if (ajax && !(a.force && index === 0)) {
+            // Fase própria: devolve o controle antes de aplicar o campo
+            return {results, stopped: f.name};
+        }
+        const error = el ? apply(f, el, targets) : 'not_found';
+        results.push({name: f.name, ok: !error, ajax, error});
+        if (ajax) {
+            // Os campos seguintes aguardam a resposta AJAX
+            break;
+        }
+    }
+    return {results, stopped: null};
+}"""
+
+
+@dataclass(frozen=True)
+class FieldWrite:
+    """Campo a ser preenchido pelo ``BulkFormWriter``."""
+
+    name: str
+    xpath: str
+    input_type: InputType
+    # Para checkbox: lista de values a marcar, ou bool para marcar/desmarcar
+    # todos os checkboxes do elemento
+    value: Any
+    # Label do campo, usado pelo motor HTTP quando não há XPath fixo
+    label: str = ""
+
+    def __post_init__(self):
+        if not isinstance(self.input_type, InputType):
+            object.__setattr__(
+                self, "input_type", InputType[str(self.input_type).upper()]
+            )
+
+
+@dataclass
+class FieldWriteResult:
+    """Resultado do preenchimento de um campo."""
+
+    name: str
+    ok: bool
+    # O campo dispara AJAX e foi aplicado em uma fase própria
+    ajax: bool = False
+    error: Optional[str] = None
+    # O campo foi preenchido individualmente, via ``XPathConstructor``
+    fallback: bool = False
+
+
+class BulkFormWriter:
+    """
+    Preenche vários campos de formulário com poucas chamadas ao navegador.
+
+    Os campos que não disparam AJAX são aplicados em lote, em uma única
+    chamada ao navegador. Cada campo que dispara uma requisição AJAX do JSF
+    forma uma fase própria: é aplicado isoladamente e a escrita só continua
+    depois que a página fica pronta (``AjaxReadinessTracker``). Campos que
+    não puderam ser aplicados no lote (elemento ausente, opção ainda não
+    carregada, campo desabilitado) são preenchidos individualmente pelo
+    ``XPathConstructor``, que aguarda o elemento e relança os erros.
+
+    Exemplo
+    -------
+    ```python
+    writer = BulkFormWriter(page, context, context.readiness)
+    results = await writer.write([
+        FieldWrite("num_prontuario", "//input[@id='frm:prontuario']",
+                   InputType.TEXT, "123"),
+        FieldWrite("tipo", "//select[@id='frm:tipo']", InputType.SELECT, "1"),
+    ])
+    ```
+    """
+
+    # Erros do lote que podem ser resolvidos aguardando o elemento
+    RECOVERABLE_ERRORS = ("not_found", "option_not_found", "disabled")
+
+    def __init__(
+        self,
+        page: Page,
+        context=None,
+        readiness: Optional["AjaxReadinessTracker"] = None,
+        timeout: float = DEFAULT_TIMEOUT,
+    ):
+        self._page = page
+        self._context = context
+        self._readiness = readiness
+        self._timeout = timeout
+        # Quantidade de chamadas ao navegador feitas pelos lotes
+        self.batches = 0
+
+    @staticmethod
+    def _payload(field: FieldWrite) -> dict:
+        value = field.value
+        if field.input_type == InputType.CHECKBOX and not isinstance(
+            value, (list, bool)
+        ):
+            value = [value]
+        return {
+            "name": field.name,
+            "xpath": field.xpath,
+            "type": field.input_type.value,
+            "value": value,
+        }
+
+    async def _apply(self, fields: list[FieldWrite], force: bool = False):
+        self.batches += 1
+        return await self._page.evaluate(
+            _APPLY,
+            {"fields": [self._payload(f) for f in fields], "force": force},
+        )
+
+    async def _fill_one(self, field: FieldWrite) -> None:
+        xpath = XPathConstructor(
+            self._page, None, self._context, xpath=field.xpath
+        )
+        if isinstance(field.value, bool):
+            # Checkbox único: marca ou desmarca o próprio elemento
+            locator = await xpath.wait_and_get(self._timeout)
+            if field.value:
+                await locator.check(force=True)
+            else:
+                await locator.uncheck(force=True)
+            return
+        await xpath.handle_fill(field.value, field.input_type, self._timeout)
+
+    async def _wait_ready(self, field: FieldWrite) -> None:
+        if self._readiness is None or not self._readiness.attached:
+            return
+        if not await self._readiness.wait_ready(
+            self._timeout, step=f"ajax:{field.name}", force=True
+        ):
+            raise SiscanTimeoutError(
+                self._context,
+                m=f"Página não ficou pronta após preencher o campo "
+                  f"'{field.name}'.",
+            )
+
+    async def write(self, fields: list[FieldWrite]) -> list[FieldWriteResult]:
+        """
+        Preenche os campos na ordem informada.
+
+        Retorno
+        -------
+        list[FieldWriteResult]
+            Resultado por campo, na ordem de ``fields``.
+
+        Exceções
+        --------
+        SiscanException
+            Propagada do ``XPathConstructor`` quando um campo não pode ser
+            preenchido nem individualmente.
+        """
+        results: list[FieldWriteResult] = []
+        pending = []
+        for field in fields:
+            if field.value is None:
+                logger.warning(
+                    "Valor vazio para o campo '%s'. Nenhum valor será "
+                    "preenchido.",
+                    field.name,
+                )
+                results.append(FieldWriteResult(field.name, False,
+                                                error="empty"))
+            else:
+                pending.append(field)
+
+        by_name = {f.name: f for f in pending}
+        force = False
+        while pending:
+            response = await self._apply(pending, force=force)
+            applied = response["results"]
+            for item in applied:
+                result = FieldWriteResult(
+                    item["name"], item["ok"], item["ajax"], item["error"]
+                )
+                field = by_name[item["name"]]
+                if not result.ok and result.error in self.RECOVERABLE_ERRORS:
+                    logger.debug(
+                        "Campo '%s' não aplicado em lote (%s). Preenchendo "
+                        "individualmente.",
+                        field.name, result.error,
+                    )
+                    await self._fill_one(field)
+                    result.ok, result.fallback = True, True
+                    if result.ajax:
+                        await self._wait_ready(field)
+                elif result.ajax:
+                    await self._wait_ready(field)
+                results.append(result)
+
+            pending = pending[len(applied):]
+            # O próximo campo dispara AJAX: aplica-o isoladamente
+            force = response["stopped"] is not None
+
+        order = {f.name: i for i, f in enumerate(fields)}
+        results.sort(key=lambda r: order[r.name])
+        logger.debug(
+            "%s campos preenchidos em %s chamadas ao navegador.",
+            len(fields), self.batches,
+        )
+        return results
@@ -0,0 +1,209 @@
+import logging
+
+from playwright.async_api import Error, Page, TimeoutError
+
+from src.env import DOM_WAIT_POLLING
+from src.utils.wait import Deadline
+
+logger = logging.getLogger(__name__)
+
+# As condições abaixo são avaliadas no próprio navegador via
+# ``page.wait_for_function``. Com ``polling="mutation"`` a condição só é
+# reavaliada quando o DOM muda e a espera termina assim que ela se torna
+# verdadeira, com um único round trip, em vez de várias consultas
+# (count/is_visible/get_attribute) a cada ``ELAPSED_INTERVAL``.
+#
+# Os elementos são localizados por XPath a cada avaliação, de modo que a
+# espera continua válida quando o RichFaces substitui o elemento em uma
+# re-renderização AJAX.
+
+# Fator de conversão de segundos para milissegundos
+TIMEOUT_MS_FACTOR = 1000
+
+# Funções auxiliares injetadas em todas as condições
+_PRELUDE = """
+const byXPath = (xpath) => document.evaluate(
+    xpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null
+).singleNodeValue;
+const isVisible = (el) => {
+    if (!el) return false;
+    const style = window.getComputedStyle(el);
+    return style.visibility !== 'hidden' && style.display !== 'none'
+        && !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length);
+};
+"""
+
+_XPATH_PRESENT = "(a) => !!byXPath(a.xpath)"
+
+_ENABLED = """(a) => {
+    const el = byXPath(a.xpath);
+    return isVisible(el) && !el.disabled;
+}"""
+
+_OPTION_PRESENT = """(a) => {
+    const el = byXPath(a.xpath);
+    return !!el && Array.from(el.querySelectorAll('option'))
+        .some((o) => o.getAttribute('value') === a.value);
+}"""
+
+_MIN_OPTIONS = """(a) => {
+    const el = byXPath(a.xpath);
+    return !!el && el.querySelectorAll('option').length >= a.min;
+}"""
+
+_RADIO_READY = """(a) => {
+    const el = byXPath(a.xpath);
+    if (!el) return false;
+    return Array.from(el.querySelectorAll("input[type='radio']"))
+        .some((r) => r.getAttribute('value') === a.value
+            && (r.checked || !r.hasAttribute('disabled')));
+}"""
+
+_AJAX_IDLE = """() => {
+    const status = document.getElementById('_viewRoot:status');
+    return !status || !status.innerText.includes('Carregando');
+}"""
+
+
+def _script(condition: str) -> str:
+    return f"(a) => {{ {_PRELUDE} return ({condition})(a); }}"
+
+
+async def _wait_for_function(
+    page: Page,
+    condition: str,
+    arg: dict | None,
+    timeout: float,
+    recheck: float | None,
+) -> tuple[bool, object]:
+    """Retorna ``(satisfeita, JSHandle do valor)``."""
+    deadline = Deadline(timeout)
+    while True:
+        remaining = deadline.remaining
+        if recheck is not None:
+            remaining = min(remaining, recheck)
+        try:
+            handle = await page.wait_for_function(
+                _script(condition),
+                arg=arg,
+                polling=DOM_WAIT_POLLING,
+                # timeout=0 desabilitaria o limite no Playwright
+                timeout=max(1, remaining * TIMEOUT_MS_FACTOR),
+            )
+            return True, handle
+        except TimeoutError:
+            if recheck is None or deadline.expired:
+                return False, None
+            # Reavaliação periódica: uma mudança que não altera o DOM
+            # (ex.: ``document.readyState``) não reavalia a condição com
+            # ``polling="mutation"``
+        except Error as e:
+            # Uma navegação (ex.: submit JSF) destrói o contexto de execução
+            # durante a espera: reavalia a condição no novo documento.
+            if "context was destroyed" not in str(e) or deadline.expired:
+                raise
+            logger.debug("Contexto de execução recriado durante a espera.")
+
+
+async def wait_for_condition(
+    page: Page,
+    condition: str,
+    arg: dict | None = None,
+    timeout: float = 10,
+    recheck: float | None = None,
+) -> bool:
+    """
+    Aguarda, no navegador, até que ``condition`` retorne um valor verdadeiro.
+
+    Parâmetros
+    ----------
+    page : Page
+        Página do Playwright.
+    condition : str
+        Função JavaScript ``(a) => boolean``. As funções auxiliares
+        ``byXPath`` e ``isVisible`` estão disponíveis no escopo.
+    arg : dict, opcional
+        Argumento repassado à função.
+    timeout : float
+        Tempo máximo de espera, em segundos.
+    recheck : float, opcional
+        Intervalo, em segundos, em que a condição é reavaliada mesmo sem
+        mutações no DOM. Necessário quando ela depende de estado que não
+        está no DOM.
+
+    Retorno
+    -------
+    bool
+        True se a condição foi satisfeita, False se o tempo limite expirou.
+    """
+    ready, _ = await _wait_for_function(page, condition, arg, timeout,
+                                        recheck)
+    return ready
+
+
+async def wait_for_value(
+    page: Page,
+    condition: str,
+    arg: dict | None = None,
+    timeout: float = 10,
+    recheck: float | None = None,
+):
+    """
+    Igual a ``wait_for_condition``, mas retorna o valor (serializável em
+    JSON) que satisfez a condição, ou None se o tempo limite expirou.
+    """
+    ready, handle = await _wait_for_function(page, condition, arg, timeout,
+                                             recheck)
+    if not ready:
+        return None
+    return await handle.json_value()
+
+
+async def xpath_present(page: Page, xpath: str, timeout: float = 10) -> bool:
+    """Aguarda até que exista um elemento para ``xpath``."""
+    return await wait_for_condition(
+        page, _XPATH_PRESENT, {"xpath": xpath}, timeout
+    )
+
+
+async def element_enabled(page: Page, xpath: str, timeout: float = 10) -> bool:
+    """Aguarda até que o elemento esteja visível e habilitado."""
+    return await wait_for_condition(page, _ENABLED, {"xpath": xpath}, timeout)
+
+
+async def option_present(
+    page: Page, xpath: str, value: str, timeout: float = 10
+) -> bool:
+    """Aguarda até que o <select> possua uma opção com o ``value`` dado."""
+    return await wait_for_condition(
+        page, _OPTION_PRESENT, {"xpath": xpath, "value": value}, timeout
+    )
+
+
+async def min_options(
+    page: Page, xpath: str, minimum: int, timeout: float = 10
+) -> bool:
+    """Aguarda até que o <select> possua ao menos ``minimum`` opções."""
+    return await wait_for_condition(
+        page, _MIN_OPTIONS, {"xpath": xpath, "min": minimum}, timeout
+    )
+
+
+async def radio_ready(
+    page: Page, xpath: str, value: str, timeout: float = 10
+) -> bool:
+    """
+    Aguarda até que o grupo possua o radio com o ``value`` dado já marcado
+    ou habilitado para seleção.
+    """
+    return await wait_for_condition(
+        page, _RADIO_READY, {"xpath": xpath, "value": value}, timeout
+    )
+
+
+async def ajax_idle(page: Page, timeout: float = 10) -> bool:
+    """
+    Aguarda até que o status do RichFaces (``_viewRoot:status``) não exiba
+    mais "Carregando...".
+    """
+    return await wait_for_condition(page, _AJAX_IDLE, None, timeout)
@@ -0,0 +1,90 @@
+import logging
+from types import MappingProxyType
+from typing import Mapping, Type
+
+from pydantic import BaseModel
+
+from src.utils.SchemaMapExtractor import SchemaMapExtractor
+from src.utils.schema import FieldSpec
+
+logger = logging.getLogger(__name__)
+
+
+class FieldRegistry:
+    """
+    Metadados de campos de uma classe de página, compilados uma única vez
+    por (classe, schema).
+
+    Cada classe da hierarquia que declara ``MAP_SCHEMA_FIELDS`` contribui
+    com uma camada de campos extraída do schema; ``FIELD_OVERRIDES`` e
+    ``FIELDS_MAP`` declarados na própria classe substituem, no mapeamento
+    completo, os valores do schema. O resultado é imutável e compartilhado
+    entre todas as instâncias, de modo que criar uma página ou consultar um
+    campo não reprocessa o JSON Schema.
+
+    Exemplo
+    -------
+    ```python
+    registry = FieldRegistry.for_page(RequisicaoExameMamografia,
+                                      RequisicaoMamografiaSchema)
+    registry.fields["cartao_sus"].label  # 'Cartão SUS'
+    ```
+    """
+
+    _compiled: dict[tuple[type, Type[BaseModel]], "FieldRegistry"] = {}
+
+    def __init__(
+        self,
+        fields: Mapping[str, FieldSpec],
+        layers: Mapping[type, Mapping[str, FieldSpec]],
+        options: Mapping[str, Mapping[str, str]],
+    ):
+        self.fields = MappingProxyType(dict(fields))
+        self.layers = MappingProxyType(dict(layers))
+        self.options = MappingProxyType(dict(options))
+
+    @classmethod
+    def for_page(
+        cls, page_class: type, schema_model: Type[BaseModel]
+    ) -> "FieldRegistry":
+        """Retorna o registro da classe, compilando-o no primeiro uso."""
+        key = (page_class, schema_model)
+        registry = cls._compiled.get(key)
+        if registry is None:
+            registry = cls._compile(page_class, schema_model)
+            cls._compiled[key] = registry
+        return registry
+
+    @classmethod
+    def _compile(
+        cls, page_class: type, schema_model: Type[BaseModel]
+    ) -> "FieldRegistry":
+        fields: dict[str, FieldSpec] = {}
+        layers: dict[type, Mapping[str, FieldSpec]] = {}
+        schema_options: dict[str, Mapping[str, str]] = {}
+        class_options: dict[str, Mapping[str, str]] = {}
+
+        # Da classe base para a mais específica
+        for klass in reversed(page_class.__mro__):
+            own = vars(klass)
+            if "MAP_SCHEMA_FIELDS" in own:
+                layer, options = SchemaMapExtractor.schema_to_maps(
+                    schema_model, fields=own["MAP_SCHEMA_FIELDS"]
+                )
+                layers[klass] = MappingProxyType(layer)
+                fields.update(layer)
+                for name, mapping in options.items():
+                    schema_options[name] = MappingProxyType(mapping)
+            fields.update(own.get("FIELD_OVERRIDES", {}))
+            for name, mapping in own.get("FIELDS_MAP", {}).items():
+                class_options[name] = MappingProxyType(dict(mapping))
+
+        logger.debug(
+            "Registro de campos de %s compilado: %s campos.",
+            page_class.__name__, len(fields),
+        )
+        return cls(fields, layers, {**schema_options, **class_options})
+
+    def layer(self, page_class: type) -> Mapping[str, FieldSpec]:
+        """Campos declarados por uma classe específica da hierarquia."""
+        return self.layers.get(page_class, MappingProxyType({}))
@@ -1,10 +1,17 @@
+import time
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 from typing import Any, Dict, Optional
 
 import jwt
 from playwright.async_api import async_playwright
 
-from src.env import PRODUCTION, TAKE_SCREENSHOT, private_key, public_key
+from src.env import PRODUCTION, private_key, public_key
+from src.siscan.browser_pool import browser_pool
+from src.siscan.patient_cache import patient_cache
+from src.siscan.trace_buffer import TraceBuffer
+from src.utils import log, metrics, tracing
+from src.utils.screenshots import ScreenshotRecorder
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.asymmetric import padding
 from fastapi.security import OAuth2PasswordBearer
@@ -59,36 +66,110 @@ def decode_access_token(token: str) -> Dict[str, Any]:
     return jwt.decode(token, public_key, algorithms=["RS256"])
 
 
-async def run_rpa(form_type, data):
-    """Executa o fluxo do RPA utilizando Playwright assíncrono."""
-    screenshots = []
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
-        page = await browser.new_page()
-        # TODO: implementar login no SISCAN usando CPF/senha de users db
-
-        # TODO: navegar até o formulário e preencher campos com 'data'
-        # Exemplo: page.handle_fill("input[name=campo1]",
-        """
-        req = RequisicaoExameMamografiaRastreio(
-            base_url=SISCAN_URL, user=SISCAN_USER, password=SISCAN_PASSWORD
+async def run_rpa(form_type, data, user_uuid: str | None = None):
+    """Executa o fluxo do RPA utilizando Playwright assíncrono.
+
+    Quando o pool de navegadores do processo está aquecido, o job recebe um
+    ``BrowserContext`` isolado em um Chromium já aberto; caso contrário, um
+    navegador é lançado apenas para este job.
+
+    A resposta inclui ``timings``: o resumo dos spans do job (tempo por
+    passo e os campos e esperas mais lentos), os mesmos exportados pelo
+    OpenTelemetry.
+
+    As mensagens de log do job levam o ``job_id`` (também retornado) e o
+    ``user_uuid``; as de DEBUG só são emitidas se o job falhar.
+
+    Os screenshots do job são gravados em ``SCREENSHOT_DIR/<job_id>``
+    conforme ``SCREENSHOT_MODE`` e listados em ``screenshots``. Se o job
+    lançar uma ``SiscanException``, o trace do Playwright dos últimos passos
+    é gravado em ``PLAYWRIGHT_TRACE_DIR/<job_id>``.
+
+    Jobs com um Cartão SUS que o ``patient_cache`` já registrou sem paciente
+    falham com ``CartaoSusNotFoundError`` antes de obter o navegador.
+    """
+    with log.job_logging(user_uuid=user_uuid, form_type=form_type) as job, \
+            tracing.collect() as spans, \
+            tracing.span("rpa.job", form_type=form_type, job_id=job.job_id), \
+            _job_metrics(form_type) as started:
+        # Cartão SUS sabidamente sem paciente: falha sem ocupar um navegador
+        patient_cache.check(data.get("cartao_sus"))
+        recorder = ScreenshotRecorder(job_id=job.job_id)
+        traces = TraceBuffer(job_id=job.job_id)
+        if browser_pool.ready:
+            async with browser_pool.context() as context:
+                page = await context.new_page()
+                started()
+                await traces.attach(context)
+                async with recorder.job(lambda: page), traces.job():
+                    await _executar_rpa(page, form_type, data, recorder)
+        else:
+            async with async_playwright() as p:
+                browser = await p.chromium.launch(headless=True)
+                page = await browser.new_page()
+                started()
+                await traces.attach(page.context)
+                async with recorder.job(lambda: page), traces.job():
+                    await _executar_rpa(page, form_type, data, recorder)
+                await browser.close()
+
+    return {"success": True, "job_id": job.job_id,
+            "screenshots": [str(path) for path in recorder.saved],
+            "timings": tracing.summarize(spans)}
+
+
+@contextmanager
+def _job_metrics(form_type: str):
+    """
+    Registra as métricas do job: resultado, duração e os gauges de jobs na
+    fila (aguardando navegador) e em execução. O bloco chama a função
+    recebida quando o job obtém a página.
+    """
+    queued = metrics.JOBS_QUEUED.labels(form_type)
+    in_flight = metrics.JOBS_IN_FLIGHT.labels(form_type)
+    running = False
+
+    def started():
+        nonlocal running
+        queued.dec()
+        in_flight.inc()
+        running = True
+
+    queued.inc()
+    start = time.perf_counter()
+    try:
+        yield started
+    except Exception as e:
+        metrics.JOBS.labels(form_type, "error").inc()
+        metrics.JOB_ERRORS.labels(form_type, type(e).__name__).inc()
+        raise
+    else:
+        metrics.JOBS.labels(form_type, "success").inc()
+    finally:
+        metrics.JOB_DURATION.labels(form_type).observe(
+            time.perf_counter() - start
         )
+        (in_flight if running else queued).dec()
 
-        req._context = SiscanBrowserContext(headless=headless)
 
-        await req.authenticate()
-        await req.preencher(json_data)
-        """
-        # informations = req.context.information_messages
-        if not PRODUCTION and TAKE_SCREENSHOT:
-            for i in range(1, 4):
-                path = f"static/tmp/{form_type}_step{i}.png"
-                await page.screenshot(path=path)
-                screenshots.append(path)
+async def _executar_rpa(page, form_type, data, screenshots) -> None:
+    # TODO: implementar login no SISCAN usando CPF/senha de users db
+
+    # TODO: navegar até o formulário e preencher campos com 'data'
+    # Exemplo: page.handle_fill("input[name=campo1]",
+    """
+    req = RequisicaoExameMamografiaRastreio(
+        base_url=SISCAN_URL, user=SISCAN_USER, password=SISCAN_PASSWORD
+    )
 
-        if PRODUCTION:
-            await page.click("button[type=submit]")
+    req._context = SiscanBrowserContext(headless=headless)
 
-        await browser.close()
+    await req.authenticate()
+    await req.preencher(json_data)
+    """
+    # informations = req.context.information_messages
+    for i in range(1, 4):
+        await screenshots.capture(page, f"{form_type}_step{i}")
 
-    return {"success": True, "screenshots": screenshots}
+    if PRODUCTION:
+        await page.click("button[type=submit]")
@@ -0,0 +1,152 @@
+import logging
+import re
+import unicodedata
+from typing import Optional, TYPE_CHECKING
+
+from playwright.async_api import Page
+
+from src.utils.schema import InputType
+
+if TYPE_CHECKING:
+    from src.siscan.readiness import AjaxReadinessTracker
+
+logger = logging.getLogger(__name__)
+
+# Lê, em uma única chamada, todos os labels com ``for`` que apontam para um
+# controle existente na página.
+_SCAN = """() => {
+    const entries = [];
+    for (const label of document.querySelectorAll('label[for]')) {
+        const el = document.getElementById(label.getAttribute('for'));
+        if (!el) continue;
+        const text = Array.from(label.childNodes)
+            .filter((n) => n.nodeType === Node.TEXT_NODE)
+            .map((n) => n.textContent).join(' ');
+        entries.push({
+            text,
+            id: el.id,
+            tag: el.tagName.toLowerCase(),
+            type: (el.getAttribute('type') || '').toLowerCase(),
+            cls: el.getAttribute('class') || '',
+        });
+    }
+    return entries;
+}"""
+
+# Tipos de <input> que não são campos de texto
+_NON_TEXT_INPUTS = ("checkbox", "radio", "hidden", "submit", "button", "image")
+
+
+def normalize_label(text: str) -> str:
+    """
+    Normaliza o texto de um label para comparação: remove acentos, ignora
+    maiúsculas/minúsculas, espaços repetidos e o ':' final.
+
+    Exemplo
+    -------
+    ```python
+    normalize_label("  Cartão SUS: ")  # 'cartao sus'
+    ```
+    """
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    text = re.sub(r"\s+", " ", text).strip().casefold()
+    return text.rstrip(":").strip()
+
+
+class LabelIndex:
+    """
+    Índice de labels da página: mapeia o texto normalizado de cada label
+    para o id, a tag e o tipo do controle associado (atributo ``for``).
+
+    O índice é montado com uma única leitura da página e reaproveitado nas
+    buscas seguintes, evitando um XPath por documento inteiro (e, para
+    selects, as consultas de ``count`` e ``for``) a cada campo. Ele é
+    descartado sempre que o ``AjaxReadinessTracker`` observa uma nova
+    requisição (navegação ou re-renderização AJAX do RichFaces) e
+    reconstruído na próxima busca. Buscas sem correspondência retornam None
+    para que o chamador use a estratégia de XPath atual.
+
+    Exemplo
+    -------
+    ```python
+    index = LabelIndex(context.readiness)
+    xpath = await index.resolve(page, "Cartão SUS:", InputType.TEXT)
+    ```
+    """
+
+    def __init__(self, readiness: Optional["AjaxReadinessTracker"] = None):
+        self._readiness = readiness
+        # texto normalizado -> controle; None quando o label é ambíguo
+        self._entries: dict[str, Optional[dict]] = {}
+        self._generation: Optional[int] = None
+
+        self.builds = 0
+        self.hits = 0
+        self.misses = 0
+
+    def invalidate(self) -> None:
+        """Descarta o índice atual."""
+        self._generation = None
+        self._entries = {}
+
+    @property
+    def _current_generation(self) -> int:
+        return self._readiness.generation if self._readiness else 0
+
+    @property
+    def is_stale(self) -> bool:
+        return self._generation != self._current_generation
+
+    async def build(self, page: Page) -> None:
+        """Lê os labels da página e reconstrói o índice."""
+        generation = self._current_generation
+        entries: dict[str, Optional[dict]] = {}
+        for entry in await page.evaluate(_SCAN):
+            key = normalize_label(entry["text"])
+            if not key:
+                continue
+            if key in entries and (
+                entries[key] is None or entries[key]["id"] != entry["id"]
+            ):
+                # Mesmo texto para controles diferentes: deixa para o XPath
+                entries[key] = None
+            else:
+                entries[key] = entry
+        self._entries = entries
+        self._generation = generation
+        self.builds += 1
+        logger.debug("Índice de labels montado com %s entradas.",
+                     len(entries))
+
+    @staticmethod
+    def _matches(entry: dict, input_type: InputType) -> bool:
+        tag, type_attr = entry["tag"], entry["type"]
+        if input_type in (InputType.SELECT, InputType.LIST):
+            return tag == "select"
+        if input_type == InputType.TEXTAREA:
+            return tag == "textarea"
+        if input_type == InputType.DATE:
+            cls = entry["cls"].lower()
+            return tag == "input" and ("date" in cls or "calendar" in cls)
+        if input_type in (InputType.TEXT, InputType.NUMBER, InputType.VALUE):
+            return tag == "input" and type_attr not in _NON_TEXT_INPUTS
+        # Checkbox e radio são localizados pelo contêiner (fieldset/tabela)
+        return False
+
+    async def resolve(
+        self, page: Page, label: str, input_type: InputType
+    ) -> Optional[str]:
+        """
+        Retorna o XPath do controle associado ao label, ou None se o label
+        não estiver no índice ou não corresponder ao tipo esperado.
+        """
+        if self.is_stale:
+            await self.build(page)
+
+        entry = self._entries.get(normalize_label(label))
+        if entry is None or not self._matches(entry, input_type):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return f"//{entry['tag']}[@id='{entry['id']}']"
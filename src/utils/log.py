@@ -0,0 +1,274 @@
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Iterator, Optional, TextIO
+
+LOG_FORMAT = (
+    "%(asctime)s [%(levelname)s] %(name)s [job=%(job_id)s]: %(message)s"
+)
+
+# Logger da aplicação: apenas as mensagens dele são guardadas por job
+APP_LOGGER = "src"
+
+
+@dataclass(frozen=True)
+class JobLogContext:
+    """Identificação do job anexada a cada mensagem de log emitida nele."""
+
+    job_id: str
+    user_uuid: str = "-"
+    form_type: str = "-"
+
+
+_job: ContextVar[Optional[JobLogContext]] = ContextVar(
+    "siscan_log_job", default=None
+)
+
+# Estado instalado por ``configure_logging``
+_listener: Optional[logging.handlers.QueueListener] = None
+_handlers: list[logging.Handler] = []
+_app_handlers: list[logging.Handler] = []
+_buffer: Optional["JobBufferHandler"] = None
+_previous_level: Optional[int] = None
+# Nível e propagação do logger da aplicação antes do buffer por job
+_previous_app: Optional[tuple[int, bool]] = None
+
+
+class ContextFilter(logging.Filter):
+    """
+    Anexa ``job_id``, ``user_uuid`` e ``form_type`` do job atual (ou "-"
+    fora de um job) ao registro. Roda na tarefa que emitiu a mensagem, antes
+    de o registro ir para a fila.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        job = _job.get()
+        if not hasattr(record, "job_id"):
+            record.job_id = job.job_id if job else "-"
+            record.user_uuid = job.user_uuid if job else "-"
+            record.form_type = job.form_type if job else "-"
+        return True
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Limita as mensagens de DEBUG repetidas a ``rate`` por segundo, por
+    logger e formato da mensagem (``record.msg``, ainda sem os argumentos).
+    Mensagens de INFO em diante sempre passam.
+
+    Parâmetros:
+        rate (int): Mensagens de DEBUG permitidas por segundo para cada
+            par (logger, formato). 0 desabilita o limite.
+    """
+
+    def __init__(self, rate: int):
+        super().__init__()
+        self.rate = rate
+        self.dropped = 0
+        self._window = 0
+        self._counts: dict[tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.rate <= 0 or record.levelno > logging.DEBUG:
+            return True
+        window = int(time.monotonic())
+        key = (record.name, str(record.msg))
+        with self._lock:
+            if window != self._window:
+                self._window = window
+                self._counts.clear()
+            count = self._counts.get(key, 0) + 1
+            self._counts[key] = count
+            if count > self.rate:
+                self.dropped += 1
+                return False
+        return True
+
+
+class JobBufferHandler(logging.Handler):
+    """
+    Guarda em memória as mensagens abaixo do nível de ``target`` emitidas
+    dentro de um job (as últimas ``capacity`` de cada job). Se o job falhar,
+    ``flush_job`` as reenvia para ``target``; se terminar bem, são
+    descartadas sem nunca terem sido formatadas.
+    """
+
+    def __init__(self, target: logging.Handler, capacity: int):
+        super().__init__(logging.DEBUG)
+        self.target = target
+        self.capacity = capacity
+        self._jobs: dict[str, deque[logging.LogRecord]] = {}
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if record.levelno >= self.target.level:
+            return  # já emitida pelo handler principal
+        buffer = self._jobs.get(getattr(record, "job_id", "-"))
+        if buffer is not None:
+            buffer.append(record)
+
+    def open_job(self, job_id: str) -> None:
+        self._jobs[job_id] = deque(maxlen=self.capacity)
+
+    def flush_job(self, job_id: str) -> int:
+        """Reenvia para ``target`` as mensagens guardadas do job."""
+        records = self._jobs.pop(job_id, ())
+        for record in records:
+            # Os filtros já rodaram quando a mensagem foi guardada
+            self.target.emit(record)
+        return len(records)
+
+    def discard_job(self, job_id: str) -> None:
+        self._jobs.pop(job_id, None)
+
+
+class RootForwardHandler(logging.Handler):
+    """
+    Repassa aos handlers do root as mensagens a partir de ``level`` de um
+    logger que não propaga. As demais (o DEBUG guardado por job) não chegam
+    a handlers de terceiros e não são formatadas.
+    """
+
+    def emit(self, record: logging.LogRecord) -> None:
+        logging.getLogger().handle(record)
+
+
+def configure_logging(
+    level: str | int = "INFO",
+    job_buffer: int = 0,
+    debug_rate: int = 0,
+    stream: Optional[TextIO] = None,
+) -> logging.handlers.QueueListener:
+    """
+    Configura o logging do serviço: as mensagens vão para uma fila
+    (``QueueHandler``) e são formatadas e escritas no ``stream`` (stderr,
+    por padrão) por uma thread (``QueueListener``), fora do loop de eventos.
+
+    Parâmetros:
+        level (str | int): Nível das mensagens emitidas diretamente.
+        job_buffer (int): Mensagens abaixo de ``level`` do logger da
+            aplicação (``APP_LOGGER``) guardadas por job para serem
+            emitidas se o job falhar (ver ``job_logging``). O root e as
+            bibliotecas (httpx, sqlalchemy, asyncio) ficam em ``level``.
+            0 desabilita o buffer.
+        debug_rate (int): Limite de mensagens de DEBUG repetidas por
+            segundo (ver ``RateLimitFilter``). 0 desabilita o limite.
+        stream (TextIO | None): Destino das mensagens.
+
+    Retorno:
+        QueueListener: A thread de escrita, já iniciada.
+    """
+    global _listener, _buffer, _previous_level, _previous_app
+    shutdown_logging()
+
+    level = logging.getLevelName(level) if isinstance(level, str) else level
+    output = logging.StreamHandler(stream or sys.stderr)
+    output.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    context = ContextFilter()
+    rate_limit = RateLimitFilter(debug_rate)
+    main = logging.handlers.QueueHandler(queue.SimpleQueue())
+    main.setLevel(level)
+    main.addFilter(context)
+    main.addFilter(rate_limit)
+    _handlers.append(main)
+
+    root = logging.getLogger()
+    _previous_level = root.level
+    root.setLevel(level)
+    for handler in _handlers:
+        root.addHandler(handler)
+
+    if job_buffer > 0 and level > logging.DEBUG:
+        # Apenas o logger da aplicação emite DEBUG: o buffer é o único
+        # destino abaixo de ``level``; o restante segue para o root
+        _buffer = JobBufferHandler(main, job_buffer)
+        _buffer.addFilter(context)
+        _buffer.addFilter(rate_limit)
+        forward = RootForwardHandler(level)
+        app = logging.getLogger(APP_LOGGER)
+        _previous_app = (app.level, app.propagate)
+        app.setLevel(logging.DEBUG)
+        app.propagate = False
+        app.addHandler(_buffer)
+        app.addHandler(forward)
+        _app_handlers.extend((_buffer, forward))
+
+    _listener = logging.handlers.QueueListener(
+        main.queue, output, respect_handler_level=False
+    )
+    _listener.start()
+    return _listener
+
+
+def shutdown_logging() -> None:
+    """Esvazia a fila, para a thread de escrita e remove os handlers."""
+    global _listener, _buffer, _previous_level, _previous_app
+    root = logging.getLogger()
+    for handler in _handlers:
+        root.removeHandler(handler)
+    _handlers.clear()
+    app = logging.getLogger(APP_LOGGER)
+    for handler in _app_handlers:
+        app.removeHandler(handler)
+    _app_handlers.clear()
+    if _previous_app is not None:
+        app_level, app.propagate = _previous_app
+        app.setLevel(app_level)
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.flush()
+    if _previous_level is not None:
+        root.setLevel(_previous_level)
+    _listener, _buffer, _previous_level = None, None, None
+    _previous_app = None
+
+
+def current_job() -> Optional[JobLogContext]:
+    """Contexto de log do job em execução na tarefa atual."""
+    return _job.get()
+
+
+@contextmanager
+def job_logging(
+    job_id: Optional[str] = None,
+    user_uuid: Optional[str] = None,
+    form_type: Optional[str] = None,
+) -> Iterator[JobLogContext]:
+    """
+    Identifica as mensagens de log emitidas no bloco com o job. Se o bloco
+    lançar uma exceção, as mensagens de DEBUG guardadas do job são emitidas
+    antes dela se propagar.
+
+    Exemplo:
+        with job_logging(user_uuid=uuid, form_type="laudo"):
+            await page.preencher(data)
+    """
+    job = JobLogContext(
+        job_id=job_id or uuid.uuid4().hex[:12],
+        user_uuid=user_uuid or "-",
+        form_type=form_type or "-",
+    )
+    buffer = _buffer
+    if buffer is not None:
+        buffer.open_job(job.job_id)
+    token = _job.set(job)
+    try:
+        yield job
+    except BaseException:
+        if buffer is not None:
+            buffer.flush_job(job.job_id)
+        raise
+    finally:
+        _job.reset(token)
+        if buffer is not None:
+            buffer.discard_job(job.job_id)
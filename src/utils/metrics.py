@@ -0,0 +1,142 @@
+import os
+from pathlib import Path
+
+from prometheus_client import Counter, Gauge, Histogram, REGISTRY
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+# Jobs do RPA -------------------------------------------------------------
+
+JOBS = Counter(
+    "siscan_rpa_jobs",
+    "Jobs do RPA concluídos, por tipo de formulário e resultado.",
+    ["form_type", "status"],
+)
+JOB_DURATION = Histogram(
+    "siscan_rpa_job_duration_seconds",
+    "Duração dos jobs do RPA, por tipo de formulário.",
+    ["form_type"],
+    buckets=(1, 2.5, 5, 10, 15, 20, 30, 45, 60, 90, 120, 180, 300),
+)
+JOBS_QUEUED = Gauge(
+    "siscan_rpa_jobs_queued",
+    "Jobs aguardando um navegador (contexto do pool ou lançamento).",
+    ["form_type"],
+)
+JOBS_IN_FLIGHT = Gauge(
+    "siscan_rpa_jobs_in_flight",
+    "Jobs em execução no navegador.",
+    ["form_type"],
+)
+JOB_ERRORS = Counter(
+    "siscan_rpa_job_errors",
+    "Jobs que falharam, por tipo de formulário e classe da exceção.",
+    ["form_type", "exception"],
+)
+
+# Falhas e novas tentativas ------------------------------------------------
+
+EXCEPTIONS = Counter(
+    "siscan_rpa_exceptions",
+    "Exceções do SIScan lançadas (ex.: SiscanTimeoutError, "
+    "XpathNotFoundError), inclusive as tratadas por novas tentativas.",
+    ["exception"],
+)
+RETRIES = Counter(
+    "siscan_rpa_retries",
+    "Novas tentativas feitas por ``retry``, pela exceção da tentativa "
+    "anterior.",
+    ["exception"],
+)
+
+
+def chromium_rss_bytes(pid: int | None = None) -> int:
+    """
+    Soma o RSS (bytes) dos processos Chromium descendentes do processo
+    ``pid`` (o atual, por padrão). Lido de ``/proc``; fora do Linux retorna
+    0.
+    """
+    proc = Path("/proc")
+    if not proc.is_dir():
+        return 0
+    pid = pid or os.getpid()
+    parents: dict[int, int] = {}
+    names: dict[int, str] = {}
+    for entry in proc.iterdir():
+        if not entry.name.isdigit():
+            continue
+        try:
+            stat = (entry / "stat").read_text()
+        except OSError:
+            continue
+        # "pid (comm) state ppid ...": o comm pode conter espaços
+        names[int(entry.name)] = stat[stat.index("(") + 1:stat.rindex(")")]
+        parents[int(entry.name)] = int(stat[stat.rindex(")") + 2:].split()[1])
+
+    def descends(p: int) -> bool:
+        seen = set()
+        while p and p not in seen:
+            seen.add(p)
+            p = parents.get(p, 0)
+            if p == pid:
+                return True
+        return False
+
+    total = 0
+    for p, name in names.items():
+        if "chrom" not in name.lower() and "headless" not in name.lower():
+            continue
+        if not descends(p):
+            continue
+        try:
+            for line in (proc / str(p) / "status").read_text().splitlines():
+                if line.startswith("VmRSS:"):
+                    total += int(line.split()[1]) * 1024
+                    break
+        except OSError:
+            continue
+    return total
+
+
+class RpaCollector:
+    """
+    Métricas lidas no momento da coleta: pool de navegadores, sessões do
+    SIScan (logins e reusos) e memória do Chromium.
+    """
+
+    def collect(self):
+        # Importados aqui: os módulos do SIScan dependem destas métricas
+        from src.siscan.browser_pool import browser_pool
+        from src.siscan.session_pool import session_manager
+
+        status = browser_pool.status()
+        for name, doc in (
+            ("size", "Quantidade desejada de navegadores no pool."),
+            ("warm", "Navegadores conectados e prontos para uso."),
+            ("in_use", "Contextos emprestados aos jobs."),
+        ):
+            yield GaugeMetricFamily(
+                f"siscan_rpa_browser_pool_{name}", doc, value=status[name]
+            )
+        yield CounterMetricFamily(
+            "siscan_rpa_browser_launches",
+            "Navegadores lançados pelo pool.",
+            value=status["launches"],
+        )
+        yield CounterMetricFamily(
+            "siscan_rpa_session_logins",
+            "Logins completos no SIScan.",
+            value=session_manager.logins,
+        )
+        yield CounterMetricFamily(
+            "siscan_rpa_session_reuses",
+            "Jobs que reaproveitaram uma sessão autenticada.",
+            value=session_manager.reuses,
+        )
+        yield GaugeMetricFamily(
+            "siscan_rpa_chromium_rss_bytes",
+            "Memória residente dos processos Chromium do serviço.",
+            value=chromium_rss_bytes(),
+        )
+
+
+REGISTRY.register(RpaCollector())
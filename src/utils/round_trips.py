@@ -0,0 +1,162 @@
+import functools
+import inspect
+import logging
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+from src.utils import tracing
+
+logger = logging.getLogger(__name__)
+
+# Classes da API assíncrona do Playwright cujos métodos assíncronos são
+# chamadas ao navegador (uma ida e volta pelo protocolo cada)
+_PLAYWRIGHT_CLASSES = (
+    "Page",
+    "Frame",
+    "Locator",
+    "ElementHandle",
+    "BrowserContext",
+    "Keyboard",
+    "Mouse",
+)
+
+_active: ContextVar[Optional["RoundTripCounter"]] = ContextVar(
+    "siscan_round_trips", default=None
+)
+_installed = False
+
+
+class RoundTripBudgetExceeded(AssertionError):
+    """Fluxo fez mais idas e voltas ao navegador/servidor que o orçamento."""
+
+
+class RoundTripCounter:
+    """
+    Conta as idas e voltas ao navegador (chamadas assíncronas de ``Page``,
+    ``Locator``, ...) e ao SIScan (requisições do ``JsfHttpEngine``) de um
+    job, por método, por passo (span ``step``) e por campo (atributo
+    ``field`` do span aberto).
+
+    Exemplo
+    -------
+    ```python
+    with round_trips.count() as counter:
+        await page.preencher(dados)
+    counter.check_budget(120)
+    print(counter.by_step)  # Counter({"campos_clinicos": 48, ...})
+    ```
+    """
+
+    def __init__(self):
+        self.total = 0
+        self.by_method: Counter[str] = Counter()
+        self.by_step: Counter[str] = Counter()
+        self.by_field: Counter[str] = Counter()
+
+    def record(self, method: str) -> None:
+        self.total += 1
+        self.by_method[method] += 1
+        step, field = _span_keys()
+        if step:
+            self.by_step[step] += 1
+        if field:
+            self.by_field[field] += 1
+
+    def summary(self) -> dict:
+        return {
+            "total": self.total,
+            "by_step": dict(self.by_step),
+            "by_field": dict(self.by_field.most_common()),
+            "by_method": dict(self.by_method.most_common()),
+        }
+
+    def check_budget(
+        self, budget: int, step: Optional[str] = None
+    ) -> None:
+        """
+        Lança ``RoundTripBudgetExceeded`` se o total (ou o do passo
+        ``step``) ultrapassar ``budget``.
+        """
+        used = self.by_step[step] if step else self.total
+        if used > budget:
+            where = f"passo '{step}'" if step else "fluxo"
+            raise RoundTripBudgetExceeded(
+                f"{where} fez {used} idas e voltas (orçamento: {budget}). "
+                f"Por passo: {dict(self.by_step)}; campos mais custosos: "
+                f"{self.by_field.most_common(5)}"
+            )
+
+
+def _span_keys() -> tuple[Optional[str], Optional[str]]:
+    # Passo e campo dos spans abertos (ver ``tracing.span``): o nome do
+    # campo no schema ou, sem ele, o label resolvido pelo XPathConstructor
+    step = field = label = None
+    record = tracing.current_span()
+    while record is not None:
+        field = field or record.attributes.get("field")
+        if record.name.startswith("xpath."):
+            label = label or record.attributes.get("label")
+        if step is None and record.name == "step":
+            step = record.attributes.get("step")
+        record = record.parent
+    return step, field or label
+
+
+def record(method: str) -> None:
+    """Registra uma ida e volta no contador ativo da tarefa, se houver."""
+    counter = _active.get()
+    if counter is not None:
+        counter.record(method)
+
+
+def _wrap(cls_name: str, name: str, fn):
+    method = f"{cls_name}.{name}"
+
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        counter = _active.get()
+        if counter is not None:
+            counter.record(method)
+        return await fn(*args, **kwargs)
+
+    wrapper.__round_trip__ = True
+    return wrapper
+
+
+def install() -> None:
+    """
+    Instrumenta os métodos assíncronos das classes do Playwright. Sem um
+    contador ativo (``count``), o custo por chamada é uma consulta a um
+    ``ContextVar``.
+    """
+    global _installed
+    if _installed:
+        return
+    from playwright import async_api
+
+    for cls_name in _PLAYWRIGHT_CLASSES:
+        cls = getattr(async_api, cls_name)
+        for name, fn in list(vars(cls).items()):
+            if (name.startswith("_") or not inspect.iscoroutinefunction(fn)
+                    or getattr(fn, "__round_trip__", False)):
+                continue
+            setattr(cls, name, _wrap(cls_name, name, fn))
+    _installed = True
+    logger.debug("Contagem de idas e voltas do Playwright instalada.")
+
+
+@contextmanager
+def count() -> Iterator[RoundTripCounter]:
+    """
+    Conta as idas e voltas feitas dentro do bloco (incluindo tarefas
+    criadas nele).
+    """
+    install()
+    counter = RoundTripCounter()
+    token = _active.set(counter)
+    try:
+        yield counter
+    finally:
+        _active.reset(token)
@@ -1,3 +1,4 @@
+from dataclasses import dataclass, replace
 from typing import List
 from pydantic import BaseModel, Field
 from enum import Enum
@@ -40,6 +41,25 @@ class InputType(Enum):
             raise ValueError(f"Tipo de input não suportado: {self.value}")
 
 
+@dataclass(frozen=True, slots=True)
+class FieldSpec:
+    """
+    Metadados imutáveis de um campo de formulário extraídos do schema:
+    label exibido na página, tipo de input, obrigatoriedade e XPath fixo
+    (``x-xpath``), se houver.
+    """
+
+    name: str
+    label: str
+    input_type: str | InputType = InputType.TEXT.value
+    required: bool = False
+    xpath: str = ""
+
+    def with_label(self, label: str) -> "FieldSpec":
+        """Retorna uma cópia do campo com outro label (ex.: com sufixo)."""
+        return replace(self, label=label)
+
+
 class LoginInput(BaseModel):
     """Modelo de entrada para login/cadastro de usuário."""
 
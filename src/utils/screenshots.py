@@ -0,0 +1,215 @@
+import asyncio
+import io
+import logging
+import random
+import re
+import time
+import uuid
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from enum import Enum
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Optional
+
+from src.env import (
+    SCREENSHOT_BUFFER,
+    SCREENSHOT_DIR,
+    SCREENSHOT_FORMAT,
+    SCREENSHOT_FULL_PAGE,
+    SCREENSHOT_MODE,
+    SCREENSHOT_QUALITY,
+    SCREENSHOT_SAMPLE_RATE,
+)
+from src.utils import log, tracing
+
+try:
+    from PIL import Image
+except ImportError:  # pragma: no cover - dependência opcional
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+
+class ScreenshotMode(str, Enum):
+    OFF = "off"
+    FAILURE = "failure"
+    SAMPLED = "sampled"
+    ALWAYS = "always"
+
+
+@dataclass
+class Capture:
+    """Screenshot já codificado, guardado em memória até ser gravado."""
+
+    index: int
+    name: str
+    data: bytes
+    extension: str
+    elapsed: float = 0.0
+
+    @property
+    def filename(self) -> str:
+        return f"{self.index:02d}_{self.name}.{self.extension}"
+
+
+def _encode_webp(png: bytes, quality: int) -> bytes:
+    with Image.open(io.BytesIO(png)) as image:
+        output = io.BytesIO()
+        image.save(output, format="WEBP", quality=quality)
+        return output.getvalue()
+
+
+def _slug(name: str) -> str:
+    name = re.sub(r"\.(png|jpe?g|webp)$", "", name, flags=re.IGNORECASE)
+    return re.sub(r"[^\w.-]+", "_", name).strip("_") or "screenshot"
+
+
+class ScreenshotRecorder:
+    """
+    Screenshots de um job. Cada captura é comprimida (JPEG pelo próprio
+    Chromium ou WebP re-codificado em uma thread) e guardada em um buffer
+    circular em memória com as últimas ``capacity`` capturas; só é gravada
+    em disco, em ``<directory>/<job_id>``, quando o modo pede:
+
+    - ``off``: nada é capturado;
+    - ``failure``: gravadas apenas se o job falhar (ver ``job``);
+    - ``sampled``: como ``failure``, mas uma fração ``sample_rate`` dos
+      jobs também grava as capturas ao terminar bem;
+    - ``always``: gravadas ao fim de todo job.
+
+    Exemplo:
+        recorder = ScreenshotRecorder()
+        async with recorder.job(lambda: page):
+            await recorder.capture(page, "login")
+    """
+
+    def __init__(
+        self,
+        mode: str | ScreenshotMode = SCREENSHOT_MODE,
+        job_id: Optional[str] = None,
+        capacity: int = SCREENSHOT_BUFFER,
+        image_format: str = SCREENSHOT_FORMAT,
+        quality: int = SCREENSHOT_QUALITY,
+        full_page: bool = SCREENSHOT_FULL_PAGE,
+        sample_rate: float = SCREENSHOT_SAMPLE_RATE,
+        directory: str | Path = SCREENSHOT_DIR,
+    ):
+        self.mode = ScreenshotMode(mode)
+        if job_id is None:
+            job = log.current_job()
+            job_id = job.job_id if job else uuid.uuid4().hex[:12]
+        self.job_id = job_id
+        if image_format == "webp" and Image is None:
+            logger.warning("Pillow não instalado: screenshots em JPEG.")
+            image_format = "jpeg"
+        self.image_format = image_format
+        self.quality = quality
+        self.full_page = full_page
+        self.directory = Path(directory) / job_id
+        # Decidido uma vez por job: o job inteiro é amostrado ou não
+        self.sampled = (
+            self.mode is ScreenshotMode.ALWAYS
+            or (self.mode is ScreenshotMode.SAMPLED
+                and random.random() < sample_rate)
+        )
+        self._buffer: deque[Capture] = deque(maxlen=max(capacity, 1))
+        self._pending: set[asyncio.Task] = set()
+        self._count = 0
+        self.saved: list[Path] = []
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode is not ScreenshotMode.OFF
+
+    @property
+    def captures(self) -> list[Capture]:
+        return list(self._buffer)
+
+    async def capture(
+        self, page, name: str, full_page: Optional[bool] = None
+    ) -> Optional[Capture]:
+        """
+        Captura a página. Só a captura em si (uma chamada ao navegador)
+        acontece aqui; a re-codificação em WebP roda em segundo plano.
+        """
+        if not self.enabled or page is None:
+            return None
+        full_page = self.full_page if full_page is None else full_page
+        self._count += 1
+        capture = Capture(self._count, _slug(name), b"",
+                          "webp" if self.image_format == "webp" else "jpg")
+        start = time.perf_counter()
+        with tracing.span("screenshot", screenshot=capture.name):
+            if self.image_format == "webp":
+                png = await page.screenshot(type="png", full_page=full_page)
+                task = asyncio.create_task(self._encode(capture, png))
+                self._pending.add(task)
+                task.add_done_callback(self._pending.discard)
+            else:
+                capture.data = await page.screenshot(
+                    type="jpeg", quality=self.quality, full_page=full_page
+                )
+        capture.elapsed = time.perf_counter() - start
+        self._buffer.append(capture)
+        return capture
+
+    async def _encode(self, capture: Capture, png: bytes) -> None:
+        capture.data = await asyncio.to_thread(
+            _encode_webp, png, self.quality
+        )
+
+    async def save(self) -> list[Path]:
+        """
+        Grava as capturas do buffer (ainda não gravadas) em
+        ``<directory>/<job_id>``, em uma thread.
+
+        Retorno:
+            list[Path]: Arquivos gravados pelo job até aqui.
+        """
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+        captures = [c for c in self._buffer if c.data]
+        self._buffer.clear()
+        if captures:
+            self.saved += await asyncio.to_thread(self._write, captures)
+            logger.info("%s screenshots salvos em: %s",
+                        len(captures), self.directory)
+        return list(self.saved)
+
+    def _write(self, captures: list[Capture]) -> list[Path]:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        paths = []
+        for capture in captures:
+            path = self.directory / capture.filename
+            path.write_bytes(capture.data)
+            paths.append(path)
+        return paths
+
+    @asynccontextmanager
+    async def job(
+        self, page_getter: Optional[Callable[[], Any]] = None
+    ) -> AsyncIterator["ScreenshotRecorder"]:
+        """
+        Delimita o job: se o bloco falhar, captura a página no estado da
+        falha (``page_getter`` retorna a página, ou None se não houver) e
+        grava o buffer; se terminar bem, grava apenas em jobs amostrados.
+        """
+        try:
+            yield self
+        except Exception:
+            if self.enabled:
+                try:
+                    page = page_getter() if page_getter else None
+                    if asyncio.iscoroutine(page):
+                        page = await page
+                    await self.capture(page, "falha")
+                    await self.save()
+                except Exception as e:
+                    # Não esconde a exceção original do job
+                    logger.warning("Screenshots da falha não gravados: %s", e)
+            raise
+        if self.sampled:
+            await self.save()
+        else:
+            self._buffer.clear()
@@ -0,0 +1,261 @@
+import asyncio
+import hashlib
+import logging
+import re
+from datetime import datetime, timedelta
+from typing import Optional
+from urllib.parse import urlsplit
+
+from playwright.async_api import Page
+from sqlalchemy.exc import SQLAlchemyError
+
+from src import env
+from src.env import SELECTOR_CACHE_ENABLED
+from src.models import SelectorCacheEntry
+from src.utils.label_index import normalize_label
+from src.utils.schema import InputType
+
+logger = logging.getLogger(__name__)
+
+# Assinatura estrutural dos formulários da página: tag, id, tipo e nome de
+# cada controle e o texto de cada label/legend. Valores e opções de select
+# ficam de fora, pois mudam a cada job sem alterar a estrutura.
+_SIGNATURE = """() => {
+    const parts = [];
+    const nodes = document.querySelectorAll(
+        'form input, form select, form textarea, form label, form legend'
+    );
+    for (const el of nodes) {
+        const tag = el.tagName.toLowerCase();
+        if (tag === 'label' || tag === 'legend') {
+            parts.push(tag + ':' + el.textContent.replace(/\\s+/g, ' ').trim());
+        } else {
+            parts.push([
+                tag, el.id, el.getAttribute('type') || '', el.name || ''
+            ].join('|'));
+        }
+    }
+    return parts.join('\\n');
+}"""
+
+# Converte o XPath resolvido em um seletor estável pelo id do elemento
+_STABLE = """(xpath) => {
+    const el = document.evaluate(
+        xpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null
+    ).singleNodeValue;
+    if (!el) return null;
+    return { tag: el.tagName.toLowerCase(), id: el.id || '' };
+}"""
+
+_ID_XPATH = re.compile(r"^//[\w-]+\[@id='[^']+'\]$")
+
+
+def page_key(url: str) -> str:
+    """
+    Normaliza a URL da página para uso como chave do cache, removendo
+    query string, fragmento e o ``;jsessionid`` do JSF.
+
+    Exemplo
+    -------
+    ```python
+    page_key("https://siscan/exame.jsf;jsessionid=AB12?x=1")
+    # 'https://siscan/exame.jsf'
+    ```
+    """
+    parts = urlsplit(url)
+    path = parts.path.split(";", 1)[0]
+    return f"{parts.scheme}://{parts.netloc}{path}"
+
+
+async def form_fingerprint(page: Page) -> str:
+    """Retorna o hash da estrutura dos formulários da página."""
+    signature = await page.evaluate(_SIGNATURE)
+    return hashlib.sha1(signature.encode("utf-8")).hexdigest()
+
+
+async def stable_selector(page: Page, xpath: str) -> Optional[str]:
+    """
+    Retorna um XPath pelo id do elemento localizado por ``xpath``. Se o
+    elemento não tiver id, devolve o próprio XPath; se não existir na
+    página, retorna None.
+    """
+    if _ID_XPATH.match(xpath):
+        return xpath
+    element = await page.evaluate(_STABLE, xpath)
+    if not element:
+        return None
+    if element["id"]:
+        return f"//{element['tag']}[@id='{element['id']}']"
+    return xpath
+
+
+class SelectorCache:
+    """
+    Cache persistente, no banco da aplicação, dos seletores resolvidos por
+    ``find_form_input``.
+
+    As entradas são indexadas por (URL da página, fingerprint da estrutura
+    do formulário, label normalizado, InputType). Quando um deploy do SIScan
+    altera o formulário, o fingerprint muda e as entradas antigas deixam de
+    ser consultadas; entradas sem uso há mais de ``max_age`` são removidas.
+    Cada formulário é carregado do banco uma única vez por processo
+    (``load``) e as consultas seguintes (``get``) são atendidas em memória,
+    sem await. Leituras e gravações no banco rodam em uma thread
+    (``asyncio.to_thread``), fora do event loop.
+
+    Exemplo
+    -------
+    ```python
+    key = await context.form_key()
+    await selector_cache.load(key)
+    xpath = selector_cache.get(key, "Cartão SUS:", InputType.TEXT)
+    ```
+    """
+
+    def __init__(
+        self,
+        enabled: bool = SELECTOR_CACHE_ENABLED,
+        max_age: timedelta = timedelta(days=30),
+    ):
+        self.enabled = enabled
+        self._max_age = max_age
+        # (url, fingerprint) -> {(label, input_type): seletor}
+        self._forms: dict[tuple[str, str], dict[tuple[str, str], str]] = {}
+        # Carregamentos em andamento, compartilhados por jobs concorrentes
+        self._loading: dict[tuple[str, str], asyncio.Task] = {}
+        self._table_ready = False
+
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+
+    @staticmethod
+    def _field_key(label: str, input_type: InputType) -> tuple[str, str]:
+        return normalize_label(label), input_type.name
+
+    def _ensure_table(self) -> None:
+        if not self._table_ready:
+            SelectorCacheEntry.__table__.create(bind=env.engine, checkfirst=True)
+            self._table_ready = True
+
+    def _load(self, key: tuple[str, str]) -> dict[tuple[str, str], str]:
+        """Carrega do banco as entradas de um formulário e remove as velhas."""
+        url, fingerprint = key
+        entries: dict[tuple[str, str], str] = {}
+        db = None
+        try:
+            self._ensure_table()
+            db = env.get_db()
+            now = datetime.utcnow()
+            db.query(SelectorCacheEntry).filter(
+                SelectorCacheEntry.url == url,
+                SelectorCacheEntry.last_used_at < now - self._max_age,
+            ).delete()
+            rows = db.query(SelectorCacheEntry).filter_by(
+                url=url, fingerprint=fingerprint
+            )
+            for row in rows:
+                entries[(row.label, row.input_type)] = row.selector
+            rows.update({SelectorCacheEntry.last_used_at: now})
+            db.commit()
+        except SQLAlchemyError:
+            logger.warning("Falha ao carregar o cache de seletores.",
+                           exc_info=True)
+        finally:
+            if db is not None:
+                db.close()
+        logger.debug(
+            "Cache de seletores para %s (%s): %s entradas.",
+            url, fingerprint[:8], len(entries),
+        )
+        return entries
+
+    async def load(self, key: tuple[str, str]) -> None:
+        """
+        Carrega do banco, em uma thread, as entradas do formulário ``key``.
+        Sem acesso ao banco quando o formulário já está em memória.
+        """
+        if key in self._forms:
+            return
+        task = self._loading.get(key)
+        if task is None:
+            task = asyncio.ensure_future(asyncio.to_thread(self._load, key))
+            self._loading[key] = task
+            task.add_done_callback(lambda _: self._loading.pop(key, None))
+        entries = await asyncio.shield(task)
+        self._forms.setdefault(key, entries)
+
+    def get(
+        self, key: tuple[str, str], label: str, input_type: InputType
+    ) -> Optional[str]:
+        """
+        Retorna o seletor em cache para o campo, ou None. Consulta apenas a
+        memória: o formulário deve ter sido carregado com ``load``.
+        """
+        form = self._forms.get(key, {})
+        selector = form.get(self._field_key(label, input_type))
+        if selector is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return selector
+
+    async def store(
+        self,
+        key: tuple[str, str],
+        label: str,
+        input_type: InputType,
+        selector: str,
+    ) -> None:
+        """Grava o seletor resolvido em memória e, em uma thread, no banco."""
+        await self.load(key)
+        field_key = self._field_key(label, input_type)
+        form = self._forms[key]
+        if form.get(field_key) == selector:
+            return
+        form[field_key] = selector
+        self.stores += 1
+        await asyncio.to_thread(self._save, key, field_key, selector)
+
+    def _save(
+        self,
+        key: tuple[str, str],
+        field_key: tuple[str, str],
+        selector: str,
+    ) -> None:
+        db = None
+        try:
+            self._ensure_table()
+            db = env.get_db()
+            db.merge(SelectorCacheEntry(
+                url=key[0],
+                fingerprint=key[1],
+                label=field_key[0],
+                input_type=field_key[1],
+                selector=selector,
+                last_used_at=datetime.utcnow(),
+            ))
+            db.commit()
+        except SQLAlchemyError:
+            logger.warning("Falha ao gravar o cache de seletores.",
+                           exc_info=True)
+        finally:
+            if db is not None:
+                db.close()
+
+    def clear(self) -> None:
+        """Descarta as entradas em memória; o banco é relido sob demanda."""
+        self._forms.clear()
+
+    def stats(self) -> dict:
+        """Retorna os contadores do cache."""
+        return {
+            "enabled": self.enabled,
+            "forms": len(self._forms),
+            "hits": self.hits,
+            "misses": self.misses,
+            "stores": self.stores,
+        }
+
+
+selector_cache = SelectorCache()
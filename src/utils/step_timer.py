@@ -0,0 +1,75 @@
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Iterator
+
+
+@dataclass(frozen=True)
+class StepTiming:
+    """Tempo de parede de um passo do fluxo de preenchimento."""
+
+    step: str
+    elapsed: float
+    ok: bool = True
+
+
+class StepTimer:
+    """
+    Mede o tempo de parede de cada passo de um fluxo (login, menu, Cartão
+    SUS, ...). Passos com o mesmo nome são somados em ``summary``; passos
+    aninhados são medidos de forma independente.
+
+    Exemplo
+    -------
+    ```python
+    timer = StepTimer()
+    with timer.step("login"):
+        await page._authenticate()
+    print(timer.summary())  # {"login": 0.42}
+    ```
+    """
+
+    def __init__(self):
+        self._timings: list[StepTiming] = []
+        # Tempo acumulado em ``excluded`` (descontado dos passos abertos)
+        self._excluded = 0.0
+
+    @property
+    def timings(self) -> list[StepTiming]:
+        return list(self._timings)
+
+    @contextmanager
+    def step(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        excluded = self._excluded
+        ok = False
+        try:
+            yield
+            ok = True
+        finally:
+            elapsed = time.perf_counter() - start
+            self._timings.append(
+                StepTiming(name, elapsed - (self._excluded - excluded), ok)
+            )
+
+    @contextmanager
+    def excluded(self) -> Iterator[None]:
+        """
+        Trecho que não conta no tempo dos passos em andamento (ex.: a
+        captura de screenshots de depuração).
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._excluded += time.perf_counter() - start
+
+    def summary(self) -> dict[str, float]:
+        """Tempo total por passo, na ordem de conclusão dos passos."""
+        totals: dict[str, float] = {}
+        for t in self._timings:
+            totals[t.step] = totals.get(t.step, 0.0) + t.elapsed
+        return totals
+
+    def reset(self) -> None:
+        self._timings.clear()
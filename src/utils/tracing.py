@@ -0,0 +1,272 @@
+import functools
+import json
+import logging
+import time
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from enum import Enum
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+try:
+    from opentelemetry import trace as otel_trace
+except ImportError:  # pragma: no cover - dependência opcional
+    otel_trace = None
+
+logger = logging.getLogger(__name__)
+
+SERVICE_NAME = "siscan-rpa"
+
+_tracer = otel_trace.get_tracer(SERVICE_NAME) if otel_trace else None
+_provider = None
+
+# Span aberto na tarefa atual e spans concluídos do job (``collect``)
+_current: ContextVar[Optional["SpanRecord"]] = ContextVar(
+    "siscan_span", default=None
+)
+_collector: ContextVar[Optional[list["SpanRecord"]]] = ContextVar(
+    "siscan_span_collector", default=None
+)
+
+
+@dataclass
+class SpanRecord:
+    """Span concluído (ou em andamento) registrado para o resumo do job."""
+
+    name: str
+    attributes: dict[str, Any] = field(default_factory=dict)
+    elapsed: float = 0.0
+    ok: bool = True
+    parent: Optional["SpanRecord"] = field(default=None, repr=False)
+
+
+def _clean(attributes: dict[str, Any]) -> dict[str, Any]:
+    # OpenTelemetry aceita apenas tipos primitivos (ou listas deles)
+    cleaned = {}
+    for key, value in attributes.items():
+        if value is None:
+            continue
+        if isinstance(value, Enum):
+            value = value.value
+        if not isinstance(value, (str, bool, int, float)):
+            value = str(value)
+        cleaned[key] = value
+    return cleaned
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[SpanRecord]:
+    """
+    Abre um span (OpenTelemetry, quando disponível) e o registra no job
+    atual para o resumo de ``collect``. Atributos podem ser acrescentados
+    durante o span com ``set_attributes``.
+
+    Exemplo
+    -------
+    ```python
+    with span("xpath.fill", field="cartao_sus", input_type="text"):
+        await locator.fill(value)
+    ```
+    """
+    record = SpanRecord(name, _clean(attributes), parent=_current.get())
+    token = _current.set(record)
+    start = time.perf_counter()
+    otel_cm = (
+        _tracer.start_as_current_span(name, attributes=record.attributes)
+        if _tracer is not None else nullcontext()
+    )
+    try:
+        with otel_cm as otel_span:
+            try:
+                yield record
+            except BaseException:
+                record.ok = False
+                raise
+            finally:
+                if otel_span is not None and otel_span.is_recording():
+                    otel_span.set_attributes(record.attributes)
+    finally:
+        record.elapsed = time.perf_counter() - start
+        _current.reset(token)
+        collector = _collector.get()
+        if collector is not None:
+            collector.append(record)
+
+
+def set_attributes(**attributes: Any) -> None:
+    """Acrescenta atributos ao span aberto na tarefa atual, se houver."""
+    record = _current.get()
+    if record is not None:
+        record.attributes.update(_clean(attributes))
+
+
+def current_span() -> Optional[SpanRecord]:
+    return _current.get()
+
+
+def traced(name: str):
+    """
+    Decorador de corrotinas que executa cada chamada dentro de
+    ``span(name)``.
+    """
+
+    def decorator(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            with span(name):
+                return await fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+@contextmanager
+def collect() -> Iterator[list[SpanRecord]]:
+    """
+    Coleta os spans concluídos dentro do bloco (incluindo os de tarefas
+    criadas nele), para montar o resumo do job com ``summarize``.
+    """
+    spans: list[SpanRecord] = []
+    token = _collector.set(spans)
+    try:
+        yield spans
+    finally:
+        _collector.reset(token)
+
+
+def summarize(spans: list[SpanRecord], top: int = 5) -> dict[str, Any]:
+    """
+    Resumo dos spans de um job: tempo total por passo do preenchimento
+    (spans ``step``), quantidade e tempo por tipo de span e os ``top``
+    campos/esperas mais lentos, com seus atributos.
+    """
+    steps: dict[str, float] = {}
+    by_name: dict[str, dict[str, float]] = {}
+    for s in spans:
+        if s.name == "step":
+            key = s.attributes.get("step", "")
+            steps[key] = round(steps.get(key, 0.0) + s.elapsed, 6)
+        stats = by_name.setdefault(s.name, {"count": 0, "elapsed": 0.0})
+        stats["count"] += 1
+        stats["elapsed"] = round(stats["elapsed"] + s.elapsed, 6)
+
+    leaves = [s for s in spans if s.name.startswith(("xpath.", "field."))]
+    slowest = sorted(leaves, key=lambda s: s.elapsed, reverse=True)[:top]
+    # Spans cujo pai não foi concluído no bloco (ex.: o span da requisição
+    # da API) contam como raízes do job
+    collected = {id(s) for s in spans}
+    roots = [s for s in spans if id(s.parent) not in collected]
+    return {
+        "total": round(sum(s.elapsed for s in roots), 6),
+        "steps": steps,
+        "spans": by_name,
+        "slowest": [
+            {"name": s.name, "elapsed": round(s.elapsed, 6), "ok": s.ok,
+             **s.attributes}
+            for s in slowest
+        ],
+    }
+
+
+class FileSpanExporter:
+    """
+    Exportador de spans do OpenTelemetry que grava um JSON por linha em
+    ``path``. Usado quando não há coletor OTLP configurado.
+    """
+
+    def __init__(self, path: str | Path):
+        self._path = Path(path)
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+
+    def export(self, spans):
+        from opentelemetry.sdk.trace.export import SpanExportResult
+
+        with self._path.open("a", encoding="utf-8") as f:
+            for s in spans:
+                ctx = s.get_span_context()
+                f.write(json.dumps({
+                    "name": s.name,
+                    "trace_id": f"{ctx.trace_id:032x}",
+                    "span_id": f"{ctx.span_id:016x}",
+                    "parent_id": (f"{s.parent.span_id:016x}"
+                                  if s.parent else None),
+                    "start": s.start_time,
+                    "duration_ms": (s.end_time - s.start_time) / 1e6,
+                    "status": s.status.status_code.name,
+                    "attributes": dict(s.attributes or {}),
+                }, ensure_ascii=False) + "\n")
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self):
+        pass
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return True
+
+
+def configure_tracing(
+    exporter: str = "auto",
+    otlp_endpoint: str = "",
+    file_path: str = "static/tmp/traces/spans.jsonl",
+) -> Optional[str]:
+    """
+    Configura o ``TracerProvider`` do processo.
+
+    Parâmetros
+    ----------
+    exporter : str
+        "otlp", "file", "none" ou "auto" (OTLP quando ``otlp_endpoint``
+        estiver definido; caso contrário, arquivo).
+    otlp_endpoint : str
+        Endpoint do coletor OTLP/HTTP (ex.: ``http://collector:4318``).
+    file_path : str
+        Arquivo JSON Lines do exportador local.
+
+    Retorno
+    -------
+    str | None
+        Exportador configurado, ou None se a exportação ficou desabilitada
+        (os spans continuam disponíveis no resumo ``timings`` dos jobs).
+    """
+    global _provider
+    exporter = exporter.lower()
+    if exporter == "auto":
+        exporter = "otlp" if otlp_endpoint else "file"
+    if exporter == "none":
+        return None
+    try:
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+    except ImportError:
+        logger.warning("opentelemetry-sdk não instalado: spans não serão "
+                       "exportados.")
+        return None
+
+    if exporter == "otlp":
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import (
+            OTLPSpanExporter,
+        )
+        span_exporter = OTLPSpanExporter(
+            endpoint=f"{otlp_endpoint.rstrip('/')}/v1/traces"
+        )
+    else:
+        span_exporter = FileSpanExporter(file_path)
+
+    _provider = TracerProvider(
+        resource=Resource.create({"service.name": SERVICE_NAME})
+    )
+    _provider.add_span_processor(BatchSpanProcessor(span_exporter))
+    otel_trace.set_tracer_provider(_provider)
+    logger.info("Tracing configurado com exportador '%s'.", exporter)
+    return exporter
+
+
+def shutdown_tracing() -> None:
+    """Exporta os spans pendentes e encerra o provider configurado."""
+    global _provider
+    if _provider is not None:
+        _provider.shutdown()
+        _provider = None
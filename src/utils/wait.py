@@ -0,0 +1,191 @@
+import asyncio
+import inspect
+import logging
+import random
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+
+from src.utils import metrics, tracing
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Intervalo padrão entre tentativas (em segundos)
+DEFAULT_INTERVAL = 0.2
+
+
+class Deadline:
+    """
+    Prazo absoluto medido no relógio monotônico do event loop.
+
+    Exemplo
+    -------
+    ```python
+    deadline = Deadline(10)
+    while not deadline.expired:
+        ...
+    ```
+    """
+
+    def __init__(self, timeout: float):
+        self._loop = asyncio.get_running_loop()
+        self._start = self._loop.time()
+        self._end = self._start + timeout
+
+    @property
+    def elapsed(self) -> float:
+        return self._loop.time() - self._start
+
+    @property
+    def remaining(self) -> float:
+        return max(0.0, self._end - self._loop.time())
+
+    @property
+    def expired(self) -> bool:
+        return self._loop.time() >= self._end
+
+
+class Backoff:
+    """
+    Gera os intervalos entre tentativas com crescimento exponencial e
+    jitter, sempre respeitando o prazo restante.
+
+    Parâmetros
+    ----------
+    interval : float
+        Intervalo inicial, em segundos.
+    backoff : float
+        Fator multiplicativo aplicado a cada tentativa (1.0 = constante).
+    max_interval : float, opcional
+        Limite superior do intervalo, em segundos.
+    jitter : float
+        Fração de variação aleatória do intervalo (0.1 = ±10%), evitando que
+        jobs concorrentes consultem o navegador em sincronia.
+    """
+
+    def __init__(
+        self,
+        interval: float = DEFAULT_INTERVAL,
+        backoff: float = 1.0,
+        max_interval: Optional[float] = None,
+        jitter: float = 0.0,
+    ):
+        self._interval = interval
+        self._backoff = backoff
+        self._max_interval = max_interval
+        self._jitter = jitter
+
+    def next(self, deadline: Deadline) -> float:
+        delay = self._interval
+        if self._jitter:
+            delay *= 1 + random.uniform(-self._jitter, self._jitter)
+        self._interval *= self._backoff
+        if self._max_interval is not None:
+            self._interval = min(self._interval, self._max_interval)
+        return max(0.0, min(delay, deadline.remaining))
+
+
+async def _call(fn: Callable[[], Any]) -> Any:
+    result = fn()
+    if inspect.isawaitable(result):
+        result = await result
+    return result
+
+
+async def wait_until(
+    condition: Callable[[], Awaitable[T] | T],
+    timeout: float,
+    interval: float = DEFAULT_INTERVAL,
+    backoff: float = 1.0,
+    max_interval: Optional[float] = None,
+    jitter: float = 0.0,
+    retry_on: tuple[type[BaseException], ...] = (),
+) -> Optional[T]:
+    """
+    Avalia ``condition`` repetidamente até que retorne um valor verdadeiro ou
+    até o prazo expirar, sem nunca bloquear o event loop.
+
+    Parâmetros
+    ----------
+    condition : Callable
+        Função síncrona ou corrotina avaliada a cada tentativa.
+    timeout : float
+        Tempo máximo, em segundos.
+    interval, backoff, max_interval, jitter
+        Controle do intervalo entre tentativas (ver ``Backoff``).
+    retry_on : tuple[type[BaseException], ...]
+        Exceções tratadas como "condição ainda não satisfeita". Demais
+        exceções são propagadas imediatamente.
+
+    Retorno
+    -------
+    Any ou None
+        O valor verdadeiro retornado por ``condition`` ou None se o prazo
+        expirar.
+
+    Exemplo
+    -------
+    ```python
+    ok = await wait_until(lambda: locator.is_enabled(), timeout=10)
+    if not ok:
+        raise SiscanTimeoutError(ctx)
+    ```
+    """
+    deadline = Deadline(timeout)
+    delays = Backoff(interval, backoff, max_interval, jitter)
+    polls = 0
+    while True:
+        polls += 1
+        try:
+            result = await _call(condition)
+            if result:
+                tracing.set_attributes(polls=polls)
+                return result
+        except retry_on as e:
+            logger.debug("Condição ainda não satisfeita: %s", e)
+        if deadline.expired:
+            tracing.set_attributes(polls=polls)
+            return None
+        await asyncio.sleep(delays.next(deadline))
+
+
+async def retry(
+    action: Callable[[], Awaitable[T] | T],
+    timeout: float,
+    interval: float = DEFAULT_INTERVAL,
+    backoff: float = 1.0,
+    max_interval: Optional[float] = None,
+    jitter: float = 0.0,
+    retry_on: tuple[type[BaseException], ...] = (Exception,),
+) -> T:
+    """
+    Executa ``action`` até que ela conclua sem lançar exceção ou até o prazo
+    expirar, aguardando entre as tentativas sem bloquear o event loop.
+
+    Ao expirar o prazo, a última exceção capturada é relançada.
+
+    Exemplo
+    -------
+    ```python
+    await retry(lambda: xpath.click_menu_action("EXAME", "GERENCIAR EXAME"),
+                timeout=10)
+    ```
+    """
+    deadline = Deadline(timeout)
+    delays = Backoff(interval, backoff, max_interval, jitter)
+    attempt = 0
+    while True:
+        attempt += 1
+        try:
+            result = await _call(action)
+            # Quantidade de novas tentativas, no span aberto (ex.: clique)
+            tracing.set_attributes(retries=attempt - 1)
+            return result
+        except retry_on as e:
+            if deadline.expired:
+                tracing.set_attributes(retries=attempt - 1)
+                raise
+            logger.debug("Tentativa %s falhou (%.1fs): %s. Retentando...",
+                         attempt, deadline.elapsed, e)
+            metrics.RETRIES.labels(type(e).__name__).inc()
+        await asyncio.sleep(delays.next(deadline))
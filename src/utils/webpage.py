@@ -1,17 +1,28 @@
-from pathlib import Path
-from datetime import datetime
+from collections import ChainMap
+from contextlib import contextmanager
 import logging
 from abc import abstractmethod, ABC
-from typing import Optional, Type, Any
+from typing import Optional, Type, Any, Mapping, TYPE_CHECKING
 
 from pydantic import BaseModel
 
-from src.siscan.exception import FieldValueNotFoundError
-from src.utils.SchemaMapExtractor import SchemaMapExtractor
+from src.siscan.exception import (
+    FieldValueNotFoundError,
+    SiscanHttpEngineError,
+)
+from src.utils.field_registry import FieldRegistry
+from src.utils.schema import FieldSpec
 from src.utils.xpath_constructor import XPathConstructor as XPE, InputType
+from src.utils.bulk_writer import BulkFormWriter, FieldWrite, FieldWriteResult
+from src.utils.step_timer import StepTimer
+from src.utils.screenshots import Capture, ScreenshotRecorder
+from src.utils import messages as msg, tracing
 from src.siscan.context import SiscanBrowserContext
+from src.siscan.browser_pool import browser_pool
 from src.env import PRODUCTION
 
+if TYPE_CHECKING:
+    from src.siscan.http_engine import JsfHttpEngine
 
 logger = logging.getLogger(__name__)
 
@@ -21,7 +32,9 @@ class WebPage(ABC):
     Classe abstrata para navegação de páginas desde a página de origem e autenticação
     """
 
-    FIELDS_MAP: dict[str, dict[str, Any]] = {}
+    # Opções declaradas pela classe. Compiladas pelo ``FieldRegistry`` em
+    # uma base imutável; cada instância trabalha sobre uma camada própria.
+    FIELDS_MAP: Mapping[str, Mapping[str, Any]] = {}
 
     def __init__(
         self, base_url: str, user: str, password: str, schema_model: Type[BaseModel]
@@ -31,6 +44,21 @@ class WebPage(ABC):
         self._password = password
         self._schema_model = schema_model
         self._context: Optional[SiscanBrowserContext] = None
+        # Motor HTTP do job, quando ele não usa o navegador
+        self._http: Optional["JsfHttpEngine"] = None
+
+        # Metadados dos campos compilados uma única vez por classe/schema
+        self._fields = FieldRegistry.for_page(type(self), schema_model)
+        # Mapa de opções do job (copy-on-write): atribuições, como as opções
+        # lidas de um select, ficam na camada da instância e a base
+        # compartilhada entre jobs concorrentes nunca é alterada.
+        self.FIELDS_MAP: ChainMap[str, Mapping[str, Any]] = ChainMap(
+            {}, self._fields.options
+        )
+        # Tempo de parede de cada passo do preenchimento (``step``)
+        self.steps = StepTimer()
+        # Screenshots de depuração do job (ver ``take_screenshot``)
+        self.screenshots = ScreenshotRecorder()
 
     @property
     def context(self) -> SiscanBrowserContext:
@@ -41,21 +69,47 @@ class WebPage(ABC):
             self._initialize_context()
         return self._context
 
+    @property
+    def http(self) -> Optional["JsfHttpEngine"]:
+        """
+        Retorna o motor HTTP do job atual, ou None quando o job é executado
+        no navegador.
+        """
+        return self._http
+
+    @contextmanager
+    def step(self, name: str):
+        """
+        Context manager que mede um passo do fluxo em ``self.steps``, o
+        registra como span ``step`` e abre um trecho do trace do Playwright
+        (ex.: ``with self.step("cartao_sus"):``).
+        """
+        if self._http is None and self._context is not None:
+            # Um trecho do trace do Playwright por passo
+            self._context.traces.step(name)
+        with tracing.span("step", step=name, page=type(self).__name__), \
+                self.steps.step(name):
+            yield
+
     def _initialize_context(self):
         self._context = SiscanBrowserContext(
             base_url=self._base_url,
             headless=not PRODUCTION,  # Para depuração, use False
             timeout=15000,
+            pool=browser_pool,
         )
 
     @abstractmethod
     async def _authenticate(self):
         raise NotImplementedError("Subclasses devem implementar este método.")
 
-    @abstractmethod
-    def get_map_label(self) -> dict[str, dict[str, Any]]:
-        """Método abstrato para retornar o mapeamento de labels dos campos."""
-        raise NotImplementedError("Subclasses devem implementar este método.")
+    def get_map_label(self) -> Mapping[str, FieldSpec]:
+        """Retorna o mapeamento (imutável) de todos os campos da página."""
+        return self._fields.fields
+
+    def field_layer(self, page_class: type) -> Mapping[str, FieldSpec]:
+        """Retorna apenas os campos declarados por ``page_class``."""
+        return self._fields.layer(page_class)
 
     @abstractmethod
     def validation(self, data: dict):
@@ -66,85 +120,49 @@ class WebPage(ABC):
         return self._schema_model
 
     def get_field_metadata(
-        self, field_name: str, map_label: Optional[dict[str, tuple]] = None
-    ) -> dict[str, str]:
-        # Busca o valor no dicionário de mapeamento
+        self,
+        field_name: str,
+        map_label: Optional[Mapping[str, FieldSpec]] = None,
+    ) -> FieldSpec:
+        """Retorna os metadados do campo, conforme o mapeamento."""
         if map_label is None:
-            map_data_label = self.get_map_label().get(field_name)
-        else:
-            map_data_label = map_label.get(field_name)
-
-        if map_data_label is None:
+            map_label = self._fields.fields
+        field = map_label.get(field_name)
+        if field is None:
             raise ValueError(f"get_field_metadata: Campo '{field_name}' não "
                              f"está mapeado.")
-
-        if len(map_data_label) != 4:
-            raise ValueError(f"get_field_metadata: Campo '{field_name}' "
-                             f"mapeado incorretamente. Esperado 4 valores, "
-                             f"recebido {len(map_data_label)}.")
-        return map_data_label
+        return field
 
     def get_field_label(
         self,
         field_name: str,
-        map_label: Optional[dict[str, tuple[str, str, str, str]]] = None,
+        map_label: Optional[Mapping[str, FieldSpec]] = None,
     ) -> str:
         """Retorna o texto do label associado ao campo, conforme o mapeamento."""
-        if map_label is None:
-            map_data_label = self.get_map_label().get(field_name)
-        else:
-            map_data_label = map_label.get(field_name)
-
-        if map_data_label is None:
-            raise ValueError(f"get_field_label: Campo '{field_name}' não está "
-                             f"mapeado.")
-        return map_data_label.get("label")
+        return self.get_field_metadata(field_name, map_label).label
 
     def get_field_type(
         self,
         field_name: str,
-        map_label: Optional[dict[str, tuple[str, str, str, str]]] = None,
-    ) -> str:
+        map_label: Optional[Mapping[str, FieldSpec]] = None,
+    ) -> str | InputType:
         """Retorna o tipo do campo conforme definido no mapeamento."""
-        if map_label is None:
-            map_data_label = self.get_map_label().get(field_name)
-        else:
-            map_data_label = map_label.get(field_name)
-
-        if map_data_label is None:
-            raise ValueError(f"get_field_type: Campo '{field_name}' não está "
-                             f"mapeado.")
-        return map_data_label.get("input_type", "text")
+        return self.get_field_metadata(field_name, map_label).input_type
 
     def get_field_required(
         self,
         field_name: str,
-        map_label: Optional[dict[str, tuple[str, str, str, str]]] = None,
+        map_label: Optional[Mapping[str, FieldSpec]] = None,
     ) -> bool:
-        if map_label is None:
-            map_data_label = self.get_map_label().get(field_name)
-        else:
-            map_data_label = map_label.get(field_name)
-
-        if map_data_label is None:
-            raise ValueError(f"get_field_required: Campo '{field_name}' não "
-                             f"está mapeado.")
-        return map_data_label.get("required", False)
+        return self.get_field_metadata(field_name, map_label).required
 
     def get_field_xpath(
             self,
             field_name: str,
-            map_label: Optional[dict[str, dict[str, Any]]] = None,
+            map_label: Optional[Mapping[str, FieldSpec]] = None,
     ) -> str:
         """Retorna o xpath associado ao campo, conforme o mapeamento."""
-        if map_label is None:
-            map_data_label = self.get_map_label().get(field_name)
-        else:
-            map_data_label = map_label.get(field_name)
-        if map_data_label is None:
-            raise ValueError(
-                f"get_field_xpath: Campo '{field_name}' não está mapeado.")
-        return map_data_label.get("xpath", "")
+        return self.get_field_metadata(field_name, map_label).xpath
 
     def get_field_value(self, field_name: str, data: dict) -> Optional[str | list]:
         """Retorna o valor do campo, convertendo via FIELDS_MAP se houver
@@ -156,10 +174,11 @@ class WebPage(ABC):
             # mapeamento
             if isinstance(value, list):
                 logger.warning(
-                    f"O valor do campo '{field_name}' é uma lista ({value}). "
-                    f"O mapeamento FIELDS_MAP espera um valor escalar. "
-                    f"Ignorando o mapeamento e retornado o valor real "
-                    f"fornecido em 'data'."
+                    "O valor do campo '%s' é uma lista (%s). O mapeamento "
+                    "FIELDS_MAP espera um valor escalar. Ignorando o "
+                    "mapeamento e retornado o valor real fornecido em "
+                    "'data'.",
+                    field_name, value,
                 )
             else:
                 value = self.FIELDS_MAP[field_name].get(value, None)
@@ -174,7 +193,7 @@ class WebPage(ABC):
     ) -> None:
         """
         Atualiza o dicionário FIELDS_MAP[field_name] com opções do select da
-        página.
+        página. O mapeamento é gravado apenas na camada desta instância.
 
         Este método utiliza um XPathConstructor já posicionado no campo
         <select>, recupera todas as opções (value, texto) e as insere em
@@ -219,9 +238,9 @@ class WebPage(ABC):
     def _mount_fields_map_and_data(
         self,
         data: dict,
-        map_label: dict[str, tuple[str, str, str]],
+        map_label: Mapping[str, FieldSpec],
         suffix: Optional[str] = ":",
-    ) -> tuple[dict[str, tuple[str, str, str]], dict[str, str]]:
+    ) -> tuple[dict[str, FieldSpec], dict[str, str]]:
         """
         Gera o dicionário campos_map e o dicionário data_final para uso em
         preenchimento genérico de formulários.
@@ -230,15 +249,14 @@ class WebPage(ABC):
         ----------
         data : dict
             Dicionário de dados originais (nomes de campos como chave).
-        map_label : dict[str, tuple[str, str, str]]
-            Dicionário com nomes de campos como chave e tuplas contendo
-            (label, tipo de campo, requirement_level) como valor.
+        map_label : Mapping[str, FieldSpec]
+            Campos que podem ser preenchidos, com nomes de campos como chave.
         suffix : str, opcional (default=":")
 
         Retorna
         -------
         tuple (campos_map, data_final)
-            - campos_map: dict[str, tuple[str, str, str]]
+            - campos_map: dict[str, FieldSpec], com o sufixo no label
             - data_final: dict[str, str]
         """
         if suffix is None:
@@ -247,88 +265,133 @@ class WebPage(ABC):
         fields_map = {}
         data_final = {}
         for field_name in data.keys():
-            if field_name not in map_label.keys():
+            field = map_label.get(field_name)
+            if field is None:
                 logger.warning(
-                    f"Campo '{field_name}' não está mapeado ou não é editável. "
-                    f"Ignorado."
+                    "Campo '%s' não está mapeado ou não é editável. "
+                    "Ignorado.",
+                    field_name,
                 )
                 continue
-            field_metadata = self.get_field_metadata(
-                field_name, map_label
-            )
-            fields_map[field_name] = SchemaMapExtractor.make_field_dict(
-                f"{field_metadata.get('label')}{suffix}",
-                field_metadata.get("input_type", 'text'),
-                field_metadata.get("required", False),
-                field_metadata.get("xpath", ""),
-            )
-            value = self.get_field_value(field_name, data)
-            data_final[field_name] = value
+            fields_map[field_name] = field.with_label(f"{field.label}{suffix}")
+            data_final[field_name] = self.get_field_value(field_name, data)
         return fields_map, data_final
 
     async def fill_form_field(
             self,
             field_name: str,
             data: dict,
-            map_label: dict[str, dict[str, Any]] | None = None,
+            map_label: Mapping[str, FieldSpec] | None = None,
             suffix: Optional[str] = ":",
     ):
 
-        field_metadata = self.get_field_metadata(field_name, map_label)
-        field_type = field_metadata.get("input_type", InputType.TEXT)
-        field_label = field_metadata.get("label")
-        label = f"{field_label}{suffix or ''}"
+        field = self.get_field_metadata(field_name, map_label)
+        field_type = field.input_type
+        label = f"{field.label}{suffix or ''}"
 
         value = self.get_field_value(field_name, data)
 
-        xpath = await XPE.create(self.context,
-                                 xpath=field_metadata.get("xpath"))
-        await (await xpath.find_form_input(label, field_type)
-               ).handle_fill(value, field_type)
+        with tracing.span("field.fill", field=field_name,
+                          input_type=field_type, selector=field.xpath):
+            if self._http is not None:
+                await self._http.write([FieldWrite(
+                    field_name, field.xpath, field_type, value, label=label
+                )])
+                return
+
+            xpath = await XPE.create(self.context, xpath=field.xpath)
+            await (await xpath.find_form_input(label, field_type)
+                   ).handle_fill(value, field_type)
 
     async def fill_form_fields(
         self,
         data: dict,
-        map_label: dict[str, dict[str, Any]] | None = None,
+        map_label: Mapping[str, FieldSpec] | None = None,
         suffix: Optional[str] = ":",
-    ):
+    ) -> list[FieldWriteResult]:
+        """
+        Preenche os campos de ``data`` em lote (ver ``write_fields``).
+
+        Retorno
+        -------
+        list[FieldWriteResult]
+            Resultado por campo.
+        """
+        with tracing.span("field.fill_many"):
+            fields = await self.build_field_writes(data, map_label, suffix)
+            tracing.set_attributes(fields=len(fields))
+            return await self.write_fields(fields)
+
+    async def build_field_writes(
+        self,
+        data: dict,
+        map_label: Mapping[str, FieldSpec] | None = None,
+        suffix: Optional[str] = ":",
+    ) -> list[FieldWrite]:
+        """
+        Resolve o XPath de cada campo de ``data`` a partir do mapeamento de
+        labels e retorna a lista de campos para o ``BulkFormWriter``.
+        """
+        if map_label is None:
+            map_label = self._fields.fields
+
         # Monta o dicionário de campos e os dados finais para preenchimento
         fields_map, final_data = self._mount_fields_map_and_data(
             data, map_label, suffix,
         )
 
         logger.debug(
-            f"Preenchendo campos do formulário com dados: {final_data} "
-            f"e mapeamento: {fields_map}"
+            "Preenchendo campos do formulário com dados: %s e mapeamento: %s",
+            final_data, fields_map,
         )
 
+        fields: list[FieldWrite] = []
         for field_name, value in final_data.items():
             if field_name not in fields_map:
                 logger.warning(
-                    f"Campo '{field_name}' não está mapeado ou não é "
-                    f"editável. Ignorado."
+                    "Campo '%s' não está mapeado ou não é editável. "
+                    "Ignorado.",
+                    field_name,
                 )
                 continue
 
-            # Verificação do tipo esperado
-            field_metadata = fields_map[field_name]
-            if not (
-                isinstance(field_metadata, dict)
-                and len(field_metadata) == 4
-                and all(isinstance(x, str) for x in field_metadata)
-            ):
-                raise TypeError(
-                    f"O valor de campos_map['{field_name}'] deve ser uma "
-                    f"dicionário montado a partir de 'SchemaMapExtractor.make_field_dict', "
-                    f", mas foi recebido: {field_metadata!r}"
-                )
+            field = fields_map[field_name]
+            if self._http is not None:
+                # O motor HTTP localiza o campo no HTML pelo XPath ou label
+                fields.append(FieldWrite(
+                    field_name, field.xpath, field.input_type, value,
+                    label=field.label,
+                ))
+                continue
+            xpath = await XPE.create(self.context, xpath=field.xpath)
+            await xpath.find_form_input(field.label, field.input_type)
+            fields.append(
+                FieldWrite(field_name, xpath.xpath, field.input_type, value)
+            )
 
-            input_type = field_metadata.get("input_type", InputType.TEXT)
-            xpath = await XPE.create(self.context,
-                                     xpath=field_metadata.get("xpath"))
-            await (await xpath.find_form_input(
-                field_metadata.get("label"),
-                input_type)).handle_fill(value, input_type)
+        return fields
+
+    async def write_fields(
+        self, fields: list[FieldWrite]
+    ) -> list[FieldWriteResult]:
+        """
+        Preenche os campos informados com o ``BulkFormWriter``: campos sem
+        AJAX em lote, em uma única chamada ao navegador, e cada campo que
+        dispara AJAX em uma fase própria, aguardando a página ficar pronta.
+
+        Retorno
+        -------
+        list[FieldWriteResult]
+            Resultado por campo, na ordem de ``fields``.
+        """
+        if self._http is not None:
+            return await self._http.write(fields)
+        writer = BulkFormWriter(
+            await self.context.page,
+            self.context,
+            self.context.readiness,
+        )
+        return await writer.write(fields)
 
     async def load_select_options(self, field_name: str):
         """
@@ -352,12 +415,15 @@ class WebPage(ABC):
         preenchimento dinâmico dos campos de formulário conforme as opções
         realmente disponíveis na página no momento da execução.
         """
-        field_metadata = self.get_field_metadata(field_name)
-        xpath = await XPE.create(self.context,
-                                 xpath=field_metadata.get("xpath"))
-        await xpath.find_form_input(field_metadata.get("label"),
-                                    field_metadata.get("input_type",
-                                                       InputType.SELECT))
+        field = self.get_field_metadata(field_name)
+        if self._http is not None:
+            options = self._http.select_options(field.xpath, field.label)
+            self.FIELDS_MAP[field_name] = {
+                label: value for value, label in options.items()
+            }
+            return
+        xpath = await XPE.create(self.context, xpath=field.xpath)
+        await xpath.find_form_input(field.label, field.input_type)
         await self.update_field_map_from_select(field_name, xpath)
 
     async def select_value(
@@ -366,18 +432,29 @@ class WebPage(ABC):
         """
         Preenche um campo de formulário identificado por `field_name` usando os dados fornecidos e retorna o texto visível e o valor selecionado (ou lista de tuplas para seleção múltipla). Usa o mapeamento FIELDS_MAP se existir. Lança exceção se o valor não for encontrado.
         """
-        field_metadata = self.get_field_metadata(field_name)
-        field_label = field_metadata.get("label")
-        field_type = field_metadata.get("input_type", InputType.SELECT)
-
-        xpath = await XPE.create(self.context,
-                                 xpath=field_metadata.get("xpath"))
+        field = self.get_field_metadata(field_name)
+        field_label = field.label
+        field_type = field.input_type
+
+        with tracing.span("field.select", field=field_name,
+                          input_type=field_type, selector=field.xpath):
+            if self._http is not None:
+                await self._http.write([FieldWrite(
+                    field_name, field.xpath, field_type,
+                    self.get_field_value(field_name, data),
+                    label=field_label,
+                )])
+                value = self._http.read(field.xpath, field_label, field_type)
+            else:
+                xpath = await XPE.create(self.context, xpath=field.xpath)
 
-        type_exam_elem = await xpath.find_form_input(field_label, field_type)
-        xpath_obj = await type_exam_elem.handle_fill(
-            self.get_field_value(field_name, data), field_type, reset=False
-        )
-        value = await xpath_obj.get_value(field_type)
+                type_exam_elem = await xpath.find_form_input(
+                    field_label, field_type)
+                xpath_obj = await type_exam_elem.handle_fill(
+                    self.get_field_value(field_name, data), field_type,
+                    reset=False
+                )
+                value = await xpath_obj.get_value(field_type)
 
         # Para campos que retornam tupla (texto, valor)
         if isinstance(value, tuple):
@@ -387,6 +464,12 @@ class WebPage(ABC):
                 field_name in self.FIELDS_MAP
                 and _value not in self.FIELDS_MAP[field_name].values()
             ):
+                if self._http is not None:
+                    # Opções lidas do HTML pelo motor HTTP: o job é repetido
+                    # no navegador por ``SiscanWebPage.executar``
+                    raise SiscanHttpEngineError(
+                        None, m=msg.FIELD_VALUE_NOT_FOUND(field_name, _value)
+                    )
                 raise FieldValueNotFoundError(self.context, field_name, _value)
 
         # Remove o campo do dicionário de dados após preenchimento
@@ -394,22 +477,24 @@ class WebPage(ABC):
         return value
 
     async def take_screenshot(
-        self,
-        filename: Optional[str] = None,
-        full_page: bool = True,
-        subdir: Optional[str] = None,
-    ) -> Path:
-        """Tira um screenshot da página atual e salva em arquivo."""
-        page = await self.context.page  # page Playwright ativo no contexto
-        if filename is None:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"screenshot_{timestamp}.png"
-        if subdir:
-            Path(subdir).mkdir(parents=True, exist_ok=True)
-            filepath = Path(subdir) / filename
-        else:
-            filepath = Path(filename)
-
-        await page.screenshot(path=str(filepath), full_page=full_page)
-        logger.info(f"Screenshot salvo em: {filepath.resolve()}")
-        return filepath.resolve()
+        self, name: str, full_page: Optional[bool] = None
+    ) -> Optional[Capture]:
+        """
+        Captura a página atual no buffer de screenshots do job
+        (``self.screenshots``); a gravação em disco depende do modo (ver
+        ``ScreenshotRecorder``). O tempo da captura não entra no tempo do
+        passo. Jobs do motor HTTP não têm página renderizada: retorna None.
+        """
+        if self._http is not None or not self.screenshots.enabled:
+            return None
+        with self.steps.excluded():
+            page = await self.context.page  # page Playwright ativo
+            return await self.screenshots.capture(page, name, full_page)
+
+    def _failure_page(self):
+        # Página no estado da falha, sem abrir um navegador para isso
+        if self._http is not None or self._context is None:
+            return None
+        if not self._context.is_started:
+            return None
+        return self._context.page
@@ -1,7 +1,7 @@
+import asyncio
 from typing import Optional
-import time
 import logging
-from playwright.async_api import Page, Locator, TimeoutError, ElementHandle
+from playwright.async_api import Page, Locator, TimeoutError
 from src.siscan.exception import (
     SiscanMenuNotFoundError,
     XpathNotFoundError,
@@ -10,6 +10,9 @@ from src.siscan.exception import (
 
 from src.env import DEFAULT_TIMEOUT
 from src.utils.schema import InputType
+from src.utils import bulk_reader, dom_wait, tracing
+from src.utils.selector_cache import stable_selector
+from src.utils.wait import Deadline, wait_until, retry
 
 logger = logging.getLogger(__name__)
 
@@ -140,19 +143,19 @@ class XPathConstructor:
         # Locator é a forma preferida de interagir com elementos
         try:
             if await self.exists(timeout=DEFAULT_TIMEOUT):
-                logger.debug(f"Obtendo locator com XPath: {self._xpath}")
+                logger.debug("Obtendo locator com XPath: %s", self._xpath)
                 elem = self.page.locator(f"xpath={self._xpath}")
                 if await elem.count() == 0:
                     raise XpathNotFoundError(self._context, xpath=self._xpath)
                 # Se elem for uma lista (ex: múltiplos elementos), retorna o primeiro
-                logger.debug(f"Locator obtido: {elem}")
+                logger.debug("Locator obtido: %s", elem)
                 if isinstance(elem, list) or getattr(elem, "__iter__", False):
                     return elem[0]
                 return elem
         except Exception as e:
             logger.error(
-                f"Erro inesperado ao obter locator com "
-                f"XPath '{self._xpath}': {e}"
+                "Erro inesperado ao obter locator com XPath '%s': %s",
+                self._xpath, e,
             )
             # Envolve a exceção original na nossa exceção específica
             raise XpathNotFoundError(
@@ -175,8 +178,8 @@ class XPathConstructor:
         """
         locator = await self.get_locator()
         logger.debug(
-            f"Aguardando elemento com XPath: {self._xpath} "
-            f"por {timeout * self.TIMEOUT_MS_FACTOR} milessegundos."
+            "Aguardando elemento com XPath: %s por %s milessegundos.",
+            self._xpath, timeout * self.TIMEOUT_MS_FACTOR,
         )
         try:
             await locator.wait_for(
@@ -186,9 +189,9 @@ class XPathConstructor:
         except TimeoutError:
             # Se o wait_for estourar timeout, o elemento não se tornou visível
             logger.error(
-                f"Timeout: Elemento com XPath '{self._xpath}' "
-                f"não se tornou visível em "
-                f"{timeout * self.TIMEOUT_MS_FACTOR} milessegundos."
+                "Timeout: Elemento com XPath '%s' não se tornou visível em "
+                "%s milessegundos.",
+                self._xpath, timeout * self.TIMEOUT_MS_FACTOR,
             )
             raise XpathNotFoundError(
                 self._context,
@@ -201,8 +204,9 @@ class XPathConstructor:
             raise
         except Exception as e:
             logger.error(
-                f"Erro inesperado ao aguardar e obter locator com "
-                f"XPath '{self._xpath}': {e}"
+                "Erro inesperado ao aguardar e obter locator com XPath "
+                "'%s': %s",
+                self._xpath, e,
             )
             raise XpathNotFoundError(
                 self._context,
@@ -239,23 +243,10 @@ class XPathConstructor:
         ```
         """
         locator = locator or await self.get_locator()
-        elapsed = 0
-        interval = 0.2
-        while elapsed < timeout:
-            try:
-                # Se não existe ou está invisível, ignore erro
-                if await locator.count() == 0:
-                    time.sleep(interval)
-                    elapsed += interval
-                    continue
-                # Verifica atributo disabled
-                if await locator.is_visible() and await locator.is_enabled():
-                    logger.debug(f"Elemento enable, xpath: {self.xpath}")
-                    return self
-            except Exception:
-                pass
-            time.sleep(interval)
-            elapsed += interval
+
+        if await dom_wait.element_enabled(self.page, self._xpath, timeout):
+            logger.debug("Elemento enable, xpath: %s", self.xpath)
+            return self
         raise SiscanTimeoutError(
             self._context,
             m=f"Elemento locator '{locator}' não encontrado. "
@@ -319,15 +310,15 @@ class XPathConstructor:
 
             # Primeiro, espera até o elemento estar visível
             logger.debug(
-                f"Aguardando preenchimento do campo localizado por "
-                f"XPath: {self._xpath}"
+                "Aguardando preenchimento do campo localizado por XPath: %s",
+                self._xpath,
             )
             await locator.wait_for(state="visible", timeout=timeout)
 
             # Em seguida, espera até o atributo 'value' ser diferente de vazio
             logger.debug(
-                f"Esperando o campo com XPath '{self._xpath}' ter valor "
-                f"preenchido."
+                "Esperando o campo com XPath '%s' ter valor preenchido.",
+                self._xpath,
             )
             await self.page.wait_for_function(
                 """(element) => {
@@ -336,16 +327,18 @@ class XPathConstructor:
                 arg=await locator.element_handle(),
                 timeout=timeout,
             )
-            logger.info(f"Campo com XPath '{self._xpath}' foi preenchido "
-                        f"com sucesso.")
+            logger.info(
+                "Campo com XPath '%s' foi preenchido com sucesso.",
+                self._xpath,
+            )
             return self
         except TimeoutError as e:
             # Captura timeouts do wait_for(state="visible")
             # ou wait_for_function
             logger.error(
-                f"Timeout: O campo '{self._xpath}' não foi "
-                f"preenchido ou não se tornou visível dentro "
-                f"de {timeout} milessegundos. Erro: {e}"
+                "Timeout: O campo '%s' não foi preenchido ou não se tornou "
+                "visível dentro de %s milessegundos. Erro: %s",
+                self._xpath, timeout, e,
             )
             raise XpathNotFoundError(
                 self._context,
@@ -359,8 +352,9 @@ class XPathConstructor:
         except Exception as e:
             # Captura quaisquer outras exceções inesperadas durante o processo
             logger.error(
-                f"Erro inesperado ao aguardar o preenchimento do "
-                f"campo com XPath '{self._xpath}': {e}"
+                "Erro inesperado ao aguardar o preenchimento do campo com "
+                "XPath '%s': %s",
+                self._xpath, e,
             )
             raise XpathNotFoundError(
                 self._context,
@@ -382,11 +376,9 @@ class XPathConstructor:
             contendo o valor digitado duas vezes: `(valor, valor)`.
           - Para campos select, retorna `(texto_opcao_selecionada,
             value_opcao_selecionada)`.
-          - Para checkbox:
-              - Se houver apenas um checkbox, retorna `(texto_associado,
-                value)` se estiver marcado, ou `(None, None)` se não estiver.
-              - Se houver múltiplos checkboxes, retorna uma lista de tuplas
-                para os checkboxes marcados: `[(texto, value), ...]`.
+          - Para checkbox, retorna uma lista de tuplas para os checkboxes
+            marcados: `[(texto, value), ...]`, ou `(None, None)` se não
+            houver checkboxes.
           - Para radio, retorna `(texto_associado, value)` para o radio
             selecionado, ou `(None, None)` se nenhum estiver marcado.
           - Para elementos do tipo div ou span, retorna o texto como
@@ -406,7 +398,7 @@ class XPathConstructor:
         -------
         tuple[str, str] | list[tuple[str, str]]
             Tupla (texto, valor) correspondente ao campo, ou lista de tuplas
-            no caso de múltiplos checkboxes.
+            no caso de checkboxes.
             Retorna (None, None) quando o campo não está preenchido ou nenhum
             item está marcado/selecionado.
 
@@ -429,67 +421,21 @@ class XPathConstructor:
             return (value, value)
         elif input_type == InputType.SELECT:
             # Retorna o texto visível da opção selecionada
-            selected_option = locator.locator("option:checked")
-            value = await selected_option.get_attribute("value")
-            text = (await selected_option.inner_text()).strip()
-            return (text, value)
+            return await bulk_reader.selected_option(self.page, self._xpath)
         elif input_type == InputType.CHECKBOX:
-            # Checa quantos checkboxes existem
-            checkboxes = locator.locator("input[type='checkbox']")
-            count = await checkboxes.count()
-            # Um único checkbox count = 1
-            # Múltiplos checkboxes count > 1
-            result = []
-            for i in range(count):
-                text = None
-                cb = checkboxes.nth(i)
-                if await cb.is_checked():
-                    value = await cb.get_attribute("value")
-                    checkbox_id = await cb.get_attribute("id")
-                    if checkbox_id:
-                        # Busca o label associado ao id
-                        label_elem = locator.page.locator(
-                            f"label[for='{checkbox_id}']")
-                        if await label_elem.count() > 0:
-                            text = (await label_elem.nth(0).inner_text()).strip()
-                    if not text:
-                        label_elem = await cb.evaluate_handle(
-                            "node => node.closest('label')"
-                        )
-                        if label_elem and isinstance(label_elem, ElementHandle):
-                            text = (await label_elem.inner_text()).strip()
-                        else:
-                            text = value
-                    result.append((text, value))
-                return result
-            else:
+            # Lê todos os checkboxes marcados e seus labels em uma chamada
+            checked = await bulk_reader.checked_inputs(
+                self.page, self._xpath, "checkbox"
+            )
+            if checked is None:
                 return (None, None)
+            return checked
         elif input_type == InputType.RADIO:
-            # Retorna o value do radio marcado, ou None se nenhum marcado
-            radios = locator.locator("input[type='radio']")
-            count = await radios.count()
-            for i in range(count):
-                text = None
-                radio = radios.nth(i)
-                if await radio.is_checked():
-                    value = await radio.get_attribute("value")
-                    radio_id = await radio.get_attribute("id")
-                    if radio_id:
-                        # Busca o label associado ao id
-                        label_elem = locator.page.locator(
-                            f"label[for='{radio_id}']")
-                        if await label_elem.count() > 0:
-                            text = (await label_elem.nth(0).inner_text()).strip()
-                    if not text:
-                        label_elem = await radio.evaluate_handle(
-                            "node => node.closest('label')"
-                        )
-                        if label_elem and isinstance(label_elem, ElementHandle):
-                            text = (await label_elem.inner_text()).strip()
-                        else:
-                            text = value
-                    return (text, value)
-            return ("", "")
+            # Retorna o radio marcado, ou ("", "") se nenhum marcado
+            checked = await bulk_reader.checked_inputs(
+                self.page, self._xpath, "radio"
+            )
+            return checked[0] if checked else ("", "")
         elif input_type in ("div", "span"):
             text = (await locator.inner_text()).strip()
             return (text, text)
@@ -556,27 +502,17 @@ class XPathConstructor:
             )
             return
 
-        elapsed = 0
-        locator_options: Locator = None
-        while elapsed < timeout:
-            locator_options = obj_locator.locator("option")
-            count = await locator_options.count()
-            found = False
-            for i in range(count):
-                opt_value = await locator_options.nth(i).get_attribute("value")
-                if opt_value == value:
-                    found = True
-                    break
-            if found:
-                await obj_locator.select_option(value=value)
-                return
-            time.sleep(interval)
-            elapsed += interval
+        # A opção pode chegar via AJAX: aguarda no navegador, sem polling
+        if await dom_wait.option_present(
+            self.page, self._xpath, value, timeout
+        ):
+            await obj_locator.select_option(value=value)
+            return
 
         raise SiscanTimeoutError(
             self._context,
             m=f"Timeout ao selecionar opção '{value}' no elemento "
-              f"locator '{locator_options}'. Opção não visível após aguardar "
+              f"locator '{obj_locator}'. Opção não visível após aguardar "
               f"o carregamento."
         )
 
@@ -612,46 +548,32 @@ class XPathConstructor:
             selecionado dentro do tempo limite.
         """
         interval = interval or self.ELAPSED_INTERVAL
-        elapsed = 0
-        locator_radios: Locator = None
-        while elapsed < timeout:
-            locator_radios = obj_locator.locator("input[type='radio']")
-            count = await locator_radios.count()
-            found = False
-
-            for i in range(count):
-                radio = locator_radios.nth(i)
-                radio_value = await radio.get_attribute("value")
-                is_checked = await radio.is_checked()
-                is_disabled = await radio.get_attribute("disabled")
-                if radio_value == value:
-                    found = True
-                    if not is_checked and not is_disabled:
-                        try:
-                            await radio.check(force=True)
-                            logger.debug(
-                                f"Radio value={value} selecionado com sucesso."
-                            )
-                            return
-                        except Exception as e:
-                            logger.warning(
-                                f"Falha ao selecionar radio value={value}: {e}"
-                            )
-                            # Pode ser overlay, atraso do frontend, etc.
-                    elif is_checked:
-                        logger.debug(f"Radio value={value} já estava"
-                                     f"selecionado.")
-                        return
-                    # Se está desabilitado, aguarda
-            if found:
-                # Radio localizado mas não foi possível selecionar, espera e
-                # tenta de novo
-                time.sleep(interval)
-                elapsed += interval
-            else:
-                # Radio ainda não apareceu, espera e tenta de novo
-                time.sleep(interval)
-                elapsed += interval
+        locator_radios: Locator = obj_locator.locator(
+            f"input[type='radio'][value='{value}']"
+        )
+        radio = locator_radios.first
+        deadline = Deadline(timeout)
+
+        # Aguarda no navegador até o radio existir e estar habilitado
+        while await dom_wait.radio_ready(
+            self.page, self._xpath, value, deadline.remaining
+        ):
+            if await radio.is_checked():
+                logger.debug("Radio value=%s já estava selecionado.", value)
+                return
+            try:
+                await radio.check(force=True)
+                logger.debug("Radio value=%s selecionado com sucesso.", value)
+                return
+            except Exception as e:
+                # Pode ser overlay, atraso do frontend, etc.
+                logger.warning(
+                    "Falha ao selecionar radio value=%s: %s",
+                    value, e,
+                )
+            if deadline.expired:
+                break
+            await asyncio.sleep(min(interval, deadline.remaining))
 
         raise SiscanTimeoutError(
             self._context,
@@ -675,17 +597,22 @@ class XPathConstructor:
         """
         await self.find_form_input(label_name, input_type=InputType.TEXT)
         if self._xpath:
-            logger.debug(f"XPath já definido: {self._xpath}. Não redefinindo "
-                         f"para o label '{label_name}'.")
+            logger.debug(
+                "XPath já definido: %s. Não redefinindo para o label '%s'.",
+                self._xpath, label_name,
+            )
             return self
 
         # Se não tiver um XPath definido, constrói o XPath para o label
         # Adiciona o seletor para o <a> logo após o campo
         self._xpath += "/following-sibling::a[1]"
-        logger.debug(f"XPath para lupa após input '{label_name}': "
-                     f"{self._xpath}")
+        logger.debug(
+            "XPath para lupa após input '%s': %s",
+            label_name, self._xpath,
+        )
         return self
 
+    @tracing.traced("xpath.resolve")
     async def find_form_input(self,
                               label_name: str,
                               input_type: str | InputType | None = None,
@@ -698,12 +625,56 @@ class XPathConstructor:
         self._label = label_name
         input_type = self._get_input_type(input_type)
         self._input_type = input_type
+        tracing.set_attributes(label=label_name, input_type=input_type)
 
         if self._xpath:
-            logger.debug(f"XPath já definido: {self._xpath}. Não redefinindo "
-                         f"para o label '{label_name}'.")
+            logger.debug(
+                "XPath já definido: %s. Não redefinindo para o label '%s'.",
+                self._xpath, label_name,
+            )
+            tracing.set_attributes(selector=self._xpath, source="schema")
             return self
 
+        # Seletores já resolvidos para esta estrutura de formulário dispensam
+        # a busca pelo label
+        cache = getattr(self._context, "selector_cache", None)
+        if cache is not None:
+            key = await self._context.form_key()
+            await cache.load(key)
+            cached = cache.get(key, label_name, input_type)
+            if cached:
+                self._xpath = cached
+                logger.debug("XPath (cache de seletores): %s", self)
+                tracing.set_attributes(selector=cached, source="cache")
+                return self
+
+        await self._resolve_form_input(label_name, input_type)
+
+        if cache is not None:
+            selector = await stable_selector(self.page, self._xpath)
+            if selector:
+                await cache.store(key, label_name, input_type, selector)
+                self._xpath = selector
+        tracing.set_attributes(selector=self._xpath, source="label")
+        return self
+
+    async def _resolve_form_input(
+        self, label_name: str, input_type: InputType
+    ) -> "XPathConstructor":
+        """
+        Monta o XPath do campo pelo label: consulta o índice de labels da
+        página e, sem correspondência, as estruturas HTML conhecidas.
+        """
+        # Consulta primeiro o índice de labels da página (uma leitura por
+        # re-renderização); sem correspondência, usa o XPath abaixo
+        index = getattr(self._context, "label_index", None)
+        if index is not None:
+            resolved = await index.resolve(self.page, label_name, input_type)
+            if resolved:
+                self._xpath = resolved
+                logger.debug("XPath (índice de labels): %s", self)
+                return self
+
         label_xpath = f"//label[normalize-space(text())='{label_name}']"
 
         if input_type == InputType.DATE:
@@ -731,7 +702,8 @@ class XPathConstructor:
             label_elem = self.page.locator(label_xpath)
             if await label_elem.count() == 0:
                 logger.debug(
-                    f"Label '{label_name}' não encontrado com XPath {label_xpath}"
+                    "Label '%s' não encontrado com XPath %s",
+                    label_name, label_xpath,
                 )
                 raise XpathNotFoundError(self._context, xpath=label_xpath)
             select_id = await label_elem.first.get_attribute("for")
@@ -751,10 +723,11 @@ class XPathConstructor:
             self._xpath += (
                 f"{label_xpath}/following-sibling::{input_type.html_element}[1]"
             )
-        logger.debug(f"XPath: {self}")
+        logger.debug("XPath: %s", self)
 
         return self
 
+    @tracing.traced("xpath.fill")
     async def handle_fill(
         self,
         value: str | list | None,
@@ -773,20 +746,24 @@ class XPathConstructor:
         """
 
         input_type = self._get_input_type(input_type)
+        tracing.set_attributes(label=self._label, input_type=input_type,
+                               selector=self._xpath)
 
         # Capturando elemento
         locator = await self.wait_and_get(timeout)
 
         logger.debug(
-            f"Preenchendo locator: {locator} com o campo do "
-            f"elemento html: {input_type.html_element} e valor: {value}"
+            "Preenchendo locator: %s com o campo do elemento html: %s e "
+            "valor: %s",
+            locator, input_type.html_element, value,
         )
         # Preenchimento dependendo do tipo de input
         if input_type in (InputType.SELECT, InputType.LIST):
             if value is None:
                 logger.warning(
-                    f"Valor vazio para campo do tipo {input_type.html_element}"
-                    ". Nenhum valor será preenchido."
+                    "Valor vazio para campo do tipo %s. Nenhum valor será "
+                    "preenchido.",
+                    input_type.html_element,
                 )
                 return self
             await self._select_option_with_retry(locator, value, timeout)
@@ -804,8 +781,9 @@ class XPathConstructor:
             else:
                 # O locator é um contêiner; buscar checkboxes filhos
                 logger.debug(
-                    f"O locator é um contêiner; buscar checkboxes filhos "
-                    f"de: {locator}"
+                    "O locator é um contêiner; buscar checkboxes filhos de: "
+                    "%s",
+                    locator,
                 )
                 checkboxes = locator.locator("input[type='checkbox']")
                 count = await checkboxes.count()
@@ -818,11 +796,15 @@ class XPathConstructor:
                 is_checked = await input_el.is_checked()
                 if input_value in valores and not is_checked:
                     logger.debug(
-                        f"Marcando checkbox value={input_value} (checked={is_checked})")
+                        "Marcando checkbox value=%s (checked=%s)",
+                        input_value, is_checked,
+                    )
                     await input_el.check(force=True)
                 elif input_value not in valores and is_checked:
                     logger.debug(
-                        f"Desmarcando checkbox value={input_value} (checked={is_checked})")
+                        "Desmarcando checkbox value=%s (checked=%s)",
+                        input_value, is_checked,
+                    )
                     await input_el.uncheck(force=True)
         elif input_type == InputType.RADIO:
             await self._select_radio_with_retry(locator, value, timeout)
@@ -851,8 +833,9 @@ class XPathConstructor:
         """
         if self._xpath:
             logger.debug(
-                f"XPath já definido: {self.xpath}. Não redefinindo para "
-                f"localizar botão '{button_text}'."
+                "XPath já definido: %s. Não redefinindo para localizar "
+                "botão '%s'.",
+                self.xpath, button_text,
             )
             return self
 
@@ -864,7 +847,7 @@ class XPathConstructor:
             f"|//a[contains(@class,'form-button') "
             f"and normalize-space(string(.))='{button_text}'])[1]"
         )
-        logger.debug(f"XPath do botão localizado: {self}")
+        logger.debug("XPath do botão localizado: %s", self)
         return self
 
     def find_form_anchor_button(self, button_text: str) -> "XPathConstructor":
@@ -896,8 +879,9 @@ class XPathConstructor:
         """
         if self._xpath:
             logger.debug(
-                f"XPath já definido: {self._xpath}. Não redefinindo para "
-                f"localizar botão âncora '{button_text}'."
+                "XPath já definido: %s. Não redefinindo para localizar "
+                "botão âncora '%s'.",
+                self._xpath, button_text,
             )
             return self
 
@@ -908,9 +892,10 @@ class XPathConstructor:
             f", ' form-button ') "
             f"and normalize-space(text())='{button_text}'])[1]"
         )
-        logger.debug(f"XPath do botão <a> localizado: {self._xpath}")
+        logger.debug("XPath do botão <a> localizado: %s", self._xpath)
         return self
 
+    @tracing.traced("xpath.click")
     async def handle_click(
         self,
         timeout: float = DEFAULT_TIMEOUT,
@@ -938,35 +923,38 @@ class XPathConstructor:
         """
         interval = interval or self.ELAPSED_INTERVAL
         elocator: Locator = None
+        tracing.set_attributes(selector=self._xpath)
 
-        elapsed = 0
-        while elapsed < timeout:
-            try:
-                elocator = await self.wait_and_get(timeout)
+        async def _click():
+            nonlocal elocator
+            elocator = await self.wait_and_get(timeout)
+            logger.debug(
+                "Clicando no elemento localizado com XPath: %s",
+                self._xpath,
+            )
+            await elocator.click(force=True)
+            if wait_for_selector:
                 logger.debug(
-                    f"Clicando no elemento localizado com XPath: {self._xpath}"
+                    "Aguardando seletor após clique: %s",
+                    wait_for_selector,
+                )
+                await self.page.wait_for_selector(
+                    wait_for_selector,
+                    state="visible",
+                    timeout=timeout * self.TIMEOUT_MS_FACTOR,
                 )
-                await elocator.click(force=True)
-                if wait_for_selector:
-                    logger.debug(f"Aguardando seletor após clique: "
-                                 f"{wait_for_selector}")
-                    await self.page.wait_for_selector(
-                        wait_for_selector,
-                        state="visible",
-                        timeout=timeout * self.TIMEOUT_MS_FACTOR,
-                    )
-                if reset:
-                    self.reset()
-                return self
-            except Exception:
-                time.sleep(interval)
-                elapsed += interval
 
-        raise SiscanTimeoutError(
-            self._context,
-            m=f"Timeout ao clicar no elemento locator '{elocator}' após "
-            f"{timeout * self.TIMEOUT_MS_FACTOR} milessegundos."
-        )
+        try:
+            await retry(_click, timeout, interval)
+        except Exception:
+            raise SiscanTimeoutError(
+                self._context,
+                m=f"Timeout ao clicar no elemento locator '{elocator}' após "
+                f"{timeout * self.TIMEOUT_MS_FACTOR} milessegundos."
+            )
+        if reset:
+            self.reset()
+        return self
 
     async def click_menu_action(
         self,
@@ -995,7 +983,7 @@ class XPathConstructor:
         """
         page = self.page
 
-        logger.debug(f"Verifica se menu '{menu_name}' existe.")
+        logger.debug("Verifica se menu '%s' existe.", menu_name)
         # Localiza o menu principal pelo texto
         menu_label = page.locator(
             ".rich-ddmenu-label .rich-label-text-decor", has_text=menu_name
@@ -1003,7 +991,7 @@ class XPathConstructor:
         if await menu_label.count() == 0:
             raise SiscanMenuNotFoundError(self.context, menu_name=menu_name)
 
-        logger.debug(f"Verifica se submenu: '{menu_action_text}' existe")
+        logger.debug("Verifica se submenu: '%s' existe", menu_action_text)
         submenu = page.locator(".rich-menu-item-label", has_text=menu_action_text)
         if await submenu.count() == 0:
             raise SiscanMenuNotFoundError(
@@ -1011,22 +999,19 @@ class XPathConstructor:
             )
 
         logger.debug(
-            f"Clinca no menu {menu_name} e verifica se o "
-            f"submenu {menu_action_text} está visível"
+            "Clinca no menu %s e verifica se o submenu %s está visível",
+            menu_name, menu_action_text,
         )
 
-        interval = self.ELAPSED_INTERVAL
-        elapsed = 0
-        while elapsed < timeout:
+        async def _submenu_visible() -> bool:
             await menu_label.first.hover()
-            if await submenu.is_visible():
-                break
-            time.sleep(interval)
-            elapsed += interval
+            return await submenu.is_visible()
+
+        await wait_until(_submenu_visible, timeout, self.ELAPSED_INTERVAL)
 
         # Delay para submenu aparecer em 500 milissegundo
         await submenu.first.click(timeout=timeout * self.TIMEOUT_MS_FACTOR)
-        logger.debug(f"Menu '{menu_name}' > '{menu_action_text}' acionado.")
+        logger.debug("Menu '%s' > '%s' acionado.", menu_name, menu_action_text)
         if reset:
             self.reset()
         return self
@@ -1057,7 +1042,8 @@ class XPathConstructor:
         """
         locator = await self.wait_and_get(timeout)
         logger.debug(
-            f"Disparando evento 'blur' no elemento localizado por XPath: {self._xpath}"
+            "Disparando evento 'blur' no elemento localizado por XPath: %s",
+            self._xpath,
         )
         await locator.dispatch_event("blur")
         return self  # Permite encadeamento, se necessário
@@ -1108,33 +1094,20 @@ class XPathConstructor:
             Se o select não carregar o número mínimo de opções no tempo limite.
         """
         locator = await self.wait_and_get(timeout)
-        interval = interval or self.ELAPSED_INTERVAL
-        elapsed = 0
-        option_count: Locator = None
+
         # Aguarda o select carregar as opções mínimas
-        while elapsed < timeout:
-            option_count = await locator.locator("option").count()
-            if option_count >= min_options:
-                break
-            time.sleep(interval)
-            elapsed += interval
-        else:
+        if not await dom_wait.min_options(
+            self.page, self._xpath, min_options, timeout
+        ):
             raise SiscanTimeoutError(
                 self._context,
                 m=f"Select não carregou pelo menos {min_options} opções após "
                   f"{timeout * self.TIMEOUT_MS_FACTOR} milessegundos. "
-                  f"Objeto locator:'{option_count}'"
+                  f"Objeto locator:'{locator}'"
             )
 
-        options_dict = {}
-        options = locator.locator("option")
-        count = await options.count()
-        for i in range(count):
-            option = options.nth(i)
-            value = await option.get_attribute("value")
-            label = (await option.inner_text()).strip()
-            options_dict[value] = label
-        return options_dict
+        # Lê todas as opções em uma única chamada ao navegador
+        return await bulk_reader.select_options(self.page, self._xpath)
 
     async def wait_for_label_visible(
         self, label_text: str, timeout: float = DEFAULT_TIMEOUT, interval: float = None
@@ -1157,14 +1130,10 @@ class XPathConstructor:
         bool
             True se o label for localizado dentro do timeout, False caso contrário.
         """
-        elapsed = 0
-        interval = interval or self.ELAPSED_INTERVAL
         selector = f"//label[normalize-space(text())='{label_text}']"
-        while elapsed < timeout:
-            if await self.page.locator(selector).count() > 0:
-                return True
-            time.sleep(interval)
-            elapsed += interval
+
+        if await dom_wait.xpath_present(self.page, selector, timeout):
+            return True
         self.reset()
         return False
 
@@ -0,0 +1,74 @@
+import pytest
+
+from src.siscan.benchmark import (
+    STEPS,
+    compare,
+    format_report,
+    load_result,
+    percentile,
+    run_benchmark,
+    save_result,
+)
+from src.siscan.simulator import SimulatorConfig
+from src.utils.step_timer import StepTimer
+
+
+def test_step_timer_sums_repeated_steps():
+    timer = StepTimer()
+    with timer.step("campos"):
+        pass
+    with pytest.raises(ValueError):
+        with timer.step("campos"):
+            raise ValueError
+    assert [t.ok for t in timer.timings] == [True, False]
+    assert list(timer.summary()) == ["campos"]
+
+
+def test_percentile_interpolates():
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 50) == pytest.approx(50.5)
+    assert percentile(values, 99) == pytest.approx(99.01)
+    assert percentile([], 95) == 0.0
+
+
+@pytest.mark.asyncio
+async def test_benchmark_reports_every_step(tmp_path):
+    config = SimulatorConfig()
+    config.prestadores.insert(0, "CLINICA SIMULADA BENCHMARK")
+    result = await run_benchmark(runs=3, warmup=1, config=config)
+
+    for flow in ("rastreio", "diagnostica"):
+        data = result["flows"][flow]
+        assert list(data["steps"]) == list(STEPS)
+        for stats in [*data["steps"].values(), data["total"]]:
+            assert stats["n"] == 3
+            assert stats["p50"] <= stats["p95"] <= stats["p99"]
+        trips = data["round_trips"]
+        assert trips["total"]["p50"] == sum(
+            stats["p50"] for stats in trips["steps"].values()
+        )
+
+    path = save_result(result, tmp_path / "bench.json")
+    assert load_result(path) == result
+    assert compare(result, load_result(path)) == []
+    assert "responsavel_coleta" in format_report(result)
+
+
+def test_compare_flags_slower_steps_only():
+    def result(cartao, login):
+        stats = lambda v: {"p50": v, "p95": v, "p99": v}  # noqa: E731
+        return {"flows": {"rastreio": {
+            "steps": {"login": stats(login), "cartao_sus": stats(cartao)},
+            "total": stats(cartao + login),
+        }}}
+
+    baseline = result(cartao=0.100, login=0.001)
+    # Login 3x mais lento, mas abaixo de min_delta: ruído
+    regressions = compare(result(cartao=0.200, login=0.003), baseline)
+
+    assert {(r.step, r.metric) for r in regressions} == {
+        ("cartao_sus", "p50"), ("cartao_sus", "p95"),
+        ("total", "p50"), ("total", "p95"),
+    }
+    assert regressions[0].ratio == pytest.approx(2.0)
+    assert compare(result(cartao=0.110, login=0.001), baseline) == []
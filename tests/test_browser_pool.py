@@ -0,0 +1,142 @@
+from contextlib import asynccontextmanager
+
+import pytest
+from fastapi.testclient import TestClient
+
+import src.siscan.browser_pool as bp
+from src.main import app
+
+
+class FakeContext:
+    def __init__(self, browser):
+        self.browser = browser
+        self._handlers = []
+
+    def on(self, event, handler):
+        if event == "close":
+            self._handlers.append(handler)
+
+    async def close(self):
+        for handler in self._handlers:
+            handler(self)
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.connected = True
+
+    def is_connected(self):
+        return self.connected
+
+    async def new_context(self, **kwargs):
+        return FakeContext(self)
+
+    async def close(self):
+        self.connected = False
+
+
+class FakeChromium:
+    async def launch(self, **kwargs):
+        return FakeBrowser()
+
+
+class FakePlaywright:
+    chromium = FakeChromium()
+
+    async def stop(self):
+        pass
+
+
+class FakeAsyncPlaywright:
+    async def start(self):
+        return FakePlaywright()
+
+
+@pytest.fixture
+def fake_playwright(monkeypatch):
+    monkeypatch.setattr(bp, "async_playwright", FakeAsyncPlaywright)
+
+
+@pytest.mark.asyncio
+async def test_pool_warmup_and_status(fake_playwright):
+    pool = bp.BrowserPool(size=2, health_interval=0)
+    assert not pool.ready
+
+    await pool.start()
+    assert pool.status() == {
+        "ready": True, "size": 2, "warm": 2, "in_use": 0, "launches": 2,
+    }
+    await pool.stop()
+    assert not pool.ready
+
+
+@pytest.mark.asyncio
+async def test_pool_distributes_and_releases_contexts(fake_playwright):
+    pool = bp.BrowserPool(size=2, health_interval=0)
+    await pool.start()
+
+    first = await pool.new_context()
+    second = await pool.new_context()
+    # Cada contexto vai para o navegador menos ocupado
+    assert first.browser is not second.browser
+    assert pool.in_use == 2
+
+    await first.close()
+    assert pool.in_use == 1
+
+    async with pool.context() as ctx:
+        assert ctx.browser is first.browser
+    assert pool.in_use == 1
+    await pool.stop()
+
+
+@pytest.mark.asyncio
+async def test_pool_health_check_replaces_dead_browser(fake_playwright):
+    pool = bp.BrowserPool(size=2, health_interval=0)
+    await pool.start()
+
+    pool._browsers[0].connected = False
+    assert pool.warm == 1
+
+    status = await pool.health_check()
+    assert status["warm"] == 2
+    assert status["launches"] == 3
+    await pool.stop()
+
+
+@pytest.fixture
+def client(monkeypatch):
+    # Sem o lifespan real: ele lançaria o Chromium do pool global
+    @asynccontextmanager
+    async def lifespan(app):
+        yield
+
+    monkeypatch.setattr(app.router, "lifespan_context", lifespan)
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.mark.asyncio
+async def test_readiness_endpoint_reports_pool_warmth(
+    fake_playwright, client, monkeypatch
+):
+    pool = bp.BrowserPool(size=1, health_interval=0)
+    monkeypatch.setattr("src.routes.health.browser_pool", pool)
+
+    res = client.get("/health/ready")
+    assert res.status_code == 503
+    assert res.json()["ready"] is False
+
+    await pool.start()
+    res = client.get("/health/ready")
+    assert res.status_code == 200
+    assert res.json()["warm"] == 1
+    await pool.stop()
+
+
+def test_readiness_endpoint_is_ready_without_pool(client, monkeypatch):
+    monkeypatch.setattr("src.routes.health.browser_pool",
+                        bp.BrowserPool(size=0))
+    res = client.get("/health/ready")
+    assert res.status_code == 200
+    assert res.json()["ready"] is True
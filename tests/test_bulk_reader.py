@@ -0,0 +1,67 @@
+import pytest
+
+from src.siscan.exception import SiscanException
+from src.utils import bulk_reader
+
+
+class FakePage:
+    """Página que responde a cada ``evaluate`` com o próximo resultado."""
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.calls = []
+
+    async def evaluate(self, expression, arg=None):
+        self.calls.append((expression, arg))
+        return self.results.pop(0)
+
+
+class FakeContext:
+    def __init__(self, page):
+        self._page = page
+
+    @property
+    async def page(self):
+        return self._page
+
+
+@pytest.mark.asyncio
+async def test_select_options_in_a_single_evaluate():
+    cnes = [[str(i), f"{i:07d} - UNIDADE {i}"] for i in range(1, 501)]
+    page = FakePage([["0", "Selecione..."], *cnes])
+
+    options = await bulk_reader.select_options(page, "//select[@id='cnes']")
+
+    assert len(page.calls) == 1
+    assert page.calls[0][1] == {"xpath": "//select[@id='cnes']"}
+    assert options["0"] == "Selecione..."
+    assert options["500"] == "0000500 - UNIDADE 500"
+    assert len(options) == 501
+
+
+@pytest.mark.asyncio
+async def test_missing_elements():
+    page = FakePage(None, None, None)
+    assert await bulk_reader.select_options(page, "//select") == {}
+    assert await bulk_reader.selected_option(page, "//select") == (None, None)
+    assert await bulk_reader.checked_inputs(page, "//div", "radio") is None
+
+
+@pytest.mark.asyncio
+async def test_checked_inputs_returns_tuples():
+    page = FakePage([["Sim", "S"], ["Não sabe", "NS"]])
+    checked = await bulk_reader.checked_inputs(page, "//table", "checkbox")
+    assert checked == [("Sim", "S"), ("Não sabe", "NS")]
+    assert page.calls[0][1] == {"xpath": "//table", "type": "checkbox"}
+
+
+@pytest.mark.asyncio
+async def test_error_messages_read_in_one_call():
+    page = FakePage(["Cartão SUS inválido", "Campo obrigatório"])
+    mensagens = await SiscanException.get_error_messages(FakeContext(page))
+
+    assert mensagens == (
+        "Form Errors: Cartão SUS inválido | Campo obrigatório"
+    )
+    assert len(page.calls) == 1
+    assert "tr.errorMessage > td" in page.calls[0][1]["selectors"]
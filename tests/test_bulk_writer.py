@@ -0,0 +1,106 @@
+import pytest
+
+from src.utils.bulk_writer import BulkFormWriter, FieldWrite
+from src.utils.schema import InputType
+
+
+class FakePage:
+    """
+    Simula o script de aplicação em lote: aplica os campos em ordem e para
+    antes de um campo que dispara AJAX (ou logo após aplicá-lo, quando
+    forçado).
+    """
+
+    def __init__(self, ajax=(), missing=()):
+        self.ajax = set(ajax)
+        self.missing = set(missing)
+        self.applied = []
+        self.calls = 0
+
+    async def evaluate(self, expression, arg):
+        self.calls += 1
+        results = []
+        for index, f in enumerate(arg["fields"]):
+            ajax = f["name"] in self.ajax
+            if ajax and not (arg["force"] and index == 0):
+                return {"results": results, "stopped": f["name"]}
+            error = "not_found" if f["name"] in self.missing else None
+            if not error:
+                self.applied.append(f["name"])
+            results.append({"name": f["name"], "ok": not error,
+                            "ajax": ajax, "error": error})
+            if ajax:
+                break
+        return {"results": results, "stopped": None}
+
+
+class FakeReadiness:
+    attached = True
+
+    def __init__(self, page):
+        self.page = page
+        self.steps = []
+
+    async def wait_ready(self, timeout, step="page", force=False):
+        self.steps.append((step, force, list(self.page.applied)))
+        return True
+
+
+def _fields(n, prefix="ano"):
+    return [
+        FieldWrite(f"{prefix}_{i}", f"//input[@id='{i}']", InputType.TEXT,
+                   "2020")
+        for i in range(n)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_non_ajax_fields_are_written_in_one_call():
+    page = FakePage()
+    writer = BulkFormWriter(page)
+    results = await writer.write(_fields(26))
+
+    assert page.calls == 1
+    assert all(r.ok and not r.fallback for r in results)
+    assert [r.name for r in results] == [f"ano_{i}" for i in range(26)]
+
+
+@pytest.mark.asyncio
+async def test_ajax_fields_get_their_own_ordered_phase():
+    page = FakePage(ajax={"grupo"})
+    readiness = FakeReadiness(page)
+    fields = [
+        FieldWrite("antes", "//input[@id='a']", InputType.TEXT, "1"),
+        FieldWrite("grupo", "//input[@id='g']", InputType.CHECKBOX, True),
+        *_fields(10, prefix="sub"),
+    ]
+    results = await BulkFormWriter(page, readiness=readiness).write(fields)
+
+    # Lote antes do AJAX, fase do campo AJAX e lote dos subcampos
+    assert page.calls == 3
+    assert page.applied[:2] == ["antes", "grupo"]
+    # A espera ocorre após o campo AJAX e antes dos subcampos
+    assert readiness.steps == [("ajax:grupo", True, ["antes", "grupo"])]
+    assert [r.ajax for r in results][:2] == [False, True]
+    assert all(r.ok for r in results)
+
+
+@pytest.mark.asyncio
+async def test_missing_fields_fall_back_to_single_fill(monkeypatch):
+    page = FakePage(missing={"ano_1"})
+    filled = []
+
+    async def fake_fill_one(self, field):
+        filled.append(field.name)
+
+    monkeypatch.setattr(BulkFormWriter, "_fill_one", fake_fill_one)
+    fields = _fields(3) + [
+        FieldWrite("vazio", "//input", InputType.TEXT, None)
+    ]
+    results = await BulkFormWriter(page).write(fields)
+
+    assert filled == ["ano_1"]
+    by_name = {r.name: r for r in results}
+    assert by_name["ano_1"].ok and by_name["ano_1"].fallback
+    assert by_name["vazio"].error == "empty"
+    assert page.calls == 1
@@ -0,0 +1,124 @@
+import asyncio
+
+import pytest
+
+from src.siscan.classes import webpage as siscan_webpage
+from src.siscan.classes.requisicao_exame_mamografia_diagnostica import (
+    RequisicaoExameMamografiaDiagnostica,
+)
+from src.siscan.classes.requisicao_exame_mamografia_rastreio import (
+    RequisicaoExameMamografiaRastreio,
+)
+from src.siscan.options_cache import SelectOptionsCache
+
+BASE_URL = "https://siscan.example/"
+
+OPTIONS = {
+    "rastreio@x": {
+        "cnes_unidade_requisitante": {
+            "Selecione...": "0",
+            "0015466 - CENTRO DE ESPECIALIDADES": "4",
+        },
+        "cns_responsavel_coleta": {
+            "Selecione...": "0",
+            "MARIA - 700000000000001": "11",
+        },
+    },
+    "diagnostica@x": {
+        "cnes_unidade_requisitante": {
+            "Selecione...": "0",
+            "0027049 - HOSPITAL MUNICIPAL": "7",
+        },
+        "cns_responsavel_coleta": {
+            "Selecione...": "0",
+            "JOAO - 700000000000002": "22",
+        },
+    },
+}
+
+
+class FakeXPE:
+    """Registra, por contexto, as seleções feitas no navegador."""
+
+    fills: dict = {}
+
+    def __init__(self, context):
+        self._context = context
+
+    @classmethod
+    async def create(cls, context, xpath=""):
+        return cls(context)
+
+    async def find_form_input(self, label, input_type=None):
+        await asyncio.sleep(0)
+        return self
+
+    async def handle_fill(self, value, input_type=None):
+        await asyncio.sleep(0)
+        FakeXPE.fills.setdefault(id(self._context), []).append(value)
+        return self
+
+
+def make_page(page_class, user, monkeypatch):
+    page = page_class(BASE_URL, user, "secret")
+
+    async def load_select_options(field_name):
+        # Cede o event loop para intercalar os dois jobs
+        await asyncio.sleep(0)
+        page.FIELDS_MAP[field_name] = dict(OPTIONS[user][field_name])
+
+    monkeypatch.setattr(page, "load_select_options", load_select_options)
+    return page
+
+
+async def fill(page, cnes, cns):
+    for _ in range(3):
+        await page._seleciona_unidade_requisitante(
+            {"cnes_unidade_requisitante": cnes}
+        )
+        await page._seleciona_responsavel_coleta(
+            {"cns_responsavel_coleta": cns}
+        )
+
+
+@pytest.mark.asyncio
+async def test_concurrent_jobs_keep_their_own_options(monkeypatch):
+    monkeypatch.setattr(siscan_webpage, "options_cache", SelectOptionsCache())
+    monkeypatch.setattr(siscan_webpage, "XPE", FakeXPE)
+    FakeXPE.fills = {}
+
+    rastreio = make_page(
+        RequisicaoExameMamografiaRastreio, "rastreio@x", monkeypatch
+    )
+    diagnostica = make_page(
+        RequisicaoExameMamografiaDiagnostica, "diagnostica@x", monkeypatch
+    )
+
+    await asyncio.gather(
+        fill(rastreio, "0015466", "700000000000001"),
+        fill(diagnostica, "0027049", "700000000000002"),
+    )
+
+    assert FakeXPE.fills[id(rastreio.context)] == ["4", "11"] * 3
+    assert FakeXPE.fills[id(diagnostica.context)] == ["7", "22"] * 3
+    assert "0027049" not in rastreio.FIELDS_MAP["cnes_unidade_requisitante"]
+    assert "0015466" not in diagnostica.FIELDS_MAP["cnes_unidade_requisitante"]
+
+    # A base compartilhada e os novos jobs não enxergam as opções lidas
+    fresh = RequisicaoExameMamografiaRastreio(BASE_URL, "outro@x", "secret")
+    assert "cnes_unidade_requisitante" not in fresh.FIELDS_MAP
+    assert fresh.FIELDS_MAP["tipo_de_mamografia"] == (
+        rastreio.FIELDS_MAP["tipo_de_mamografia"]
+    )
+
+
+def test_base_options_are_read_only():
+    page = RequisicaoExameMamografiaRastreio(BASE_URL, "u", "p")
+
+    with pytest.raises(TypeError):
+        page.FIELDS_MAP["tipo_de_mamografia"]["Outro"] = "03"
+
+    # Substituir um mapeamento altera apenas a camada da instância
+    page.FIELDS_MAP["tipo_de_mamografia"] = {"Outro": "03"}
+    other = RequisicaoExameMamografiaRastreio(BASE_URL, "u", "p")
+    assert other.FIELDS_MAP["tipo_de_mamografia"]["Rastreamento"] == "02"
@@ -0,0 +1,66 @@
+import pytest
+from playwright.async_api import Error, TimeoutError
+
+from src.utils import dom_wait
+
+
+class FakePage:
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = []
+
+    async def wait_for_function(self, expression, arg=None, polling=None,
+                                timeout=None):
+        self.calls.append(
+            {"expression": expression, "arg": arg, "polling": polling,
+             "timeout": timeout}
+        )
+        outcome = self.outcomes.pop(0) if self.outcomes else None
+        if outcome is not None:
+            raise outcome
+
+
+@pytest.mark.asyncio
+async def test_option_present_waits_in_browser_with_mutation_polling():
+    page = FakePage()
+    assert await dom_wait.option_present(page, "//select", "5", timeout=2)
+
+    # Uma única chamada ao navegador, reavaliada a cada mutação do DOM
+    assert len(page.calls) == 1
+    call = page.calls[0]
+    assert call["polling"] == "mutation"
+    assert call["arg"] == {"xpath": "//select", "value": "5"}
+    assert "byXPath" in call["expression"]
+    assert 0 < call["timeout"] <= 2000
+
+
+@pytest.mark.asyncio
+async def test_timeout_returns_false():
+    page = FakePage(TimeoutError("Timeout 10ms exceeded."))
+    assert not await dom_wait.ajax_idle(page, timeout=0.01)
+
+
+@pytest.mark.asyncio
+async def test_navigation_during_wait_is_retried():
+    page = FakePage(Error("Execution context was destroyed"))
+    assert await dom_wait.radio_ready(page, "//div", "1", timeout=2)
+    assert len(page.calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_unexpected_errors_are_propagated():
+    page = FakePage(Error("SyntaxError"))
+    with pytest.raises(Error):
+        await dom_wait.element_enabled(page, "//input", timeout=2)
+
+
+@pytest.mark.asyncio
+async def test_recheck_reevaluates_without_dom_mutations():
+    # A condição só fica verdadeira na segunda avaliação, sem mutação no DOM
+    page = FakePage(TimeoutError("Timeout 50ms exceeded."))
+    assert await dom_wait.wait_for_condition(
+        page, "() => document.readyState === 'complete'", None, timeout=2,
+        recheck=0.05,
+    )
+    assert len(page.calls) == 2
+    assert page.calls[0]["timeout"] == 50
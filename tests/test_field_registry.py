@@ -0,0 +1,67 @@
+import dataclasses
+
+import pytest
+
+from src.siscan.classes.requisicao_exame import RequisicaoExame
+from src.siscan.classes.requisicao_exame_mamografia_diagnostica import (
+    RequisicaoExameMamografiaDiagnostica,
+)
+from src.siscan.schema.requisicao_mamografia_diagnostica_schema import (
+    RequisicaoMamografiaDiagnosticaSchema,
+)
+from src.utils.SchemaMapExtractor import SchemaMapExtractor
+from src.utils.field_registry import FieldRegistry
+from src.utils.schema import InputType
+
+
+def make_page():
+    return RequisicaoExameMamografiaDiagnostica("https://siscan/", "u", "p")
+
+
+def test_registry_is_compiled_once(monkeypatch):
+    make_page()
+    calls = []
+    original = SchemaMapExtractor.schema_to_maps
+    monkeypatch.setattr(
+        SchemaMapExtractor, "schema_to_maps",
+        lambda *a, **kw: calls.append(a) or original(*a, **kw),
+    )
+
+    first, second = make_page(), make_page()
+
+    assert calls == []
+    assert first.get_map_label() is second.get_map_label()
+    assert FieldRegistry.for_page(
+        RequisicaoExameMamografiaDiagnostica,
+        RequisicaoMamografiaDiagnosticaSchema,
+    ).fields is first.get_map_label()
+
+
+def test_merged_fields_and_overrides():
+    page = make_page()
+
+    cartao = page.get_field_metadata("cartao_sus")
+    assert (cartao.label, cartao.input_type, cartao.required) == (
+        "Cartão SUS", InputType.TEXT, True
+    )
+    assert page.get_field_xpath("prestador") == (
+        "//select[@name='frm:prestadorServicoCoordenacaoMunicipal']"
+    )
+    assert page.FIELDS_MAP["tipo_de_mamografia"]["Diagnóstica"] == "01"
+
+    # Camada de uma classe contém apenas os campos que ela declara
+    assert set(page.field_layer(RequisicaoExame)) == set(
+        RequisicaoExame.MAP_SCHEMA_FIELDS
+    )
+
+
+def test_field_specs_are_immutable():
+    page = make_page()
+    field = page.get_field_metadata("cartao_sus")
+
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        field.label = "Outro"
+    with pytest.raises(TypeError):
+        page.get_map_label()["cartao_sus"] = field
+    assert field.with_label("Cartão SUS:").label == "Cartão SUS:"
+    assert not hasattr(field, "__dict__")
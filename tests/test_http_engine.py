@@ -0,0 +1,255 @@
+from urllib.parse import parse_qs
+
+import httpx
+import pytest
+
+from src.siscan.classes import webpage as siscan_webpage
+from src.siscan.classes.requisicao_exame_mamografia_rastreio import (
+    RequisicaoExameMamografiaRastreio,
+)
+from src.siscan.exception import SiscanHttpEngineError
+from src.siscan.http_engine import JsfDocument, JsfHttpEngine
+from src.siscan.session_pool import SiscanSessionManager
+from src.utils.bulk_writer import FieldWrite
+from src.utils.schema import InputType
+
+BASE_URL = "https://siscan.example/"
+
+A4J_BLUR = (
+    "A4J.AJAX.Submit('_viewRoot','frm',event,{'similarityGroupingId':"
+    "'frm:j_id10','parameters':{'frm:j_id10':'frm:j_id10'},"
+    "'actionUrl':'/exame.jsf'})"
+)
+
+LOGIN = """
+<form id="frm" action="/login.jsf" method="post">
+  <input type="hidden" name="frm" value="frm"/>
+  <label for="frm:email">E-mail:</label><input id="frm:email" name="frm:email"/>
+  <label for="frm:senha">Senha:</label>
+  <input type="password" id="frm:senha" name="frm:senha"/>
+  <input type="submit" name="frm:acessar" value="Acessar"/>
+  <input type="hidden" name="javax.faces.ViewState" value="L1"/>
+</form>
+"""
+
+HOME = """
+<h1>SEJA BEM VINDO AO SISCAN</h1>
+<form id="menu" action="/home.jsf">
+  <div class="rich-ddmenu-label"><div class="rich-label-text-decor">EXAME</div>
+    <div class="rich-menu-item rich-menu-item-enabled" id="menu:gerenciar"
+         onclick="jsfcljs(document.getElementById('menu'),{'menu:gerenciar':'menu:gerenciar'},'');return false;">
+      <span class="rich-menu-item-label">GERENCIAR EXAME</span>
+    </div>
+  </div>
+  <input type="hidden" name="javax.faces.ViewState" value="H1"/>
+</form>
+"""
+
+EXAME = f"""
+<form id="frm" action="/exame.jsf">
+  <input type="hidden" name="frm" value="frm"/>
+  <label for="frm:cartaoSus">Cartão SUS:</label>
+  <input id="frm:cartaoSus" name="frm:cartaoSus" onblur="{A4J_BLUR}"/>
+  <div id="frm:paciente">
+    <label for="frm:nome">Nome:</label>
+    <input id="frm:nome" name="frm:nome" value=""/>
+  </div>
+  <fieldset><legend>OPÇÕES DE CIRURGIA</legend>
+    <div><input type="text" name="frm:anoSegDir"/></div>
+    <div><label>Segmentectomia</label></div>
+    <div><input type="text" name="frm:anoSegEsq"/></div>
+  </fieldset>
+  <div id="frm:mamaDireita">
+    <fieldset><legend>DESCARGA PAPILAR ESPONTÂNEA</legend>
+      <input type="checkbox" id="frm:d:0" name="frm:descargaDireita" value="01"/>
+      <label for="frm:d:0">Cristalina</label>
+      <input type="checkbox" id="frm:d:1" name="frm:descargaDireita" value="02"/>
+      <label for="frm:d:1">Hemorrágica</label>
+    </fieldset>
+  </div>
+  <fieldset><legend>TIPO DE MAMOGRAFIA</legend>
+    <input type="radio" id="frm:t:0" name="frm:tipo" value="01"/>
+    <label for="frm:t:0">Diagnóstica</label>
+    <input type="radio" id="frm:t:1" name="frm:tipo" value="02" checked="checked"/>
+    <label for="frm:t:1">Rastreamento</label>
+  </fieldset>
+  <label for="frm:prestador">Prestador de Serviço:</label>
+  <select id="frm:prestador" name="frm:prestadorServicoCoordenacaoMunicipal">
+    <option value="0">Selecione...</option>
+    <option value="7">CLINICA X</option>
+  </select>
+  <input type="checkbox" name="frm:lesaoPapilarDireita" value="true" disabled="disabled"/>
+  <input type="submit" name="frm:avancar" value="Avançar"/>
+  <input type="hidden" name="javax.faces.ViewState" value="V1"/>
+</form>
+"""
+
+PACIENTE = """<?xml version="1.0"?>
+<html><head><meta name="Ajax-Update-Ids" content="frm:paciente"/></head>
+<body><div id="frm:paciente"><label for="frm:nome">Nome:</label>
+<input id="frm:nome" name="frm:nome" value="MARIA DA SILVA"/></div>
+<span id="ajax-view-state"><input type="hidden" name="javax.faces.ViewState"
+ value="V2"/></span></body></html>"""
+
+
+def test_document_resolves_fields_from_registry_metadata():
+    doc = JsfDocument(EXAME, f"{BASE_URL}exame.jsf")
+
+    assert doc.view_state == "V1"
+    select = doc.resolve(
+        "//select[@name='frm:prestadorServicoCoordenacaoMunicipal']", "",
+        InputType.SELECT,
+    )
+    assert select[0].value == "0"
+    assert doc.select_options("", "Prestador de Serviço:") == {
+        "0": "Selecione...", "7": "CLINICA X"
+    }
+    descarga = doc.resolve(
+        "//div[@id='frm:mamaDireita']//fieldset[legend[text()="
+        "'DESCARGA PAPILAR ESPONTÂNEA']]", "", InputType.CHECKBOX,
+    )
+    assert [c.value for c in descarga] == ["01", "02"]
+    assert doc.read("", "Tipo de Mamografia", InputType.RADIO) == (
+        "Rastreamento", "02"
+    )
+
+    base = ("//fieldset[legend[normalize-space(text())='OPÇÕES DE CIRURGIA']]"
+            "//label[normalize-space(text())='Segmentectomia']/parent::div/")
+    direita = base + "preceding-sibling::div[1]//input[@type='text']"
+    esquerda = base + "following-sibling::div[1]//input[@type='text']"
+    assert doc.resolve(direita, "", InputType.TEXT)[0].name == "frm:anoSegDir"
+    assert doc.resolve(esquerda, "", InputType.TEXT)[0].name == "frm:anoSegEsq"
+
+    with pytest.raises(SiscanHttpEngineError):
+        doc.resolve("//tr[2]/td[@class='x']", "", InputType.TEXT)
+    with pytest.raises(SiscanHttpEngineError):
+        doc.resolve("", "Campo Inexistente", InputType.TEXT)
+
+
+@pytest.mark.asyncio
+async def test_ajax_field_merges_partial_response_and_view_state():
+    requests = []
+
+    def handler(request: httpx.Request):
+        body = parse_qs(request.content.decode()) if request.content else {}
+        requests.append((request.method, request.url.path, body,
+                         request.headers.get("cookie")))
+        if request.method == "GET":
+            return httpx.Response(200, text=EXAME,
+                                  headers={"Set-Cookie": "JSESSIONID=s1"})
+        if "AJAXREQUEST" in body:
+            return httpx.Response(200, text=PACIENTE)
+        return httpx.Response(200, text="<h1>MAMOGRAFIA</h1>")
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler),
+                               follow_redirects=True)
+    async with JsfHttpEngine(BASE_URL, client=client) as http:
+        await http.goto("/exame.jsf")
+        results = await http.write([
+            FieldWrite("cartao_sus", "", InputType.TEXT, "700000000000001",
+                       label="Cartão SUS"),
+            FieldWrite("descarga", "//div[@id='frm:mamaDireita']//fieldset["
+                       "legend[text()='DESCARGA PAPILAR ESPONTÂNEA']]",
+                       InputType.CHECKBOX, ["02"]),
+        ])
+
+        assert [r.ajax for r in results] == [True, False]
+        _, path, body, cookie = requests[1]
+        assert path == "/exame.jsf"
+        assert body["AJAXREQUEST"] == ["_viewRoot"]
+        assert body["frm:j_id10"] == ["frm:j_id10"]
+        assert body["frm:cartaoSus"] == ["700000000000001"]
+        assert body["javax.faces.ViewState"] == ["V1"]
+        assert cookie == "JSESSIONID=s1"
+
+        # Apenas a região re-renderizada e o ViewState foram substituídos
+        assert http.read("", "Nome", InputType.TEXT) == (
+            "MARIA DA SILVA", "MARIA DA SILVA"
+        )
+        assert http.document.view_state == "V2"
+
+        await http.click("Avançar")
+        _, _, body, _ = requests[2]
+        assert body["javax.faces.ViewState"] == ["V2"]
+        assert body["frm:avancar"] == ["Avançar"]
+        assert body["frm:descargaDireita"] == ["02"]
+        assert body["frm:tipo"] == ["02"]
+        assert "frm:lesaoPapilarDireita" not in body
+        assert http.document.has_heading("Mamografia")
+        assert http.requests == 3
+
+
+@pytest.mark.asyncio
+async def test_http_login_menu_and_cartao_sus(tmp_path, monkeypatch):
+    manager = SiscanSessionManager(state_dir=tmp_path, keepalive_interval=0)
+    monkeypatch.setattr(siscan_webpage, "session_manager", manager)
+    posts = []
+
+    def handler(request: httpx.Request):
+        path = request.url.path
+        if request.method == "POST":
+            posts.append(parse_qs(request.content.decode()))
+        if path == "/login.jsf" and request.method == "POST":
+            return httpx.Response(
+                302, headers={"Location": "/home.jsf",
+                              "Set-Cookie": "JSESSIONID=auth; Path=/"})
+        if path == "/login.jsf":
+            return httpx.Response(200, text=LOGIN)
+        if path == "/home.jsf" and request.method == "POST":
+            return httpx.Response(200, text=EXAME)
+        if path == "/home.jsf":
+            return httpx.Response(200, text=HOME)
+        return httpx.Response(200, text=PACIENTE)
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler),
+                               follow_redirects=True)
+    page = RequisicaoExameMamografiaRastreio(BASE_URL, "user@x", "secret")
+    async with JsfHttpEngine(BASE_URL, client=client) as http:
+        page._http = http
+        await page._authenticate()
+        await page._acessar_menu_gerenciar_exame()
+        await page.preencher_cartao_sus("700000000000001")
+
+    assert posts[0]["frm:email"] == ["user@x"]
+    assert posts[0]["frm:senha"] == ["secret"]
+    assert posts[1]["menu:gerenciar"] == ["menu:gerenciar"]
+    state = await manager.get_storage_state(BASE_URL, "user@x")
+    assert state["cookies"][0]["value"] == "auth"
+
+
+@pytest.mark.asyncio
+async def test_executar_falls_back_to_browser(monkeypatch):
+    page = RequisicaoExameMamografiaRastreio(BASE_URL, "user@x", "secret")
+    engines = []
+
+    async def preencher(data):
+        engines.append("http" if page.http is not None else "browser")
+        data.pop("cartao_sus")
+        if page.http is not None:
+            raise SiscanHttpEngineError(None, m="evento não suportado")
+
+    monkeypatch.setattr(page, "preencher", preencher)
+    data = {"cartao_sus": "700000000000001"}
+
+    assert await page.executar(data, engine="http") == "browser"
+    assert engines == ["http", "browser"]
+    assert page.http is None
+
+
+@pytest.mark.asyncio
+async def test_unknown_http_option_falls_back_to_browser():
+    page = RequisicaoExameMamografiaRastreio(BASE_URL, "user@x", "secret")
+
+    class FakeHttp:
+        async def write(self, fields):
+            pass
+
+        def read(self, xpath, label, input_type):
+            # Opção que não consta do FIELDS_MAP da página
+            return "Outra", "03"
+
+    page._http = FakeHttp()
+    with pytest.raises(SiscanHttpEngineError, match="tipo_de_mamografia"):
+        await page.select_value(
+            "tipo_de_mamografia", {"tipo_de_mamografia": "Rastreamento"}
+        )
@@ -0,0 +1,131 @@
+import pytest
+
+from src.utils.label_index import LabelIndex, normalize_label
+from src.utils.schema import InputType
+from src.utils.xpath_constructor import XPathConstructor
+
+
+def entry(text, id, tag="input", type="text", cls=""):
+    return {"text": text, "id": id, "tag": tag, "type": type, "cls": cls}
+
+
+LABELS = [
+    entry("Cartão SUS:", "frm:cartaoSus"),
+    entry("Número do Prontuário", "frm:prontuario"),
+    entry("Unidade Requisitante:", "frm:cnes", tag="select"),
+    entry("Data da Solicitação:", "frm:dataInputDate", cls="rich-calendar-input"),
+    entry("Observação", "frm:obs", tag="textarea"),
+    entry("Sim", "frm:opcao1", type="checkbox"),
+    entry("Sim", "frm:opcao2", type="checkbox"),
+]
+
+
+class FakePage:
+    """Página que devolve sempre os mesmos labels em ``evaluate``."""
+
+    def __init__(self, entries):
+        self.entries = entries
+        self.evaluations = 0
+
+    async def evaluate(self, expression, arg=None):
+        self.evaluations += 1
+        return list(self.entries)
+
+    def locator(self, xpath):
+        raise AssertionError(f"XPath não esperado: {xpath}")
+
+
+class FakeReadiness:
+    def __init__(self):
+        self.generation = 0
+
+
+class FakeContext:
+    def __init__(self, index):
+        self.label_index = index
+
+
+def test_normalize_label():
+    assert normalize_label("  Cartão   SUS: ") == "cartao sus"
+    assert normalize_label("NÚMERO DO PRONTUÁRIO") == "numero do prontuario"
+    assert normalize_label(None) == ""
+
+
+@pytest.mark.asyncio
+async def test_resolve_builds_once_per_generation():
+    page = FakePage(LABELS)
+    readiness = FakeReadiness()
+    index = LabelIndex(readiness)
+
+    assert await index.resolve(page, "cartao sus", InputType.TEXT) == (
+        "//input[@id='frm:cartaoSus']"
+    )
+    assert await index.resolve(page, "Unidade Requisitante:",
+                               InputType.SELECT) == "//select[@id='frm:cnes']"
+    assert await index.resolve(page, "Data da Solicitação:",
+                               InputType.DATE) == (
+        "//input[@id='frm:dataInputDate']"
+    )
+    assert await index.resolve(page, "Observação", InputType.TEXTAREA) == (
+        "//textarea[@id='frm:obs']"
+    )
+    assert page.evaluations == 1
+    assert index.hits == 4
+
+    # Uma re-renderização AJAX invalida o índice
+    readiness.generation += 1
+    await index.resolve(page, "Cartão SUS:", InputType.TEXT)
+    assert page.evaluations == 2
+    assert index.builds == 2
+
+
+@pytest.mark.asyncio
+async def test_misses_fall_back_to_xpath():
+    page = FakePage(LABELS)
+    index = LabelIndex(FakeReadiness())
+
+    # Label inexistente, ambíguo, tipo divergente e checkbox
+    assert await index.resolve(page, "Inexistente", InputType.TEXT) is None
+    assert await index.resolve(page, "Sim", InputType.TEXT) is None
+    assert await index.resolve(page, "Cartão SUS", InputType.SELECT) is None
+    assert await index.resolve(page, "Sim", InputType.CHECKBOX) is None
+    assert index.misses == 4
+    assert page.evaluations == 1
+
+
+@pytest.mark.asyncio
+async def test_invalidate_forces_rebuild():
+    page = FakePage(LABELS)
+    index = LabelIndex()
+    await index.resolve(page, "Cartão SUS", InputType.TEXT)
+    index.invalidate()
+    await index.resolve(page, "Cartão SUS", InputType.TEXT)
+    assert page.evaluations == 2
+
+
+@pytest.mark.asyncio
+async def test_find_form_input_uses_index():
+    page = FakePage(LABELS)
+    context = FakeContext(LabelIndex(FakeReadiness()))
+
+    xpath = await XPathConstructor(page, None, context).find_form_input(
+        "Unidade Requisitante:", InputType.SELECT
+    )
+
+    # Sem consultas de count/for pelo locator
+    assert xpath.xpath == "//select[@id='frm:cnes']"
+
+
+@pytest.mark.asyncio
+async def test_find_form_input_falls_back_on_miss():
+    page = FakePage(LABELS)
+    context = FakeContext(LabelIndex(FakeReadiness()))
+
+    xpath = await XPathConstructor(page, None, context).find_form_input(
+        "Idade:", InputType.TEXT
+    )
+
+    assert xpath.xpath == (
+        "//label[normalize-space(text())='Idade:']"
+        "/following-sibling::input[1]"
+    )
@@ -0,0 +1,132 @@
+import asyncio
+import io
+import logging
+from contextlib import asynccontextmanager
+
+import pytest
+
+import src.utils.helpers as helpers
+from src.siscan.exception import SiscanTimeoutError
+from src.utils import log
+
+logger = logging.getLogger("src.teste.log")
+
+
+@pytest.fixture
+def stream():
+    output = io.StringIO()
+    log.configure_logging("INFO", job_buffer=3, debug_rate=5, stream=output)
+    yield output
+    log.shutdown_logging()
+
+
+def _lines(stream):
+    log.shutdown_logging()  # esvazia a fila
+    return stream.getvalue().splitlines()
+
+
+def test_messages_carry_job_context(stream):
+    logger.info("fora do job")
+    with log.job_logging(job_id="job-1", user_uuid="u-1", form_type="laudo"):
+        assert log.current_job().user_uuid == "u-1"
+        logger.info("campo %s preenchido", "cartao_sus")
+    assert log.current_job() is None
+
+    lines = _lines(stream)
+    assert "[job=-]: fora do job" in lines[0]
+    assert "[job=job-1]: campo cartao_sus preenchido" in lines[1]
+
+
+def test_debug_is_emitted_only_when_the_job_fails(stream):
+    with log.job_logging(job_id="ok"):
+        logger.debug("detalhe do job ok")
+    with pytest.raises(RuntimeError):
+        with log.job_logging(job_id="falhou"):
+            for i in range(5):
+                logger.debug("detalhe %s", i)
+            logger.info("passo")
+            raise RuntimeError("quebrou")
+    logger.debug("fora de um job")
+
+    text = "\n".join(_lines(stream))
+    assert "detalhe do job ok" not in text
+    assert "fora de um job" not in text
+    # Apenas as últimas 3 mensagens de DEBUG do job que falhou
+    assert "detalhe 1" not in text
+    for i in (2, 3, 4):
+        assert f"[DEBUG] src.teste.log [job=falhou]: detalhe {i}" in text
+    assert "[INFO] src.teste.log [job=falhou]: passo" in text
+
+
+def test_repeated_debug_messages_are_rate_limited(monkeypatch):
+    monkeypatch.setattr(log.time, "monotonic", lambda: 100.0)
+    output = io.StringIO()
+    log.configure_logging("DEBUG", debug_rate=5, stream=output)
+    for i in range(50):
+        logger.debug("campo %s", i)
+    logger.info("info não é limitada")
+
+    lines = _lines(output)
+    assert len(lines) == 6
+    assert lines[-1].endswith("info não é limitada")
+
+
+def test_arguments_are_not_formatted_below_level(stream, monkeypatch):
+    # O pytest também anexa a captura dele aos loggers que não propagam;
+    # apenas os handlers do serviço interessam aqui
+    app = logging.getLogger(log.APP_LOGGER)
+    monkeypatch.setattr(app, "handlers", [
+        h for h in app.handlers if h.__module__ == log.__name__
+    ])
+
+    class Payload:
+        def __str__(self):
+            raise AssertionError("formatado sem necessidade")
+
+    with log.job_logging():
+        logger.debug("dados: %s", Payload())
+
+    assert _lines(stream) == []
+
+
+def test_libraries_stay_at_the_configured_level(stream):
+    assert logging.getLogger().level == logging.INFO
+    assert not logging.getLogger("httpx").isEnabledFor(logging.DEBUG)
+    assert logging.getLogger("src.siscan").isEnabledFor(logging.DEBUG)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_jobs_keep_their_own_context(stream):
+    async def job(name):
+        with log.job_logging(job_id=name):
+            await asyncio.sleep(0.01)
+            logger.info("executando %s", name)
+
+    await asyncio.gather(job("a"), job("b"))
+
+    lines = _lines(stream)
+    assert any("[job=a]: executando a" in line for line in lines)
+    assert any("[job=b]: executando b" in line for line in lines)
+
+
+@pytest.mark.asyncio
+async def test_run_rpa_logs_with_user_and_job_id(stream, monkeypatch):
+    class FakeContext:
+        async def new_page(self):
+            job = log.current_job()
+            logger.info("usuário %s", job.user_uuid)
+            raise SiscanTimeoutError(None, m="sem página")
+
+    class FakePool:
+        ready = True
+
+        @asynccontextmanager
+        async def context(self, **kwargs):
+            yield FakeContext()
+
+    monkeypatch.setattr(helpers, "browser_pool", FakePool())
+
+    with pytest.raises(SiscanTimeoutError):
+        await helpers.run_rpa("laudo", {}, user_uuid="u-42")
+
+    assert any("usuário u-42" in line for line in _lines(stream))
@@ -0,0 +1,156 @@
+import pytest
+
+from src.siscan.classes.requisicao_exame_mamografia_rastreio import (
+    RequisicaoExameMamografiaRastreio,
+)
+from src.siscan.menu_targets import (
+    CLICK_MENU_ITEM,
+    MENU_ITEM_ID,
+    MenuTarget,
+    menu_targets,
+)
+from src.utils.xpath_constructor import XPathConstructor
+
+BASE_URL = "https://siscan.local/"
+GERENCIAR = "https://siscan.local/exame/gerenciarExame.jsf"
+FINGERPRINTS = {"home": "fp-home", "gerenciar": "fp-gerenciar"}
+
+
+class FakeSite:
+    """Navegador simulado: a tela atual e a URL da barra de endereço."""
+
+    def __init__(self, postback_url: bool = True):
+        self.screen = "home"
+        self.url = "https://siscan.local/inicial.jsf"
+        # No JSF a ação do menu é um POST para a página atual
+        self.postback_url = postback_url
+        self.menu_item = "menu:gerenciarExame"
+        self.hovers = 0
+        self.gotos = []
+        self.item_clicks = 0
+
+    def open_gerenciar(self):
+        self.screen = "gerenciar"
+        if not self.postback_url:
+            self.url = GERENCIAR
+
+
+class FakePage:
+    def __init__(self, site):
+        self.site = site
+
+    @property
+    def url(self):
+        return self.site.url
+
+    async def evaluate(self, script, arg=None):
+        if script == MENU_ITEM_ID:
+            return self.site.menu_item
+        if script == CLICK_MENU_ITEM:
+            if arg != self.site.menu_item:
+                return False
+            self.site.item_clicks += 1
+            self.site.open_gerenciar()
+            return True
+        raise AssertionError("script inesperado")
+
+
+class FakeReadiness:
+    async def wait_ready(self, timeout, step="page"):
+        return True
+
+
+class FakeContext:
+    def __init__(self, site):
+        self.site = site
+        self._page = FakePage(site)
+        self.readiness = FakeReadiness()
+
+    @property
+    async def page(self):
+        return self._page
+
+    @property
+    async def browser(self):
+        return None
+
+    async def handle_goto(self, path):
+        self.site.gotos.append(path)
+        self.site.url = BASE_URL.rstrip("/") + path
+        self.site.screen = "gerenciar" if self.site.url == GERENCIAR else "?"
+        return self._page
+
+    async def form_key(self):
+        return self.site.url, FINGERPRINTS.get(self.site.screen, "fp-outra")
+
+
+@pytest.fixture(autouse=True)
+def fake_menu(monkeypatch):
+    async def click_menu_action(self, menu_name, menu_action_text, **kwargs):
+        self.context.site.hovers += 1
+        self.context.site.open_gerenciar()
+        return self
+
+    monkeypatch.setattr(XPathConstructor, "click_menu_action",
+                        click_menu_action)
+    menu_targets.clear()
+    yield
+    menu_targets.clear()
+
+
+async def _acessar(site):
+    page = RequisicaoExameMamografiaRastreio(BASE_URL, "u@x", "s3nh4")
+    page._context = FakeContext(site)
+    await page.acessar_menu("EXAME", "GERENCIAR EXAME")
+    return site
+
+
+@pytest.mark.asyncio
+async def test_postback_menu_is_replayed_through_the_item_action():
+    first = await _acessar(FakeSite())
+    assert first.hovers == 1 and first.screen == "gerenciar"
+    assert menu_targets.get(BASE_URL, "EXAME", "GERENCIAR EXAME") == (
+        MenuTarget(item_id="menu:gerenciarExame", fingerprint="fp-gerenciar")
+    )
+
+    second = await _acessar(FakeSite())
+    assert second.hovers == 0 and second.item_clicks == 1
+    assert second.screen == "gerenciar"
+
+
+@pytest.mark.asyncio
+async def test_menu_with_own_url_is_opened_with_goto():
+    await _acessar(FakeSite(postback_url=False))
+
+    site = await _acessar(FakeSite(postback_url=False))
+    assert site.gotos == ["/exame/gerenciarExame.jsf"]
+    assert site.hovers == 0 and site.item_clicks == 0
+
+
+@pytest.mark.asyncio
+async def test_url_of_another_view_switches_to_the_item_action():
+    # A URL aprendida abre outra tela (a barra mostrava a view anterior)
+    menu_targets.store(BASE_URL, "EXAME", "GERENCIAR EXAME", MenuTarget(
+        path="/exame/novoExame.jsf", item_id="menu:gerenciarExame",
+        fingerprint="fp-gerenciar",
+    ))
+
+    site = await _acessar(FakeSite())
+
+    assert site.item_clicks == 1 and site.hovers == 0
+    assert menu_targets.get(BASE_URL, "EXAME", "GERENCIAR EXAME").path is None
+
+
+@pytest.mark.asyncio
+async def test_failed_shortcut_falls_back_to_hover_and_relearns():
+    await _acessar(FakeSite())
+    site = FakeSite()
+    site.menu_item = "menu:j_id42"  # id do item mudou após um deploy
+
+    await _acessar(site)
+
+    assert site.hovers == 1 and site.screen == "gerenciar"
+    assert menu_targets.stats()["fallbacks"] == 1
+    assert menu_targets.get(
+        BASE_URL, "EXAME", "GERENCIAR EXAME"
+    ).item_id == "menu:j_id42"
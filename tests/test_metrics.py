@@ -0,0 +1,131 @@
+import subprocess
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+import src.utils.helpers as helpers
+from src.main import app
+from src.siscan.exception import SiscanTimeoutError
+from src.utils.metrics import chromium_rss_bytes
+from src.utils.wait import retry
+
+
+def _sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+class FakePage:
+    async def screenshot(self, **kwargs):
+        return b"jpeg"
+
+
+class FakeContext:
+    async def new_page(self):
+        return FakePage()
+
+
+class FakePool:
+    ready = True
+
+    @asynccontextmanager
+    async def context(self, **kwargs):
+        yield FakeContext()
+
+
+@pytest.mark.asyncio
+async def test_run_rpa_records_job_metrics(monkeypatch):
+    monkeypatch.setattr(helpers, "browser_pool", FakePool())
+    jobs = _sample("siscan_rpa_jobs_total",
+                   form_type="metricas", status="success")
+    count = _sample("siscan_rpa_job_duration_seconds_count",
+                    form_type="metricas")
+
+    result = await helpers.run_rpa("metricas", {})
+
+    assert result["success"] and "timings" in result
+    assert _sample("siscan_rpa_jobs_total", form_type="metricas",
+                   status="success") == jobs + 1
+    assert _sample("siscan_rpa_job_duration_seconds_count",
+                   form_type="metricas") == count + 1
+    assert _sample("siscan_rpa_jobs_in_flight", form_type="metricas") == 0
+    assert _sample("siscan_rpa_jobs_queued", form_type="metricas") == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_job_is_counted_by_exception(monkeypatch):
+    class BrokenContext:
+        async def new_page(self):
+            raise SiscanTimeoutError(None, m="sem página")
+
+    class BrokenPool(FakePool):
+        @asynccontextmanager
+        async def context(self, **kwargs):
+            yield BrokenContext()
+
+    monkeypatch.setattr(helpers, "browser_pool", BrokenPool())
+    errors = _sample("siscan_rpa_job_errors_total", form_type="quebrado",
+                     exception="SiscanTimeoutError")
+
+    with pytest.raises(SiscanTimeoutError):
+        await helpers.run_rpa("quebrado", {})
+
+    assert _sample("siscan_rpa_job_errors_total", form_type="quebrado",
+                   exception="SiscanTimeoutError") == errors + 1
+    # O job falhou antes de obter a página: sai da fila, não da execução
+    assert _sample("siscan_rpa_jobs_queued", form_type="quebrado") == 0
+    assert _sample("siscan_rpa_jobs_in_flight", form_type="quebrado") == 0
+
+
+@pytest.mark.asyncio
+async def test_retries_and_exceptions_are_counted_by_class():
+    retries = _sample("siscan_rpa_retries_total",
+                      exception="SiscanTimeoutError")
+    raised = _sample("siscan_rpa_exceptions_total",
+                     exception="SiscanTimeoutError")
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise SiscanTimeoutError(None, m="ainda não")
+
+    await retry(flaky, timeout=2, interval=0.01)
+
+    assert _sample("siscan_rpa_retries_total",
+                   exception="SiscanTimeoutError") == retries + 2
+    assert _sample("siscan_rpa_exceptions_total",
+                   exception="SiscanTimeoutError") == raised + 2
+
+
+def test_metrics_endpoint_exposes_pool_and_sessions():
+    with TestClient(app) as client:
+        res = client.get("/metrics")
+
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("text/plain")
+    for name in (
+        "siscan_rpa_browser_pool_in_use",
+        "siscan_rpa_browser_launches_total",
+        "siscan_rpa_session_logins_total",
+        "siscan_rpa_session_reuses_total",
+        "siscan_rpa_chromium_rss_bytes",
+    ):
+        assert f"\n{name} " in res.text
+
+
+@pytest.mark.skipif(not Path("/proc").is_dir(), reason="requer /proc")
+def test_chromium_rss_sums_child_processes(tmp_path):
+    # Processo filho com nome de Chromium
+    sleep = tmp_path / "chromium-teste"
+    sleep.symlink_to(subprocess.check_output(["which", "sleep"],
+                                             text=True).strip())
+    proc = subprocess.Popen([str(sleep), "5"])
+    try:
+        assert chromium_rss_bytes() > 0
+        assert chromium_rss_bytes(pid=proc.pid) == 0
+    finally:
+        proc.kill()
+        proc.wait()
@@ -0,0 +1,116 @@
+import asyncio
+import secrets
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+import src.env as env
+from src.main import app
+from src.models import ApiKey
+from src.siscan.context import SiscanBrowserContext
+from src.siscan.notices import NoticeStore, notice_store
+
+NOTICES = [
+    {"date": "01/07/2025", "subject": "Manutenção programada",
+     "lines": ["O sistema ficará indisponível das 22h às 23h."]},
+    {"date": "15/06/2025", "subject": "Nova versão",
+     "lines": ["Novo campo no laudo.", "Consulte o manual."]},
+]
+
+
+@pytest.fixture
+def db(tmp_path):
+    env.init_engine(str(tmp_path / "notices.db"))
+    env.Base.metadata.create_all(bind=env.engine)
+    notice_store.clear()
+    yield
+    notice_store.clear()
+
+
+class FakePopup:
+    url = "https://siscan/popupMensagensInformativas.jsf"
+
+    def __init__(self):
+        self.evaluations = 0
+        self.closed = False
+
+    async def wait_for_load_state(self, state):
+        await asyncio.sleep(0.01)
+
+    async def evaluate(self, expression, arg=None):
+        self.evaluations += 1
+        return NOTICES
+
+    async def close(self):
+        self.closed = True
+
+
+def test_notices_are_deduplicated_by_date_and_subject(db):
+    store = NoticeStore()
+    assert store.store(NOTICES) == 2
+    assert store.store(NOTICES) == 0
+    # Outro processo (memória vazia) não duplica as linhas do banco
+    assert NoticeStore().store(NOTICES[:1]) == 0
+
+    stored = {n["subject"]: n for n in store.list()}
+    assert set(stored) == {"Manutenção programada", "Nova versão"}
+    assert stored["Nova versão"]["lines"] == [
+        "Novo campo no laudo.", "Consulte o manual.",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_popup_event_reads_all_notices_in_one_evaluate(db):
+    store = NoticeStore()
+    context = SiscanBrowserContext(notices=store)
+    context._page = object()  # página principal já aberta
+    popup = FakePopup()
+
+    context._on_page(popup)
+    messages = await context.collect_information_popup()
+
+    assert popup.evaluations == 1 and popup.closed
+    assert messages[("15/06/2025", "Nova versão")] == NOTICES[1]["lines"]
+    assert len(store.list()) == 2
+
+
+@pytest.mark.asyncio
+async def test_login_without_popup_does_not_wait():
+    context = SiscanBrowserContext(notices=None)
+    context._page = object()
+
+    start = time.perf_counter()
+    assert await context.collect_information_popup() == {}
+    assert time.perf_counter() - start < 0.1
+
+
+@pytest.mark.asyncio
+async def test_other_windows_are_ignored():
+    context = SiscanBrowserContext(notices=None)
+    context._page = object()
+    popup = FakePopup()
+    popup.url = "https://siscan/relatorio.jsf"
+
+    context._on_page(popup)
+    assert await context.collect_information_popup() == {}
+    assert popup.evaluations == 0 and not popup.closed
+
+
+def test_notices_endpoint(db):
+    key = secrets.token_hex(8)
+    session = env.get_db()
+    session.add(ApiKey(key=key))
+    session.commit()
+    session.close()
+    notice_store.store(NOTICES)
+
+    with TestClient(app) as client:
+        res = client.get("/informes", headers={"Api-Key": key},
+                         params={"user_uuid": "test", "limit": 1})
+        unauthorized = client.get("/informes")
+
+    assert res.status_code == 200
+    (informe,) = res.json()["informes"]
+    assert informe["subject"] in {n["subject"] for n in NOTICES}
+    assert unauthorized.status_code == 401
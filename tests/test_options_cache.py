@@ -0,0 +1,150 @@
+import asyncio
+
+import pytest
+
+from src.siscan.classes import webpage as siscan_webpage
+from src.siscan.classes.requisicao_exame_mamografia import (
+    RequisicaoExameMamografia,
+)
+from src.siscan.exception import SiscanInvalidFieldValueError
+from src.siscan.options_cache import SelectOptionsCache
+from src.siscan.session_pool import SiscanSessionManager
+
+BASE_URL = "https://siscan.example/"
+UNIDADES = {
+    "Selecione...": "0",
+    "0015466 - CENTRO DE ESPECIALIDADES": "4",
+    "0027049 - HOSPITAL MUNICIPAL": "7",
+}
+
+
+class FakeXPE:
+    """Registra as seleções feitas no navegador."""
+
+    fills: list = []
+
+    @classmethod
+    async def create(cls, context, xpath=""):
+        return cls()
+
+    async def find_form_input(self, label, input_type=None):
+        return self
+
+    async def handle_fill(self, value, input_type=None):
+        FakeXPE.fills.append(value)
+        return self
+
+
+@pytest.fixture
+def page(monkeypatch):
+    cache = SelectOptionsCache(ttl=60)
+    monkeypatch.setattr(siscan_webpage, "options_cache", cache)
+    monkeypatch.setattr(siscan_webpage, "XPE", FakeXPE)
+    FakeXPE.fills = []
+
+    page = RequisicaoExameMamografia(BASE_URL, "user@x", "secret")
+    page.page_loads = 0
+
+    async def load_select_options(field_name):
+        page.page_loads += 1
+        page.FIELDS_MAP[field_name] = dict(UNIDADES)
+
+    page.load_select_options = load_select_options
+    page.cache = cache
+    return page
+
+
+def test_ttl_and_invalidate():
+    cache = SelectOptionsCache(ttl=60)
+    cache.store(BASE_URL, "user@x", "prestador", {"A": "1"})
+    assert cache.get(BASE_URL, "user@x", "prestador") == {"A": "1"}
+    assert cache.get(BASE_URL, "other@x", "prestador") is None
+
+    cache.invalidate(BASE_URL, "user@x")
+    assert cache.get(BASE_URL, "user@x", "prestador") is None
+
+    expired = SelectOptionsCache(ttl=0)
+    expired.store(BASE_URL, "user@x", "prestador", {"A": "1"})
+    assert expired.get(BASE_URL, "user@x", "prestador") is None
+
+
+@pytest.mark.asyncio
+async def test_cached_options_skip_page_reads(page):
+    for _ in range(3):
+        await page._seleciona_unidade_requisitante(
+            {"cnes_unidade_requisitante": "0027049"}
+        )
+
+    assert page.page_loads == 1
+    assert FakeXPE.fills == ["7", "7", "7"]
+    assert page.cache.stats()["hits"] == 2
+    assert page.FIELDS_MAP["cnes_unidade_requisitante"]["0015466"] == "4"
+
+
+@pytest.mark.asyncio
+async def test_unknown_value_refreshes_once_then_fails(page):
+    await page._seleciona_unidade_requisitante(
+        {"cnes_unidade_requisitante": "0015466"}
+    )
+
+    with pytest.raises(SiscanInvalidFieldValueError):
+        await page._seleciona_unidade_requisitante(
+            {"cnes_unidade_requisitante": "9999999"}
+        )
+
+    # Cache frio + uma releitura; nenhuma seleção para o valor inválido
+    assert page.page_loads == 2
+    assert FakeXPE.fills == ["4"]
+
+
+@pytest.mark.asyncio
+async def test_session_warmup_prefetches_once_per_account(page):
+    navegacoes = []
+
+    async def novo_exame(event_button=False):
+        navegacoes.append(event_button)
+        await asyncio.sleep(0)
+
+    page._novo_exame = novo_exame
+    outro = RequisicaoExameMamografia(BASE_URL, "user@x", "secret")
+    outro._novo_exame = novo_exame
+    outro.load_select_options = page.load_select_options
+
+    # Dois jobs da mesma conta autenticados ao mesmo tempo
+    await asyncio.gather(
+        page.prefetch_select_options(), outro.prefetch_select_options()
+    )
+    assert navegacoes == [True]
+    assert page.page_loads == 2  # unidade requisitante e prestador
+    assert page.cache.stats()["prefetches"] == 1
+
+    # Cache aquecido: o job não relê a página e não pré-carrega de novo
+    await page._seleciona_unidade_requisitante(
+        {"cnes_unidade_requisitante": "0027049"}
+    )
+    await page.prefetch_select_options()
+    assert page.page_loads == 2
+    assert navegacoes == [True]
+    assert FakeXPE.fills == ["7"]
+
+
+@pytest.mark.asyncio
+async def test_authenticate_prefetches_outside_the_login_lock(
+    page, tmp_path, monkeypatch
+):
+    manager = SiscanSessionManager(state_dir=tmp_path, keepalive_interval=0)
+    monkeypatch.setattr(siscan_webpage, "session_manager", manager)
+    locked = []
+
+    async def login():
+        page._is_authenticated = True
+        return {"cookies": [], "origins": []}
+
+    async def prefetch_select_options(refresh=False):
+        locked.append(manager._session(BASE_URL, "user@x").lock.locked())
+
+    page._login = login
+    page.prefetch_select_options = prefetch_select_options
+
+    await page._authenticate()
+    assert locked == [False]
@@ -0,0 +1,209 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from src.siscan.classes import webpage as siscan_webpage
+from src.siscan.classes.requisicao_exame_mamografia_rastreio import (
+    RequisicaoExameMamografiaRastreio,
+)
+from src.siscan.exception import (
+    CartaoSusNotFoundError,
+    SiscanException,
+    SiscanTimeoutError,
+)
+from src.siscan.http_engine import JsfHttpEngine
+from src.siscan.patient_cache import PatientCache, patient_cache
+from src.siscan.session_pool import SiscanSessionManager
+from src.siscan.simulator import SimulatorConfig, create_app
+
+BASE_URL = "http://siscan.local/"
+CNS = "700000000000011"
+PACIENTE = {"nome": "MARIA DA SILVA", "nome_da_mae": "JOANA DA SILVA"}
+
+
+@pytest.fixture(autouse=True)
+def clear_patients():
+    patient_cache.clear()
+    yield
+    patient_cache.clear()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_jobs_share_one_lookup():
+    cache = PatientCache(ttl=60, not_found_ttl=60)
+    calls = []
+
+    async def lookup():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return dict(PACIENTE)
+
+    results = await asyncio.gather(
+        *(cache.resolve(CNS, lookup) for _ in range(3))
+    )
+
+    assert calls == [1]
+    assert results == [PACIENTE] * 3
+    assert cache.check("700 0000 0000 0011") == PACIENTE
+    assert cache.stats()["coalesced"] == 2
+
+
+@pytest.mark.asyncio
+async def test_known_bad_cartao_fails_fast_until_it_expires(monkeypatch):
+    cache = PatientCache(ttl=60, not_found_ttl=10)
+
+    async def lookup():
+        await asyncio.sleep(0.01)
+        raise CartaoSusNotFoundError(None, cartao_sus=CNS)
+
+    results = await asyncio.gather(
+        cache.resolve(CNS, lookup), cache.resolve(CNS, lookup),
+        return_exceptions=True,
+    )
+    assert all(isinstance(r, CartaoSusNotFoundError) for r in results)
+    with pytest.raises(CartaoSusNotFoundError):
+        cache.check(CNS)
+
+    now = time.time()
+    monkeypatch.setattr("src.siscan.patient_cache.time.time",
+                        lambda: now + 11)
+    assert cache.check(CNS) is None
+
+
+@pytest.mark.asyncio
+async def test_waiter_retries_when_the_shared_lookup_times_out():
+    cache = PatientCache(ttl=60, not_found_ttl=60)
+    attempts = []
+
+    async def lookup():
+        attempts.append(1)
+        await asyncio.sleep(0.01)
+        if len(attempts) == 1:
+            raise SiscanTimeoutError(None)
+        return dict(PACIENTE)
+
+    first, second = await asyncio.gather(
+        cache.resolve(CNS, lookup), cache.resolve(CNS, lookup),
+        return_exceptions=True,
+    )
+
+    assert isinstance(first, SiscanTimeoutError)
+    assert second == PACIENTE and len(attempts) == 2
+
+
+@pytest.fixture
+def simulator(tmp_path, monkeypatch):
+    manager = SiscanSessionManager(state_dir=tmp_path, keepalive_interval=0)
+    monkeypatch.setattr(siscan_webpage, "session_manager", manager)
+    return create_app(SimulatorConfig(users={"user@x": "s3nh4"}))
+
+
+def _engine(app) -> JsfHttpEngine:
+    client = httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url=BASE_URL,
+        follow_redirects=True,
+    )
+    return JsfHttpEngine(BASE_URL, client=client)
+
+
+@pytest.mark.asyncio
+async def test_preencher_cartao_sus_caches_patient_data(simulator):
+    page = RequisicaoExameMamografiaRastreio(BASE_URL, "user@x", "s3nh4")
+
+    async with _engine(simulator) as http:
+        page._http = http
+        await page._authenticate()
+        await page._novo_exame(event_button=True)
+        paciente = await page.preencher_cartao_sus(CNS)
+
+    assert paciente["nome"] == "PACIENTE 000011"
+    assert paciente["nome_da_mae"] == "MAE DE PACIENTE 000011"
+    assert paciente["data_de_nascimento"] == "01/01/1970"
+    assert paciente["bairro"] == "CENTRO"
+    assert patient_cache.check(CNS) == paciente
+
+
+@pytest.mark.asyncio
+async def test_job_with_known_bad_cartao_does_not_reach_siscan(simulator):
+    simulator.state.simulator.config.patients = {}
+    page = RequisicaoExameMamografiaRastreio(BASE_URL, "user@x", "s3nh4")
+
+    async with _engine(simulator) as http:
+        page._http = http
+        await page._authenticate()
+        await page._novo_exame(event_button=True)
+        with pytest.raises(CartaoSusNotFoundError):
+            await page.preencher_cartao_sus(CNS)
+
+    requests = simulator.state.simulator.stats["requests"]
+    outro = RequisicaoExameMamografiaRastreio(BASE_URL, "user@x", "s3nh4")
+    with pytest.raises(CartaoSusNotFoundError):
+        await outro.executar({"cartao_sus": CNS}, engine="http")
+
+    assert simulator.state.simulator.stats["requests"] == requests
+
+
+@pytest.mark.asyncio
+async def test_blank_patient_is_not_cached(monkeypatch):
+    page = RequisicaoExameMamografiaRastreio(BASE_URL, "user@x", "s3nh4")
+
+    async def preencher(numero, timeout, interval):
+        pass  # o campo foi preenchido, mas o paciente não carregou
+
+    async def ler_paciente():
+        return {"nome": "", "nome_da_mae": ""}
+
+    monkeypatch.setattr(page, "_preencher_cartao_sus", preencher)
+    monkeypatch.setattr(page, "ler_paciente", ler_paciente)
+
+    with pytest.raises(SiscanTimeoutError):
+        await page.preencher_cartao_sus(CNS)
+    assert patient_cache.check(CNS) is None
+
+
+@pytest.mark.asyncio
+async def test_cached_patient_fills_cartao_once(monkeypatch):
+    patient_cache.store(CNS, PACIENTE)
+    page = RequisicaoExameMamografiaRastreio(BASE_URL, "user@x", "s3nh4")
+    informados = []
+
+    async def preencher(numero, timeout, interval):
+        raise AssertionError("o paciente já está em cache")
+
+    async def informar(numero):
+        informados.append(numero)
+
+    monkeypatch.setattr(page, "_preencher_cartao_sus", preencher)
+    monkeypatch.setattr(page, "_informar_cartao_sus", informar)
+
+    assert await page.preencher_cartao_sus(CNS) == PACIENTE
+    assert informados == [CNS]
+
+
+@pytest.mark.asyncio
+async def test_other_page_errors_are_not_cached_as_not_found(monkeypatch):
+    page = RequisicaoExameMamografiaRastreio(BASE_URL, "user@x", "s3nh4")
+
+    async def preencher(numero, timeout, interval):
+        raise SiscanException(None, m="Form Errors: Erro inesperado.")
+
+    monkeypatch.setattr(page, "_preencher_cartao_sus", preencher)
+
+    with pytest.raises(SiscanException):
+        await page.preencher_cartao_sus(CNS)
+    assert patient_cache.check(CNS) is None
+
+
+def test_only_not_found_messages_match():
+    assert CartaoSusNotFoundError.matches(
+        "Form Errors: Cartão SUS não encontrado na base do CADSUS."
+    )
+    assert CartaoSusNotFoundError.matches(
+        "Não existe paciente com o Cartão SUS informado."
+    )
+    assert not CartaoSusNotFoundError.matches(
+        "Form Errors: Erro ao consultar o CADSUS. Tente novamente."
+    )
+    assert not CartaoSusNotFoundError.matches("")
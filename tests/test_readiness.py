@@ -0,0 +1,122 @@
+import pytest
+from playwright.async_api import TimeoutError
+
+from src.siscan.readiness import AjaxReadinessTracker
+
+
+class FakeRequest:
+    def __init__(self, resource_type, post_data=None):
+        self.resource_type = resource_type
+        self.post_data = post_data
+
+
+class FakeHandle:
+    def __init__(self, value):
+        self.value = value
+
+    async def json_value(self):
+        return self.value
+
+
+class FakePage:
+    def __init__(self):
+        self.handlers = {}
+        self.init_scripts = []
+        self.waits = 0
+        self.timeout = False
+        # Contador ``__siscanAjax.sent`` e requisições ainda pendentes
+        self.sent = 0
+        self.pending = 0
+
+    def on(self, event, handler):
+        self.handlers[event] = handler
+
+    async def add_init_script(self, script):
+        self.init_scripts.append(script)
+
+    def state(self):
+        return {"idle": self.pending == 0, "sent": self.sent}
+
+    async def evaluate(self, expression, arg=None):
+        return self.state()
+
+    async def wait_for_function(self, expression, **kwargs):
+        self.waits += 1
+        self.pending = 0
+        if self.timeout:
+            raise TimeoutError("Timeout exceeded.")
+        return FakeHandle(self.state())
+
+    def emit(self, request):
+        self.sent += 1
+        self.handlers["request"](request)
+
+
+@pytest.mark.asyncio
+async def test_wait_is_skipped_when_nothing_was_sent():
+    page = FakePage()
+    tracker = AjaxReadinessTracker()
+    await tracker.attach(page)
+    assert "XMLHttpRequest" in page.init_scripts[0]
+
+    page.emit(FakeRequest("document"))
+    assert await tracker.wait_ready(timeout=1, step="login")
+    assert page.waits == 1
+
+    # Nenhuma requisição desde o último ponto ocioso: sem round trip
+    assert await tracker.wait_ready(timeout=1, step="menu")
+    assert page.waits == 1
+
+    # Recursos estáticos não alteram o estado da página
+    page.handlers["request"](FakeRequest("image"))
+    assert await tracker.wait_ready(timeout=1, step="menu")
+    assert page.waits == 1
+
+    assert [t.skipped for t in tracker.timings] == [False, True, True]
+
+
+@pytest.mark.asyncio
+async def test_partial_requests_and_summary():
+    page = FakePage()
+    tracker = AjaxReadinessTracker()
+    await tracker.attach(page)
+
+    page.emit(FakeRequest("xhr", "AJAXREQUEST=_viewRoot&frm=frm"))
+    page.emit(FakeRequest("xhr", "foo=bar"))
+    assert await tracker.wait_ready(timeout=1, step="cartao_sus_blur")
+
+    timing = tracker.timings[-1]
+    assert (timing.requests, timing.partial) == (2, 1)
+    summary = tracker.summary()
+    assert summary["cartao_sus_blur"]["count"] == 1
+    assert summary["cartao_sus_blur"]["skipped"] == 0
+
+
+@pytest.mark.asyncio
+async def test_timeout_keeps_page_dirty():
+    page = FakePage()
+    page.timeout = True
+    tracker = AjaxReadinessTracker()
+    await tracker.attach(page)
+
+    page.emit(FakeRequest("xhr"))
+    assert not await tracker.wait_ready(timeout=0.01, step="avancar")
+    assert tracker.dirty
+
+
+@pytest.mark.asyncio
+async def test_request_sent_before_its_event_arrives_is_awaited():
+    page = FakePage()
+    tracker = AjaxReadinessTracker()
+    await tracker.attach(page)
+    page.emit(FakeRequest("document"))
+    assert await tracker.wait_ready(timeout=1, step="login")
+
+    # O blur enviou o AJAX, mas o evento ``request`` ainda não chegou
+    page.sent += 1
+    page.pending = 1
+    assert not tracker.dirty
+    assert await tracker.wait_ready(timeout=1, step="cartao_sus_blur")
+
+    assert page.waits == 2
+    assert not tracker.timings[-1].skipped
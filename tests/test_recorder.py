@@ -0,0 +1,188 @@
+import asyncio
+from urllib.parse import urlencode
+
+import pytest
+
+import src.env as env
+from src.siscan.http_engine import JsfDocument
+from src.siscan.recorder import (
+    SOURCE_FIELD,
+    SOURCE_SECRET,
+    SOURCE_VIEW_STATE,
+    NetworkRecorder,
+    RecordedRequest,
+    RequestTemplateStore,
+    build_template,
+)
+from src.utils.schema import FieldSpec, InputType
+from tests.test_http_engine import BASE_URL, EXAME, LOGIN, PACIENTE
+
+FIELDS = {
+    "cartao_sus": FieldSpec("cartao_sus", "Cartão SUS", InputType.TEXT),
+    "descarga": FieldSpec(
+        "descarga", "", InputType.CHECKBOX,
+        xpath="//div[@id='frm:mamaDireita']//fieldset[legend[text()="
+              "'DESCARGA PAPILAR ESPONTÂNEA']]",
+    ),
+    "tipo": FieldSpec("tipo", "Tipo de Mamografia", InputType.RADIO),
+    "prestador": FieldSpec("prestador", "Prestador de Serviço:",
+                           InputType.SELECT),
+}
+
+
+class FakeFrame:
+    pass
+
+
+class FakeRequest:
+    def __init__(self, frame, method, path, params=None, resource="xhr"):
+        self.frame = frame
+        self.method = method
+        self.url = BASE_URL.rstrip("/") + path
+        self.resource_type = resource
+        self.post_data = urlencode(params) if params else None
+        self.headers = {
+            "content-type": "application/x-www-form-urlencoded"
+        } if params else {}
+
+
+class FakeResponse:
+    def __init__(self, request, body, status=200):
+        self.request = request
+        self.url = request.url
+        self.status = status
+        self._body = body
+
+    async def text(self):
+        return self._body
+
+
+class FakePage:
+    def __init__(self, html):
+        self.url = f"{BASE_URL}exame.jsf"
+        self.main_frame = FakeFrame()
+        self._html = html
+        self._listeners = {}
+
+    async def content(self):
+        return self._html
+
+    def on(self, event, handler):
+        self._listeners.setdefault(event, []).append(handler)
+
+    def remove_listener(self, event, handler):
+        self._listeners[event].remove(handler)
+
+    def emit(self, event, item):
+        for handler in list(self._listeners.get(event, [])):
+            handler(item)
+
+
+def test_fingerprint_ignores_values_and_follows_ajax_merges():
+    doc = JsfDocument(EXAME, f"{BASE_URL}exame.jsf")
+    assert doc.fingerprint == JsfDocument(
+        EXAME.replace('value="V1"', 'value="V9"')
+    ).fingerprint
+
+    # Uma região re-renderizada com um controle novo altera a estrutura
+    extra = PACIENTE.replace(
+        "</div>", '<input id="frm:cpf" name="frm:cpf"/></div>', 1
+    )
+    doc.merge(extra, "frm")
+    expected = JsfDocument(EXAME.replace(
+        '<input id="frm:nome" name="frm:nome" value=""/>',
+        '<input id="frm:nome" name="frm:nome" value="MARIA DA SILVA"/>'
+        '<input id="frm:cpf" name="frm:cpf"/>',
+    ))
+    assert doc.fingerprint == expected.fingerprint
+    assert doc.fingerprint != JsfDocument(EXAME).fingerprint
+
+
+@pytest.mark.asyncio
+async def test_recorder_builds_parameterised_template(tmp_path):
+    page = FakePage(EXAME)
+    recorder = NetworkRecorder()
+    await recorder.attach(page)
+    initial = JsfDocument(EXAME).fingerprint
+
+    blur = FakeRequest(page.main_frame, "POST", "/exame.jsf;jsessionid=s1", [
+        ("AJAXREQUEST", "_viewRoot"), ("frm", "frm"),
+        ("frm:cartaoSus", "700000000000001"), ("frm:nome", ""),
+        ("frm:tipo", "02"), ("javax.faces.ViewState", "V1"),
+        ("frm:j_id10", "frm:j_id10"),
+    ])
+    page.emit("request", blur)
+    # Recursos estáticos e outros frames não fazem parte do fluxo
+    page.emit("request", FakeRequest(page.main_frame, "GET", "/a.css",
+                                     resource="stylesheet"))
+    page.emit("request", FakeRequest(FakeFrame(), "POST", "/x.jsf",
+                                     [("a", "b")]))
+    page.emit("response", FakeResponse(blur, PACIENTE))
+    avancar = FakeRequest(page.main_frame, "POST", "/exame.jsf", [
+        ("frm", "frm"), ("frm:cartaoSus", "700000000000001"),
+        ("frm:nome", "MARIA DA SILVA"), ("frm:descargaDireita", "01"),
+        ("frm:descargaDireita", "02"), ("frm:tipo", "02"),
+        ("frm:prestadorServicoCoordenacaoMunicipal", "7"),
+        ("frm:avancar", "Avançar"), ("javax.faces.ViewState", "V2"),
+    ], resource="document")
+    page.emit("request", avancar)
+    records = await recorder.stop()
+
+    assert [r.ajax for r in records] == [True, False]
+    assert records[0].fingerprint == initial
+    assert records[1].document.view_state == "V2"
+    assert records[1].status is None
+
+    values = {"cartao_sus": "700000000000001", "descarga": ["01", "02"],
+              "tipo": "02", "prestador": "7"}
+    template = build_template("rastreio", records, FIELDS, values)
+    first, second = template.steps
+    assert first.path == "/exame.jsf" and first.ajax
+    sources = {p.name: (p.source, p.field) for p in second.params}
+    assert sources["frm:cartaoSus"] == (SOURCE_FIELD, "cartao_sus")
+    assert sources["frm:descargaDireita"] == (SOURCE_FIELD, "descarga")
+    assert sources["frm:tipo"] == (SOURCE_FIELD, "tipo")
+    assert sources["frm:prestadorServicoCoordenacaoMunicipal"] == (
+        SOURCE_FIELD, "prestador"
+    )
+    assert sources["javax.faces.ViewState"] == (SOURCE_VIEW_STATE, None)
+    assert sources["frm:nome"][0] == "constant"
+    assert template.fields == set(values)
+
+    rendered = second.render(
+        {"cartao_sus": "700000000000002", "descarga": ["03"], "tipo": "01",
+         "prestador": "8"},
+        view_state="V7",
+    )
+    assert rendered == [
+        ("frm", "frm"), ("frm:cartaoSus", "700000000000002"),
+        ("frm:nome", "MARIA DA SILVA"), ("frm:descargaDireita", "03"),
+        ("frm:tipo", "01"), ("frm:prestadorServicoCoordenacaoMunicipal", "8"),
+        ("frm:avancar", "Avançar"), ("javax.faces.ViewState", "V7"),
+    ]
+
+    env.init_engine(str(tmp_path / "templates.db"))
+    store = RequestTemplateStore()
+    await asyncio.to_thread(store.save, template)
+    loaded = await asyncio.to_thread(store.find, "rastreio", initial)
+    assert loaded == template
+    assert await asyncio.to_thread(store.versions, "rastreio") == [
+        template.version
+    ]
+    assert await asyncio.to_thread(store.get, "rastreio", "outra") is None
+
+
+def test_template_never_stores_passwords():
+    record = RecordedRequest(
+        "POST", f"{BASE_URL}login.jsf", "document",
+        [("frm:email", "user@x"), ("frm:senha", "s3nh4-real"),
+         ("javax.faces.ViewState", "L1")],
+        document=JsfDocument(LOGIN),
+    )
+    template = build_template("login", [record], {}, {})
+    params = {p.name: p for p in template.steps[0].params}
+    assert params["frm:senha"].source == SOURCE_SECRET
+    assert "s3nh4-real" not in template.to_json()
+    assert template.steps[0].render(
+        {}, "L2", secrets={"frm:senha": "s3"}
+    )[1:] == [("frm:senha", "s3"), ("javax.faces.ViewState", "L2")]
@@ -0,0 +1,95 @@
+import httpx
+import pytest
+from playwright.async_api import Locator, Page
+
+from src.siscan.benchmark import (
+    FLOWS,
+    ROUND_TRIP_BUDGETS,
+    check_budgets,
+    dados_exemplo,
+)
+from src.siscan.classes import webpage as siscan_webpage
+from src.siscan.http_engine import JsfHttpEngine
+from src.siscan.session_pool import SiscanSessionManager
+from src.siscan.simulator import SimulatorConfig, create_app
+from src.utils import round_trips, tracing
+from src.utils.round_trips import RoundTripBudgetExceeded
+
+BASE_URL = "http://siscan-round-trips.local/"
+
+
+def test_round_trips_are_attributed_to_step_and_field():
+    with round_trips.count() as counter:
+        round_trips.record("Page.goto")
+        with tracing.span("step", step="campos_clinicos"):
+            with tracing.span("field.fill", field="num_prontuario"):
+                with tracing.span("xpath.fill", label="Nº do Prontuário:"):
+                    round_trips.record("Locator.fill")
+            with tracing.span("xpath.click", label="Avançar"):
+                round_trips.record("Locator.click")
+    round_trips.record("Page.goto")  # fora do bloco: não contado
+
+    assert counter.total == 3
+    assert counter.by_step == {"campos_clinicos": 2}
+    assert counter.by_field == {"num_prontuario": 1, "Avançar": 1}
+    assert counter.by_method["Page.goto"] == 1
+
+    counter.check_budget(3)
+    counter.check_budget(2, step="campos_clinicos")
+    with pytest.raises(RoundTripBudgetExceeded, match="orçamento: 1"):
+        counter.check_budget(1, step="campos_clinicos")
+
+
+def test_playwright_async_methods_are_instrumented():
+    round_trips.install()
+    round_trips.install()
+
+    assert Locator.count.__round_trip__ and Page.goto.__round_trip__
+    # Instalar de novo não empilha wrappers (cada chamada conta uma vez)
+    assert not hasattr(Locator.count.__wrapped__, "__round_trip__")
+    # Métodos síncronos (montagem de locators) não vão ao navegador
+    assert not hasattr(Page.locator, "__round_trip__")
+
+
+def test_check_budgets_uses_worst_run():
+    result = {"engine": "http", "flows": {"rastreio": {"round_trips": {
+        "total": {"max": 13.0},
+        "steps": {"menu": {"max": 3.0}},
+    }}}}
+    budgets = {"rastreio": {"http": 12, "steps": {"menu": 2}}}
+
+    assert check_budgets(result, budgets) == [
+        "rastreio: 13 idas e voltas (orçamento: 12)",
+        "rastreio/menu: 3 idas e voltas (orçamento: 2)",
+    ]
+    assert check_budgets({**result, "engine": "browser"}, budgets) == [
+        "rastreio/menu: 3 idas e voltas (orçamento: 2)",
+    ]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("flow", list(FLOWS))
+async def test_fill_stays_within_round_trip_budget(
+    flow, tmp_path, monkeypatch
+):
+    monkeypatch.setattr(
+        siscan_webpage, "session_manager",
+        SiscanSessionManager(state_dir=tmp_path, keepalive_interval=0),
+    )
+    config = SimulatorConfig()
+    # Prestador próprio: o cache de opções é global por conta
+    config.prestadores.insert(0, f"CLINICA SIMULADA ORCAMENTO {flow}")
+    app = create_app(config)
+    page = FLOWS[flow](BASE_URL, f"budget-{flow}@x", "s3nh4")
+    client = httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url=BASE_URL,
+        follow_redirects=True,
+    )
+
+    with round_trips.count() as counter:
+        async with JsfHttpEngine(BASE_URL, client=client) as http:
+            page._http = http
+            await page.preencher(dados_exemplo(flow, config))
+
+    assert counter.by_method["http.post"] > 0
+    counter.check_budget(ROUND_TRIP_BUDGETS[flow]["http"])
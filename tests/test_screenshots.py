@@ -0,0 +1,113 @@
+import asyncio
+import functools
+import time
+from contextlib import asynccontextmanager
+
+import pytest
+
+import src.utils.helpers as helpers
+from src.siscan.exception import SiscanTimeoutError
+from src.utils.screenshots import ScreenshotRecorder
+from src.utils.step_timer import StepTimer
+
+
+class FakePage:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = []
+
+    async def screenshot(self, **kwargs):
+        self.calls.append(kwargs)
+        await asyncio.sleep(self.delay)
+        return b"\xff\xd8jpeg"
+
+
+@pytest.mark.asyncio
+async def test_failure_mode_keeps_last_captures_until_the_job_fails(tmp_path):
+    page = FakePage()
+    ok = ScreenshotRecorder("failure", job_id="ok", capacity=2,
+                            directory=tmp_path)
+    async with ok.job(lambda: page):
+        await ok.capture(page, "login")
+
+    assert ok.saved == [] and not (tmp_path / "ok").exists()
+    assert page.calls[0] == {"type": "jpeg", "quality": 60,
+                             "full_page": False}
+
+    failed = ScreenshotRecorder("failure", job_id="falhou", capacity=2,
+                                directory=tmp_path)
+    with pytest.raises(RuntimeError):
+        async with failed.job(lambda: page):
+            for name in ("login", "menu.png", "cartao sus"):
+                await failed.capture(page, name)
+            raise RuntimeError("quebrou")
+
+    # Buffer circular: a captura mais antiga já foi descartada
+    assert sorted(p.name for p in (tmp_path / "falhou").iterdir()) == [
+        "03_cartao_sus.jpg", "04_falha.jpg",
+    ]
+    assert [p.parent.name for p in failed.saved] == ["falhou", "falhou"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("mode, rate, written", [
+    ("off", 1.0, 0),
+    ("sampled", 0.0, 0),
+    ("sampled", 1.0, 1),
+    ("always", 0.0, 1),
+])
+async def test_successful_jobs_are_written_by_mode(
+    mode, rate, written, tmp_path
+):
+    page = FakePage()
+    recorder = ScreenshotRecorder(mode, job_id="job", sample_rate=rate,
+                                  directory=tmp_path)
+    async with recorder.job(lambda: page):
+        await recorder.capture(page, "login")
+
+    assert len(recorder.saved) == written
+    assert len(page.calls) == (0 if mode == "off" else 1)
+
+
+def test_excluded_time_is_not_counted_in_open_steps():
+    timer = StepTimer()
+    with timer.step("login"):
+        with timer.excluded():
+            time.sleep(0.05)
+    with timer.step("menu"):
+        pass
+
+    assert timer.summary()["login"] < 0.04
+
+
+@pytest.mark.asyncio
+async def test_run_rpa_writes_screenshots_of_failed_job(tmp_path, monkeypatch):
+    class FailingPage(FakePage):
+        async def click(self, selector):
+            raise SiscanTimeoutError(None, m="botão não encontrado")
+
+    class FakeContext:
+        async def new_page(self):
+            return FailingPage()
+
+    class FakePool:
+        ready = True
+
+        @asynccontextmanager
+        async def context(self, **kwargs):
+            yield FakeContext()
+
+    monkeypatch.setattr(helpers, "browser_pool", FakePool())
+    monkeypatch.setattr(helpers, "PRODUCTION", True)
+    monkeypatch.setattr(helpers, "ScreenshotRecorder", functools.partial(
+        ScreenshotRecorder, "failure", directory=tmp_path
+    ))
+
+    with pytest.raises(SiscanTimeoutError):
+        await helpers.run_rpa("laudo", {})
+
+    (job_dir,) = tmp_path.iterdir()
+    assert sorted(p.name for p in job_dir.iterdir()) == [
+        "01_laudo_step1.jpg", "02_laudo_step2.jpg", "03_laudo_step3.jpg",
+        "04_falha.jpg",
+    ]
@@ -0,0 +1,146 @@
+import asyncio
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+import src.env as env
+from src.models import SelectorCacheEntry
+from src.utils.label_index import LabelIndex
+from src.utils.schema import InputType
+from src.utils.selector_cache import SelectorCache, page_key
+from src.utils.xpath_constructor import XPathConstructor
+
+KEY = ("https://siscan/exame.jsf", "abc123")
+
+
+@pytest.fixture
+def cache(tmp_path):
+    env.init_engine(str(tmp_path / "cache.db"))
+    return SelectorCache(enabled=True)
+
+
+class FakePage:
+    """Página com um único label e sem XPath resolvível fora do índice."""
+
+    def __init__(self):
+        self.evaluations = 0
+
+    async def evaluate(self, expression, arg=None):
+        self.evaluations += 1
+        return [{"text": "Cartão SUS:", "id": "frm:cartaoSus",
+                 "tag": "input", "type": "text", "cls": ""}]
+
+    def locator(self, xpath):
+        raise AssertionError(f"XPath não esperado: {xpath}")
+
+
+class FakeReadiness:
+    generation = 0
+
+
+class FakeContext:
+    def __init__(self, cache):
+        self.label_index = LabelIndex(FakeReadiness())
+        self.selector_cache = cache
+        self.fingerprint = "abc123"
+
+    async def form_key(self):
+        return KEY[0], self.fingerprint
+
+
+def test_page_key_strips_session_and_query():
+    assert page_key(
+        "https://siscan/exame.jsf;jsessionid=AB12?cid=3#top"
+    ) == "https://siscan/exame.jsf"
+
+
+@pytest.mark.asyncio
+async def test_store_persists_across_instances(cache):
+    await cache.load(KEY)
+    assert cache.get(KEY, "Cartão SUS:", InputType.TEXT) is None
+    await cache.store(KEY, "Cartão SUS:", InputType.TEXT,
+                      "//input[@id='frm:cartaoSus']")
+
+    # Novo processo: lê do banco, com label normalizado
+    warm = SelectorCache(enabled=True)
+    await warm.load(KEY)
+    assert warm.get(KEY, "cartao sus", InputType.TEXT) == (
+        "//input[@id='frm:cartaoSus']"
+    )
+    assert warm.get(KEY, "Cartão SUS:", InputType.SELECT) is None
+    assert warm.stats()["hits"] == 1
+    assert warm.stats()["misses"] == 1
+
+
+@pytest.mark.asyncio
+async def test_fingerprint_change_invalidates(cache):
+    await cache.store(KEY, "Cartão SUS:", InputType.TEXT,
+                      "//input[@id='frm:cartaoSus']")
+    deployed = (KEY[0], "def456")
+    await cache.load(deployed)
+    assert cache.get(deployed, "Cartão SUS:", InputType.TEXT) is None
+
+
+@pytest.mark.asyncio
+async def test_old_entries_are_purged(cache):
+    db = env.get_db()
+    SelectorCacheEntry.__table__.create(bind=env.engine, checkfirst=True)
+    db.add(SelectorCacheEntry(
+        url=KEY[0], fingerprint="old", label="cartao sus",
+        input_type="TEXT", selector="//input[@id='x']",
+        last_used_at=datetime.utcnow() - timedelta(days=60),
+    ))
+    db.commit()
+    db.close()
+
+    await cache.load(KEY)
+
+    db = env.get_db()
+    assert db.query(SelectorCacheEntry).filter_by(
+        fingerprint="old").count() == 0
+    db.close()
+
+
+@pytest.mark.asyncio
+async def test_database_access_runs_off_the_event_loop(cache, monkeypatch):
+    threads = []
+    load, save = cache._load, cache._save
+
+    def record(call):
+        def wrapper(*args):
+            threads.append(threading.get_ident())
+            return call(*args)
+        return wrapper
+
+    monkeypatch.setattr(cache, "_load", record(load))
+    monkeypatch.setattr(cache, "_save", record(save))
+
+    await asyncio.gather(cache.load(KEY), cache.load(KEY))
+    await cache.store(KEY, "Cartão SUS:", InputType.TEXT,
+                      "//input[@id='frm:cartaoSus']")
+    # Memória: nenhum acesso ao banco
+    assert cache.get(KEY, "Cartão SUS:", InputType.TEXT)
+
+    assert len(threads) == 2  # um carregamento, compartilhado, e uma gravação
+    assert threading.get_ident() not in threads
+
+
+@pytest.mark.asyncio
+async def test_find_form_input_skips_label_search_when_warm(cache):
+    page = FakePage()
+    context = FakeContext(cache)
+
+    cold = await XPathConstructor(page, None, context).find_form_input(
+        "Cartão SUS:", InputType.TEXT
+    )
+    assert cold.xpath == "//input[@id='frm:cartaoSus']"
+    assert page.evaluations == 1
+
+    warm_page = FakePage()
+    warm = await XPathConstructor(warm_page, None, context).find_form_input(
+        "Cartão SUS:", InputType.TEXT
+    )
+    assert warm.xpath == "//input[@id='frm:cartaoSus']"
+    assert warm_page.evaluations == 0
+    assert cache.hits == 1
@@ -0,0 +1,108 @@
+import asyncio
+import threading
+
+import httpx
+import pytest
+
+from src.siscan.session_pool import SiscanSessionManager
+
+BASE_URL = "https://siscan.example/"
+STATE = {"cookies": [{"name": "JSESSIONID", "value": "abc",
+                      "domain": "siscan.example", "path": "/"}],
+         "origins": []}
+
+
+@pytest.mark.asyncio
+async def test_concurrent_jobs_share_single_login(tmp_path):
+    manager = SiscanSessionManager(state_dir=tmp_path, keepalive_interval=0)
+    calls = 0
+
+    async def login():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return STATE
+
+    states = await asyncio.gather(
+        *[manager.acquire(BASE_URL, "user@x", login) for _ in range(5)]
+    )
+    assert calls == 1
+    assert all(s == STATE for s in states)
+    assert manager.logins == 1
+    assert manager.reuses == 4
+
+
+@pytest.mark.asyncio
+async def test_storage_state_is_restored_from_disk(tmp_path):
+    first = SiscanSessionManager(state_dir=tmp_path, keepalive_interval=0)
+    await first.store(BASE_URL, "user@x", STATE)
+
+    second = SiscanSessionManager(state_dir=tmp_path, keepalive_interval=0)
+    assert await second.get_storage_state(BASE_URL, "user@x") == STATE
+    assert await second.get_storage_state(BASE_URL, "other@x") is None
+
+    second.invalidate(BASE_URL, "user@x")
+    third = SiscanSessionManager(state_dir=tmp_path, keepalive_interval=0)
+    assert await third.get_storage_state(BASE_URL, "user@x") is None
+
+
+@pytest.mark.asyncio
+async def test_keepalive_detects_expired_session(tmp_path):
+    manager = SiscanSessionManager(state_dir=tmp_path, keepalive_interval=0)
+    await manager.store(BASE_URL, "user@x", STATE)
+    session = manager._session(BASE_URL, "user@x")
+
+    def handler(request):
+        if request.url.path == "/login.jsf":
+            return httpx.Response(200, text="login")
+        return httpx.Response(302, headers={"Location": "/login.jsf"})
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler),
+                                 follow_redirects=True) as client:
+        assert await manager.ping(session, client) is False
+    assert await manager.get_storage_state(BASE_URL, "user@x") is None
+
+
+@pytest.mark.asyncio
+async def test_keepalive_keeps_valid_session(tmp_path):
+    manager = SiscanSessionManager(state_dir=tmp_path, keepalive_interval=0)
+    await manager.store(BASE_URL, "user@x", STATE)
+    session = manager._session(BASE_URL, "user@x")
+
+    def handler(request):
+        assert request.headers["cookie"] == "JSESSIONID=abc"
+        return httpx.Response(200, text="SEJA BEM VINDO AO SISCAN")
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler),
+                                 follow_redirects=True) as client:
+        assert await manager.ping(session, client) is True
+    assert await manager.get_storage_state(BASE_URL, "user@x") == STATE
+
+
+@pytest.mark.asyncio
+async def test_state_file_io_runs_off_the_event_loop(tmp_path, monkeypatch):
+    threads = []
+    load, save = SiscanSessionManager._load, SiscanSessionManager._save
+
+    def record_load(self, session):
+        threads.append(threading.get_ident())
+        return load(self, session)
+
+    def record_save(path, text):
+        threads.append(threading.get_ident())
+        return save(path, text)
+
+    monkeypatch.setattr(SiscanSessionManager, "_load", record_load)
+    monkeypatch.setattr(SiscanSessionManager, "_save",
+                        staticmethod(record_save))
+
+    async def login():
+        return STATE
+
+    manager = SiscanSessionManager(state_dir=tmp_path, keepalive_interval=0)
+    await asyncio.gather(
+        *[manager.acquire(BASE_URL, "user@x", login) for _ in range(3)]
+    )
+
+    assert len(threads) == 2  # uma leitura e uma gravação
+    assert threading.get_ident() not in threads
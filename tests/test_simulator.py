@@ -0,0 +1,258 @@
+import httpx
+import pytest
+
+from src.siscan.classes import webpage as siscan_webpage
+from src.siscan.classes.requisicao_exame_mamografia_diagnostica import (
+    RequisicaoExameMamografiaDiagnostica,
+)
+from src.siscan.classes.requisicao_exame_mamografia_rastreio import (
+    RequisicaoExameMamografiaRastreio,
+)
+from src.siscan.exception import (
+    CartaoSusNotFoundError,
+    SiscanHttpEngineError,
+    SiscanLoginError,
+)
+from src.siscan.http_engine import JsfHttpEngine
+from src.siscan.session_pool import SiscanSessionManager
+from src.siscan.simulator import SimulatorConfig, create_app
+from src.utils.bulk_writer import FieldWrite
+from src.utils.schema import InputType
+
+BASE_URL = "http://siscan.local/"
+
+CIRURGIAS = [
+    "biopsia_cirurgica_incisional",
+    "biopsia_cirurgica_excisional",
+    "segmentectomia",
+    "centralectomia",
+    "dutectomia",
+    "mastectomia",
+    "mastectomia_poupadora_pele",
+    "mastectomia_poupadora_pele_complexo_papilar",
+    "linfadenectomia_axilar",
+    "biopsia_linfonodo_sentinela",
+    "reconstrucao_mamaria",
+    "mastoplastia_redutora",
+    "inclusao_implantes",
+]
+
+DADOS = {
+    "cartao_sus": "700000000000011",
+    "nome": "MARIA DA SILVA",
+    "apelido": "MARIA",
+    "data_de_nascimento": "01/01/1970",
+    "nacionalidade": "BRASILEIRO",
+    "sexo": "F",
+    "nome_da_mae": "JOANA DA SILVA",
+    "raca_cor": "BRANCA",
+    "escolaridade": "4",
+    "uf": "SP",
+    "municipio": "SAO PAULO",
+    "tipo_logradouro": "RUA",
+    "nome_logradouro": "DAS FLORES",
+    "numero": "100",
+    "bairro": "CENTRO",
+    "cep": "01001000",
+    "ponto_de_referencia": "PRACA",
+    "cnes_unidade_requisitante": "2337545",
+    "num_prontuario": "123456",
+    "tem_nodulo_ou_caroco_na_mama": ["01", "02"],
+    "apresenta_risco_elevado_para_cancer_mama": "01",
+    "fez_mamografia_alguma_vez": "01",
+    "ano_que_fez_a_ultima_mamografia": "2020",
+    "antes_desta_consulta_teve_as_mamas_examinadas_por_um_profissional": "03",
+    "fez_radioterapia_na_mama_ou_no_plastrao": "01",
+    "radioterapia_localizacao": "03",
+    "ano_da_radioterapia_direita": "2019",
+    "ano_da_radioterapia_esquerda": "2018",
+    "fez_cirurgia_de_mama": "01",
+    **{f"ano_{c}_direita": str(2000 + i) for i, c in enumerate(CIRURGIAS)},
+    **{f"ano_{c}_esquerda": str(2001 + i) for i, c in enumerate(CIRURGIAS)},
+    "data_da_solicitacao": "01/10/2025",
+    "cns_responsavel_coleta": "700000000000005",
+}
+
+
+@pytest.fixture
+def session_manager(tmp_path, monkeypatch):
+    manager = SiscanSessionManager(state_dir=tmp_path, keepalive_interval=0)
+    monkeypatch.setattr(siscan_webpage, "session_manager", manager)
+    return manager
+
+
+def _engine(app) -> JsfHttpEngine:
+    client = httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url=BASE_URL,
+        follow_redirects=True,
+    )
+    return JsfHttpEngine(BASE_URL, client=client)
+
+
+def _checked(document) -> dict[str, list[str]]:
+    values = {}
+    for c in document.controls:
+        if c.checked:
+            values.setdefault(c.name, []).append(c.value)
+    return values
+
+
+@pytest.mark.asyncio
+async def test_rastreio_fills_whole_flow_against_simulator(session_manager):
+    app = create_app(SimulatorConfig(users={"user@x": "s3nh4"}))
+    # Unidade e prestador próprios: o cache de opções é global por conta
+    app.state.simulator.config.prestadores.append("CLINICA SIMULADA RASTREIO")
+    page = RequisicaoExameMamografiaRastreio(BASE_URL, "user@x", "s3nh4")
+    dados = {**DADOS, "prestador": "CLINICA SIMULADA RASTREIO",
+             "tipo_mamografia_de_rastreamento": "02"}
+
+    async with _engine(app) as http:
+        page._http = http
+        await page.preencher(dados)
+        document = http.document
+
+    assert document.has_heading("Requisição de Mamografia")
+    checked = _checked(document)
+    assert checked["frm:tem_nodulo_ou_caroco_na_mama"] == ["01", "02"]
+    assert checked["frm:radioterapia_localizacao"] == ["03"]
+    assert checked["frm:fez_cirurgia_de_mama"] == ["S"]
+    assert checked["frm:tipo_de_mamografia"] == ["02"]
+    assert checked["frm:tipo_mamografia_de_rastreamento"] == ["02"]
+    values = dict(document.form_data("frm"))
+    assert values["frm:ano_da_radioterapia_esquerda"] == "2018"
+    assert values["frm:ano_mastectomia_esquerda"] == "2006"
+    assert values["frm:data_da_solicitacao"] == "01/10/2025"
+    assert values["frm:responsavelColeta"] == "700000000000005"
+
+    stats = app.state.simulator.stats
+    assert stats["logins"] == 1 and stats["expired"] == 0
+    assert stats["ajax"] >= 6
+
+
+@pytest.mark.asyncio
+async def test_diagnostica_enables_group_fields(session_manager):
+    app = create_app()
+    app.state.simulator.config.prestadores.append("CLINICA SIMULADA DIAG")
+    page = RequisicaoExameMamografiaDiagnostica(BASE_URL, "diag@x", "s3nh4")
+    dados = {**DADOS, "prestador": "CLINICA SIMULADA DIAG",
+             "achados_exame_clinico": True,
+             "exame_clinico_mama_direita_lesao_papilar": "S",
+             "exame_clinico_mama_direita_descarga_papilar_espontanea": "02",
+             "exame_clinico_mama_direita_nodulo_localizacao": ["03"],
+             "exame_clinico_mama_direita_espessamento_localizacao": ["05"],
+             "exame_clinico_mama_direita_linfonodo_palpavel": ["01"],
+             "exame_clinico_mama_esquerda_lesao_papilar": "S",
+             "exame_clinico_mama_esquerda_descarga_papilar_espontanea": "01",
+             "exame_clinico_mama_esquerda_nodulo_localizacao": ["01", "04"],
+             "exame_clinico_mama_esquerda_espessamento_localizacao": ["02"],
+             "exame_clinico_mama_esquerda_linfonodo_palpavel": ["02"]}
+
+    async with _engine(app) as http:
+        page._http = http
+        await page.preencher(dados)
+        checked = _checked(http.document)
+
+    assert checked["frm:tipo_de_mamografia"] == ["01"]
+    assert checked["frm:achadosExameClinico"] == ["S"]
+    assert checked["frm:lesaoPapilarDireita"] == ["S"]
+    assert checked[
+        "frm:exame_clinico_mama_direita_descarga_papilar_espontanea"
+    ] == ["02"]
+    assert checked[
+        "frm:exame_clinico_mama_esquerda_nodulo_localizacao"
+    ] == ["01", "04"]
+    # Grupos não informados continuam desabilitados
+    assert all(c.disabled for c in http.document.controls
+               if c.name == "frm:lesaoCancerNoduloDireita")
+
+
+@pytest.mark.asyncio
+async def test_invalid_credentials_fail_login(session_manager):
+    app = create_app(SimulatorConfig(users={"user@x": "s3nh4"}))
+    page = RequisicaoExameMamografiaRastreio(BASE_URL, "user@x", "errada")
+
+    async with _engine(app) as http:
+        page._http = http
+        with pytest.raises(SiscanLoginError):
+            await page._authenticate()
+        assert http.document.errors == ["Usuário ou senha inválidos."]
+
+
+@pytest.mark.asyncio
+async def test_unknown_cartao_sus_reports_not_found(session_manager):
+    app = create_app(SimulatorConfig(patients={}))
+    page = RequisicaoExameMamografiaRastreio(BASE_URL, "cadsus@x", "s3nh4")
+
+    async with _engine(app) as http:
+        page._http = http
+        await page._authenticate()
+        await page._novo_exame(event_button=True)
+        with pytest.raises(CartaoSusNotFoundError):
+            await page.preencher_cartao_sus("700000000000099")
+
+
+@pytest.mark.asyncio
+async def test_stale_view_state_expires_postbacks(session_manager):
+    app = create_app(SimulatorConfig(stale_view_state_rate=1.0, seed=1))
+    page = RequisicaoExameMamografiaRastreio(BASE_URL, "stale@x", "s3nh4")
+
+    async with _engine(app) as http:
+        page._http = http
+        with pytest.raises(SiscanHttpEngineError, match="ViewState"):
+            await page._authenticate()
+    assert app.state.simulator.stats["expired"] == 1
+
+
+@pytest.mark.asyncio
+async def test_patient_search_returns_duplicates(session_manager):
+    app = create_app(SimulatorConfig(duplicate_patients=True))
+    page = RequisicaoExameMamografiaRastreio(BASE_URL, "busca@x", "s3nh4")
+
+    async with _engine(app) as http:
+        page._http = http
+        await page._authenticate()
+        await page._novo_exame(event_button=True)
+
+        def script(action: str) -> str:
+            return next(a.onclick for a in http.document.actions
+                        if f"frm:a4j_{action}" in a.onclick)
+
+        await http.trigger(script("pesquisa_abrir"))
+        await http.write([FieldWrite(
+            "nome", "//input[@name='frm:pesquisa_nome']", InputType.TEXT,
+            "MARIA DA SILVA",
+        )])
+        await http.click("Pesquisar")
+        selecionar = [a for a in http.document.actions
+                      if "frm:a4j_selecionar" in a.onclick]
+        assert len(selecionar) == 2
+
+        await http.trigger(selecionar[1].onclick)
+        nome, _ = http.read("", "Nome", InputType.TEXT)
+        cartao, _ = http.read("", "Cartão SUS", InputType.TEXT)
+
+    assert nome == "MARIA DA SILVA"
+    assert len(cartao) == 15
+
+
+@pytest.mark.asyncio
+async def test_fault_settings_change_at_runtime():
+    app = create_app()
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url=BASE_URL
+    ) as client:
+        response = await client.post(
+            "/_simulator/config",
+            json={"slow_rate": 1.0, "slow_latency": 0.0},
+        )
+        assert response.json()["slow_rate"] == 1.0
+        assert (await client.post("/_simulator/config",
+                                  json={"users": {}})).status_code == 422
+
+        # Postback sem sessão volta ao login
+        response = await client.post("/exame/novoExame.jsf", content="a=b")
+        assert response.status_code == 302
+        assert response.headers["location"] == "/login.jsf"
+        stats = (await client.get("/_simulator/stats")).json()
+
+    assert stats["slow"] == 1
@@ -0,0 +1,94 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from src.siscan.exception import SiscanTimeoutError, XpathNotFoundError
+from src.siscan.trace_buffer import TraceBuffer
+
+
+class FakeTracing:
+    def __init__(self):
+        self.calls = []
+
+    async def start(self, **kwargs):
+        self.calls.append(("start", kwargs))
+
+    async def start_chunk(self, title=None):
+        self.calls.append(("start_chunk", title))
+
+    async def stop_chunk(self, path=None):
+        await asyncio.sleep(0)
+        if path:
+            Path(path).write_bytes(b"PK")
+        self.calls.append(("stop_chunk", path and Path(path).name))
+
+    async def stop(self):
+        self.calls.append(("stop", None))
+
+
+class FakeContext:
+    def __init__(self):
+        self.tracing = FakeTracing()
+
+
+async def _run_steps(traces, steps, error=None, context=None):
+    context = context or FakeContext()
+    async with traces.job():
+        traces.step(steps[0])
+        await traces.attach(context)
+        for step in steps[1:]:
+            traces.step(step)
+            await asyncio.sleep(0)
+        if error:
+            raise error
+    return context.tracing
+
+
+@pytest.mark.asyncio
+async def test_failing_job_saves_only_the_last_chunks(tmp_path):
+    traces = TraceBuffer(enabled=True, chunks=3, directory=tmp_path,
+                         job_id="job-1")
+    steps = ["login", "menu", "cartao_sus", "campos_exame", "campos_clinicos"]
+
+    with pytest.raises(XpathNotFoundError):
+        await _run_steps(traces, steps, XpathNotFoundError(None, "//input"))
+
+    assert [p.name for p in traces.saved] == [
+        "03_cartao_sus.zip", "04_campos_exame.zip", "05_campos_clinicos.zip",
+    ]
+    assert sorted(p.name for p in (tmp_path / "job-1").iterdir()) == [
+        p.name for p in traces.saved
+    ]
+    assert not traces.active
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("error", [None, RuntimeError("sem trace")])
+async def test_other_outcomes_discard_the_trace(error, tmp_path):
+    traces = TraceBuffer(enabled=True, chunks=3, directory=tmp_path,
+                         job_id="job-2")
+
+    if error:
+        with pytest.raises(RuntimeError):
+            await _run_steps(traces, ["login", "menu"], error)
+    else:
+        tracing = await _run_steps(traces, ["login", "menu"])
+        assert tracing.calls[-1] == ("stop", None)
+        assert tracing.calls[1] == ("start_chunk", "login")
+
+    assert traces.saved == [] and not (tmp_path / "job-2").exists()
+    assert traces._tmp is None
+
+
+@pytest.mark.asyncio
+async def test_disabled_buffer_never_starts_tracing(tmp_path):
+    traces = TraceBuffer(enabled=False, directory=tmp_path)
+    context = FakeContext()
+
+    with pytest.raises(SiscanTimeoutError):
+        await _run_steps(traces, ["login", "menu"], SiscanTimeoutError(None),
+                         context)
+
+    assert context.tracing.calls == [] and not traces.active
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,112 @@
+import json
+
+import httpx
+import pytest
+
+from src.siscan.classes import webpage as siscan_webpage
+from src.siscan.classes.requisicao_exame_mamografia_rastreio import (
+    RequisicaoExameMamografiaRastreio,
+)
+from src.siscan.http_engine import JsfHttpEngine
+from src.siscan.session_pool import SiscanSessionManager
+from src.siscan.simulator import SimulatorConfig, create_app
+from src.siscan.benchmark import dados_exemplo
+from src.utils import tracing
+from src.utils.schema import InputType
+from src.utils.wait import retry
+
+BASE_URL = "http://siscan-tracing.local/"
+
+
+def test_spans_are_collected_with_attributes():
+    with tracing.collect() as spans:
+        with tracing.span("step", step="cartao_sus"):
+            with tracing.span("xpath.fill", input_type=InputType.TEXT):
+                tracing.set_attributes(selector="//input[@id='cns']")
+            with pytest.raises(ValueError):
+                with tracing.span("xpath.click", selector=None):
+                    raise ValueError
+
+    assert [s.name for s in spans] == ["xpath.fill", "xpath.click", "step"]
+    fill, click, step = spans
+    assert fill.parent is step and fill.attributes == {
+        "input_type": "text", "selector": "//input[@id='cns']",
+    }
+    assert not click.ok and click.attributes == {}
+
+    summary = tracing.summarize(spans)
+    assert summary["total"] == pytest.approx(step.elapsed, abs=1e-6)
+    assert list(summary["steps"]) == ["cartao_sus"]
+    assert summary["spans"]["xpath.fill"]["count"] == 1
+    assert {s["name"] for s in summary["slowest"]} == {
+        "xpath.fill", "xpath.click"
+    }
+
+
+@pytest.mark.asyncio
+async def test_retry_records_attempts_on_current_span():
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise RuntimeError("ainda não")
+        return "ok"
+
+    with tracing.collect() as spans:
+        with tracing.span("xpath.click"):
+            assert await retry(flaky, timeout=2, interval=0.01) == "ok"
+
+    assert spans[0].attributes["retries"] == 2
+
+
+@pytest.mark.asyncio
+async def test_fill_flow_spans_against_simulator(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        siscan_webpage, "session_manager",
+        SiscanSessionManager(state_dir=tmp_path, keepalive_interval=0),
+    )
+    config = SimulatorConfig()
+    config.prestadores.insert(0, "CLINICA SIMULADA TRACING")
+    app = create_app(config)
+    page = RequisicaoExameMamografiaRastreio(BASE_URL, "trace@x", "s3nh4")
+    client = httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url=BASE_URL,
+        follow_redirects=True,
+    )
+
+    with tracing.collect() as spans:
+        async with JsfHttpEngine(BASE_URL, client=client) as http:
+            page._http = http
+            await page.preencher(dados_exemplo("rastreio", config))
+
+    summary = tracing.summarize(spans)
+    assert set(page.steps.summary()) == set(summary["steps"])
+    fills = {s.attributes["field"]: s for s in spans
+             if s.name == "field.fill"}
+    tipo = fills["tipo_mamografia_de_rastreamento"]
+    assert tipo.attributes["input_type"] == "radio"
+    assert tipo.parent.attributes["step"] == "campos_clinicos"
+    assert any(s.name == "field.select" for s in spans)
+
+
+def test_file_exporter_writes_json_lines(tmp_path):
+    sdk = pytest.importorskip("opentelemetry.sdk.trace")
+    from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+
+    path = tmp_path / "spans.jsonl"
+    provider = sdk.TracerProvider()
+    provider.add_span_processor(
+        SimpleSpanProcessor(tracing.FileSpanExporter(path))
+    )
+    tracer = provider.get_tracer("test")
+    with tracer.start_as_current_span("step", attributes={"step": "login"}):
+        with tracer.start_as_current_span("xpath.fill"):
+            pass
+    provider.shutdown()
+
+    child, parent = [json.loads(line) for line in path.read_text().splitlines()]
+    assert child["name"] == "xpath.fill"
+    assert child["parent_id"] == parent["span_id"]
+    assert child["trace_id"] == parent["trace_id"]
+    assert parent["attributes"] == {"step": "login"}
@@ -0,0 +1,156 @@
+import asyncio
+import time
+
+import pytest
+
+from src.env import DOM_WAIT_POLLING
+from src.utils.wait import Backoff, Deadline, retry, wait_until
+from src.utils.xpath_constructor import XPathConstructor as XPE, InputType
+
+
+class FakeSelect:
+    """Select cuja opção já está disponível."""
+
+    def __init__(self, name):
+        self.name = name
+        self.selected = None
+
+    async def wait_for(self, **kwargs):
+        pass
+
+    async def count(self):
+        return 1
+
+    async def select_option(self, value):
+        self.selected = value
+
+
+class FakePage:
+    def __init__(self, select, waits):
+        self._select = select
+        self._waits = waits
+
+    def locator(self, selector):
+        return self._select
+
+    async def wait_for_function(self, expression, arg=None, **kwargs):
+        # Resolve imediatamente: o teste verifica o que o código de produção
+        # pede ao navegador, não o tempo de espera do fake
+        self._waits.append((arg, kwargs))
+
+
+@pytest.mark.asyncio
+async def test_select_fill_waits_in_the_browser(monkeypatch):
+    def blocking_sleep(seconds):
+        raise AssertionError("time.sleep bloquearia o event loop")
+
+    monkeypatch.setattr(time, "sleep", blocking_sleep)
+    waits = []
+    selects = [FakeSelect("a"), FakeSelect("b")]
+    xpaths = [
+        XPE(FakePage(s, waits), None, None,
+            xpath=f"//select[@id='{s.name}']")
+        for s in selects
+    ]
+
+    await asyncio.gather(
+        xpaths[0].handle_fill("1", InputType.SELECT, timeout=2),
+        xpaths[1].handle_fill("2", InputType.SELECT, timeout=2),
+    )
+
+    assert [s.selected for s in selects] == ["1", "2"]
+    # Uma única espera por campo, feita no navegador com o polling
+    # configurado e limitada ao timeout do preenchimento
+    assert sorted((arg["xpath"], arg["value"]) for arg, _ in waits) == [
+        ("//select[@id='a']", "1"), ("//select[@id='b']", "2"),
+    ]
+    for _, kwargs in waits:
+        assert kwargs["polling"] == DOM_WAIT_POLLING
+        assert 0 < kwargs["timeout"] <= 2 * XPE.TIMEOUT_MS_FACTOR
+
+
+class SlowPage(FakePage):
+    """Página cuja espera no navegador leva alguns ciclos do event loop."""
+
+    def __init__(self, select, waits, log, cycles=3):
+        super().__init__(select, waits)
+        self._log = log
+        self._cycles = cycles
+
+    async def wait_for_function(self, expression, arg=None, **kwargs):
+        for _ in range(self._cycles):
+            self._log.append(self._select.name)
+            # Cede o event loop, como o round trip ao navegador
+            await asyncio.sleep(0)
+        await super().wait_for_function(expression, arg, **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_fills_interleave():
+    log, waits = [], []
+    selects = [FakeSelect("a"), FakeSelect("b")]
+    xpaths = [
+        XPE(SlowPage(s, waits, log), None, None,
+            xpath=f"//select[@id='{s.name}']")
+        for s in selects
+    ]
+
+    await asyncio.gather(
+        xpaths[0].handle_fill("1", InputType.SELECT, timeout=2),
+        xpaths[1].handle_fill("2", InputType.SELECT, timeout=2),
+    )
+
+    assert [s.selected for s in selects] == ["1", "2"]
+    # Com espera bloqueante, toda a espera de 'a' terminaria antes do
+    # início da espera de 'b'. Com espera assíncrona elas se intercalam.
+    first_b = log.index("b")
+    last_a = len(log) - 1 - log[::-1].index("a")
+    assert first_b < last_a
+
+
+@pytest.mark.asyncio
+async def test_wait_until_returns_value_or_none_on_deadline():
+    calls = 0
+
+    def condition():
+        nonlocal calls
+        calls += 1
+        return "ok" if calls == 3 else None
+
+    assert await wait_until(condition, timeout=1, interval=0.01) == "ok"
+    assert await wait_until(lambda: False, timeout=0.05, interval=0.01) is None
+
+
+@pytest.mark.asyncio
+async def test_wait_until_propagates_unexpected_exceptions():
+    async def condition():
+        raise KeyError("boom")
+
+    with pytest.raises(KeyError):
+        await wait_until(condition, timeout=1, interval=0.01)
+    assert await wait_until(condition, timeout=0.05, interval=0.01,
+                            retry_on=(KeyError,)) is None
+
+
+@pytest.mark.asyncio
+async def test_retry_reraises_last_exception():
+    attempts = 0
+
+    async def action():
+        nonlocal attempts
+        attempts += 1
+        raise ValueError(attempts)
+
+    with pytest.raises(ValueError):
+        await retry(action, timeout=0.1, interval=0.02)
+    assert attempts > 1
+
+
+@pytest.mark.asyncio
+async def test_backoff_grows_and_respects_deadline():
+    delays = Backoff(interval=0.1, backoff=2, max_interval=0.3)
+    deadline = Deadline(10)
+    assert [round(delays.next(deadline), 2) for _ in range(4)] == [
+        0.1, 0.2, 0.3, 0.3,
+    ]
+    assert Backoff(interval=5).next(Deadline(0.01)) <= 0.01